@@ -1,4 +1,8 @@
 import os
+import sys
+import json
+import time
+import shutil
 import subprocess
 from datetime import datetime
 
@@ -6,48 +10,120 @@ from datetime import datetime
 cd = os.getcwd()
 TestDir = os.path.join(cd, "Tests")
 OutputTestDir = os.path.join(cd, "Tests")
+ResultJsonDir = os.path.join(OutputTestDir, "Test Results")
 DateAndTime = datetime.now().strftime("%Y-%m-%d %H-%M-%S")
 
 #If quick test, only the first version will be used
 QuickTest = True
 
+#How many Blender processes may run at once. Every suite of every version is it's own process
+MaxParallel = max(1, (os.cpu_count() or 2) // 2)
+
 TestExport =            True
 TestImport =            True
 InternalTest =          False #This is EOL, and this stuff is inherently testedin the import/export tests
 TestBaker =             True
 TestInApp =             True
 TestNormalConversion =  True
+TestBenchmark =         False #Slow. Generates large assets and checks how import/export time scales with size
+TestStartup =           True  #Starts a few fresh Blenders to time importing/registering the addon
+TestCore =              True  #Validates and round trips Tests/Content with the bpy-free Core library
+
+#Suites to run, as (enabled, script). Exclusive suites write their outputs to shared paths in Tests/Content before renaming them per version,
+#so only one version of them runs at a time
+Suites = [
+    (TestExport,            "export_tests.py",      False),
+    (TestImport,            "import_tests.py",      False),
+    (InternalTest,          "internal_tests.py",    False),
+    (TestBaker,             "bake_test.py",         True),
+    (TestInApp,             "in_app_tests.py",      False),
+    (TestNormalConversion,  "normal_conversion.py", True),
+    (TestBenchmark,         "benchmark_tests.py",   True),
+    (TestStartup,           "startup_benchmark.py", True),
+    (TestCore,              "core_tests.py",        False),
+]
+
+class test_job:
+    def __init__(self, version_name, blender_exe, script, exclusive):
+        self.version_name = version_name
+        self.blender_exe = blender_exe
+        self.script = script
+        self.exclusive = exclusive
+        self.result_path = os.path.join(ResultJsonDir, f"{version_name} {os.path.splitext(script)[0]}.json")
+        self.log_path = os.path.splitext(self.result_path)[0] + ".log"
+        self.process = None
+        self.log_file = None
+        self.start_time = 0.0
+        self.seconds = 0.0
+
+    def start(self):
+        env = os.environ.copy()
+        env["XP_EXT_TEST_RESULT_PATH"] = self.result_path
+        self.log_file = open(self.log_path, "w", encoding="utf-8")
+        self.start_time = time.perf_counter()
+        self.process = subprocess.Popen([
+            self.blender_exe,
+            "--background",
+            "--python", os.path.join(TestDir, self.script)
+        ], cwd=TestDir, env=env, stdout=self.log_file, stderr=subprocess.STDOUT)
+
+    def poll(self):
+        if self.process.poll() is None:
+            return False
+        self.seconds = time.perf_counter() - self.start_time
+        self.log_file.close()
+        return True
+
+def run_jobs(jobs):
+    pending = list(jobs)
+    running = []
+
+    while len(pending) > 0 or len(running) > 0:
+        for job in [j for j in running if j.poll()]:
+            running.remove(job)
+            print(f"Finished {job.version_name} {job.script} in {job.seconds:.1f}s (exit code {job.process.returncode})")
+
+        for job in list(pending):
+            if len(running) >= MaxParallel:
+                break
+            if job.exclusive and any(r.script == job.script for r in running):
+                continue
+            pending.remove(job)
+            job.start()
+            running.append(job)
+            print(f"Started {job.version_name} {job.script}")
+
+        time.sleep(0.2)
 
-def run_blender(blender_exe, script):
-    subprocess.run([
-        blender_exe,
-        "--background",
-        "--python", script
-    ], shell=True, cwd=TestDir)
-
-def test_all(blender_exe):
-    if TestExport:
-        run_blender(blender_exe, os.path.join(TestDir, "export_tests.py"))
-    if TestImport:
-        run_blender(blender_exe, os.path.join(TestDir, "import_tests.py"))
-    if InternalTest:
-        run_blender(blender_exe, os.path.join(TestDir, "internal_tests.py"))
-    if TestBaker:
-        run_blender(blender_exe, os.path.join(TestDir, "bake_test.py"))
-    if TestInApp:
-        run_blender(blender_exe, os.path.join(TestDir, "in_app_tests.py"))
-    if TestNormalConversion:
-        run_blender(blender_exe, os.path.join(TestDir, "normal_conversion.py"))
+def load_job_result(job):
+    if not os.path.exists(job.result_path):
+        return {"blender_version": job.version_name, "categories": [{"name": job.script, "tests": [{
+            "name": "Suite Error",
+            "passed": False,
+            "percentage": None,
+            "message": f"No results written. Exit code {job.process.returncode}. See {job.log_path}",
+            "seconds": job.seconds,
+        }]}]}
+
+    with open(job.result_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def csv_escape(text):
+    text = str(text).replace('\n', ';').replace('"', '""')
+    return f'"{text}"'
 
 #Run python build.py (same dir as this)
-subprocess.run(["python", "build.py"], cwd=cd)
+subprocess.run([sys.executable, "build.py"], cwd=cd)
 
-# Remove old result file
+# Remove old results
 results_path = os.path.join(OutputTestDir, "Test Results.csv")
+report_path = os.path.join(OutputTestDir, "Test Results.json")
 try:
     os.remove(results_path)
 except FileNotFoundError:
     pass
+shutil.rmtree(ResultJsonDir, ignore_errors=True)
+os.makedirs(ResultJsonDir, exist_ok=True)
 
 #Load the BlenderVersions.txt file from the test dir. Add to the blender_exe list
 blender_exes = []
@@ -63,20 +139,52 @@ with open(os.path.join(TestDir, "BlenderVersions.txt"), "r", encoding="utf-8") a
         path = tokens[1].strip()
         blender_exes.append([name, path])
 
-# Create new results file
-with open(results_path, "w", encoding="utf-8") as f:
-    f.write(f"{DateAndTime}\nTest Name,Result,Percentage,Message\n")
+if QuickTest:
+    blender_exes = blender_exes[:1]
+
+# Run every suite of every version in parallel
+jobs = []
+for exe in blender_exes:
+    for enabled, script, exclusive in Suites:
+        if enabled:
+            jobs.append(test_job(exe[0], exe[1], script, exclusive))
 
-# Run the tests for each version
-def add_result_header(header):
-    with open(results_path, "a", encoding="utf-8") as f:
-        f.write(f"{header}\n")
+start_time = time.perf_counter()
+run_jobs(jobs)
+total_seconds = time.perf_counter() - start_time
 
+# Merge the results of every job into one report, grouped by version in the same order as BlenderVersions.txt
+report = {"date": DateAndTime, "seconds": total_seconds, "versions": []}
 for exe in blender_exes:
-    add_result_header(f"{exe[0]} Tests")
-    test_all(exe[1])
-    if QuickTest:
-        break
+    version = {"name": exe[0], "suites": []}
+    for job in jobs:
+        if job.version_name != exe[0]:
+            continue
+        result = load_job_result(job)
+        version["suites"].append({"script": job.script, "seconds": job.seconds, "exit_code": job.process.returncode, "categories": result["categories"]})
+    report["versions"].append(version)
+
+with open(report_path, "w", encoding="utf-8") as f:
+    json.dump(report, f, indent=4)
+
+passed_count = 0
+failed_count = 0
+with open(results_path, "w", encoding="utf-8") as f:
+    f.write(f"{DateAndTime}\nTest Name,Result,Percentage,Message,Seconds\n")
+    for version in report["versions"]:
+        f.write(f"{version['name']} Tests\n")
+        for suite in version["suites"]:
+            for category in suite["categories"]:
+                f.write(f"{category['name']}:\n")
+                for test in category["tests"]:
+                    if test["passed"]:
+                        passed_count += 1
+                    else:
+                        failed_count += 1
+                    percentage = f"{test['percentage']:.2f}%" if test["percentage"] is not None else "N/A"
+                    f.write(f"{test['name']}:,{'PASS' if test['passed'] else 'FAIL'},{percentage},{csv_escape(test['message'])},{test['seconds']:.2f}\n")
+
+print(f"{passed_count} passed, {failed_count} failed, in {total_seconds:.1f}s")
 
 # Open the result file (platform-specific)
 if os.name == "nt":
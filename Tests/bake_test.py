@@ -20,8 +20,11 @@ def test_combined(test_dir):
     error_messages = ""
 
     albedo_similarity = 0
+    albedo_comparison = test_helpers.image_comparison()
     normal_similarity = 0
+    normal_comparison = test_helpers.image_comparison()
     lit_similarity = 0
+    lit_comparison = test_helpers.image_comparison()
 
     test_helpers.add_test_category("Bake Tests")
 
@@ -69,9 +72,12 @@ def test_combined(test_dir):
 
     #Compare the images
     try:
-        albedo_similarity = test_helpers.compare_images(test_albedo, known_good_albedo)
-        normal_similarity = test_helpers.compare_images(test_normal, known_good_normal)
-        lit_similarity = test_helpers.compare_images(test_lit, known_good_lit)
+        albedo_comparison = test_helpers.compare_images_detailed(test_albedo, known_good_albedo)
+        albedo_similarity = albedo_comparison.similarity
+        normal_comparison = test_helpers.compare_images_detailed(test_normal, known_good_normal)
+        normal_similarity = normal_comparison.similarity
+        lit_comparison = test_helpers.compare_images_detailed(test_lit, known_good_lit)
+        lit_similarity = lit_comparison.similarity
 
         #Rename the test result images to _version.test_result.png so they are ignored by git
         blender_version = bpy.app.version_string.split(".")
@@ -97,21 +103,21 @@ def test_combined(test_dir):
     test_helpers.append_test_results(
         albedo_similarity > 0.98,
         albedo_similarity * 100,
-        error_messages
+        error_messages + str(albedo_comparison)
     )
 
     test_helpers.add_test_name("Bake Test Combined Normal")
     test_helpers.append_test_results(
         normal_similarity > 0.98,
         normal_similarity * 100,
-        error_messages
+        error_messages + str(normal_comparison)
     )
 
     test_helpers.add_test_name("Bake Test Lit")
     test_helpers.append_test_results(
         lit_similarity > 0.98,
         lit_similarity * 100,
-        error_messages
+        error_messages + str(lit_comparison)
     )
 
 def test_separate(test_dir):
@@ -119,7 +125,9 @@ def test_separate(test_dir):
     error_messages = ""
 
     normal_similarity = 0
+    normal_comparison = test_helpers.image_comparison()
     material_similarity = 0
+    material_comparison = test_helpers.image_comparison()
 
     bpy.context.scene.xp_ext.low_poly_bake_margin = 2
     bpy.context.scene.xp_ext.low_poly_bake_extrusion_distance = 0.1
@@ -161,8 +169,10 @@ def test_separate(test_dir):
 
     #Compare the images
     try:
-        normal_similarity = test_helpers.compare_images(test_normal, known_good_normal)
-        material_similarity = test_helpers.compare_images(test_material, known_good_material)
+        normal_comparison = test_helpers.compare_images_detailed(test_normal, known_good_normal)
+        normal_similarity = normal_comparison.similarity
+        material_comparison = test_helpers.compare_images_detailed(test_material, known_good_material)
+        material_similarity = material_comparison.similarity
 
         #Rename the test result images to _version.test_result.png so they are ignored by git
         blender_version = bpy.app.version_string.split(".")
@@ -185,14 +195,14 @@ def test_separate(test_dir):
     test_helpers.append_test_results(
         normal_similarity > 0.98,
         normal_similarity * 100,
-        error_messages
+        error_messages + str(normal_comparison)
     )
 
     test_helpers.add_test_name("Bake Test Material")
     test_helpers.append_test_results(
         material_similarity > 0.98,
         material_similarity * 100,
-        error_messages
+        error_messages + str(material_comparison)
     )
 
 #Program entry point. Here we get the test directory, and call the test function
@@ -0,0 +1,259 @@
+#Project: Blender-X-Plane-Extensions
+#Author: Connor Russell
+#Date: 10/19/2026
+#Module: benchmark_generators.py
+#Purpose: Generate parametrically large X-Plane assets for the scaling benchmarks. Does not depend on bpy, so assets can be generated outside Blender
+
+import math
+import os
+
+def write_lines(path, lines):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+        f.write("\n")
+
+def get_grid_quads(quad_count, width, height):
+    """
+    Gets a grid of quads, as close to square as possible, covering width x height.
+    Returns:
+        list of Tuple[float, float, float, float]: left, bottom, right, top of each quad.
+    """
+    columns = max(1, int(math.ceil(math.sqrt(quad_count))))
+    rows = max(1, int(math.ceil(quad_count / columns)))
+    quad_w = width / columns
+    quad_h = height / rows
+
+    quads = []
+    for i in range(quad_count):
+        x = i % columns
+        y = i // columns
+        quads.append((x * quad_w, y * quad_h, (x + 1) * quad_w, (y + 1) * quad_h))
+    return quads
+
+def append_idx_lines(lines, indicies, command="IDX", per_line=10):
+    for i in range(0, len(indicies), per_line):
+        lines.append(command + " " + " ".join(str(idx) for idx in indicies[i:i + per_line]))
+
+def generate_obj(path, vertex_count, draw_call_count=1, lod_count=1, anim_depth=0):
+    """
+    Generates an OBJ8 of flat quads split evenly into draw calls and LODs. The last draw call of each LOD is nested anim_depth levels deep in alternating translate/rotate animations.
+    Args:
+        path (str): The path to write the .obj to.
+        vertex_count (int): Approximate number of vertices. Rounded down to a multiple of 4 (one quad).
+        draw_call_count (int): Number of draw calls per LOD.
+        lod_count (int): Number of LODs. Each has the same geometry.
+        anim_depth (int): Depth of the animation tree around the last draw call of each LOD.
+    """
+    quad_count = max(draw_call_count * lod_count, vertex_count // 4)
+    quads = get_grid_quads(quad_count, 100.0, 100.0)
+
+    vt_lines = []
+    indicies = []
+    for i, (l, b, r, t) in enumerate(quads):
+        for x, z, u, v in ((l, b, 0, 0), (r, b, 1, 0), (r, t, 1, 1), (l, t, 0, 1)):
+            vt_lines.append(f"VT {x:.4f} 0.0000 {-z:.4f} 0 1 0 {u} {v}")
+        base = i * 4
+        indicies.extend((base, base + 1, base + 2, base, base + 2, base + 3))
+
+    lines = ["I", "800", "OBJ", "", "TEXTURE bench.png", f"POINT_COUNTS {len(vt_lines)} 0 0 {len(indicies)}", ""]
+    lines.extend(vt_lines)
+    lines.append("")
+    append_idx_lines(lines, indicies, "IDX10")
+    lines.append("")
+
+    #Split the triangles into draw_call_count * lod_count runs
+    total_calls = draw_call_count * lod_count
+    tris_per_call = (len(indicies) // 3) // total_calls
+    offset = 0
+    for lod in range(lod_count):
+        if lod_count > 1:
+            lines.append(f"ATTR_LOD {lod * 1000} {(lod + 1) * 1000}")
+        for dc in range(draw_call_count):
+            is_last_call = dc == draw_call_count - 1 and lod == lod_count - 1
+            count = (len(indicies) - offset) if is_last_call else tris_per_call * 3
+
+            if dc == draw_call_count - 1 and anim_depth > 0:
+                for depth in range(anim_depth):
+                    lines.append("ANIM_begin")
+                    if depth % 2 == 0:
+                        lines.append("ANIM_trans_begin bench/anim")
+                        lines.append("ANIM_trans_key 0 0 0 0")
+                        lines.append(f"ANIM_trans_key 1 {depth * 0.1:.2f} 0 0")
+                        lines.append("ANIM_trans_end")
+                    else:
+                        lines.append("ANIM_rotate_begin 0 1 0 bench/anim")
+                        lines.append("ANIM_rotate_key 0 0")
+                        lines.append("ANIM_rotate_key 1 90")
+                        lines.append("ANIM_rotate_end")
+                lines.append(f"TRIS {offset} {count}")
+                for depth in range(anim_depth):
+                    lines.append("ANIM_end")
+            else:
+                lines.append(f"TRIS {offset} {count}")
+            offset += count
+
+    write_lines(path, lines)
+
+def generate_facade(path, floor_count, segment_count, attachment_count, quads_per_segment=8):
+    """
+    Generates a mesh facade. Every floor has it's own segments (each a strip of quads with attached objects) and a wall spelling all of them.
+    Args:
+        path (str): The path to write the .fac to.
+        floor_count (int): Number of floors.
+        segment_count (int): Number of segments per floor. Each segment also has a curved variant.
+        attachment_count (int): Number of attached objects per segment.
+        quads_per_segment (int): Number of quads in each segment's mesh.
+    """
+    attach_name = "bench_attach.obj"
+    generate_obj(os.path.join(os.path.dirname(path), attach_name), 4)
+
+    lines = ["I", "1000", "FACADE", "", "GRADED", "RING 1", "",
+             "SHADER_WALL", "NORMAL_METALNESS", "TEXTURE bench.png", "", "SHADER_ROOF", "NORMAL_METALNESS", "TEXTURE bench.png", "ROOF_SCALE 8.0 8.0", "",
+             f"OBJ {attach_name}"]
+
+    for floor in range(floor_count):
+        lines.append(f"FLOOR Floor_{floor}")
+        lines.append(f"ROOF_HEIGHT {float(floor * 4 + 4)}")
+
+        for curved in (False, True):
+            for seg in range(segment_count):
+                lines.append("")
+                lines.append(f"SEGMENT_CURVED {seg}" if curved else f"SEGMENT {seg}")
+
+                vertex_lines = []
+                indicies = []
+                for q in range(quads_per_segment):
+                    z0 = q / quads_per_segment * 4.0
+                    z1 = (q + 1) / quads_per_segment * 4.0
+                    for x, y, u, v in ((0.0, z0, 0.0, z0 / 4), (4.0, z0, 1.0, z0 / 4), (4.0, z1, 1.0, z1 / 4), (0.0, z1, 0.0, z1 / 4)):
+                        vertex_lines.append(f"VERTEX {x:.8f} {y:.8f} 0.00000000 0.00000000 0.00000000 -1.00000000 {u:.8f} {v:.8f}")
+                    base = q * 4
+                    indicies.extend((base, base + 1, base + 2, base, base + 2, base + 3))
+
+                lines.append(f"MESH 0 1000 {len(vertex_lines)} {len(indicies)}")
+                lines.extend(vertex_lines)
+                append_idx_lines(lines, indicies)
+
+                for a in range(attachment_count):
+                    lines.append(f"ATTACH_GRADED 0 {a / max(1, attachment_count) * 4.0:.8f} 0.00000000 0.00000000 180.0000 0 0")
+
+        lines.append("")
+        lines.append(f"WALL 0.0 1000.0 0.0 360.0 Wall_{floor}")
+        lines.append("SPELLING " + " ".join(str(seg) for seg in range(segment_count)))
+        lines.append("")
+
+    write_lines(path, lines)
+
+def generate_forest(path, tree_count, vertices_per_tree=24):
+    """
+    Generates a forest with tree_count trees, each with it's own 3D mesh.
+    Args:
+        path (str): The path to write the .for to.
+        tree_count (int): Number of trees.
+        vertices_per_tree (int): Approximate number of vertices in each tree's mesh. Rounded down to a multiple of 4 (one quad).
+    """
+    lines = ["A", "1200", "FOREST", "", "SHADER_2D", "\tTEXTURE bench.png", "SHADER_3D", "\tTEXTURE bench.png", "",
+             "SCALE_X 1024", "SCALE_Y 1024", "SPACING 10.0 10.0", "RANDOM 2.0 2.0", ""]
+
+    quads_per_tree = max(1, vertices_per_tree // 4)
+    tree_lines = []
+    for tree in range(tree_count):
+        mesh_name = f"Mesh_{tree}"
+        vertex_lines = []
+        indicies = []
+        for q in range(quads_per_tree):
+            angle = math.pi * q / quads_per_tree
+            dx = math.cos(angle) * 2.0
+            dy = math.sin(angle) * 2.0
+            for x, y, z, u, v in ((-dx, -dy, 0.0, 0, 0), (dx, dy, 0.0, 1, 0), (dx, dy, 6.0, 1, 1), (-dx, -dy, 6.0, 0, 1)):
+                vertex_lines.append(f"VERTEX {x:.8f} {z:.8f} {y:.8f} {-dy:.8f} 0.00000000 {dx:.8f} {u} {v} 0.5 0.5 0.0")
+            base = q * 4
+            indicies.extend((base, base + 1, base + 2, base, base + 2, base + 3))
+
+        lines.append(f"MESH {mesh_name} 0 1000 {len(vertex_lines)} {len(indicies)} 0.5 0.5 10")
+        lines.extend(vertex_lines)
+        append_idx_lines(lines, indicies)
+        lines.append("")
+
+        #Trees are spread over the texture so they don't all share a quad
+        quad_x = (tree % 16) * 64
+        quad_y = ((tree // 16) % 16) * 64
+        tree_lines.append(f"TREE2 {quad_x} {quad_y} 64 64 32 1.0 6.0 8.0 7.0 1000 2 0 Tree_{tree}")
+        tree_lines.append(f"MESH_3D {mesh_name}")
+
+    lines.extend(tree_lines)
+    write_lines(path, lines)
+
+def generate_agp(path, placement_count, tile_count=1):
+    """
+    Generates an AGP with placement_count draped objects spread evenly over tile_count tiles.
+    Args:
+        path (str): The path to write the .agp to.
+        placement_count (int): Total number of object placements.
+        tile_count (int): Number of tiles.
+    """
+    attach_name = "bench_attach.obj"
+    generate_obj(os.path.join(os.path.dirname(path), attach_name), 4)
+
+    lines = ["A", "1000", "AG_POINT", "", "TEXTURE bench.png", "TEXTURE_SCALE 1024 1024", "TEXTURE_WIDTH 100", "", f"OBJECT {attach_name}", ""]
+
+    per_tile = placement_count // max(1, tile_count)
+    placements = get_grid_quads(max(1, per_tile), 1000.0, 1000.0)
+    for t in range(tile_count):
+        lines.append("TILE 0 0 1024 1024")
+        lines.append("ANCHOR_PT 512 512")
+        count = placement_count - per_tile * (tile_count - 1) if t == tile_count - 1 else per_tile
+        for i in range(count):
+            l, b, r, top = placements[i % len(placements)]
+            lines.append(f"OBJ_DRAPED {(l + r) / 2 + 12:.2f} {(b + top) / 2 + 12:.2f} {i % 360} 0")
+        lines.append("")
+
+    write_lines(path, lines)
+
+def generate_lin(path, segment_count):
+    """
+    Generates a painted line with segment_count segments, each on it's own layer with a start and end cap.
+    Args:
+        path (str): The path to write the .lin to.
+        segment_count (int): Number of segments.
+    """
+    lines = ["A", "850", "LINE_PAINT", "", "TEXTURE bench.png", "LAYER_GROUP objects 0", "SCALE 9 37", "TEX_WIDTH 4096", "TEX_HEIGHT 4096", ""]
+
+    #Each segment is a 24 pixel wide strip, wrapping around the texture width
+    cap_lines = []
+    for i in range(segment_count):
+        left = (i * 32) % 4064
+        lines.append(f"S_OFFSET {i} {left} {left + 12} {left + 24}")
+        cap_lines.append(f"START_CAP {i} {left} {left + 12} {left + 24} 0 64")
+        cap_lines.append(f"END_CAP {i} {left} {left + 12} {left + 24} 4032 4096")
+
+    lines.append("")
+    lines.extend(cap_lines)
+    write_lines(path, lines)
+
+def generate_pol(path, subtexture_count):
+    """
+    Generates a draped polygon with subtexture_count subtextures in a grid over the texture.
+    Args:
+        path (str): The path to write the .pol to.
+        subtexture_count (int): Number of subtextures.
+    """
+    lines = ["A", "850", "DRAPED_POLYGON", "", "TEXTURE bench.png", "NO_BLEND 0.50", "LAYER_GROUP objects 0", "SCALE 10 10", "SURFACE CONCRETE", ""]
+
+    for l, b, r, t in get_grid_quads(subtexture_count, 1.0, 1.0):
+        lines.append(f"#subtex {l:.4f} {b:.4f} {r:.4f} {t:.4f}")
+
+    write_lines(path, lines)
+
+#Generator for each benchmarked type, with the extension it writes. Each takes (path, scale), and the size of the asset is proportional to scale
+generators = {
+    "OBJ": (".obj", lambda path, scale: generate_obj(path, 5000 * scale, draw_call_count=8, lod_count=3, anim_depth=4)),
+    "OBJ Anim": (".obj", lambda path, scale: generate_obj(path, 64, anim_depth=8 * scale)),
+    "Facade": (".fac", lambda path, scale: generate_facade(path, floor_count=2 * scale, segment_count=8, attachment_count=4)),
+    "Forest": (".for", lambda path, scale: generate_forest(path, tree_count=50 * scale)),
+    "Forest Seasons": (".for", lambda path, scale: generate_forest(path, tree_count=50 * scale)),
+    "AGP": (".agp", lambda path, scale: generate_agp(path, placement_count=200 * scale)),
+    "Line": (".lin", lambda path, scale: generate_lin(path, segment_count=16 * scale)),
+    "Polygon": (".pol", lambda path, scale: generate_pol(path, subtexture_count=64 * scale)),
+}
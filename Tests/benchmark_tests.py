@@ -0,0 +1,263 @@
+#Project: Blender-X-Plane-Extensions
+#Author: Connor Russell
+#Date: 10/19/2026
+#Module: benchmark_tests.py
+#Purpose: Time and memory profile importing and exporting generated assets at increasing sizes, and flag importers/exporters whose time grows faster than the stored baseline
+#Usage: blender --background --python benchmark_tests.py -- [--scales 1,2,4,8] [--update-baseline]
+
+import bpy
+import os
+import sys
+import json
+import math
+import time
+import shutil
+import tempfile
+import tracemalloc
+from datetime import datetime
+
+# Add the directory containing this script to sys.path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+if script_dir not in sys.path:
+    sys.path.insert(0, script_dir)
+
+import test_helpers
+import benchmark_generators
+
+#Scales each asset is generated at. Sizes are proportional to these, see benchmark_generators.generators
+default_scales = [1, 2, 4, 8]
+
+#Without a baseline, a scaling exponent above this is flagged. 1.0 is linear
+max_exponent = 1.3
+
+#With a baseline, an exponent this much above the baseline's is flagged
+baseline_tolerance = 0.2
+
+#Times below this (at the largest scale) are too noisy to judge scaling from, so they aren't flagged
+min_judged_seconds = 0.05
+
+baseline_path = os.path.join(script_dir, "benchmark_baseline.json")
+results_dir = os.path.join(script_dir, "Benchmark Results")
+
+#Import operator and exportable property group for each benchmarked type. OBJs have no exporter, so only their import is benchmarked
+import_operators = {
+    ".lin": lambda: bpy.ops.import_scene.xp_lin,
+    ".pol": lambda: bpy.ops.import_scene.xp_pol,
+    ".obj": lambda: bpy.ops.import_scene.xp_obj,
+    ".fac": lambda: bpy.ops.import_scene.xp_fac,
+    ".for": lambda: bpy.ops.import_scene.xp_for,
+    ".agp": lambda: bpy.ops.import_scene.xp_agp,
+}
+export_operators = {
+    ".lin": (lambda: bpy.ops.xp_ext.export_lines, "xp_lin"),
+    ".pol": (lambda: bpy.ops.xp_ext.export_polygons, "xp_pol"),
+    ".fac": (lambda: bpy.ops.xp_ext.export_facades, "xp_fac"),
+    ".for": (lambda: bpy.ops.xp_ext.export_forests, "xp_for"),
+    ".agp": (lambda: bpy.ops.xp_ext.export_agps, "xp_agp"),
+}
+
+def enable_forest_seasons(collection):
+    """
+    Turns on seasons for an imported forest, using it's own material for all 4, so the export writes the _SP/_SU/_FL/_WI variants from one shared body.
+    """
+    material = next(obj.active_material for child in collection.children for obj in child.objects if obj.active_material is not None)
+    props = collection.xp_for
+    props.has_seasons = True
+    for season in ("spring", "summer", "fall", "winter"):
+        setattr(props, f"{season}_material_2d", material)
+        setattr(props, f"{season}_material_3d", material)
+
+#Setup applied to the imported collection before it's exported, for cases that benchmark an export option the importer can't set
+export_setups = {
+    "Forest Seasons": enable_forest_seasons,
+}
+
+def time_call(func):
+    """
+    Runs a function and measures how long it took. Nothing else is traced, so the time isn't inflated by tracemalloc.
+    Returns:
+        float: Seconds.
+    """
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+def peak_memory_call(func):
+    """
+    Runs a function under tracemalloc and measures it's peak Python memory use. Memory allocated by Blender itself is not included.
+    tracemalloc slows Python down several times, so this is a separate run from the timed one.
+    Returns:
+        float: Peak memory in MB.
+    """
+    tracemalloc.start()
+    try:
+        func()
+    finally:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return peak / (1024 * 1024)
+
+def import_and_export(asset_path, case_name, blend_path, measure, export_setup=None):
+    """
+    Imports an asset into an empty file, then exports it again, measuring both with measure.
+    Args:
+        asset_path (str): The generated asset.
+        case_name (str): Name of the benchmark case. The export is written next to the asset as <case_name>.exported.
+        blend_path (str): Where to save the empty .blend, so exports have a folder to resolve paths against.
+        measure (callable): time_call or peak_memory_call.
+        export_setup (callable): Optional function run on the imported collection before it's exported. Not measured.
+    Returns:
+        Tuple: The import measurement, and the export measurement (None if the type has no exporter).
+    """
+    extension = os.path.splitext(asset_path)[1]
+
+    bpy.ops.wm.read_homefile(use_empty=True)
+    bpy.ops.wm.save_as_mainfile(filepath=blend_path)
+
+    collections_before = set(bpy.data.collections.keys())
+    import_value = measure(lambda: import_operators[extension]()('EXEC_DEFAULT', filepath=asset_path, files=[{"name": os.path.basename(asset_path)}]))
+
+    if extension not in export_operators:
+        return import_value, None
+
+    export_operator, props_name = export_operators[extension]
+
+    new_collections = [col for col in bpy.data.collections if col.name not in collections_before]
+    if len(new_collections) == 0:
+        raise ValueError(f"Importing {asset_path} did not create a collection")
+
+    #Only the first new collection (the asset) is exported, to a different file than was imported
+    for col in bpy.data.collections:
+        getattr(col, props_name).exportable = False
+    getattr(new_collections[0], props_name).exportable = True
+    getattr(new_collections[0], props_name).name = case_name + ".exported"
+    if export_setup is not None:
+        export_setup(new_collections[0])
+
+    return import_value, measure(lambda: export_operator()())
+
+def run_case(type_name, scale, work_dir):
+    """
+    Generates an asset, then imports it into an empty file and exports it again twice: once timed, and once for memory.
+    Returns:
+        dict: The type, scale, file size, and import/export seconds and peak MB. Export values are None if the type has no exporter.
+    """
+    extension, generate = benchmark_generators.generators[type_name]
+    export_setup = export_setups.get(type_name)
+    case_name = f"bench_{type_name.replace(' ', '_')}_{scale}"
+    asset_path = os.path.join(work_dir, case_name + extension)
+
+    generate(asset_path, scale)
+
+    result = {
+        "type": type_name,
+        "scale": scale,
+        "file_bytes": os.path.getsize(asset_path),
+    }
+
+    result["import_seconds"], result["export_seconds"] = import_and_export(asset_path, case_name, os.path.join(work_dir, case_name + ".blend"), time_call, export_setup)
+    result["import_peak_mb"], result["export_peak_mb"] = import_and_export(asset_path, case_name, os.path.join(work_dir, case_name + "_memory.blend"), peak_memory_call, export_setup)
+
+    return result
+
+def get_scaling_exponent(results, key):
+    """
+    Fits value = c * scale ^ exponent to the results with a least squares fit in log-log space. 1.0 is linear, 2.0 is quadratic.
+    Returns:
+        float: The exponent, or None if there aren't 2 usable results.
+    """
+    points = [(math.log(r["scale"]), math.log(r[key])) for r in results if r[key] is not None and r[key] > 0]
+    if len(points) < 2:
+        return None
+
+    mean_x = sum(p[0] for p in points) / len(points)
+    mean_y = sum(p[1] for p in points) / len(points)
+    var_x = sum((p[0] - mean_x) ** 2 for p in points)
+    if var_x == 0:
+        return None
+    return sum((p[0] - mean_x) * (p[1] - mean_y) for p in points) / var_x
+
+def load_baseline():
+    if not os.path.exists(baseline_path):
+        return {}
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def write_results(results, exponents):
+    os.makedirs(results_dir, exist_ok=True)
+    stamp = datetime.now().strftime("%Y-%m-%d %H-%M-%S")
+    base_name = f"Benchmark {bpy.app.version_string} {stamp}"
+
+    with open(os.path.join(results_dir, base_name + ".json"), "w", encoding="utf-8") as f:
+        json.dump({"blender_version": bpy.app.version_string, "date": stamp, "results": results, "exponents": exponents}, f, indent=4)
+
+    columns = ["type", "scale", "file_bytes", "import_seconds", "import_peak_mb", "export_seconds", "export_peak_mb"]
+    with open(os.path.join(results_dir, base_name + ".csv"), "w", encoding="utf-8", newline="") as f:
+        f.write(",".join(columns) + "\n")
+        for r in results:
+            f.write(",".join("" if r[c] is None else str(r[c]) for c in columns) + "\n")
+
+def test(scales, update_baseline):
+    test_helpers.add_test_category("Benchmarks")
+
+    baseline = load_baseline()
+    work_dir = tempfile.mkdtemp(prefix="xp_ext_benchmark_")
+    results = []
+    exponents = {}
+
+    try:
+        for type_name in benchmark_generators.generators:
+            type_results = []
+            for scale in scales:
+                try:
+                    r = run_case(type_name, scale, work_dir)
+                    type_results.append(r)
+                    print(f"Benchmark {type_name} x{scale}: {r}")
+                except Exception as e:
+                    test_helpers.add_test_name(f"Benchmark {type_name} x{scale}")
+                    test_helpers.append_test_fail(f"Error running benchmark: {str(e)}")
+            results.extend(type_results)
+
+            for key in ("import_seconds", "export_seconds", "import_peak_mb", "export_peak_mb"):
+                exponent = get_scaling_exponent(type_results, key)
+                if exponent is None:
+                    continue
+                exponents[f"{type_name} {key}"] = exponent
+
+                #Only time is flagged, memory is reported for reference
+                if not key.endswith("seconds"):
+                    continue
+
+                largest = max(r[key] for r in type_results if r[key] is not None)
+                baseline_exponent = baseline.get(f"{type_name} {key}")
+                limit = max_exponent if baseline_exponent is None else max(1.0, baseline_exponent) + baseline_tolerance
+                judged = largest >= min_judged_seconds
+
+                test_helpers.add_test_name(f"Benchmark {type_name} {key.split('_')[0]} scaling")
+                message = f"Exponent {exponent:.2f} (limit {limit:.2f}), {largest:.3f}s at x{max(scales)}"
+                if not judged:
+                    message += ". Too fast to judge"
+                test_helpers.append_test_results(not judged or exponent <= limit, None, message)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    write_results(results, exponents)
+
+    #The first run on a machine (or one without a baseline) becomes the baseline, so later runs are compared to real measurements
+    if len(baseline) == 0 and not update_baseline:
+        print(f"No benchmark baseline found, saving this run's exponents to {baseline_path}")
+        update_baseline = True
+
+    if update_baseline:
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump(exponents, f, indent=4, sort_keys=True)
+
+#Program entry point. Arguments after -- are for us
+if __name__ == "__main__":
+    args = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+
+    scales = default_scales
+    if "--scales" in args:
+        scales = [int(s) for s in args[args.index("--scales") + 1].split(",")]
+
+    test(scales, "--update-baseline" in args)
@@ -0,0 +1,132 @@
+#Project: Blender-X-Plane-Extensions
+#Author: Connor Russell
+#Date: 10/19/2026
+#Module: core_tests.py
+#Purpose: Test that the bpy-free Core library validates and round trips every X-Plane file in Tests/Content, and the generated benchmark assets
+
+import os
+import sys
+import tempfile
+
+# Add the directory containing this script to sys.path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+if script_dir not in sys.path:
+    sys.path.insert(0, script_dir)
+
+#Core is imported from the repository's addon folder as a top level package, the same way python -m Core runs it
+addon_dir = os.path.join(os.path.dirname(script_dir), "io_scene_xplane_ext")
+if addon_dir not in sys.path:
+    sys.path.insert(0, addon_dir)
+
+#Core doesn't need Blender, so neither does this suite. Inside Blender results go through test_helpers, otherwise they are printed
+try:
+    import test_helpers
+except ImportError:
+    test_helpers = None
+
+import benchmark_generators
+from Core import parser
+from Core import serializer
+from Core import validate
+from Core import compare
+
+extensions = (".obj", ".fac", ".for", ".agp", ".lin", ".pol")
+
+def round_trip(path, temp_dir):
+    """
+    Parses a file, writes it back out, parses that, and compares the two.
+    Args:
+        path (str): The file to round trip.
+        temp_dir (str): Folder to write the copy to.
+    Returns:
+        list of str: The differences. Empty if the file round trips.
+    """
+    doc = parser.parse_file(path)
+    out_path = os.path.join(temp_dir, "RoundTrip" + os.path.splitext(path)[1])
+    serializer.write_file(doc, out_path, do_update_counts=False)
+    return compare.compare_documents(doc, parser.parse_file(out_path))
+
+#Names of the tests that failed when running without Blender
+failed_tests = []
+
+def report(name, message):
+    """
+    Reports a test's result.
+    Args:
+        name (str): The test's name.
+        message (str): Why the test failed. Empty if it passed.
+    """
+    if test_helpers is not None:
+        test_helpers.add_test_name(name)
+        if message == "":
+            test_helpers.append_test_results(True, 100, "")
+        else:
+            test_helpers.append_test_fail(message)
+        return
+
+    if message == "":
+        print(f"PASS {name}")
+    else:
+        failed_tests.append(name)
+        print(f"FAIL {name}: {message}")
+
+def test_file(path, temp_dir):
+    name = "Core " + os.path.basename(path)
+
+    issues = validate.validate(parser.parse_file(path))
+    if len(issues) > 0:
+        report(name, "Validation: " + "; ".join(issues[:10]))
+        return
+
+    differences = round_trip(path, temp_dir)
+    if len(differences) > 0:
+        report(name, "Round trip: " + "; ".join(differences[:10]))
+        return
+
+    report(name, "")
+
+def test(test_dir):
+    paths = []
+    for folder in ("Import Tests", "Export Tests"):
+        folder_path = os.path.join(test_dir, folder)
+        for file in sorted(os.listdir(folder_path)):
+            #_READ files are importer output dumps, not X-Plane files
+            if file.lower().endswith(extensions) and "_READ" not in file:
+                paths.append(os.path.join(folder_path, file))
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        generated = {
+            "Generated.obj": lambda p: benchmark_generators.generate_obj(p, 3000, 4, 2, 3),
+            "Generated.fac": lambda p: benchmark_generators.generate_facade(p, 3, 4, 2),
+            "Generated.for": lambda p: benchmark_generators.generate_forest(p, 50),
+            "Generated.agp": lambda p: benchmark_generators.generate_agp(p, 50),
+        }
+        for name, generate in generated.items():
+            path = os.path.join(temp_dir, name)
+            generate(path)
+            paths.append(path)
+
+        for path in paths:
+            try:
+                test_file(path, temp_dir)
+            except Exception as e:
+                report("Core " + os.path.basename(path), f"Error testing {os.path.basename(path)}: {e}")
+
+if __name__ == "__main__":
+
+    #Test.py runs suites from the Tests folder. Without Blender, the script can be run from anywhere with python Tests/core_tests.py
+    test_dir = os.getcwd() + os.sep + "Content"
+    if test_helpers is None:
+        test_dir = os.path.join(script_dir, "Content")
+    print("Core Tests Directory: " + test_dir)
+
+    try:
+        test(test_dir)
+    except Exception as e:
+        print("Fatal error in core tests: " + str(e))
+        if test_helpers is None:
+            sys.exit(2)
+
+    if test_helpers is None:
+        print(f"{len(failed_tests)} core test(s) failed")
+        sys.exit(1 if len(failed_tests) > 0 else 0)
@@ -108,13 +108,13 @@ def test(test_dir):
                 raise FileNotFoundError(f"Output file was not created: {output_path}")
 
             #Compare the two files
-            line_diff, similarity = test_helpers.compare_files(output_path, good_file)
+            similarity, differences = test_helpers.compare_x_plane_files(output_path, good_file)
 
             if similarity < 0.98:
                 failed_count += 1
 
             test_helpers.append_test_results(similarity >= 0.98, similarity * 100, 
-                f"Different line count {line_diff}")
+                test_helpers.differences_to_string(differences) if len(differences) > 0 else "Files match")
 
         except Exception as e:
             print(f"Error exporting {base_name}: {str(e)}")
@@ -47,9 +47,9 @@ def test(test_dir):
     print("Comparing generated normal map: " + nml_texture + " with known good: " + good_nml_texture)
 
     #Now compare the two images
-    similiarity = test_helpers.compare_images(nml_texture, good_nml_texture)
+    comparison = test_helpers.compare_images_detailed(nml_texture, good_nml_texture)
 
-    test_helpers.append_test_results(similiarity > 0.98, similiarity * 100, "")
+    test_helpers.append_test_results(comparison.similarity > 0.98, comparison.similarity * 100, str(comparison))
 
 #Program entry point. Here we get the test directory, and call the test function
 if __name__ == "__main__":
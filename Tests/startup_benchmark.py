@@ -0,0 +1,173 @@
+#Project: Blender-X-Plane-Extensions
+#Author: Connor Russell
+#Date: 10/19/2026
+#Module: startup_benchmark.py
+#Purpose: Measure how long importing and registering the addon takes in a fresh Blender, and check that registering doesn't import the heavy format, bake, and conversion modules
+#Usage: blender --background --python startup_benchmark.py -- [--runs 5]
+
+import bpy
+import os
+import sys
+import json
+import time
+import tempfile
+import importlib
+import subprocess
+import statistics
+from datetime import datetime
+
+#The addon is imported from the repository, not from Blender's addons folder
+script_dir = os.path.dirname(os.path.abspath(__file__))
+repo_dir = os.path.dirname(script_dir)
+
+addon_name = "io_scene_xplane_ext"
+
+#Addon modules that should only be imported when an operator first needs them. Anything in Types is also deferred
+deferred_modules = [
+    "exporter",
+    "importer",
+    "export_farm",
+    "auto_baker",
+    "anim_actions",
+    "Helpers.bake_utils",
+    "Helpers.normal_conversion_utils",
+    "Helpers.facade_utils",
+    "Helpers.for_utils",
+    "Helpers.geometery_utils",
+    "Helpers.vertex_utils",
+    "Helpers.light_data",
+]
+
+default_runs = 5
+
+results_dir = os.path.join(script_dir, "Benchmark Results")
+
+def get_loaded_deferred_modules():
+    """
+    Gets the deferred modules that are currently imported.
+    Returns:
+        list of str: Module names, relative to the addon package, plus "numpy" if it is imported.
+    """
+    loaded = [name for name in deferred_modules if f"{addon_name}.{name}" in sys.modules]
+    loaded += [name[len(addon_name) + 1:] for name in sys.modules if name.startswith(addon_name + ".Types.")]
+    if "numpy" in sys.modules:
+        loaded.append("numpy")
+    return loaded
+
+def measure(out_path):
+    """
+    Imports and registers the addon from the repository, then imports the deferred modules like the first operator would, and saves how long each step took.
+    Must be run in a fresh Blender started with --factory-startup, so nothing has imported the addon or NumPy yet.
+    Args:
+        out_path (str): The path to save the results JSON to.
+    """
+    if repo_dir not in sys.path:
+        sys.path.insert(0, repo_dir)
+
+    numpy_preloaded = "numpy" in sys.modules
+
+    start = time.perf_counter()
+    addon = importlib.import_module(addon_name)
+    import_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    addon.register()
+    register_seconds = time.perf_counter() - start
+
+    loaded_by_register = [name for name in get_loaded_deferred_modules() if not (name == "numpy" and numpy_preloaded)]
+
+    start = time.perf_counter()
+    for name in deferred_modules:
+        importlib.import_module(f"{addon_name}.{name}")
+    deferred_seconds = time.perf_counter() - start
+
+    addon.unregister()
+
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "import_seconds": import_seconds,
+            "register_seconds": register_seconds,
+            "deferred_seconds": deferred_seconds,
+            "loaded_by_register": loaded_by_register,
+            "numpy_preloaded": numpy_preloaded,
+        }, f)
+
+def run_measure_process(out_path):
+    """
+    Starts a fresh Blender that runs measure(), and waits for it.
+    Returns:
+        float: Seconds from starting Blender to it exiting.
+    """
+    #The child must not write to our test results
+    env = os.environ.copy()
+    env.pop("XP_EXT_TEST_RESULT_PATH", None)
+
+    start = time.perf_counter()
+    subprocess.run([
+        bpy.app.binary_path,
+        "--background",
+        "--factory-startup",
+        "--python", os.path.abspath(__file__),
+        "--", "--measure", out_path
+    ], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+    return time.perf_counter() - start
+
+def test(runs):
+    #Only import test_helpers here, the measuring process must not write test results
+    sys.path.insert(0, script_dir)
+    import test_helpers
+
+    test_helpers.add_test_category("Startup Benchmark")
+
+    work_dir = tempfile.mkdtemp(prefix="xp_ext_startup_")
+    samples = []
+    process_seconds = []
+    for i in range(runs):
+        out_path = os.path.join(work_dir, f"run_{i}.json")
+        process_seconds.append(run_measure_process(out_path))
+        if not os.path.exists(out_path):
+            test_helpers.add_test_name(f"Startup run {i}")
+            test_helpers.append_test_fail("Blender exited without writing results. Run startup_benchmark.py with -- --measure <path> to see the error")
+            continue
+        with open(out_path, "r", encoding="utf-8") as f:
+            samples.append(json.load(f))
+        os.remove(out_path)
+    os.rmdir(work_dir)
+
+    if len(samples) == 0:
+        return
+
+    summary = {
+        "blender_version": bpy.app.version_string,
+        "runs": len(samples),
+        "import_ms": statistics.median(s["import_seconds"] for s in samples) * 1000,
+        "register_ms": statistics.median(s["register_seconds"] for s in samples) * 1000,
+        "deferred_ms": statistics.median(s["deferred_seconds"] for s in samples) * 1000,
+        "blender_process_ms": statistics.median(process_seconds) * 1000,
+        "loaded_by_register": sorted(set(name for s in samples for name in s["loaded_by_register"])),
+    }
+    print(f"Startup benchmark: {summary}")
+
+    test_helpers.add_test_name("Startup registration imports")
+    loaded = summary["loaded_by_register"]
+    test_helpers.append_test_results(len(loaded) == 0, None, "No deferred modules imported" if len(loaded) == 0 else "Imported by registering: " + ", ".join(loaded))
+
+    test_helpers.add_test_name("Startup timings")
+    test_helpers.append_test_results(True, None, f"Import {summary['import_ms']:.1f}ms, register {summary['register_ms']:.1f}ms, first operator imports {summary['deferred_ms']:.1f}ms, whole Blender process {summary['blender_process_ms']:.0f}ms (median of {len(samples)})")
+
+    os.makedirs(results_dir, exist_ok=True)
+    stamp = datetime.now().strftime("%Y-%m-%d %H-%M-%S")
+    with open(os.path.join(results_dir, f"Startup {bpy.app.version_string} {stamp}.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=4)
+
+#Program entry point. Arguments after -- are for us
+if __name__ == "__main__":
+    args = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+
+    if "--measure" in args:
+        measure(args[args.index("--measure") + 1])
+    else:
+        runs = default_runs
+        if "--runs" in args:
+            runs = int(args[args.index("--runs") + 1])
+        test(runs)
@@ -11,65 +11,60 @@ import collections
 import mathutils
 import math
 import os
+import json
+import time
 import numpy as np
+import sys
 
-class difference:
-    def __init__(self, category="Unspecified", message="Unspecified"):
-        self.category = category
-        self.message = message
+#The patience diff lives in the bpy-free Core library, which is imported from the repository's addon folder as a top level package
+addon_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "io_scene_xplane_ext")
+if addon_dir not in sys.path:
+    sys.path.insert(0, addon_dir)
+from Core.diff import get_diff_opcodes
+
+#When Test.py runs suites in parallel, it gives each process it's own .json to write results to, instead of every process appending to Test Results.csv
+result_json_path = os.environ.get("XP_EXT_TEST_RESULT_PATH", "")
+
+#Results of this process, written to result_json_path after every change so a crash still leaves the results so far
+json_results = {"blender_version": bpy.app.version_string, "categories": []}
 
-#Simple container to hold an X-Plane Vertex
-class xp_vertex:
+#Name and start time of the test whose result hasn't been appended yet
+current_test_name = ""
+current_test_start = 0.0
+
+def write_json_results():
     """
-    Simple class that contains all the data for a vertex in X-Plane.
+    Writes this process's results to result_json_path. Written to a temp file and renamed so Test.py never reads a partial file.
     """
-    loc_x = 0
-    loc_y = 0
-    loc_z = 0
-
-    normal_x = 0
-    normal_y = 0
-    normal_z = 0
+    temp_path = result_json_path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(json_results, f, indent=4)
+    os.replace(temp_path, result_json_path)
 
-    uv_x = 0
-    uv_y = 0
+def add_json_result(b_did_pass, percentage, message):
+    """
+    Adds a test result for the current test to the .json results.
+    """
+    global current_test_name
 
-    def __init__(self, loc_x, loc_y, loc_z, normal_x, normal_y, normal_z, uv_x, uv_y):
-        self.loc_x = loc_x
-        self.loc_y = loc_y
-        self.loc_z = loc_z
+    if len(json_results["categories"]) == 0:
+        json_results["categories"].append({"name": "Uncategorized", "tests": []})
 
-        self.normal_x = normal_x
-        self.normal_y = normal_y
-        self.normal_z = normal_z
+    json_results["categories"][-1]["tests"].append({
+        "name": current_test_name,
+        "passed": b_did_pass,
+        "percentage": percentage,
+        "message": message,
+        "seconds": time.perf_counter() - current_test_start if current_test_name != "" else 0.0,
+    })
+    current_test_name = ""
 
-        self.uv_x = uv_x
-        self.uv_y = uv_y
+    write_json_results()
 
-    def __eq__(self, other):
-        return self.loc_x == other.loc_x and self.loc_y == other.loc_y and self.loc_z == other.loc_z and self.normal_x == other.normal_x and self.normal_y == other.normal_y and self.normal_z == other.normal_z and self.uv_x == other.uv_x and self.uv_y == other.uv_y
-    
-    def almost_equal(self, other, epsilon=0.1):
-        """
-        Check if this vertex is almost equal to another vertex within a small epsilon tolerance.
-        """
-        return (math.isclose(self.loc_x, other.loc_x, abs_tol=epsilon) and
-                math.isclose(self.loc_y, other.loc_y, abs_tol=epsilon) and
-                math.isclose(self.loc_z, other.loc_z, abs_tol=epsilon) and
-                math.isclose(self.normal_x, other.normal_x, abs_tol=epsilon) and
-                math.isclose(self.normal_y, other.normal_y, abs_tol=epsilon) and
-                math.isclose(self.normal_z, other.normal_z, abs_tol=epsilon) and
-                math.isclose(self.uv_x, other.uv_x, abs_tol=epsilon) and
-                math.isclose(self.uv_y, other.uv_y, abs_tol=epsilon))
-    
-    def __str__(self):
-        return (
-            f"xp_vertex("
-            f"loc=({self.loc_x:.4f}, {self.loc_y:.4f}, {self.loc_z:.4f}), "
-            f"normal=({self.normal_x:.4f}, {self.normal_y:.4f}, {self.normal_z:.4f}), "
-            f"uv=({self.uv_x:.4f}, {self.uv_y:.4f})"
-            f")"
-        )
+class difference:
+    def __init__(self, category="Unspecified", message="Unspecified"):
+        self.category = category
+        self.message = message
 
 def vectors_close(v1, v2, epsilon=0.1):
     """
@@ -115,20 +110,19 @@ def matrix_close(m1, m2, epsilon=0.1):
                 return False
     return True
 
-def get_draw_call_from_obj(obj):
+def get_draw_call_arrays_from_obj(obj):
     """
-    Get the geometry from a Blender object and return it as a tuple of xp_vertexs and integer indices.
+    Get the triangulated geometry of a Blender object in world space, as float32 arrays read with foreach_get. Every triangle has it's own 3 vertices,
+    in reversed winding order (as X-Plane uses), so the indices are always 0 to vertex count - 1.
     Args:
         obj (bpy.types.Object): Blender object to extract geometry from.
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: Positions (N, 3), normals (N, 3), UVs (N, 2), and indices (N). UVs are 0 if the mesh has no UV map.
     """
 
     # Ensure the object is a mesh
     if obj.type != 'MESH':
         raise TypeError("Object must be a mesh")
-    
-    #Define our output arrays
-    out_verts = []  #Array of xp_vertex
-    out_inds = []   #Ints
 
     #Check if this object has modifiers. If it does, we'll duplicate it, and apply the modifiers to the duplicate.
     did_duplicate = False
@@ -158,181 +152,348 @@ def get_draw_call_from_obj(obj):
 
         #Triangulate the mesh and get the loop triangles
         mesh.calc_loop_triangles()
-        loop_triangles = mesh.loop_triangles
-
-        #Attempt to get the uv layer. We look for the first layer. 
-        uv_layer = None
-        try:
-            if len(obj.data.uv_layers) > 0:
-                uv_layer = obj.data.uv_layers.active
-                if uv_layer is None:
-                    uv_layer = obj.data.uv_layers[0]
-        except:
-            pass
-
-        if uv_layer is None:
-            raise Exception("Could not find UV map")
-
-        #Define a temporary data structure to hold our triangle faces.
-        XPTriangle = collections.namedtuple(
-                        "XPTriangle",
-                        field_names=[
-                            "vertex_pos",  # Tuple[Tuple[float, float, float], Tuple[float, float, float], Tuple[float, float, float]] Tuple containing the positions for each vertex. Only used when smooth is true
-                            "vertex_nrm",  # Tuple[Tuple[float, float, float], Tuple[float, float, float], Tuple[float, float, float]] Tuple containing the normals for each vertex. Only used when smooth is true
-                            "uvs",  # type: Tuple[[float, float], [float, float], [float, float]]
-                        ],
-                    )
-        
-        #Define an array to hold our faces
-        xp_triangles = []
-
-        #TODO: We need to warn the user if this is Blender 4.1+ and they have an autosmooth modifier on the object, as this does not get applied to the normals
+        tri_count = len(mesh.loop_triangles)
 
-        for tri in loop_triangles:
+        tri_loops = np.empty(tri_count * 3, dtype=np.int32)
+        tri_verts = np.empty(tri_count * 3, dtype=np.int32)
+        tri_normals = np.empty(tri_count * 9, dtype=np.float32)
+        mesh.loop_triangles.foreach_get("loops", tri_loops)
+        mesh.loop_triangles.foreach_get("vertices", tri_verts)
+        mesh.loop_triangles.foreach_get("split_normals", tri_normals)
 
-            #Define our UV and normal data beforehand. The struct is immutable so we can't change it after the fact
-            xp_triangle_uvs = ((0, 0), (0, 0), (0, 0))
-            if uv_layer != None:
-                xp_triangle_uvs = (uv_layer.data[tri.loops[0]].uv, uv_layer.data[tri.loops[1]].uv, uv_layer.data[tri.loops[2]].uv)
+        co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", co)
+        co = co.reshape(-1, 3)
 
-            xp_triangles_normals = (tri.split_normals[0], tri.split_normals[1], tri.split_normals[2])
+        #Attempt to get the uv layer. We look for the active layer, then the first
+        uvs = np.zeros((tri_count * 3, 2), dtype=np.float32)
+        uv_layer = None
+        if len(mesh.uv_layers) > 0:
+            uv_layer = mesh.uv_layers.active
+            if uv_layer is None:
+                uv_layer = mesh.uv_layers[0]
+        if uv_layer is not None:
+            loop_uvs = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+            uv_layer.data.foreach_get("uv", loop_uvs)
+            uvs = loop_uvs.reshape(-1, 2)[tri_loops]
+
+        positions = co[tri_verts]
+        normals = tri_normals.reshape(-1, 3)
+
+        #Reverse the winding of each triangle (v3, v2, v1)
+        order = np.arange(tri_count * 3).reshape(-1, 3)[:, ::-1].ravel()
+        positions = positions[order]
+        normals = normals[order]
+        uvs = uvs[order]
+
+        #Apply the world transform to the positions, and the inverse transpose of it to the normals
+        transform = np.array(obj.matrix_world, dtype=np.float32)
+        positions = positions @ transform[:3, :3].T + transform[:3, 3]
+
+        normal_matrix = np.array(obj.matrix_world.to_3x3().inverted().transposed(), dtype=np.float32)
+        normals = normals @ normal_matrix.T
+        lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+        normals = normals / np.where(lengths == 0, 1, lengths)
+
+        return positions, normals, uvs, np.arange(tri_count * 3, dtype=np.int32)
 
+    finally:
+        #If we made a duplicate object, delete it
+        if did_duplicate and obj != None:
+            bpy.data.objects.remove(obj, do_unlink=True)
+            obj = None
 
-            #Define a temporary face with the data from the loop triangle. UVs default to none so we can add them IF we do have a uv layer
-            tmp_face = XPTriangle(
-                vertex_pos = (mesh.vertices[tri.vertices[0]].co, mesh.vertices[tri.vertices[1]].co, mesh.vertices[tri.vertices[2]].co),
-                vertex_nrm = xp_triangles_normals,
-                uvs = xp_triangle_uvs
-            )
+def compare_mesh_arrays(arrays1, arrays2, name1, name2, epsilon=0.1, max_reported=10):
+    """
+    Compare the geometry from two get_draw_call_arrays_from_obj calls. Positions, normals, and UVs must be within epsilon.
+    Args:
+        arrays1, arrays2: Results of get_draw_call_arrays_from_obj.
+        name1, name2 (str): Names of the objects, for the messages.
+        epsilon (float): Maximum absolute difference of each component.
+        max_reported (int): Maximum number of differing vertices to list. All are counted.
+    Returns:
+        list: List of differences found.
+    """
+    differences = []
+    positions1, normals1, uvs1, indices1 = arrays1
+    positions2, normals2, uvs2, indices2 = arrays2
 
-            #Append the face to the array
-            xp_triangles.append(tmp_face)
+    if len(indices1) != len(indices2) or not np.array_equal(indices1, indices2):
+        differences.append(difference("Object Geometry", f"{name1}, {name2}, geometry indices count difference: {len(indices1)} vs {len(indices2)}"))
+    if len(positions1) != len(positions2):
+        differences.append(difference("Object Geometry", f"{name1}, {name2}, geometry vertices count difference: {len(positions1)} vs {len(positions2)}"))
+        return differences
 
-        #Now that we have the faces stored, we need to actually turn them into vertices and indicies.
-        #This is a bit more complicated. We have to iterate through every face. Then we need to check if *any* of it's 3 vertices already exist - if they do, we will use the existing one instead
-        #Once we know the indicies of each vertex because it's either been added, or already exists, we can do the index output array, which would be in the order of last vertex, middle, first. 
+    #Per vertex, the largest difference of each attribute
+    position_error = np.abs(positions1 - positions2).max(axis=1, initial=0)
+    normal_error = np.abs(normals1 - normals2).max(axis=1, initial=0)
+    uv_error = np.abs(uvs1 - uvs2).max(axis=1, initial=0)
+    bad = np.flatnonzero((position_error > epsilon) | (normal_error > epsilon) | (uv_error > epsilon))
 
-        for t in xp_triangles:
-            #Define vertices for each triangle. Then see if they exist, if they don't, add them.
-            v1 = xp_vertex(t.vertex_pos[0][0], t.vertex_pos[0][1], t.vertex_pos[0][2], t.vertex_nrm[0][0], t.vertex_nrm[0][1], t.vertex_nrm[0][2], t.uvs[0][0], t.uvs[0][1])
-            v2 = xp_vertex(t.vertex_pos[1][0], t.vertex_pos[1][1], t.vertex_pos[1][2], t.vertex_nrm[1][0], t.vertex_nrm[1][1], t.vertex_nrm[1][2], t.uvs[1][0], t.uvs[1][1])
-            v3 = xp_vertex(t.vertex_pos[2][0], t.vertex_pos[2][1], t.vertex_pos[2][2], t.vertex_nrm[2][0], t.vertex_nrm[2][1], t.vertex_nrm[2][2], t.uvs[2][0], t.uvs[2][1])
+    if len(bad) > 0:
+        differences.append(difference("Object Geometry", f"{name1}, {name2}, {len(bad)} of {len(positions1)} vertices differ. Max error position {position_error.max():.4f}, normal {normal_error.max():.4f}, uv {uv_error.max():.4f}"))
+        for i in bad[:max_reported]:
+            differences.append(difference("Object Geometry", f"{name1}, {name2}, vertex {i} differs: "
+                f"loc {tuple(np.round(positions1[i], 4))} vs {tuple(np.round(positions2[i], 4))}, "
+                f"normal {tuple(np.round(normals1[i], 4))} vs {tuple(np.round(normals2[i], 4))}, "
+                f"uv {tuple(np.round(uvs1[i], 4))} vs {tuple(np.round(uvs2[i], 4))}"))
 
-            out_verts.append(v3)
-            v1_index = len(out_verts) - 1
-            out_verts.append(v2)
-            v2_index = len(out_verts) - 1
-            out_verts.append(v1)
-            v3_index = len(out_verts) - 1
+    return differences
 
-            #Now finally we add the indicies! These are in the order v3, v2, v1
-            out_inds.append(v3_index)
-            out_inds.append(v2_index)
-            out_inds.append(v1_index)
+def get_image_pixels(image):
+    """
+    Read the pixels of a Blender image into a float32 array with foreach_get, without creating a Python float per pixel.
+    Args:
+        image (bpy.types.Image): The image.
+    Returns:
+        np.ndarray: Pixels, shaped (height, width, channels).
+    """
+    width, height = image.size
+    channels = image.channels
+    pixels = np.empty(width * height * channels, dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    return pixels.reshape(height, width, channels)
 
-        #Now we need to get the transform matrix for the object
-        transform = obj.matrix_world
+class image_comparison:
+    """
+    Error metrics between two images, with pixel values from 0-1.
+    """
+    def __init__(self):
+        self.valid = False
+        self.message = ""
+        self.similarity = 0.0           #1 - mean absolute error. 1 is identical
+        self.max_abs_error = 1.0
+        self.mean_abs_error = 1.0
+        self.psnr = 0.0                 #Peak signal to noise ratio in dB. Infinite if identical
+        self.channel_mean_abs_error = []
+        self.channel_max_abs_error = []
+        self.different_pixel_ratio = 1.0  #Fraction of pixels where any channel differs by more than 1/255
 
-        #Now we loop through the vertices and apply the transform to each one
-        for v in out_verts:
-            #Get the local position as a vector
-            local_position = mathutils.Vector((v.loc_x, v.loc_y, v.loc_z))
-            normal = mathutils.Vector((v.normal_x, v.normal_y, v.normal_z))
+    def __str__(self):
+        if not self.valid:
+            return self.message
+        channel_names = "RGBA"
+        channels = ", ".join(f"{channel_names[i] if i < len(channel_names) else i} mean {mean:.4f} max {peak:.4f}" for i, (mean, peak) in enumerate(zip(self.channel_mean_abs_error, self.channel_max_abs_error)))
+        return f"Mean abs error {self.mean_abs_error:.4f}, max abs error {self.max_abs_error:.4f}, PSNR {self.psnr:.2f}dB, {self.different_pixel_ratio * 100:.2f}% of pixels differ. {channels}"
 
-            #Apply the full transformation
-            transformed_position = transform @ local_position
+def compare_images_detailed(img1, img2):
+    """
+    Compares two image files.
+    Args:
+        img1 (str): Path to the first image.
+        img2 (str): Path to the second image.
+    Returns:
+        image_comparison: The error metrics. valid is False (with the reason in message) if the images couldn't be compared.
+    """
+    result = image_comparison()
+    image1 = None
+    image2 = None
+    try:
+        print("Loading images...")
+        image1 = bpy.data.images.load(img1)
+        image2 = bpy.data.images.load(img2)
 
-            #Work to apply the transform to the normals
-            normal_matrix = obj.matrix_world.to_3x3().inverted().transposed()
-            transformed_normal = normal_matrix @ normal
-            transformed_normal.normalize()
+        # Check if the images are the same size
+        if image1.size[0] != image2.size[0] or image1.size[1] != image2.size[1]:
+            result.message = f"Images are not the same size: {tuple(image1.size)} vs {tuple(image2.size)}"
+            print(result.message)
+            return result
+        if image1.channels != image2.channels:
+            result.message = f"Images have different channel counts: {image1.channels} vs {image2.channels}"
+            print(result.message)
+            return result
+
+        diff = np.abs(get_image_pixels(image1) - get_image_pixels(image2))
+
+        result.valid = True
+        result.mean_abs_error = float(diff.mean())
+        result.max_abs_error = float(diff.max())
+        result.similarity = max(0.0, 1.0 - result.mean_abs_error)
+        mse = float(np.square(diff, dtype=np.float64).mean())
+        result.psnr = float("inf") if mse == 0 else 10 * math.log10(1.0 / mse)
+        result.channel_mean_abs_error = diff.mean(axis=(0, 1)).tolist()
+        result.channel_max_abs_error = diff.max(axis=(0, 1)).tolist()
+        result.different_pixel_ratio = float((diff.max(axis=2) > 1 / 255).mean())
 
-            #Set the new position and rotation
-            v.loc_x = transformed_position.x
-            v.loc_y = transformed_position.y
-            v.loc_z = transformed_position.z
+        print("Images compared.")
+        return result
 
-            #Set the new normal
-            v.normal_x = transformed_normal.x
-            v.normal_y = transformed_normal.y
-            v.normal_z = transformed_normal.z
+    except Exception as e:
+        result.message = f"Error comparing images: {e}"
+        print(result.message)
+        return result
 
     finally:
-        #If we made a duplicate object, delete it
-        if did_duplicate and obj != None:
-            bpy.data.objects.remove(obj, do_unlink=True)
-            obj = None
-
-        return (out_verts, out_inds)
+        for image in (image1, image2):
+            if image is not None:
+                bpy.data.images.remove(image)
 
 def compare_images(img1, img2):
     """
-    Compares two images and returns a similarity ratio (0-1).
+    Compares two images and returns a similarity ratio (0-1), which is 1 - the mean absolute error. See compare_images_detailed for more metrics.
+    """
+    return compare_images_detailed(img1, img2).similarity
+
+#Absolute tolerance of numeric tokens when comparing exported text files, by command. Tolerances are not scaled by the values' size, so a large coordinate
+#(i.e. a vertex 5000m from the origin) must be as close as a small one.
+#Geometry is written with 8 decimals, but float math differs slightly between Blender versions, so small differences are expected
+default_numeric_tolerance = 1e-5
+numeric_tolerances = {
+    #Geometry
+    "VERTEX": 1e-4,
+    "VT": 1e-4,
+    "ANIM_trans_key": 1e-4,
+    "ANIM_rotate_key": 1e-3,
+    #Facade attachments and roof objects
+    "ATTACH_DRAPED": 1e-4,
+    "ATTACH_GRADED": 1e-4,
+    "ATTACH_DRAPED_AT": 1e-4,
+    "ATTACH_GRADED_AT": 1e-4,
+    "ROOF_OBJ_HEADING": 1e-4,
+    #AGP placements are in pixels
+    "TILE": 1e-2,
+    "ANCHOR_PT": 1e-2,
+    "CROP_POLY": 1e-2,
+    "OBJ_DRAPED": 1e-2,
+    "OBJ_GRADED": 1e-2,
+    "OBJ_DELTA": 1e-2,
+    "OBJ_SCRAPER": 1e-2,
+    "FAC": 1e-2,
+    "FAC_WALLS": 1e-2,
+    "TREE": 1e-2,
+    "TREE_LINE": 1e-2,
+    "AUTOGEN_TREE": 1e-2,
+    #Lines and polygons
+    "S_OFFSET": 1e-3,
+    "SEGMENT_DRAPED": 1e-3,
+    "SEGMENT_GRADED": 1e-3,
+    "SCALE": 1e-3,
+    "#subtex": 1e-4,
+    #Forests
+    "TREE2": 1e-2,
+}
+
+def tokenize_line(line):
+    """
+    Splits a line of an X-Plane text file into its command, and a list of tokens where numbers are floats and other tokens are strings with normalized path separators.
+    """
+    tokens = line.split()
+    if len(tokens) == 0:
+        return "", []
+
+    out = []
+    for token in tokens[1:]:
+        try:
+            out.append(float(token))
+        except ValueError:
+            out.append(token.replace("\\", "/"))
+    return tokens[0], out
+
+def get_line_key(command, tokens):
     """
-    try:
-        print("Loading images...")
-        img1 = bpy.data.images.load(img1)
-        img2 = bpy.data.images.load(img2)
+    Gets a hashable key of a tokenized line to align lines with. Numbers are quantized to their command's tolerance, so lines within tolerance almost always have the same key.
+    Lines that straddle a quantization step get different keys, and are compared with tolerance when the diff pairs them up.
+    """
+    tolerance = numeric_tolerances.get(command, default_numeric_tolerance)
+    return (command,) + tuple(round(t / tolerance) if isinstance(t, float) else t for t in tokens)
 
-        # Check if the images are the same size
-        if img1.size[0] != img2.size[0] or img1.size[1] != img2.size[1]:
-            print("Images are not the same size.")
-            return 0
+def compare_tokenized_lines(new_line, good_line):
+    """
+    Compares two tokenized lines with their command's absolute numeric tolerance.
+    Returns:
+        str: Empty if they match, otherwise what differs.
+    """
+    new_command, new_tokens = new_line
+    good_command, good_tokens = good_line
 
-        # Convert pixel data to NumPy arrays
-        pixels1 = np.array(img1.pixels[:])
-        pixels2 = np.array(img2.pixels[:])
+    if new_command != good_command:
+        return f"command {new_command} should be {good_command}"
+    if len(new_tokens) != len(good_tokens):
+        return f"{new_command} has {len(new_tokens)} arguments, should have {len(good_tokens)}"
 
-        # Calculate the absolute difference between the two images
-        #I... don't actually know why this works. But the results *appear* right and Github Copilot told me to soooo...
-        #If python wasn't SOOOOOOOOOOOOOOOO SLOW I'd do this with a simple nested for *cries in c++*
-        diff = np.abs(pixels1 - pixels2)
+    tolerance = numeric_tolerances.get(new_command, default_numeric_tolerance)
+    for i, (new_token, good_token) in enumerate(zip(new_tokens, good_tokens)):
+        if isinstance(new_token, float) and isinstance(good_token, float):
+            if abs(new_token - good_token) > tolerance:
+                return f"{new_command} argument {i + 1} is {new_token:g}, should be {good_token:g} (tolerance {tolerance:g})"
+        elif new_token != good_token:
+            return f"{new_command} argument {i + 1} is {new_token}, should be {good_token}"
 
-        # Calculate the similarity ratio
-        total_pixels = len(pixels1)
-        similarity = 1 - (np.sum(diff) / total_pixels)
+    return ""
 
-        print("Images compared.")
-        return max(0, similarity)  # Ensure similarity is not negative
+def compare_x_plane_files(new_file, good_file, max_reported=25):
+    """
+    Compares an exported X-Plane text file (.fac, .lin, .pol, .agp, .for, .obj) to a known good file. Lines are tokenized and numbers compared with per command
+    tolerances (see numeric_tolerances), so float formatting differences don't count. Inserted and removed lines are aligned with a diff, so one missing line
+    doesn't make every line after it differ. Blank lines are ignored.
+    Args:
+        new_file (str): Path to the exported file.
+        good_file (str): Path to the known good file.
+        max_reported (int): Maximum number of differences to report. All are still counted in the similarity.
+    Returns:
+        Tuple[float, list of difference]: Similarity (fraction of lines that match, 0-1), and the differences, each with the line numbers in both files.
+    """
+    def read_lines(path):
+        with open(path, "r") as f:
+            lines = []
+            for number, line in enumerate(f, 1):
+                command, tokens = tokenize_line(line)
+                if command != "":
+                    lines.append((number, line.strip(), command, tokens))
+            return lines
 
-    except Exception as e:
-        print(f"Error comparing images: {e}")
-        return 0
+    new_lines = read_lines(new_file)
+    good_lines = read_lines(good_file)
+
+    new_keys = [get_line_key(l[2], l[3]) for l in new_lines]
+    good_keys = [get_line_key(l[2], l[3]) for l in good_lines]
+
+    differences = []
+    different_count = 0
+
+    def report(category, message):
+        if len(differences) < max_reported:
+            differences.append(difference(category, message))
+
+    for tag, new_start, new_end, good_start, good_end in get_diff_opcodes(new_keys, good_keys):
+        #Pair up replaced lines, and compare them with tolerance. Whatever is left over was inserted or removed
+        paired = min(new_end - new_start, good_end - good_start) if tag == "replace" else 0
+        for i in range(paired):
+            new_line = new_lines[new_start + i]
+            good_line = good_lines[good_start + i]
+            problem = compare_tokenized_lines((new_line[2], new_line[3]), (good_line[2], good_line[3]))
+            if problem != "":
+                different_count += 1
+                report("Changed Line", f"Line {new_line[0]} (good line {good_line[0]}): {problem}")
+
+        for new_line in new_lines[new_start + paired:new_end]:
+            different_count += 1
+            report("Extra Line", f"Line {new_line[0]} is not in the good file: {new_line[1][:80]}")
+        for good_line in good_lines[good_start + paired:good_end]:
+            different_count += 1
+            report("Missing Line", f"Good line {good_line[0]} is missing: {good_line[1][:80]}")
+
+    total = max(len(new_lines), len(good_lines))
+    similarity = 1.0 if total == 0 else max(0.0, 1.0 - different_count / total)
+
+    if different_count > max_reported:
+        differences.append(difference("Truncated", f"{different_count - max_reported} more differences not shown"))
+
+    return similarity, differences
 
 def compare_files(file1, file2):
     """
-    Compare two files byte by byte and return the line count difference and similarity ratio (0-1).
+    Compare two X-Plane text files with compare_x_plane_files and return the line count difference and similarity ratio (0-1).
     Args:
         file1 (str): Path to the first file.
         file2 (str): Path to the second file.
     Returns:
         tuple: (line_count_diff, similarity) where similarity is a float between 0 and 1.
     """
-    chr_same = 0
-    chr_total = 0
-    similarity = 0.0
-    line_count_diff = 0
+    similarity, differences = compare_x_plane_files(file1, file2)
 
     with open(file1, 'r') as new, open(file2, 'r') as good:
-        f_new = new.read()
-        f_good = good.read()
-
-        #Iterate over each line in both file. Then compare the characters in each line one by one
-        new_lines = f_new.splitlines()
-        good_lines = f_good.splitlines()
-
-        for i in range(min(len(new_lines), len(good_lines))):
-            new_line_len = len(new_lines[i])
-            good_line_len = len(good_lines[i])
-
-            for j in range(min(new_line_len, good_line_len)):
-                if new_lines[i][j] == good_lines[i][j]:
-                    chr_same += 1
-
-            chr_total += max(new_line_len, good_line_len)
-
-    similarity = chr_same / chr_total
-    line_count_diff = abs(len(new_lines) - len(good_lines))
+        line_count_diff = abs(sum(1 for line in new if line.strip()) - sum(1 for line in good if line.strip()))
 
     return line_count_diff, similarity
 
@@ -421,24 +582,7 @@ def compare_objects(obj1, obj2):
 
     #If these are both a mesh we'll compare geometry and materials
     if obj1.type == 'MESH' and obj2.type == 'MESH':
-        dc1 = get_draw_call_from_obj(obj1)
-        dc2 = get_draw_call_from_obj(obj2)
-        if dc1[1] != dc2[1]:
-            differences.append(difference("Object Geometry", f"{obj1.name}, {obj2.name}, geometry indices count difference: {len(dc1[1])} vs {len(dc2[1])}"))
-        if len(dc1[0]) != len(dc2[0]):
-            differences.append(difference("Object Geometry", f"{obj1.name}, {obj2.name}, geometry vertices count difference: {len(dc1[0])} vs {len(dc2[0])}"))
-        else:
-            #Now we compare the vertices
-            for i in range(len(dc1[0])):
-                v1 = dc1[0][i]
-                v2 = dc2[0][i]
-                if not v1.almost_equal(v2):
-                    differences.append(difference("Object Geometry", f"{obj1.name}, {obj2.name}, vertex {i} differs: {v1} vs {v2}"))
-
-            #Now we compare the indices
-            for i in range(len(dc1[1])):
-                if dc1[1][i] != dc2[1][i]:
-                    differences.append(difference("Object Geometry", f"{obj1.name}, {obj2.name}, index {i} differs: {dc1[1][i]} vs {dc2[1][i]}"))
+        differences.extend(compare_mesh_arrays(get_draw_call_arrays_from_obj(obj1), get_draw_call_arrays_from_obj(obj2), obj1.name, obj2.name))
     
         #Now we compare the materials
         mats1 = obj1.data.materials
@@ -572,6 +716,10 @@ def append_test_results(b_did_pass, percentage, message):
         percentage (float): Percentage score or similarity.
         message (str): Additional message or notes.
     """
+    if result_json_path != "":
+        add_json_result(b_did_pass, percentage, message)
+        return
+
     #Get path of this script
     script_path = os.path.dirname(os.path.abspath(__file__))
 
@@ -599,6 +747,10 @@ def append_test_fail(message):
     Args:
         message (str): Failure message to append.
     """
+    if result_json_path != "":
+        add_json_result(False, None, message)
+        return
+
     #Get path of this script
     script_path = os.path.dirname(os.path.abspath(__file__))
 
@@ -620,6 +772,14 @@ def add_test_name(test_name):
     Args:
         test_name (str): Name of the test to add.
     """
+    global current_test_name
+    global current_test_start
+
+    if result_json_path != "":
+        current_test_name = test_name
+        current_test_start = time.perf_counter()
+        return
+
     #Get path of this script
     script_path = os.path.dirname(os.path.abspath(__file__))
 
@@ -641,6 +801,11 @@ def add_test_category(test_category):
     Args:
         test_name (str): Name of the test to add.
     """
+    if result_json_path != "":
+        json_results["categories"].append({"name": test_category, "tests": []})
+        write_json_results()
+        return
+
     #Get path of this script
     script_path = os.path.dirname(os.path.abspath(__file__))
 
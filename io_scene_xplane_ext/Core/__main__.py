@@ -0,0 +1,101 @@
+#Project:   Blender-X-Plane-Extensions
+#Author:    Connor Russell
+#Date:      10/19/2026
+#Module:    __main__.py
+#Purpose:   Command line tool to validate, summarize, diff, and round trip X-Plane files without Blender.
+#           Run from the addon folder: python -m Core validate|stats|diff|roundtrip <files> [--workers N]
+
+import argparse
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from . import parser
+from . import serializer
+from . import validate
+from . import compare
+
+def _validate_file(path):
+    return path, validate.validate(parser.parse_file(path))
+
+def _stats_file(path):
+    return path, parser.parse_file(path).get_stats()
+
+def _roundtrip_file(path):
+    doc = parser.parse_file(path)
+    fd, temp_path = tempfile.mkstemp(suffix=os.path.splitext(path)[1])
+    os.close(fd)
+    try:
+        serializer.write_file(doc, temp_path, do_update_counts=False)
+        return path, compare.compare_documents(doc, parser.parse_file(temp_path))
+    finally:
+        os.remove(temp_path)
+
+def _call(function, path):
+    """
+    Runs a command's function on one file, catching errors so one unreadable file doesn't stop the others.
+    Returns:
+        Tuple[str, Any, str]: The path, the function's result (None on error), and the error message ("" on success).
+    """
+    try:
+        return path, function(path)[1], ""
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+
+def _run_all(function, paths, workers):
+    if workers <= 1 or len(paths) <= 1:
+        return [_call(function, path) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(partial(_call, function), paths))
+
+def _report_issues(results, ok_message):
+    failed = 0
+    for path, issues, error in results:
+        if error != "":
+            failed += 1
+            print(f"{path}: error: {error}")
+            continue
+        if len(issues) == 0:
+            print(f"{path}: {ok_message}")
+            continue
+        failed += 1
+        print(f"{path}: {len(issues)} problem(s)")
+        for issue in issues:
+            print(f"    {issue}")
+    return failed
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(prog="python -m Core", description="Validate, summarize, diff, and round trip X-Plane files without Blender.")
+    arg_parser.add_argument("command", choices=["validate", "stats", "diff", "roundtrip"])
+    arg_parser.add_argument("files", nargs="+")
+    arg_parser.add_argument("--workers", type=int, default=1, help="Number of processes to use for validate, stats, and roundtrip")
+    arg_parser.add_argument("--tolerance", type=float, default=1e-5, help="Allowed difference between numbers for diff")
+    args = arg_parser.parse_args(argv)
+
+    if args.command == "diff":
+        if len(args.files) != 2:
+            arg_parser.error("diff takes exactly two files")
+        differences = compare.compare_documents(parser.parse_file(args.files[0]), parser.parse_file(args.files[1]), args.tolerance)
+        for difference in differences:
+            print(difference)
+        return 1 if len(differences) > 0 else 0
+
+    if args.command == "stats":
+        failed = 0
+        for path, stats, error in _run_all(_stats_file, args.files, args.workers):
+            if error != "":
+                failed += 1
+                print(f"{path}: error: {error}")
+                continue
+            print(f"{path}: " + ", ".join(f"{k} {v}" for k, v in stats.items()))
+        return 1 if failed > 0 else 0
+
+    if args.command == "validate":
+        failed = _report_issues(_run_all(_validate_file, args.files, args.workers), "valid")
+    else:
+        failed = _report_issues(_run_all(_roundtrip_file, args.files, args.workers), "round trips")
+    return 1 if failed > 0 else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
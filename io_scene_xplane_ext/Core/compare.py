@@ -0,0 +1,89 @@
+#Project:   Blender-X-Plane-Extensions
+#Author:    Connor Russell
+#Date:      10/19/2026
+#Module:    compare.py
+#Purpose:   Find the differences between two parsed X-Plane files, with a tolerance for numbers. Does not depend on bpy
+
+from .diff import get_diff_opcodes
+from .ir import geometry_ref
+
+def tokens_match(tokens_a, tokens_b, tolerance):
+    """
+    Checks whether two commands match. Numbers match if they are within tolerance of each other.
+    Args:
+        tokens_a (list of str): The first command.
+        tokens_b (list of str): The second command.
+        tolerance (float): The allowed difference between numbers.
+    Returns:
+        bool: True if the commands match.
+    """
+    if len(tokens_a) != len(tokens_b):
+        return False
+    for a, b in zip(tokens_a, tokens_b):
+        if a == b:
+            continue
+        try:
+            value_a = float(a)
+            value_b = float(b)
+        except ValueError:
+            return False
+        if abs(value_a - value_b) > tolerance:
+            return False
+    return True
+
+def _compare_commands(doc_a, doc_b, tolerance, differences, max_reported):
+    commands_a = [c for c in doc_a.commands if not isinstance(c, geometry_ref)]
+    commands_b = [c for c in doc_b.commands if not isinstance(c, geometry_ref)]
+
+    for tag, a_start, a_end, b_start, b_end in get_diff_opcodes([" ".join(c) for c in commands_a], [" ".join(c) for c in commands_b]):
+        #Replaced runs of the same length may only differ by number precision
+        if tag == "replace" and a_end - a_start == b_end - b_start:
+            for a, b in zip(commands_a[a_start:a_end], commands_b[b_start:b_end]):
+                if not tokens_match(a, b, tolerance):
+                    differences.append(f"Command '{' '.join(a)}' != '{' '.join(b)}'")
+            continue
+
+        for a in commands_a[a_start:a_end]:
+            differences.append(f"Only in first: '{' '.join(a)}'")
+        for b in commands_b[b_start:b_end]:
+            differences.append(f"Only in second: '{' '.join(b)}'")
+
+        if len(differences) >= max_reported:
+            return
+
+def _compare_meshes(doc_a, doc_b, tolerance, differences):
+    if len(doc_a.meshes) != len(doc_b.meshes):
+        differences.append(f"Mesh count {len(doc_a.meshes)} != {len(doc_b.meshes)}")
+
+    for i, (mesh_a, mesh_b) in enumerate(zip(doc_a.meshes, doc_b.meshes)):
+        if mesh_a.get_vertex_count() != mesh_b.get_vertex_count() or mesh_a.vertex_floats != mesh_b.vertex_floats:
+            differences.append(f"Mesh {i} has {mesh_a.get_vertex_count()} vertices != {mesh_b.get_vertex_count()}")
+        else:
+            max_error = max((abs(a - b) for a, b in zip(mesh_a.vertices, mesh_b.vertices)), default=0.0)
+            if max_error > tolerance:
+                differences.append(f"Mesh {i} vertices differ by up to {max_error}")
+
+        if mesh_a.indices != mesh_b.indices:
+            differences.append(f"Mesh {i} indices differ ({mesh_a.get_index_count()} and {mesh_b.get_index_count()} indices)")
+
+def compare_documents(doc_a, doc_b, tolerance=1e-5, max_reported=25):
+    """
+    Finds the differences between two parsed files. Commands are aligned, so an inserted command is reported once rather than shifting every command after it.
+    Args:
+        doc_a (document_ir): The first file.
+        doc_b (document_ir): The second file.
+        tolerance (float): The allowed difference between numbers.
+        max_reported (int): The most command differences to report.
+    Returns:
+        list of str: The differences. Empty if the files match.
+    """
+    differences = []
+
+    if doc_a.header != doc_b.header:
+        differences.append(f"Header {doc_a.header} != {doc_b.header}")
+
+    _compare_commands(doc_a, doc_b, tolerance, differences, max_reported)
+    del differences[max_reported:]
+
+    _compare_meshes(doc_a, doc_b, tolerance, differences)
+    return differences
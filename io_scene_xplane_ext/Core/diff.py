@@ -0,0 +1,85 @@
+#Project:   Blender-X-Plane-Extensions
+#Author:    Connor Russell
+#Date:      10/19/2026
+#Module:    diff.py
+#Purpose:   Align two sequences with a patience diff, shared by Core.compare and the test helpers. Does not depend on bpy
+
+import bisect
+import collections
+import difflib
+
+def get_diff_opcodes(a, b, a_start=0, a_end=None, b_start=0, b_end=None):
+    """
+    Aligns two lists of hashable items with a patience diff. Items that occur once in both are matched up in order as anchors, and the gaps between
+    anchors are aligned the same way. Gaps without unique items fall back to difflib. This is close to linear for files that mostly match, where difflib alone is quadratic.
+    Args:
+        a (list): The first list.
+        b (list): The second list.
+        a_start, a_end, b_start, b_end (int): The ranges of a and b to align. Default to the whole lists.
+    Returns:
+        list of Tuple[str, int, int, int, int]: The non-equal opcodes, in the same form as difflib.SequenceMatcher.get_opcodes.
+    """
+    if a_end is None:
+        a_end = len(a)
+    if b_end is None:
+        b_end = len(b)
+
+    #Skip the matching start and end
+    while a_start < a_end and b_start < b_end and a[a_start] == b[b_start]:
+        a_start += 1
+        b_start += 1
+    while a_start < a_end and b_start < b_end and a[a_end - 1] == b[b_end - 1]:
+        a_end -= 1
+        b_end -= 1
+
+    if a_start == a_end and b_start == b_end:
+        return []
+    if a_start == a_end:
+        return [("insert", a_start, a_end, b_start, b_end)]
+    if b_start == b_end:
+        return [("delete", a_start, a_end, b_start, b_end)]
+
+    #Find items that occur exactly once in both
+    a_counts = collections.Counter(a[a_start:a_end])
+    b_positions = {}
+    for j in range(b_start, b_end):
+        if a_counts.get(b[j]) == 1:
+            b_positions[b[j]] = -1 if b[j] in b_positions else j
+    unique = [(i, b_positions[a[i]]) for i in range(a_start, a_end) if a_counts[a[i]] == 1 and b_positions.get(a[i], -1) != -1]
+
+    if len(unique) == 0:
+        matcher = difflib.SequenceMatcher(None, a[a_start:a_end], b[b_start:b_end], autojunk=False)
+        return [(tag, i1 + a_start, i2 + a_start, j1 + b_start, j2 + b_start) for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != "equal"]
+
+    #Longest increasing run of b positions (patience sorting), so anchors are in the same order in both lists
+    tails = []
+    tail_indicies = []
+    previous = [-1] * len(unique)
+    for k, (i, j) in enumerate(unique):
+        pos = bisect.bisect_left(tails, j)
+        if pos == len(tails):
+            tails.append(j)
+            tail_indicies.append(k)
+        else:
+            tails[pos] = j
+            tail_indicies[pos] = k
+        previous[k] = tail_indicies[pos - 1] if pos > 0 else -1
+
+    anchors = []
+    k = tail_indicies[-1]
+    while k != -1:
+        anchors.append(unique[k])
+        k = previous[k]
+    anchors.reverse()
+
+    #Align the gaps between anchors
+    opcodes = []
+    last_a = a_start
+    last_b = b_start
+    for i, j in anchors + [(a_end, b_end)]:
+        if i != last_a or j != last_b:
+            opcodes.extend(get_diff_opcodes(a, b, last_a, i, last_b, j))
+        last_a = i + 1
+        last_b = j + 1
+
+    return opcodes
@@ -0,0 +1,212 @@
+#Project:   Blender-X-Plane-Extensions
+#Author:    Connor Russell
+#Date:      10/19/2026
+#Module:    formats.py
+#Purpose:   Define the command token tables and geometry layout of each X-Plane text format. Does not depend on bpy
+
+from . import tokenizer
+
+#Minimum number of tokens of each command, per format. Built once, and shared by every read
+obj_command_table = tokenizer.command_table({
+    'VT': 9,
+    'IDX10': 11,
+    'IDX': 2,
+    'TRIS': 3,
+    'PARTICLE_SYSTEM': 2,
+    'BLEND_GLASS': 1,
+    'GLOBAL_luminance': 2,
+    'TEXTURE': 2,
+    'TEXTURE_MAP': 3,
+    'TEXTURE_NORMAL': 2,
+    'TEXTURE_DRAPED': 2,
+    'TEXTURE_DRAPED_NORMAL': 3,
+    'TEXTURE_DRAPED_LIT': 2,
+    'TEXTURE_LIT': 2,
+    'GLOBAL_no_blend': 2,
+    'GLOBAL_shadow_blend': 2,
+    'ANIM_trans': 4, # 4 *minimum* tokens, but can be more
+    'ANIM_rotate': 5, # 5 *minimum* tokens, but can be more
+    'ANIM_keyframe_loop': 2,
+    'ANIM_show': 4,
+    'ANIM_hide': 4,
+    'ANIM_rotate_begin': 5,
+    'ANIM_rotate_key': 3,
+    'ANIM_trans_begin': 2,
+    'ANIM_trans_key': 5,
+    'ATTR_LOD': 3,
+    'LIGHT_NAMED': 5,
+    'LIGHT_CUSTOM': 13, #13-14
+    'LIGHT_SPILL_CUSTOM': 13, #13-14
+    'LIGHT_PARAM': 6, # variable, but 6 is minimum
+    'ATTR_hard': 2,
+    'ATTR_hard_deck': 2,
+    'ATTR_layer_group': 3,
+    'ATTR_draped_layer_group': 3,
+    'ATTR_cockpit_device': 5,
+    'ATTR_cockpit_region': 2,
+    'THERMAL_source': 3,
+    'THERMAL_source2': 3,
+    'WIPER_param': 5,
+    'COCKPIT_REGION': 5,
+    'RAIN_SCALE': 2,
+    'RAIN_FRICTION': 2,
+    'THERMAL_texture': 2,
+    'WIPER_texture': 2,
+    'WIPER_blend': 2,
+})
+
+#In the past we accidentally wrote MESH commands without the cuts parameter (MESH <group> <far lod> <vertices> <indices>), so those are still accepted
+fac_command_table = tokenizer.command_table({
+    'I': 1,
+    'FACADE': 1,
+    'GRADED': 1,
+    'DRAPED': 1,
+    'RING': 2,
+    'SHADER_WALL': 1,
+    'SHADER_ROOF': 1,
+    'TEXTURE': 2,
+    'TEXTURE_LIT': 2,
+    'TEXTURE_NORMAL': 2,
+    'TEXTURE_MODULATOR': 2,
+    'NO_BLEND': 2,
+    'NO_SHADOW': 1,
+    'LAYER_GROUP': 3,
+    'DECAL': 1,
+    'NORMAL_DECAL': 1,
+    'ROOF_SCALE': 3,
+    'OBJ': 2,
+    'FLOOR': 2,
+    'ROOF_TWO_SIDED': 1,
+    'ROOF_HEIGHT': 2,
+    'ROOF_OBJ_HEADING': 7,
+    'SEGMENT': 2,
+    'SEGMENT_CURVED': 2,
+    'MESH': 6,
+    'VERTEX': 9,
+    'IDX': 2,
+    'WALL': 6,
+    'SPELLING': 2,
+    'ATTACH_DRAPED': 6,
+    'ATTACH_GRADED': 6,
+}, {"MESH": {4, 5}})
+
+for_command_table = tokenizer.command_table({
+    "TEXTURE": 2,
+    "TEXTURE_NORMAL": 3,
+    "TEXTURE_LIT": 2,
+    "TEXTURE_MODULATOR": 2,
+    "LAYER_GROUP": 3,
+    "NO_BLEND": 2,
+    "SCALE_X": 2,
+    "SCALE_Y": 2,
+    "SPACING": 3,
+    "RANDOM": 3,
+    "DENSITY_PARAMS": 9,
+    "HEIGHT_PARAMS": 9,
+    "CHOICE_PARAMS": 9,
+    "MESH": 9,
+    "VERTEX": 12,
+    "TREE2": 13,
+    "TREE": 11,
+    "IDX": 2,
+    "MESH_3D": 2,
+})
+
+agp_command_table = tokenizer.command_table({
+    'TEXTURE_NOWRAP': 2,
+    'TEXTURE': 2,
+    'TEXTURE_LIT': 2,
+    'WEATHER': 2,
+    'NO_BLEND': 2,
+    'LAYER_GROUP': 2, # can be 2 or 3, but 2 is safe
+    'SURFACE': 2,
+    'LOAD_CENTER': 5,
+    'TEXTURE_TILE': 6
+})
+
+lin_command_table = tokenizer.command_table({
+    'TEXTURE_NORMAL': 3,
+    'TEXTURE_LIT': 2,
+    'TEXTURE': 2,
+    'TEXTURE_MODULATOR': 2,
+    'WEATHER': 2,
+    'NO_BLEND': 2,
+    'DITHER_ALPHA': 2,
+    'TEX_WIDTH': 2,
+    'TEX_HEIGHT': 2,
+    'DECAL': 1,
+    'NORMAL_DECAL': 1,
+    'LAYER_GROUP': 2, # can be 2 or 3, but 2 is safe
+    'MIRROR': 1,
+    'ALIGN': 2,
+    'SCALE': 2, # can be 2 or 3
+    'SURFACE': 2,
+    'S_OFFSET': 5,
+    'START_CAP': 7,
+    'END_CAP': 7,
+})
+
+pol_command_table = tokenizer.command_table({
+    'TEXTURE_NOWRAP': 2,
+    'TEXTURE_LIT_NOWRAP': 2,
+    'TEXTURE_NORMAL': 3,
+    'TEXTURE_MODULATOR': 2,
+    'TEXTURE': 2,
+    'TEXTURE_LIT': 2,
+    'WEATHER': 2,
+    'SUPER_ROUGHNESS': 1,
+    'NO_BLEND': 2,
+    'DITHER_ALPHA': 2,
+    'LAYER_GROUP': 2, # can be 2 or 3, but 2 is safe
+    'SCALE': 3,
+    'SURFACE': 2,
+    'LOAD_CENTER': 5,
+    'TEXTURE_TILE': 6,
+    'RUNWAY_MARKINGS': 6,
+    'RUNWAY_NOISE': 1,
+    '#subtex': 5,
+})
+
+class geometry_layout:
+    """
+    Describes how a format stores vertex geometry, so it can be parsed into (and written from) mesh_ir arrays.
+    """
+    def __init__(self, vertex_command, vertex_floats, row_command, single_command, split_remainder, mesh_command=None, mesh_count_tokens=None):
+        """
+        Args:
+            vertex_command (str): The command of each vertex, i.e. VT.
+            vertex_floats (int): The number of floats per vertex.
+            row_command (str): The command for full rows of index_row_length indices.
+            single_command (str): The command for the remaining indices.
+            split_remainder (bool): Whether the remaining indices are written one per command, or as one shorter row.
+            mesh_command (str): The command that starts each mesh. None if the format has a single vertex pool.
+            mesh_count_tokens (Tuple[int, int]): Token positions of the vertex and index counts of the mesh command. Negative positions count from the end.
+        """
+        self.vertex_command = vertex_command
+        self.vertex_floats = vertex_floats
+        self.row_command = row_command
+        self.single_command = single_command
+        self.split_remainder = split_remainder
+        self.mesh_command = mesh_command
+        self.mesh_count_tokens = mesh_count_tokens
+
+#Number of indices in a full index row, in every format
+index_row_length = 10
+
+#Third header line -> command table
+command_tables = {
+    "OBJ": obj_command_table,
+    "FACADE": fac_command_table,
+    "FOREST": for_command_table,
+    "AG_POINT": agp_command_table,
+    "LINE_PAINT": lin_command_table,
+    "DRAPED_POLYGON": pol_command_table,
+}
+
+#Third header line -> geometry layout, for the formats that have vertex geometry.
+#OBJs have one vertex pool, with full rows of indices in IDX10 commands. Facade meshes are MESH <group> <far lod> [cuts] <vertices> <indices>, forest meshes are MESH <name> <near> <far> <vertices> <indices> ...
+geometry_layouts = {
+    "OBJ": geometry_layout("VT", 8, "IDX10", "IDX", True),
+    "FACADE": geometry_layout("VERTEX", 8, "IDX", "IDX", False, "MESH", (-2, -1)),
+    "FOREST": geometry_layout("VERTEX", 11, "IDX", "IDX", True, "MESH", (4, 5)),
+}
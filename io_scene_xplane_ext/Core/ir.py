@@ -0,0 +1,104 @@
+#Project:   Blender-X-Plane-Extensions
+#Author:    Connor Russell
+#Date:      10/19/2026
+#Module:    ir.py
+#Purpose:   Provide the intermediate representation of parsed X-Plane files. Geometry is kept in flat arrays rather than per vertex objects. Does not depend on bpy
+
+from array import array
+
+class mesh_ir:
+    """
+    The vertices and indices of a mesh (or an OBJ's vertex pool), as flat arrays.
+    Vertices are stored interleaved as doubles, vertex_floats floats each, in the file's own axes (X-Plane's X, Y up, Z).
+    """
+    __slots__ = ("vertex_floats", "vertices", "indices")
+
+    def __init__(self, vertex_floats):
+        """
+        Args:
+            vertex_floats (int): The number of floats per vertex. 8 for position, normal, and UV, 11 for forests which add wind weights.
+        """
+        self.vertex_floats = vertex_floats
+        self.vertices = array("d")
+        self.indices = array("I")
+
+    def get_vertex_count(self):
+        return len(self.vertices) // self.vertex_floats
+
+    def get_index_count(self):
+        return len(self.indices)
+
+    def get_vertex(self, index):
+        """
+        Gets a vertex's floats.
+        Args:
+            index (int): The vertex index.
+        Returns:
+            array: The vertex_floats floats of the vertex.
+        """
+        start = index * self.vertex_floats
+        return self.vertices[start:start + self.vertex_floats]
+
+    def get_bounds(self):
+        """
+        Gets the bounding box of the vertex positions.
+        Returns:
+            Tuple[Tuple[float, float, float], Tuple[float, float, float]]: The min and max corners, or None if there are no vertices.
+        """
+        if len(self.vertices) == 0:
+            return None
+        stride = self.vertex_floats
+        axes = [self.vertices[axis::stride] for axis in range(3)]
+        return tuple(min(a) for a in axes), tuple(max(a) for a in axes)
+
+class geometry_ref:
+    """
+    Marks where a mesh's vertices or indices are written among a document's commands.
+    """
+    __slots__ = ("mesh_index", "is_indices")
+
+    def __init__(self, mesh_index, is_indices):
+        self.mesh_index = mesh_index
+        self.is_indices = is_indices
+
+class document_ir:
+    """
+    A parsed X-Plane text file. Every command is kept as it's tokens, except vertex and index commands, which are stored in meshes and referenced by a geometry_ref where they were.
+    """
+    def __init__(self):
+        self.kind = ""          #Third header line, i.e. OBJ or FACADE
+        self.header = []        #Tokens of the three header lines
+        self.commands = []      #List of list of str tokens, or geometry_ref
+        self.meshes = []        #List of mesh_ir. Formats with one vertex pool (OBJ) have one mesh
+        self.warnings = []      #Problems found while parsing
+
+    def get_mesh_command(self, mesh_index):
+        """
+        Gets the command a mesh belongs to (i.e. it's MESH command).
+        Args:
+            mesh_index (int): The index of the mesh.
+        Returns:
+            list of str: The tokens of the command before the mesh's first geometry_ref, or None if there isn't one.
+        """
+        last_command = None
+        for command in self.commands:
+            if isinstance(command, geometry_ref):
+                if command.mesh_index == mesh_index:
+                    return last_command
+            else:
+                last_command = command
+        return None
+
+    def get_stats(self):
+        """
+        Gets counts describing the document.
+        Returns:
+            dict: The kind, and number of commands, meshes, vertices, and indices.
+        """
+        return {
+            "kind": self.kind,
+            "commands": sum(1 for c in self.commands if not isinstance(c, geometry_ref)),
+            "meshes": len(self.meshes),
+            "vertices": sum(m.get_vertex_count() for m in self.meshes),
+            "indices": sum(m.get_index_count() for m in self.meshes),
+        }
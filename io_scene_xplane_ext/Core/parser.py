@@ -0,0 +1,105 @@
+#Project:   Blender-X-Plane-Extensions
+#Author:    Connor Russell
+#Date:      10/19/2026
+#Module:    parser.py
+#Purpose:   Parse X-Plane text files into document_ir. Does not depend on bpy, so files can be parsed outside Blender
+
+from array import array
+from . import formats
+from . import tokenizer
+from .ir import document_ir, mesh_ir, geometry_ref
+
+#Used for files whose type we don't know. Nothing is checked
+_unchecked_table = tokenizer.command_table({})
+
+def read_header(in_path):
+    """
+    Reads the three header lines of an X-Plane text file (i.e. I, 800, OBJ).
+    Args:
+        in_path (str): The path of the file.
+    Returns:
+        list of list of str: The tokens of each header line. Fewer than three if the file is shorter.
+    """
+    header = []
+    with open(in_path, "r") as f:
+        for raw_line in f:
+            tokens = raw_line.split()
+            if len(tokens) == 0:
+                continue
+            header.append(tokens)
+            if len(header) == 3:
+                break
+    return header
+
+def parse_file(in_path, warn=None, on_progress=None, should_cancel=None):
+    """
+    Parses an X-Plane text file. Vertex and index commands go into the document's meshes, every other command is kept as tokens.
+    Args:
+        in_path (str): The path of the file.
+        warn (callable): Called with (message, summary) for each problem. Problems are also added to the document's warnings.
+        on_progress (callable): Called with the fraction (0-1) of the file read.
+        should_cancel (callable): Polled while reading. If it returns True, tokenizer.read_cancelled is raised.
+    Returns:
+        document_ir: The parsed file.
+    """
+    doc = document_ir()
+
+    def add_warning(message, summary=None):
+        doc.warnings.append(message)
+        if warn is not None:
+            warn(message, summary)
+
+    doc.header = read_header(in_path)
+    if len(doc.header) == 3:
+        doc.kind = doc.header[2][0]
+    else:
+        add_warning(f"{in_path} does not have a complete header")
+
+    table = formats.command_tables.get(doc.kind, _unchecked_table)
+    layout = formats.geometry_layouts.get(doc.kind)
+
+    current_mesh = None
+    current_mesh_index = -1
+    referenced = set()      #(mesh index, is indices) of the geometry already referenced in the commands
+
+    if layout is not None and layout.mesh_command is None:
+        current_mesh = mesh_ir(layout.vertex_floats)
+        current_mesh_index = 0
+        doc.meshes.append(current_mesh)
+
+    header_remaining = len(doc.header)
+    for line, tokens in tokenizer.read_commands(in_path, table, False, add_warning, on_progress, should_cancel):
+        if header_remaining > 0:
+            header_remaining -= 1
+            continue
+
+        cmd = tokens[0]
+        if layout is not None:
+            if cmd == layout.vertex_command or cmd == layout.row_command or cmd == layout.single_command:
+                if current_mesh is None:
+                    add_warning(f"{cmd} command found outside of a {layout.mesh_command} block, skipping: '{line}'")
+                    continue
+
+                is_indices = cmd != layout.vertex_command
+                if (current_mesh_index, is_indices) not in referenced:
+                    referenced.add((current_mesh_index, is_indices))
+                    doc.commands.append(geometry_ref(current_mesh_index, is_indices))
+
+                #Converted to an array first, so a bad number doesn't leave part of the line in the mesh
+                try:
+                    if is_indices:
+                        current_mesh.indices.extend(array("I", [int(t) for t in tokens[1:]]))
+                    else:
+                        current_mesh.vertices.extend(array("d", [float(t) for t in tokens[1:layout.vertex_floats + 1]]))
+                except (ValueError, OverflowError):
+                    add_warning(f"Invalid number in '{line}', skipping")
+                continue
+
+            if cmd == layout.mesh_command:
+                current_mesh = mesh_ir(layout.vertex_floats)
+                current_mesh_index = len(doc.meshes)
+                doc.meshes.append(current_mesh)
+
+        doc.commands.append(tokens)
+
+    return doc
@@ -0,0 +1,133 @@
+#Project:   Blender-X-Plane-Extensions
+#Author:    Connor Russell
+#Date:      10/19/2026
+#Module:    serializer.py
+#Purpose:   Write document_ir back to X-Plane text. Does not depend on bpy
+
+import os
+import tempfile
+from . import formats
+from .ir import geometry_ref
+
+#Mode of newly created files (0666 less the umask), the same as open() would give them. mkstemp always creates 0600 files
+_umask = os.umask(0)
+os.umask(_umask)
+_new_file_mode = 0o666 & ~_umask
+
+def get_vertex_lines(mesh, layout, precision=8):
+    """
+    Gets the vertex commands of a mesh.
+    Args:
+        mesh (mesh_ir): The mesh.
+        layout (formats.geometry_layout): The geometry layout of the format.
+        precision (int): Decimal places of each float.
+    Returns:
+        list of str: One command per vertex.
+    """
+    stride = mesh.vertex_floats
+    vertices = mesh.vertices
+    number_format = f"{{:.{precision}f}}"
+    prefix = layout.vertex_command + " "
+    return [prefix + " ".join(number_format.format(v) for v in vertices[i:i + stride]) for i in range(0, len(vertices), stride)]
+
+def get_index_lines(mesh, layout):
+    """
+    Gets the index commands of a mesh. Full rows use the layout's row command, the rest are written one per command or as one shorter row.
+    Args:
+        mesh (mesh_ir): The mesh.
+        layout (formats.geometry_layout): The geometry layout of the format.
+    Returns:
+        list of str: The index commands.
+    """
+    indices = mesh.indices
+    row_length = formats.index_row_length
+    full_rows = len(indices) // row_length * row_length
+
+    lines = [layout.row_command + " " + " ".join(map(str, indices[i:i + row_length])) for i in range(0, full_rows, row_length)]
+    if full_rows < len(indices):
+        if layout.split_remainder:
+            lines.extend(f"{layout.single_command} {idx}" for idx in indices[full_rows:])
+        else:
+            lines.append(layout.single_command + " " + " ".join(map(str, indices[full_rows:])))
+    return lines
+
+def update_counts(doc):
+    """
+    Updates the vertex and index counts of the document's POINT_COUNTS and MESH commands to match it's meshes. MESH commands too short to have counts are left alone.
+    Args:
+        doc (document_ir): The document to update.
+    """
+    layout = formats.geometry_layouts.get(doc.kind)
+    if layout is None:
+        return
+
+    mesh_index = 0
+    for command in doc.commands:
+        if isinstance(command, geometry_ref):
+            continue
+
+        if layout.mesh_command is None and command[0] == "POINT_COUNTS" and len(command) >= 5 and len(doc.meshes) > 0:
+            command[1] = str(doc.meshes[0].get_vertex_count())
+            command[4] = str(doc.meshes[0].get_index_count())
+
+        elif layout.mesh_command is not None and command[0] == layout.mesh_command:
+            if mesh_index < len(doc.meshes) and len(command) >= 5:
+                command[layout.mesh_count_tokens[0]] = str(doc.meshes[mesh_index].get_vertex_count())
+                command[layout.mesh_count_tokens[1]] = str(doc.meshes[mesh_index].get_index_count())
+            mesh_index += 1
+
+def get_lines(doc, precision=8):
+    """
+    Gets the text of a document.
+    Args:
+        doc (document_ir): The document.
+        precision (int): Decimal places of vertex floats.
+    Returns:
+        list of str: The lines of the file.
+    """
+    layout = formats.geometry_layouts.get(doc.kind)
+
+    lines = [" ".join(tokens) for tokens in doc.header]
+    lines.append("")
+
+    for command in doc.commands:
+        if isinstance(command, geometry_ref):
+            mesh = doc.meshes[command.mesh_index]
+            if command.is_indices:
+                lines.extend(get_index_lines(mesh, layout))
+            else:
+                lines.extend(get_vertex_lines(mesh, layout, precision))
+        else:
+            lines.append(" ".join(command))
+
+    return lines
+
+def write_file(doc, out_path, precision=8, do_update_counts=True):
+    """
+    Writes a document to a file. The file is written to a temporary file next to it first, so a failed write never leaves a partial file.
+    An existing file keeps it's permissions, a new one gets the usual permissions for the umask.
+    Args:
+        doc (document_ir): The document.
+        out_path (str): The path to write to.
+        precision (int): Decimal places of vertex floats.
+        do_update_counts (bool): Whether to update the POINT_COUNTS and MESH counts to match the meshes first.
+    """
+    if do_update_counts:
+        update_counts(doc)
+
+    folder = os.path.dirname(os.path.abspath(out_path))
+    fd, temp_path = tempfile.mkstemp(dir=folder, prefix=".tmp_", suffix=os.path.splitext(out_path)[1])
+    try:
+        with os.fdopen(fd, "w") as f:
+            for line in get_lines(doc, precision):
+                f.write(line)
+                f.write("\n")
+        if os.path.isfile(out_path):
+            os.chmod(temp_path, os.stat(out_path).st_mode & 0o7777)
+        else:
+            os.chmod(temp_path, _new_file_mode)
+        os.replace(temp_path, out_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
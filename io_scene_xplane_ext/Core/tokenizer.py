@@ -0,0 +1,93 @@
+#Project:   Blender-X-Plane-Extensions
+#Author:    Connor Russell
+#Date:      10/19/2026
+#Module:    tokenizer.py
+#Purpose:   Stream the commands of X-Plane text files line by line. Does not depend on bpy, so it can be used outside Blender
+
+import os
+
+#Number of lines between checking for cancellation and reporting progress
+check_interval = 4096
+
+class read_cancelled(Exception):
+    """
+    Raised by read_commands when it's should_cancel callback returns True.
+    """
+    pass
+
+class command_table:
+    """
+    The minimum number of tokens each command of a format needs. Build one per format at module level, and reuse it for every line of every file.
+    """
+    def __init__(self, min_tokens, accepted_short_counts=None):
+        """
+        Args:
+            min_tokens (dict): Command -> minimum number of tokens, including the command itself. Commands not in it are not checked.
+            accepted_short_counts (dict): Command -> set of token counts below the minimum that are still accepted (i.e. for files written by old versions).
+        """
+        self.min_tokens = min_tokens
+        self.accepted_short_counts = accepted_short_counts if accepted_short_counts is not None else {}
+
+    def get_missing_tokens(self, tokens):
+        """
+        Gets how many tokens a command is short of it's minimum.
+        Args:
+            tokens (list of str): The tokens of the line. Must not be empty.
+        Returns:
+            int: The number of missing tokens. 0 if the command can be used.
+        """
+        needed = self.min_tokens.get(tokens[0])
+        if needed is None or len(tokens) >= needed:
+            return 0
+        if len(tokens) in self.accepted_short_counts.get(tokens[0], ()):
+            return 0
+        return needed - len(tokens)
+
+def read_commands(in_path, table, skip_comments=False, warn=None, on_progress=None, should_cancel=None):
+    """
+    Streams the commands of an X-Plane text file, one line at a time, so the whole file is never held in memory.
+    Empty lines, and commands without enough tokens (per table) are skipped.
+    Args:
+        in_path (str): The path of the file to read.
+        table (command_table): The minimum token counts of the format.
+        skip_comments (bool): Whether to skip lines starting with #. Otherwise they are yielded like any other command.
+        warn (callable): Called with (message, summary) for each skipped command. None to skip them silently.
+        on_progress (callable): Called with the fraction (0-1) of the file read, every check_interval lines.
+        should_cancel (callable): Called every check_interval lines. If it returns True, read_cancelled is raised.
+    Yields:
+        Tuple[str, list of str]: The stripped line, and it's tokens.
+    Raises:
+        read_cancelled: If should_cancel returned True.
+    """
+    if should_cancel is not None and should_cancel():
+        raise read_cancelled(f"Reading {in_path} was cancelled")
+
+    file_size = max(1, os.path.getsize(in_path))
+
+    chars_read = 0
+    line_count = 0
+    with open(in_path, "r") as f:
+        for raw_line in f:
+            chars_read += len(raw_line)
+            line_count += 1
+
+            if line_count % check_interval == 0:
+                if should_cancel is not None and should_cancel():
+                    raise read_cancelled(f"Reading {in_path} was cancelled")
+                if on_progress is not None:
+                    on_progress(min(1.0, chars_read / file_size))
+
+            line = raw_line.strip()
+            if not line:
+                continue
+            if skip_comments and line[0] == "#":
+                continue
+
+            tokens = line.split()
+            missing = table.get_missing_tokens(tokens)
+            if missing > 0:
+                if warn is not None:
+                    warn(f"Not enough tokens for command '{tokens[0]}'! Expected at least {len(tokens) + missing}, got {len(tokens)}. Line: '{line}'", f"Not enough tokens for command '{tokens[0]}'")
+                continue
+
+            yield line, tokens
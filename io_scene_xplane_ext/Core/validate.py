@@ -0,0 +1,100 @@
+#Project:   Blender-X-Plane-Extensions
+#Author:    Connor Russell
+#Date:      10/19/2026
+#Module:    validate.py
+#Purpose:   Check parsed X-Plane files for structural problems (bad indices, wrong counts, unbalanced animations). Does not depend on bpy
+
+from . import formats
+from .ir import geometry_ref
+
+def _check_mesh_indices(doc, issues):
+    for i, mesh in enumerate(doc.meshes):
+        if mesh.get_index_count() == 0:
+            continue
+        vertex_count = mesh.get_vertex_count()
+        max_index = max(mesh.indices)
+        if max_index >= vertex_count:
+            issues.append(f"Mesh {i} uses vertex {max_index}, but only has {vertex_count} vertices")
+
+def _check_obj(doc, issues):
+    pool = doc.meshes[0] if len(doc.meshes) > 0 else None
+    anim_depth = 0
+
+    for command in doc.commands:
+        if isinstance(command, geometry_ref):
+            continue
+        cmd = command[0]
+
+        if cmd == "POINT_COUNTS" and len(command) >= 5 and pool is not None:
+            if command[1] != str(pool.get_vertex_count()):
+                issues.append(f"POINT_COUNTS says {command[1]} vertices, but there are {pool.get_vertex_count()}")
+            if command[4] != str(pool.get_index_count()):
+                issues.append(f"POINT_COUNTS says {command[4]} indices, but there are {pool.get_index_count()}")
+
+        elif cmd == "TRIS" and len(command) >= 3 and pool is not None:
+            try:
+                start = int(float(command[1]))
+                count = int(float(command[2]))
+            except ValueError:
+                issues.append(f"TRIS has invalid numbers: '{' '.join(command)}'")
+                continue
+            if start < 0 or start + count > pool.get_index_count():
+                issues.append(f"TRIS {start} {count} is outside of the {pool.get_index_count()} indices")
+            if count % 3 != 0:
+                issues.append(f"TRIS {start} {count} is not a whole number of triangles")
+
+        elif cmd == "ANIM_begin":
+            anim_depth += 1
+
+        elif cmd == "ANIM_end":
+            anim_depth -= 1
+            if anim_depth < 0:
+                issues.append("ANIM_end without a matching ANIM_begin")
+                anim_depth = 0
+
+    if anim_depth > 0:
+        issues.append(f"{anim_depth} ANIM_begin without a matching ANIM_end")
+
+def _check_meshes(doc, layout, issues):
+    mesh_index = 0
+    for command in doc.commands:
+        if isinstance(command, geometry_ref) or command[0] != layout.mesh_command:
+            continue
+        if mesh_index >= len(doc.meshes):
+            break
+
+        mesh = doc.meshes[mesh_index]
+        if len(command) >= 5:
+            declared_vertices = command[layout.mesh_count_tokens[0]]
+            declared_indices = command[layout.mesh_count_tokens[1]]
+            if declared_vertices != str(mesh.get_vertex_count()):
+                issues.append(f"Mesh {mesh_index} says {declared_vertices} vertices, but has {mesh.get_vertex_count()}")
+            if declared_indices != str(mesh.get_index_count()):
+                issues.append(f"Mesh {mesh_index} says {declared_indices} indices, but has {mesh.get_index_count()}")
+        if mesh.get_index_count() % 3 != 0:
+            issues.append(f"Mesh {mesh_index} has {mesh.get_index_count()} indices, which is not a whole number of triangles")
+        mesh_index += 1
+
+def validate(doc):
+    """
+    Checks a parsed file for structural problems.
+    Args:
+        doc (document_ir): The parsed file.
+    Returns:
+        list of str: Every problem found, including the warnings from parsing. Empty if the file is valid.
+    """
+    issues = list(doc.warnings)
+
+    if doc.kind not in formats.command_tables:
+        issues.append(f"Unknown file type '{doc.kind}'")
+        return issues
+
+    _check_mesh_indices(doc, issues)
+
+    layout = formats.geometry_layouts.get(doc.kind)
+    if doc.kind == "OBJ":
+        _check_obj(doc, issues)
+    elif layout is not None:
+        _check_meshes(doc, layout, issues)
+
+    return issues
@@ -6,9 +6,11 @@
 
 import bpy
 import mathutils
+import numpy as np
 from . import geometery_utils
 from . import log_utils
 from . import misc_utils
+from . import vertex_utils
 
 #-------------------------------------------------------------------------------------------------------------------------------------------
 #
@@ -50,145 +52,121 @@ class agp_transform:
         #The Y resolution of the texture (default 4096). This is applied only for import/export, not for calculations
         self.resolution_y = 4096.0
 
-def build_vertex_to_edge_map(obj):
+def build_vertex_adjacency(edge_verts, vertex_count):
     """
-    Build a lookup table mapping each vertex index to a list of edge indices it is part of.
+    Builds a compressed (CSR) vertex to vertex adjacency from an edge array.
 
     Args:
-        obj (bpy.types.Object): The Blender object (must be a mesh).
+        edge_verts (np.ndarray): (E, 2) array of the vertex indices of each edge.
+        vertex_count (int): The number of vertices in the mesh.
 
     Returns:
-        dict: A dictionary mapping vertex indices to lists of edge indices.
+        Tuple[np.ndarray, np.ndarray]: Offsets and neighbors. The neighbors of vertex v are neighbors[offsets[v]:offsets[v + 1]].
     """
-    from collections import defaultdict
+    ends = edge_verts.ravel()
+    others = edge_verts[:, ::-1].ravel()
 
-    mesh = obj.data
-    vertex_to_edges = defaultdict(list)
-    for edge in mesh.edges:
-        for v in edge.vertices:
-            vertex_to_edges[v].append(edge.index)
-    return dict(vertex_to_edges)
+    order = np.argsort(ends, kind='stable')
+    neighbors = others[order]
+
+    offsets = np.zeros(vertex_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(ends, minlength=vertex_count), out=offsets[1:])
 
-def get_edges_for_vertex(obj, vertex_index, vertex_to_edges):
+    return offsets, neighbors
+
+def get_perimeter_loops(obj):
     """
-    Retrieve a list of edge objects attached to a given vertex index, using a provided lookup table.
+    Traces every chain of flat (horizontal) edges in a mesh. Vertical edges, like the sides of an extruded perimeter, are ignored.
+    Open chains start at their lowest index end. Closed loops start at their lowest Z, then lowest Y, vertex, and go along that vertex's first flat edge
+    (in edge order), so the perimeter has the same start and direction as it always has.
 
     Args:
         obj (bpy.types.Object): The Blender object (must be a mesh).
-        vertex_index (int): The index of the vertex.
-        vertex_to_edges (dict): A dictionary mapping vertex indices to lists of edge indices.
 
     Returns:
-        list: A list of bpy.types.MeshEdge objects attached to the vertex.
+        Tuple[list, np.ndarray]: A list of (vertex indices, is_closed) for each chain, and the (V, 3) vertex positions.
     """
     mesh = obj.data
-    edge_indices = vertex_to_edges.get(vertex_index, [])
-    return [mesh.edges[i] for i in edge_indices]
 
-def get_perimeter_from_mesh(obj):
-    vert_to_edge = build_vertex_to_edge_map(obj)
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float64)
+    mesh.vertices.foreach_get("co", co)
+    co = co.reshape(-1, 3)
 
-    #Get a list of edges that have 1 connected edge
-    end_vertex = []
-    start_vertex = 0
+    edge_verts = np.empty(len(mesh.edges) * 2, dtype=np.int64)
+    mesh.edges.foreach_get("vertices", edge_verts)
+    edge_verts = edge_verts.reshape(-1, 2)
 
-    parent_scale = mathutils.Vector((1, 1, 1))
+    #Only keep flat edges
+    edge_verts = edge_verts[np.abs(co[edge_verts[:, 0], 2] - co[edge_verts[:, 1], 2]) < 0.001]
 
-    if obj.parent is not None:
-        parent_scale = obj.parent.scale
+    offsets, neighbors = build_vertex_adjacency(edge_verts, len(co))
+    degrees = np.diff(offsets)
 
-    for v in vert_to_edge:
-        edges = get_edges_for_vertex(obj, v, vert_to_edge)
-        if len(edges) == 1:
-            end_vertex.append(v)
+    if np.any(degrees > 2):
+        bad_vertex = int(np.argmax(degrees > 2))
+        raise ValueError(f"Multiple edges found for vertex at location {tuple(co[bad_vertex])}. Ensure the mesh is a simple polygon.")
 
-    #If there are no end vertices, this is a closed loop, so we'll just find the vertex with the lowest Z and lowest Y
-    if len(end_vertex) == 0:
-        all_verts = [v for v in obj.data.vertices]
+    offsets = offsets.tolist()
+    neighbors = neighbors.tolist()
+    visited = [False] * len(co)
 
-        #Sort by Z then Y
-        all_verts.sort(key=lambda v: (v.co.z, v.co.y))
+    def walk(start_vertex):
+        #Each vertex has at most 2 neighbors, so we just keep going to the one we didn't come from
+        out_verts = [start_vertex]
+        visited[start_vertex] = True
+        prior_vertex = -1
+        cur_vertex = start_vertex
 
-        start_vertex = all_verts[0].index
+        while True:
+            next_vertex = -1
+            for neighbor in neighbors[offsets[cur_vertex]:offsets[cur_vertex + 1]]:
+                if neighbor != prior_vertex and neighbor != cur_vertex:
+                    next_vertex = neighbor
+                    break
 
-    def remove_non_flat_edges(obj, edges):
-        new_edges = []
-        for edge in edges:
-            #Get the verts
-            v1 = obj.data.vertices[edge.vertices[0]]
-            v2 = obj.data.vertices[edge.vertices[1]]
+            if next_vertex == -1:
+                return out_verts, False
+            if next_vertex == start_vertex:
+                return out_verts, True
 
-            if abs(v1.co.z - v2.co.z) < 0.001:
-                new_edges.append(edge)
-        return new_edges
-    
-    def remove_self_edge(edges, self_edge):
-        new_edges = []
-        for edge in edges:
-            if edge.vertices != self_edge.vertices:
-                new_edges.append(edge)
-        return new_edges
-    
-    def get_next_edge_vertex(cur_edge, prior_vertex):
-        if cur_edge.vertices[0] == prior_vertex:
-            return cur_edge.vertices[1]
-        else:
-            return cur_edge.vertices[0]
+            out_verts.append(next_vertex)
+            visited[next_vertex] = True
+            prior_vertex = cur_vertex
+            cur_vertex = next_vertex
+
+    loops = []
+
+    #Open chains first, starting from their ends, then whatever is left is closed loops
+    for v in np.flatnonzero(degrees == 1).tolist():
+        if not visited[v]:
+            loops.append(walk(v))
+    for v in np.flatnonzero(degrees == 2).tolist():
+        if not visited[v]:
+            #The walk direction comes from the start vertex's first edge, so walk again from the lowest vertex. Ties go to the lowest index
+            loop_verts, is_closed = walk(v)
+            start_vertex = min(loop_verts, key=lambda i: (co[i, 2], co[i, 1], i))
+            if is_closed and start_vertex != v:
+                loop_verts, is_closed = walk(start_vertex)
+            loops.append((loop_verts, is_closed))
+
+    return loops, co
 
-    #Now that we have a starting point, we need to find the starting edge
-    all_starting_edges = get_edges_for_vertex(obj, start_vertex, vert_to_edge)
-    all_starting_edges = remove_non_flat_edges(obj, all_starting_edges)
+def get_perimeter_from_mesh(obj):
+    loops, co = get_perimeter_loops(obj)
 
-    if len(all_starting_edges) == 0:
+    if len(loops) == 0:
         raise ValueError("No valid starting edges found. Ensure the mesh has flat edges.")
 
-    #We'll use the first edge
-    #These are vertex *indicies*
-    out_verts = []
-    cur_start_vertex = start_vertex
-    cur_edge = all_starting_edges[0]
-
-    while True:
-        #Save the current start vertex
-        out_verts.append(cur_start_vertex)
-
-        #Get the next vertex
-        next_vertex = get_next_edge_vertex(cur_edge, cur_start_vertex)
-
-        #Get the next edges, and remove the current and non-flat edges
-        next_edges = get_edges_for_vertex(obj, next_vertex, vert_to_edge)
-        print(f"Edges for vertex {len(next_edges)}")
-        next_edges = remove_non_flat_edges(obj, next_edges)
-        print(f"Edges minus vertical edges {len(next_edges)}")
-        next_edges = remove_self_edge(next_edges, cur_edge)
-        print(f"Edges minus self {len(next_edges)}")
-
-        #If there are no edges, we've reached an open end, save the last vertex and break
-        if len(next_edges) == 0:
-            out_verts.append(next_vertex)
-            break
+    parent_scale = mathutils.Vector((1, 1, 1))
 
-        #If there is only one edge, we need to check that the next vertex is not the same as our very first vertex
-        #If it's not, we can continue
-        #If it is, it's a close loop and we can just break here
-        if len(next_edges) == 1:
-            if next_vertex == start_vertex:
-                break
-            else:
-                cur_edge = next_edges[0]
-                cur_start_vertex = next_vertex
-        
-        #If there are multiple edges, that is invalid. So we will raise an error
-        if len(next_edges) > 1:
-            raise ValueError(f"Multiple edges found for vertex at location {obj.data.vertices[next_vertex].co}. Ensure the mesh is a simple polygon.")
-        
-    #Now we have a list of vertex indicies! So now we get to go through the actual vertices, and get their coords.
-    out_coords = []
-
-    for v in out_verts:
-        new_pos = obj.data.vertices[v].co
-        new_pos.z = 0.0  # Set Z to 0 for flatness
-        out_coords.append(new_pos)
+    if obj.parent is not None:
+        parent_scale = obj.parent.scale
+
+    #Meshes can have multiple loops (i.e. the top and bottom of an extruded perimeter). We use the one with the lowest Z, then lowest Y, vertex
+    out_verts = min(loops, key=lambda loop: min((co[v, 2], co[v, 1]) for v in loop[0]))[0]
+
+    #Now we have a list of vertex indicies! So now we get to go through the actual vertices, and get their coords. Z is set to 0 for flatness
+    out_coords = [mathutils.Vector((co[v, 0], co[v, 1], 0.0)) for v in out_verts]
 
     #Now we will iterate over our list of coords and apply the rot/loc/scale of *this* object, but not the parents, to it
     out_coords = [(obj.matrix_local @ coord) * parent_scale for coord in out_coords]
@@ -280,122 +258,159 @@ def uv_to_px(uv_x, uv_y, transform: agp_transform):
 
     return pixel_x, pixel_y
 
-def get_tile_bounds_and_transform(obj):
+#Cache of tile analysis results. Maps object name to (fingerprint, results, messages). See get_tile_bounds_and_transform
+_tile_cache = {}
+
+def cluster_values(values, tolerance):
     """
-    Returns a tuple of left, bottom, right, top, UVs for the bounding box of the object, and the bounding box, and an agp_transform for this tile
+    Groups values that are within the tolerance of the smallest value in their group. Each group is measured from it's first value, rather than
+    chaining from neighbor to neighbor, so evenly spaced values closer than the tolerance don't all collapse into one group.
+    Args:
+        values (np.ndarray): 1D array of values.
+        tolerance (float): The maximum distance of a value from the first (smallest) value of it's cluster.
+    Returns:
+        Tuple[np.ndarray, int]: The cluster index of each value, and the number of clusters.
+    """
+    if len(values) == 0:
+        return np.zeros(0, dtype=np.int64), 0
+
+    order = np.argsort(values, kind='stable')
+    sorted_values = values[order].tolist()
+
+    sorted_clusters = np.empty(len(sorted_values), dtype=np.int64)
+    cluster = 0
+    cluster_start = sorted_values[0]
+    for i, value in enumerate(sorted_values):
+        if value - cluster_start > tolerance:
+            cluster += 1
+            cluster_start = value
+        sorted_clusters[i] = cluster
+
+    clusters = np.empty(len(values), dtype=np.int64)
+    clusters[order] = sorted_clusters
+
+    return clusters, cluster + 1
 
+def is_grid(xs, ys, tolerance):
     """
+    Checks that 2D points form a full rectangular grid. A quad has 2 unique Xs and Ys and 4 points. A subdivided plane has a point for every unique X and Y pair.
+    The tolerance is for float noise, so on each axis it is capped at a quarter of the largest gap between coordinates. Otherwise the rows of a finely subdivided plane would be merged.
+    Args:
+        xs (np.ndarray): X coordinate of each point.
+        ys (np.ndarray): Y coordinate of each point.
+        tolerance (float): Coordinates closer than this are considered the same.
+    Returns:
+        bool: True if the points form a rectangular grid.
+    """
+    def get_axis_tolerance(values):
+        if len(values) < 2:
+            return tolerance
+        return min(tolerance, 0.25 * float(np.max(np.diff(np.sort(values)))))
+
+    x_clusters, x_count = cluster_values(xs, get_axis_tolerance(xs))
+    y_clusters, y_count = cluster_values(ys, get_axis_tolerance(ys))
 
-    left_vertex = None
-    right_vertex = None
-    top_vertex = None
-    bottom_vertex = None
-
-    left_u = 0
-    right_u = 1
-    top_v = 1
-    bottom_v = 0
-
-    for v in obj.data.vertices:
-        if left_vertex is None or v.co.x < left_vertex.co.x:
-            left_vertex = v
-        if right_vertex is None or v.co.x > right_vertex.co.x:
-            right_vertex = v
-        if top_vertex is None or v.co.y > top_vertex.co.y:
-            top_vertex = v
-        if bottom_vertex is None or v.co.y < bottom_vertex.co.y:
-            bottom_vertex = v
-
-    left_vertex_pos = obj.scale * left_vertex.co
-    right_vertex_pos = obj.scale * right_vertex.co
-    top_vertex_pos = obj.scale * top_vertex.co
-    bottom_vertex_pos = obj.scale * bottom_vertex.co
-
-    #Get the UVs for these vertices
-    uv_layer = misc_utils.get_uv_layer(obj).data
+    if x_count < 2 or y_count < 2:
+        return False
+
+    #Every point is in the X * Y grid, so if we have that many unique pairs every grid position is filled
+    unique_pairs = np.unique(x_clusters * y_count + y_clusters)
+    return len(unique_pairs) == x_count * y_count
+
+def get_tile_bounds_and_transform(obj):
+    """
+    Returns a tuple of left, bottom, right, top, UVs for the bounding box of the object, and the bounding box, and an agp_transform for this tile
+    Results are cached per object until its mesh, UVs, or scale change.
+    """
+    mesh = obj.data
+    uv_layer = misc_utils.get_uv_layer(obj)
     if uv_layer is None:
         log_utils.error(f"No UV layer on BASE_TILE object! {obj.name}", "BASE_TILE is missing UV layer")
         return -1, -1, -1, -1, None
-    
-    left_u = uv_layer[left_vertex.index].uv.x
-    right_u = uv_layer[right_vertex.index].uv.x
-    top_v = uv_layer[top_vertex.index].uv.y
-    bottom_v = uv_layer[bottom_vertex.index].uv.y
+
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+    co = co.reshape(-1, 3)
+
+    loop_verts = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_verts)
+
+    uvs = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+    uv_layer.data.foreach_get("uv", uvs)
+    uvs = uvs.reshape(-1, 2)
+
+    if len(co) == 0 or len(uvs) == 0:
+        log_utils.error(f"BASE_TILE object {obj.name} has no geometry! Export cancelled.", "BASE_TILE must be rectangular")
+        return -1, -1, -1, -1, None
+
+    def replay(results, messages):
+        #Logs the messages from the analysis, and returns a copy of the results so callers can't change the cached transform
+        for log_function, message, summary in messages:
+            log_function(message, summary)
+
+        left_u, bottom_v, right_u, top_v, cached_transform = results
+        if cached_transform is None:
+            return results
+
+        transform = agp_transform()
+        transform.__dict__.update(cached_transform.__dict__)
+        return left_u, bottom_v, right_u, top_v, transform
+
+    #Reuse the last results if nothing has changed. Any messages are logged again so every export reports them
+    fingerprint = (hash(co.tobytes()), hash(loop_verts.tobytes()), hash(uvs.tobytes()), tuple(obj.scale))
+    cached = _tile_cache.get(obj.name)
+    if cached is not None and cached[0] == fingerprint:
+        return replay(cached[1], cached[2])
+
+    messages = []
+
+    def store(results):
+        _tile_cache[obj.name] = (fingerprint, results, messages)
+        return replay(results, messages)
+
+    #Now we want to check if the geometry is resonably square. Each unique X and Y (within 0.1m) must be paired with every other, so we have a rectangular grid
+    if not is_grid(co[:, 0], co[:, 1], 0.1):
+        messages.append((log_utils.error, f"BASE_TILE object {obj.name} appears to have non-square geometry! Export cancelled.", "BASE_TILE must be rectangular"))
+        return store((-1, -1, -1, -1, None))
+
+    scaled_co = co.astype(np.float64) * np.array(obj.scale, dtype=np.float64)
+
+    left_x = scaled_co[:, 0].min()
+    right_x = scaled_co[:, 0].max()
+    bottom_y = scaled_co[:, 1].min()
+    top_y = scaled_co[:, 1].max()
+
+    #Get the UVs along each edge of the tile. UVs are per loop, so we go through the loops' vertices to know which edge they are on
+    loop_co = co[loop_verts]
+    left_u = float(uvs[np.abs(loop_co[:, 0] - co[:, 0].min()) <= 0.1, 0].mean())
+    right_u = float(uvs[np.abs(loop_co[:, 0] - co[:, 0].max()) <= 0.1, 0].mean())
+    bottom_v = float(uvs[np.abs(loop_co[:, 1] - co[:, 1].min()) <= 0.1, 1].mean())
+    top_v = float(uvs[np.abs(loop_co[:, 1] - co[:, 1].max()) <= 0.1, 1].mean())
 
     #Calculate the ratios. We always use 4096 as our pixel size
-    x_ratio = ((right_u - left_u) / (right_vertex_pos.x - left_vertex_pos.x))
-    y_ratio = ((top_v - bottom_v) / (top_vertex_pos.y - bottom_vertex_pos.y))
+    x_ratio = ((right_u - left_u) / (right_x - left_x))
+    y_ratio = ((top_v - bottom_v) / (top_y - bottom_y))
 
     #Now that we have the ratios, and the left/bottom coords, we can get the anchor
     # To do so, we will multiply the negative left position and negative bottom postion by the ratios,
     # then add them to the left and bottom UVs to get the anchor UVs
-    anchor_u = left_u + ((-left_vertex_pos.x) * x_ratio)
-    anchor_v = bottom_v + ((-bottom_vertex_pos.y) * y_ratio)
+    anchor_u = left_u + ((-left_x) * x_ratio)
+    anchor_v = bottom_v + ((-bottom_y) * y_ratio)
 
     transform = agp_transform()
-    transform.x_ratio = x_ratio
-    transform.y_ratio = y_ratio
-    transform.anchor_x = anchor_u
-    transform.anchor_y = anchor_v
+    transform.x_ratio = float(x_ratio)
+    transform.y_ratio = float(y_ratio)
+    transform.anchor_x = float(anchor_u)
+    transform.anchor_y = float(anchor_v)
     transform.resolution_x = 4096.0
     transform.resolution_y = 4096.0
 
-    #Now we want to check if the geometry is resonably square. We will do this by checking that each vertex is only different from 2 other vertices in X and Y
-    bIsSquareish = True
-    all_xs = []
-    all_ys = []
-    for v in obj.data.vertices:
-        all_xs.append(v.co.x)
-        all_ys.append(v.co.y)
-
-    #This logic is a little janky but it works. We will iterate over each vertex. It can be different from up to 2 verticies. If it is different than 3 or more than we are non-square
-    for v in obj.data.vertices:
-        num_different_xs = 0
-        num_different_ys = 0
-        for v_compare in obj.data.vertices:
-            if v == v_compare:
-                continue
-            if abs(v.co.x - v_compare.co.x) > 0.1:
-                num_different_xs += 1
-            if abs(v.co.y - v_compare.co.y) > 0.1:
-                num_different_ys += 1
-        if num_different_xs > 2 or num_different_ys > 2:
-            bIsSquareish = False
-            break
-
-    if not bIsSquareish:
-        log_utils.error(f"BASE_TILE object {obj.name} appears to have non-square geometry! Export cancelled.", "BASE_TILE must be rectangular")
-        return -1, -1, -1, -1, None
-    
     #Now we do similar, but for the UVs, to make sure they are squareish
-    all_us = []
-    all_vs = []
-    for v in obj.data.vertices:
-        uv = uv_layer[v.index].uv
-        all_us.append(uv.x)
-        all_vs.append(uv.y)
-    
-    for v in obj.data.vertices:
-        num_different_us = 0
-        num_different_vs = 0
-        uv = uv_layer[v.index].uv
-        for v_compare in obj.data.vertices:
-            if v == v_compare:
-                continue
-            uv_compare = uv_layer[v_compare.index].uv
-            if abs(uv.x - uv_compare.x) > 0.01:
-                num_different_us += 1
-            if abs(uv.y - uv_compare.y) > 0.01:
-                num_different_vs += 1
-        if num_different_us > 2 or num_different_vs > 2:
-            bIsSquareish = False
-            break
-
-    if not bIsSquareish:
-        log_utils.warning(f"BASE_TILE object {obj.name} appears to have non-square UVs! Annotations should remain correct, however base tile UVs will likely be incorrect.", "BASE_TILE has non-square UVs, results may be unexpected")
+    if not is_grid(uvs[:, 0], uvs[:, 1], 0.01):
+        messages.append((log_utils.warning, f"BASE_TILE object {obj.name} appears to have non-square UVs! Annotations should remain correct, however base tile UVs will likely be incorrect.", "BASE_TILE has non-square UVs, results may be unexpected"))
 
     #Return the UV bounds
-    return left_u, bottom_v, right_u, top_v, transform
+    return store((left_u, bottom_v, right_u, top_v, transform))
 
 def create_tile_obj(left: float, bottom: float, right: float, top: float, in_transform: agp_transform):
     """
@@ -445,16 +460,16 @@ def create_obj_from_perimeter(perimeter, extrude_height=0.0):
     Creates a new object from the given perimeter points.
     """
 
-    verts = []
-    indicies = []
+    verts = vertex_utils.vertex_buffer(capacity=max(0, len(perimeter) - 1) * 6)
 
     for i, pt in enumerate(perimeter):
         if i == len(perimeter) - 1:
             break
-        cur_vert = geometery_utils.xp_vertex(pt.x, pt.y, pt.z, 0, 0, 1, 0, 0) 
-        next_vert = geometery_utils.xp_vertex(perimeter[i + 1].x, perimeter[i + 1].y, perimeter[i + 1].z, 0, 0, 1, 0, 0)
-        top_cur_vert = geometery_utils.xp_vertex(pt.x, pt.y, pt.z + extrude_height, 0, 0, 1, 0, 0)
-        top_next_vert = geometery_utils.xp_vertex(perimeter[i + 1].x, perimeter[i + 1].y, perimeter[i + 1].z + extrude_height, 0, 0, 1, 0, 0)
+        next_pt = perimeter[i + 1]
+        cur_vert = (pt.x, pt.y, pt.z, 0, 0, 1, 0, 0)
+        next_vert = (next_pt.x, next_pt.y, next_pt.z, 0, 0, 1, 0, 0)
+        top_cur_vert = (pt.x, pt.y, pt.z + extrude_height, 0, 0, 1, 0, 0)
+        top_next_vert = (next_pt.x, next_pt.y, next_pt.z + extrude_height, 0, 0, 1, 0, 0)
 
         verts.append(cur_vert)
         verts.append(next_vert)
@@ -464,8 +479,7 @@ def create_obj_from_perimeter(perimeter, extrude_height=0.0):
         verts.append(top_next_vert)
         verts.append(top_cur_vert)
     
-    for i in range(0, len(verts)):
-        indicies.append(i)
+    indicies = list(range(len(verts)))
 
     new_obj = geometery_utils.create_obj_from_draw_call(verts, indicies, "Perimeter Obj")
     #Link
@@ -489,7 +503,8 @@ def create_obj_from_perimeter(perimeter, extrude_height=0.0):
 def recursively_split_objects(in_object:bpy.types.Object):
     """
     Duplicates and splits the current object by material
-    Parent and animation data automatically copy to the new objects in the duplicate and split operators
+    Objects are copied with the data API, so parenting, transforms, modifiers, animation data, and X-Plane properties carry over to the new objects.
+    Meshes are split by partitioning their faces by material index and building the per material meshes directly from arrays. No operators or mode switches are used, so this does not depend on the selection or view layer.
     If the object is not a mesh, it will be skipped but children will still be processed.
     If the object is a light it will still be duplicated and put in the return list
     Args:
@@ -502,49 +517,31 @@ def recursively_split_objects(in_object:bpy.types.Object):
 
     #Split mesh objects by material
     if in_object.type == 'MESH' and not in_object.hide_get() and not in_object.hide_select:
-        #Deselect all in obj mode
-        bpy.context.view_layer.objects.active = in_object
-        bpy.ops.object.mode_set(mode='OBJECT')
-        bpy.ops.object.select_all(action='DESELECT')
-
-        #Select and duplicate the object
-        bpy.context.view_layer.objects.active = in_object
-        in_object.select_set(True)
-        bpy.ops.object.duplicate(linked=False)
-        obj = bpy.context.active_object
-        in_object.select_set(False)
-        obj.select_set(True)
-
         # If there are multiple materials, split the object
-        if len(obj.data.materials) > 1:
-            
-            # Enter edit mode, select all, split by material, return to obj mode
-            bpy.ops.object.mode_set(mode='EDIT')
-            bpy.ops.mesh.select_all(action='SELECT')
-            bpy.ops.mesh.separate(type='MATERIAL')
-            bpy.ops.object.mode_set(mode='OBJECT')
-            
-            # Get the newly created objects
-            resulting_objects.extend(bpy.context.selected_objects)
-            
-            # Deselect all objects
-            bpy.ops.object.select_all(action='DESELECT')
+        if len(in_object.data.materials) > 1:
+            #Slots can be linked to the object rather than the mesh, so parts are named and assigned from the material each slot actually shows
+            slot_materials = [slot.material for slot in in_object.material_slots]
+            for material, part_mesh in geometery_utils.split_mesh_by_material(in_object.data, slot_materials):
+                obj = in_object.copy()
+                obj.data = part_mesh
+                obj.name = part_mesh.name
+
+                #If the original used object linked materials, the new single slot needs the resolved material as well
+                if len(obj.material_slots) > 0 and obj.material_slots[0].link == 'OBJECT':
+                    obj.material_slots[0].material = material
+
+                resulting_objects.append(obj)
         else:
+            obj = in_object.copy()
+            obj.data = in_object.data.copy()
+
             #Safety check to ensure we never add the original object, resulting in data loss
             if obj != in_object:
                 resulting_objects.append(obj)
     elif in_object.type == 'LIGHT' and not in_object.hide_get() and not in_object.hide_select:
         # If the object is a light, just duplicate it
-        bpy.ops.object.mode_set(mode='OBJECT')
-        bpy.ops.object.select_all(action='DESELECT')
-
-        #Select and duplicate the object
-        bpy.context.view_layer.objects.active = in_object
-        in_object.select_set(True)
-        bpy.ops.object.duplicate(linked=False)
-        obj = bpy.context.active_object
-        in_object.select_set(False)
-        obj.select_set(True)
+        obj = in_object.copy()
+        obj.data = in_object.data.copy()
 
         # Add the duplicated light to the resulting objects
         # Safety check to ensure we never add the original object, resulting in data loss
@@ -559,15 +556,12 @@ def recursively_split_objects(in_object:bpy.types.Object):
 
 def add_fake_lod_obj_to_collections(lods: int, size: int):
     size = size / 2
-    verts = [] #type: list[geometery_utils.xp_vertex]
-    v1 = geometery_utils.xp_vertex(-size, -size, -size * 2, 0, 0, 1, 0, 0)
-    v2 = geometery_utils.xp_vertex(-size, size, -size * 2, 0, 0, 1, 0, 0)
-    v3 = geometery_utils.xp_vertex(size, -size, -size * 2, 0, 0, 1, 0, 0)
-    v4 = geometery_utils.xp_vertex(size, size, -size * 2, 0, 0, 1, 0, 0)
-    verts.append(v1)
-    verts.append(v2)
-    verts.append(v3)
-    verts.append(v4)
+    verts = vertex_utils.vertex_buffer.from_rows([
+        (-size, -size, -size * 2, 0, 0, 1, 0, 0),
+        (-size, size, -size * 2, 0, 0, 1, 0, 0),
+        (size, -size, -size * 2, 0, 0, 1, 0, 0),
+        (size, size, -size * 2, 0, 0, 1, 0, 0),
+    ])
 
     indicies = [1, 2, 0, 1, 3, 2]
 
@@ -8,6 +8,7 @@ import bpy
 import os
 from enum import Enum
 from . import file_utils
+from . import perf_utils
 from .. import material_config
 import time
 import shutil
@@ -362,6 +363,7 @@ def config_target_bake_texture(target_obj, type, resolution):
     #Set the active node to the image node (so this is the one that gets baked to)
     mat.node_tree.nodes.active = image_node
     
+@perf_utils.timed("Save baked textures")
 def save_baked_textures(target_obj, do_separate_normals=False, did_alb=True, did_opacity=True, did_nrm=True, did_mat=True, did_lit=True):
     """
     Saves the baked base and lit textures to the disk, and merges the normal, metalness, and roughness textures into the final nml texture which is also saved to the disk.
@@ -0,0 +1,169 @@
+#Project:   Blender-X-Plane-Extensions
+#Author:    Connor Russell
+#Date:      10/19/2026
+#Module:    collection_index_utils.py
+#Purpose:   Provide an index of which collections are exportable as each asset type, so panels can list them without looping over every collection on each redraw
+
+import bpy # type: ignore
+
+#Collection property groups that have an exportable flag, and are listed in the exporter panels
+collection_types = ("xp_for", "xp_lin", "xp_agp", "xp_pol", "xp_fac")
+
+#Names of every collection, in bpy.data.collections order. None when the index needs to be rebuilt
+_all_names = None
+_all_names_set = set()
+
+#Type -> set of names of the collections that are exportable as that type
+_exportable = {}
+
+#(type, exportable, search) -> list of names. Cleared for a type whenever it's exportable set changes
+_filtered = {}
+
+#Enum items of every collection name. Blender doesn't keep the strings of dynamic enum items alive, so we have to
+_enum_items = []
+
+def mark_dirty():
+    """
+    Marks the index as out of date. It will be rebuilt the next time it is read
+    """
+    global _all_names
+    _all_names = None
+    _all_names_set.clear()
+    _exportable.clear()
+    _filtered.clear()
+    _enum_items.clear()
+
+def build_index():
+    """
+    Rebuilds the index from every collection in the file, if it is out of date.
+    """
+    global _all_names
+    if _all_names is not None:
+        return
+
+    _all_names = []
+    for col_type in collection_types:
+        _exportable[col_type] = set()
+
+    for col in bpy.data.collections:
+        _all_names.append(col.name)
+        for col_type in collection_types:
+            if getattr(col, col_type).exportable:
+                _exportable[col_type].add(col.name)
+
+    _all_names_set.update(_all_names)
+
+def update_collection(col):
+    """
+    Updates which types a collection is exportable as. Called when any of it's exportable flags change.
+    Args:
+        col (bpy.types.Collection): The collection that changed.
+    """
+    if _all_names is None:
+        return
+
+    #A collection we haven't seen (i.e. just added, and no depsgraph update yet) can't be placed in order, so just rebuild
+    if col.name not in _all_names_set:
+        mark_dirty()
+        return
+
+    for col_type in collection_types:
+        is_exportable = getattr(col, col_type).exportable
+        if is_exportable == (col.name in _exportable[col_type]):
+            continue
+
+        if is_exportable:
+            _exportable[col_type].add(col.name)
+        else:
+            _exportable[col_type].discard(col.name)
+
+        for key in [key for key in _filtered if key[0] == col_type]:
+            del _filtered[key]
+
+def update_from_depsgraph(depsgraph):
+    """
+    Checks whether collections were added, removed, or renamed, and if so marks the index as out of date. Only the collections in the update are checked.
+    Args:
+        depsgraph (bpy.types.Depsgraph): The depsgraph of the update.
+    """
+    if _all_names is None:
+        return
+
+    if len(bpy.data.collections) != len(_all_names):
+        mark_dirty()
+        return
+
+    if depsgraph is None or not depsgraph.id_type_updated('COLLECTION'):
+        return
+
+    for update in depsgraph.updates:
+        if isinstance(update.id, bpy.types.Collection) and update.id.original.name not in _all_names_set:
+            mark_dirty()
+            return
+
+def get_collection_names(col_type, exportable, search=""):
+    """
+    Gets the names of the collections that are (or aren't) exportable as a type, and match a search.
+    Args:
+        col_type (str): The collection property group name, i.e. "xp_fac".
+        exportable (bool): Whether to get the exportable collections, or the ones that aren't.
+        search (str): Only collections whose name starts or ends with this are included. Empty to include all.
+    Returns:
+        list of str: The names, in bpy.data.collections order.
+    """
+    build_index()
+
+    key = (col_type, exportable, search)
+    names = _filtered.get(key)
+    if names is None:
+        exportable_names = _exportable[col_type]
+        names = [name for name in _all_names if (name in exportable_names) == exportable and (search == "" or name.startswith(search) or name.endswith(search))]
+        _filtered[key] = names
+
+    return names
+
+def get_collections(col_type, exportable, search=""):
+    """
+    Gets the collections that are (or aren't) exportable as a type, and match a search.
+    Args:
+        col_type (str): The collection property group name, i.e. "xp_fac".
+        exportable (bool): Whether to get the exportable collections, or the ones that aren't.
+        search (str): Only collections whose name starts or ends with this are included. Empty to include all.
+    Returns:
+        list of bpy.types.Collection: The collections, in bpy.data.collections order.
+    """
+    collections = []
+    for name in get_collection_names(col_type, exportable, search):
+        col = bpy.data.collections.get(name)
+        if col is None:
+            #Renamed or removed since the last depsgraph update. Skip it, and rebuild next time
+            mark_dirty()
+            continue
+        collections.append(col)
+    return collections
+
+def has_exportable(col_type):
+    """
+    Gets whether any collection is exportable as a type.
+    Args:
+        col_type (str): The collection property group name, i.e. "xp_fac".
+    Returns:
+        bool: True if at least one collection is exportable as the type.
+    """
+    build_index()
+    return len(_exportable[col_type]) > 0
+
+def get_collection_enum_items():
+    """
+    Gets enum items for every collection name.
+    Returns:
+        list of Tuple[str, str, str]: (identifier, name, description) of each collection, or a single NO_COLLECTIONS item if there are none.
+    """
+    build_index()
+
+    if len(_enum_items) == 0:
+        _enum_items.extend((name, name, name) for name in _all_names)
+        if len(_enum_items) == 0:
+            _enum_items.append(("NO_COLLECTIONS", "No Collections", "No Collections"))
+
+    return _enum_items
@@ -11,6 +11,10 @@ from . import log_utils
 import datetime
 import time
 import os
+import hashlib
+import tempfile
+import shutil
+import threading
 
 
 def _lexnorm(path: Path) -> Path:
@@ -336,27 +340,26 @@ def get_or_load_image(image_path, do_reload=False, copy_append_name=""):
     new_image.name = image_appended_name
     return new_image                 
 
-def backup_file(in_file_path):
+def get_do_backup_on_overwrite():
     """
-    Generates a backup file name by appending a timestamp to the original file name.
+    Gets whether the preferences say to back up files before they are overwritten. Reads bpy, so call it on the main thread.
+
+    Returns:
+        bool: True if files should be backed up.
+    """
+    return bpy.context.preferences.addons['io_scene_xplane_ext'].preferences.do_backup_on_overwrite
+
+def get_backup_path(in_file_path):
+    """
+    Generates a backup file name by appending the file's modified time to the original file name. Doesn't use bpy, so it is safe on worker threads.
 
     Args:
         in_file_path (str): The original file path.
 
     Returns:
-        str: The backup file path with a timestamp.
+        Path: A backup path that doesn't exist yet.
     """
-
     p = Path(in_file_path)
-
-    #If the file doesn't exist, we're done!
-    if not p.is_file():
-        return
-    
-    #We only backup if the preferences say to, so check that
-    if not bpy.context.preferences.addons['io_scene_xplane_ext'].preferences.do_backup_on_overwrite:
-        return
-
     name = p.stem
     ext = p.suffix
 
@@ -383,6 +386,28 @@ def backup_file(in_file_path):
             break
         iter += 1
 
+    return backup_path
+
+def backup_file(in_file_path):
+    """
+    Moves a file to a backup path (see get_backup_path), if the preferences say to back up files before they are overwritten.
+
+    Args:
+        in_file_path (str): The original file path.
+    """
+
+    p = Path(in_file_path)
+
+    #If the file doesn't exist, we're done!
+    if not p.is_file():
+        return
+    
+    #We only backup if the preferences say to, so check that
+    if not get_do_backup_on_overwrite():
+        return
+
+    backup_path = get_backup_path(in_file_path)
+
     #Try to rename the file
     try:
         p.rename(backup_path)
@@ -390,6 +415,128 @@ def backup_file(in_file_path):
     except Exception as e:
         raise RuntimeError(f"Failed to back up file {in_file_path} to {backup_path}: {e}")
 
+#Mode of newly created files (0666 less the umask), the same as open() would give them. The umask can only be read by setting it, so it is read once here
+_umask = os.umask(0)
+os.umask(_umask)
+_new_file_mode = 0o666 & ~_umask
+
+#Counts of files written and skipped by write_if_changed since the last reset_write_stats. Exporters may write from worker threads, so this is locked
+_write_stats = {"written": 0, "unchanged": 0}
+_write_stats_lock = threading.Lock()
+
+#(file, backup) paths of the backups write_if_changed made that haven't been logged yet. write_if_changed may run on worker threads, which can't log, so log_backups logs these on the main thread
+_pending_backups = []
+
+def get_file_digest(in_file_path):
+    """
+    Gets the SHA-1 digest of a file's contents.
+
+    Args:
+        in_file_path (str): The file path.
+
+    Returns:
+        bytes: The digest.
+    """
+    digest = hashlib.sha1()
+    with open(in_file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+def write_if_changed(in_file_path, contents, backup=False):
+    """
+    Writes text to a file, only replacing the file if the contents changed. The text is written to a temporary file in the same folder,
+    then compared to the existing file. If they are the same, the existing file (and it's modified time) is left alone. Otherwise the
+    existing file is optionally copied to a backup, and replaced atomically, so readers never see a partially written or missing file.
+    Doesn't use bpy, so exporters can call it from worker threads. Call log_backups on the main thread afterwards to log the backups made.
+
+    Args:
+        in_file_path (str): The file path.
+        contents (str or list of str): The text to write. A list is written in order, without joining it first.
+        backup (bool): Whether to copy the existing file to a backup (see get_backup_path) before it is replaced. Read the preference on the main thread with get_do_backup_on_overwrite and pass it in.
+
+    Returns:
+        bool: True if the file was written, False if it was unchanged.
+    """
+    if isinstance(contents, str):
+        contents = [contents]
+
+    folder = os.path.dirname(os.path.abspath(in_file_path))
+    os.makedirs(folder, exist_ok=True)
+
+    #Write in text mode, like the exporters always have, so line endings and encoding are the same as before
+    fd, temp_path = tempfile.mkstemp(prefix=".xp_ext_", suffix=".tmp", dir=folder)
+    try:
+        with os.fdopen(fd, "w") as f:
+            for part in contents:
+                f.write(part)
+
+        changed = True
+        if os.path.isfile(in_file_path) and os.path.getsize(in_file_path) == os.path.getsize(temp_path):
+            changed = get_file_digest(in_file_path) != get_file_digest(temp_path)
+
+        if changed:
+            #mkstemp creates the file owner-only, so give it the mode of the file it replaces, or the normal mode for a new file
+            if os.path.isfile(in_file_path):
+                os.chmod(temp_path, os.stat(in_file_path).st_mode & 0o7777)
+            else:
+                os.chmod(temp_path, _new_file_mode)
+            #The existing file is copied rather than moved, so it's in place until os.replace swaps in the new one
+            if backup and os.path.isfile(in_file_path):
+                backup_path = get_backup_path(in_file_path)
+                shutil.copy2(in_file_path, backup_path)
+                with _write_stats_lock:
+                    _pending_backups.append((in_file_path, str(backup_path)))
+            os.replace(temp_path, in_file_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    with _write_stats_lock:
+        _write_stats["written" if changed else "unchanged"] += 1
+
+    return changed
+
+def log_backups():
+    """
+    Logs the backups write_if_changed made since the last call. Call it on the main thread, after any worker threads writing files are done.
+    """
+    with _write_stats_lock:
+        backups = _pending_backups[:]
+        _pending_backups.clear()
+    for in_file_path, backup_path in backups:
+        log_utils.info(f"Backed up file {in_file_path} to {backup_path}")
+
+def get_write_stats():
+    """
+    Gets the number of files written and left unchanged by write_if_changed since the last reset_write_stats.
+
+    Returns:
+        Tuple[int, int]: The written and unchanged counts.
+    """
+    with _write_stats_lock:
+        return _write_stats["written"], _write_stats["unchanged"]
+
+def add_write_stats(written, unchanged):
+    """
+    Adds to the written and unchanged counts. Used to merge counts from export worker processes.
+
+    Args:
+        written (int): Number of files written.
+        unchanged (int): Number of files left unchanged.
+    """
+    with _write_stats_lock:
+        _write_stats["written"] += written
+        _write_stats["unchanged"] += unchanged
+
+def reset_write_stats():
+    """
+    Resets the written and unchanged counts to 0.
+    """
+    with _write_stats_lock:
+        _write_stats["written"] = 0
+        _write_stats["unchanged"] = 0
+
 def resolve_lib_or_real(in_file_path : str, export_path : str) -> str:
     if in_file_path.startswith("//"):
         return to_relative(to_absolute(in_file_path), False, export_path)
@@ -5,9 +5,11 @@
 #Purpose:   Provide utility functions for working with polygons in Blender
 
 import bpy
+import numpy as np
 
 from ..Helpers import misc_utils
 from ..Helpers import geometery_utils
+from ..Helpers import vertex_utils
 
 class TreeQuad():
     def __init__(self):
@@ -18,6 +20,100 @@ class TreeQuad():
         self.offset_to_center = 0.0
         self.height_meters = 0.0
 
+#Cache of forest extraction results, so unchanged trees aren't re-extracted every export. Maps (kind, object name) to (fingerprint, result)
+_extraction_cache = {}
+
+def get_extraction_fingerprint(obj : bpy.types.Object):
+    """
+    Gets a fingerprint of everything the forest extraction of a mesh object depends on: it's geometry, UVs, and transform.
+    Vertex weights and custom normals aren't fingerprinted, edits to them evict the object through evict_extraction_cache instead.
+
+    Args:
+        obj (bpy.types.Object): The mesh object.
+
+    Returns:
+        tuple: The fingerprint, or None if the object can't be cached (i.e. it has modifiers).
+    """
+    if obj.type != 'MESH' or len(obj.modifiers) > 0:
+        return None
+
+    mesh = obj.data
+
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+    loop_verts = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_verts)
+    poly_loop_total = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", poly_loop_total)
+    poly_smooth = np.empty(len(mesh.polygons), dtype=bool)
+    mesh.polygons.foreach_get("use_smooth", poly_smooth)
+    edge_sharp = np.empty(len(mesh.edges), dtype=bool)
+    mesh.edges.foreach_get("use_edge_sharp", edge_sharp)
+
+    uv_hash = None
+    uv_layer = misc_utils.get_uv_layer(obj)
+    if uv_layer is not None:
+        uvs = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+        uv_layer.data.foreach_get("uv", uvs)
+        uv_hash = hash(uvs.tobytes())
+
+    mesh_hash = hash((co.tobytes(), loop_verts.tobytes(), poly_loop_total.tobytes(), poly_smooth.tobytes(), edge_sharp.tobytes(), mesh.has_custom_normals))
+    transform = tuple(tuple(row) for row in obj.matrix_local) + (tuple(obj.location), tuple(obj.scale))
+
+    return (mesh.name, mesh_hash, uv_hash, transform)
+
+def get_cached_extraction(kind : str, obj : bpy.types.Object, extract):
+    """
+    Gets the result of an extraction function for an object, reusing the last result if the object hasn't changed.
+
+    Args:
+        kind (str): Name of the kind of extraction, so different extractions of the same object are cached separately.
+        obj (bpy.types.Object): The object to extract from.
+        extract (Callable[[bpy.types.Object], Any]): The extraction function. It's result must not be modified by callers, as it is shared.
+
+    Returns:
+        Any: The result of extract(obj).
+    """
+    key = (kind, obj.name)
+    fingerprint = get_extraction_fingerprint(obj)
+
+    cached = _extraction_cache.get(key)
+    if fingerprint is not None and cached is not None and cached[0] == fingerprint:
+        return cached[1]
+
+    result = extract(obj)
+    if fingerprint is not None:
+        _extraction_cache[key] = (fingerprint, result)
+    return result
+
+def evict_extraction_cache(name : str):
+    """
+    Removes cached extractions for an object, or for the objects using a mesh.
+
+    Args:
+        name (str): The name of the object or mesh.
+    """
+    for key in [key for key, (fingerprint, result) in _extraction_cache.items() if key[1] == name or fingerprint[0] == name]:
+        del _extraction_cache[key]
+
+def clear_extraction_cache():
+    """
+    Removes all cached extractions
+    """
+    _extraction_cache.clear()
+
+def get_cached_forest_quad(obj : bpy.types.Object):
+    """
+    Gets the forest quad of an object, if it is one. Results are cached per object until it changes.
+
+    Args:
+        obj (bpy.types.Object): The Blender object to analyze.
+
+    Returns:
+        TreeQuad: The quad, or None if the object isn't a forest quad.
+    """
+    return get_cached_extraction("quad", obj, lambda o: get_forest_quad_from_obj(o) if is_forest_quad_obj(o) else None)
+
 def is_forest_quad_obj(obj : bpy.types.Object) -> bool:
     """
     Get the lowest and highest U and V values from an object in Blender.
@@ -46,10 +142,10 @@ def is_forest_quad_obj(obj : bpy.types.Object) -> bool:
         return False
     
     #Extract the verticies and UVs
-    v0 = obj.data.vertices[obj.data.polygons[0].vertices[0]].co
-    v1 = obj.data.vertices[obj.data.polygons[0].vertices[1]].co
-    v2 = obj.data.vertices[obj.data.polygons[0].vertices[2]].co
-    v3 = obj.data.vertices[obj.data.polygons[0].vertices[3]].co
+    v0 = obj.data.vertices[obj.data.polygons[0].vertices[0]].co.copy()
+    v1 = obj.data.vertices[obj.data.polygons[0].vertices[1]].co.copy()
+    v2 = obj.data.vertices[obj.data.polygons[0].vertices[2]].co.copy()
+    v3 = obj.data.vertices[obj.data.polygons[0].vertices[3]].co.copy()
 
     #Now that we have verticies, we need to apply the *object's* loc/scale. We don't really care about it's rotation
     v0 -= obj.location
@@ -102,13 +198,13 @@ def get_forest_quad_from_obj(obj : bpy.types.Object):
         raise ValueError("Object is missing UVs.")
     
     #Extract the verticies and UVs
-    v0 = obj.data.vertices[obj.data.polygons[0].vertices[0]].co
+    v0 = obj.data.vertices[obj.data.polygons[0].vertices[0]].co.copy()
     uv0 = uv_layer.data[obj.data.polygons[0].loop_indices[0]].uv
-    v1 = obj.data.vertices[obj.data.polygons[0].vertices[1]].co
+    v1 = obj.data.vertices[obj.data.polygons[0].vertices[1]].co.copy()
     uv1 = uv_layer.data[obj.data.polygons[0].loop_indices[1]].uv
-    v2 = obj.data.vertices[obj.data.polygons[0].vertices[2]].co
+    v2 = obj.data.vertices[obj.data.polygons[0].vertices[2]].co.copy()
     uv2 = uv_layer.data[obj.data.polygons[0].loop_indices[2]].uv
-    v3 = obj.data.vertices[obj.data.polygons[0].vertices[3]].co
+    v3 = obj.data.vertices[obj.data.polygons[0].vertices[3]].co.copy()
     uv3 = uv_layer.data[obj.data.polygons[0].loop_indices[3]].uv
 
     #Now that we have verticies, we need to apply the *object's* loc/scale. We don't really care about it's rotation
@@ -210,10 +306,12 @@ def create_obj_from_forest_quad(in_tree_quad : TreeQuad, in_x_to_y_ratio : float
     #Normals (all the same)
     nx, ny, nz = 0, -1, 0
 
-    #Create xp_vertex instances using the constructor
-    bl = geometery_utils.xp_vertex(bl_loc_x, loc_y, bl_loc_z, nx, ny, nz, bl_uv_x, bl_uv_y)
-    br = geometery_utils.xp_vertex(br_loc_x, loc_y, br_loc_z, nx, ny, nz, br_uv_x, br_uv_y)
-    ur = geometery_utils.xp_vertex(ur_loc_x, loc_y, ur_loc_z, nx, ny, nz, ur_uv_x, ur_uv_y)
-    ul = geometery_utils.xp_vertex(ul_loc_x, loc_y, ul_loc_z, nx, ny, nz, ul_uv_x, ul_uv_y)
+    #Bottom left, bottom right, upper right, upper left
+    verts = vertex_utils.vertex_buffer.from_rows([
+        (bl_loc_x, loc_y, bl_loc_z, nx, ny, nz, bl_uv_x, bl_uv_y),
+        (br_loc_x, loc_y, br_loc_z, nx, ny, nz, br_uv_x, br_uv_y),
+        (ur_loc_x, loc_y, ur_loc_z, nx, ny, nz, ur_uv_x, ur_uv_y),
+        (ul_loc_x, loc_y, ul_loc_z, nx, ny, nz, ul_uv_x, ul_uv_y),
+    ])
 
-    return geometery_utils.create_obj_from_draw_call([bl, br, ur, ul], [0, 1, 3, 1, 2, 3], "Quad")
+    return geometery_utils.create_obj_from_draw_call(verts, [0, 1, 3, 1, 2, 3], "Quad")
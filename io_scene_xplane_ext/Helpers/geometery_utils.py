@@ -4,285 +4,398 @@
 #Module: geometry_utils.py
 #Purpose: Provide utility functions for converting between Blender objects and X-Plane vert/idx/tris format.
 
-import collections
 import math
 import bpy #type: ignore
 import bmesh #type: ignore
 import mathutils #type: ignore
-from . import misc_utils
+import numpy as np
+from . import perf_utils
+from . import vertex_utils
 
-#Simple container to hold an X-Plane Vertex
-class xp_vertex:
+def create_obj_from_draw_call(vertices, indicies, name):
     """
-    Simple class that contains all the data for a vertex in X-Plane.
+    Create a Blender mesh and object from an X-Plane draw call.
+    Args:
+        vertices (vertex_utils.vertex_buffer): The vertices.
+        indicies (list of int): List of indices to create faces with the vertices.
+        name (str): Name for the new object.
+    Returns:
+        bpy.types.Object: The created Blender object.
     """
-    loc_x = 0
-    loc_y = 0
-    loc_z = 0
+    mesh = create_mesh_from_triangles(name, vertices.positions, vertices.normals, vertices.uvs, indicies)
+
+    # Create an object with the mesh and link it to the scene
+    obj = bpy.data.objects.new(name, mesh)
+
+    return obj
 
-    normal_x = 0
-    normal_y = 0
-    normal_z = 0
+@perf_utils.timed("Get draw call from object")
+def get_draw_call_from_obj(obj, matrix=None, depsgraph=None):
+    """
+    Get the geometry from a Blender object as a vertex buffer and integer indices. Every triangle corner becomes it's own vertex.
+    Each triangle's vertices are stored last corner first, with the indices pointing back at them in corner order, so exports keep the vertex order they always had.
+    Args:
+        obj (bpy.types.Object): Blender object to extract geometry from.
+        matrix (mathutils.Matrix): Transform to apply to the geometry. Defaults to the object's world matrix.
+        depsgraph (bpy.types.Depsgraph): Depsgraph to evaluate the object with. Defaults to the current evaluated depsgraph.
+    Returns:
+        Tuple[vertex_utils.vertex_buffer, List[int]]:
+    """
+    positions, normals, uvs, tri_materials, weights = get_triangle_corner_arrays(obj, matrix, depsgraph)
 
-    uv_x = 0
-    uv_y = 0
+    order = get_reversed_corner_order(len(positions))
 
-    def __init__(self, loc_x, loc_y, loc_z, normal_x, normal_y, normal_z, uv_x, uv_y):
-        self.loc_x = loc_x
-        self.loc_y = loc_y
-        self.loc_z = loc_z
+    return vertex_utils.vertex_buffer.from_arrays(positions[order], normals[order], uvs[order]), order.tolist()
 
-        self.normal_x = normal_x
-        self.normal_y = normal_y
-        self.normal_z = normal_z
+def get_reversed_corner_order(corner_count):
+    """
+    Gets the order of triangle corners with each triangle's corners reversed, i.e. 2 1 0 5 4 3. Reversing is it's own inverse, so this is also the index of each corner in that order.
+    Args:
+        corner_count (int): The number of corners. A multiple of 3.
+    Returns:
+        np.ndarray: The reversed order.
+    """
+    return np.arange(corner_count, dtype=np.int64).reshape(-1, 3)[:, ::-1].ravel()
 
-        self.uv_x = uv_x
-        self.uv_y = uv_y
+def get_mesh_arrays(mesh):
+    """
+    Read the raw topology and per-corner data of a mesh into flat NumPy arrays using foreach_get.
+    Args:
+        mesh (bpy.types.Mesh): The mesh to read.
+    Returns:
+        dict: Dictionary of arrays. Keys are co, edge_verts, edge_sharp, loop_verts, loop_edges, poly_loop_start, poly_loop_total,
+              poly_material, poly_smooth, uvs (dict of layer name to array), and loop_normals (None unless the mesh has custom normals).
+    """
+    num_verts = len(mesh.vertices)
+    num_edges = len(mesh.edges)
+    num_loops = len(mesh.loops)
+    num_polys = len(mesh.polygons)
+
+    arrays = {}
+
+    arrays["co"] = np.empty(num_verts * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", arrays["co"])
+
+    arrays["edge_verts"] = np.empty(num_edges * 2, dtype=np.int32)
+    mesh.edges.foreach_get("vertices", arrays["edge_verts"])
+    arrays["edge_sharp"] = np.empty(num_edges, dtype=bool)
+    mesh.edges.foreach_get("use_edge_sharp", arrays["edge_sharp"])
+
+    arrays["loop_verts"] = np.empty(num_loops, dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", arrays["loop_verts"])
+    arrays["loop_edges"] = np.empty(num_loops, dtype=np.int32)
+    mesh.loops.foreach_get("edge_index", arrays["loop_edges"])
+
+    arrays["poly_loop_start"] = np.empty(num_polys, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", arrays["poly_loop_start"])
+    arrays["poly_loop_total"] = np.empty(num_polys, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", arrays["poly_loop_total"])
+    arrays["poly_material"] = np.empty(num_polys, dtype=np.int32)
+    mesh.polygons.foreach_get("material_index", arrays["poly_material"])
+    arrays["poly_smooth"] = np.empty(num_polys, dtype=bool)
+    mesh.polygons.foreach_get("use_smooth", arrays["poly_smooth"])
+
+    arrays["uvs"] = {}
+    for layer in mesh.uv_layers:
+        uvs = np.empty(num_loops * 2, dtype=np.float32)
+        layer.data.foreach_get("uv", uvs)
+        arrays["uvs"][layer.name] = uvs
+
+    #Custom normals are only carried over when the mesh actually has them, otherwise Blender recalculates them from the smooth/sharp flags
+    arrays["loop_normals"] = None
+    if mesh.has_custom_normals:
+        loop_normals = np.empty(num_loops * 3, dtype=np.float32)
+        if hasattr(mesh, "calc_normals_split"):
+            mesh.calc_normals_split()
+            mesh.loops.foreach_get("normal", loop_normals)
+        else:
+            mesh.corner_normals.foreach_get("vector", loop_normals)
+        arrays["loop_normals"] = loop_normals
 
-    def __eq__(self, other):
-        return self.loc_x == other.loc_x and self.loc_y == other.loc_y and self.loc_z == other.loc_z and self.normal_x == other.normal_x and self.normal_y == other.normal_y and self.normal_z == other.normal_z and self.uv_x == other.uv_x and self.uv_y == other.uv_y
+    return arrays
 
-def create_obj_from_draw_call(vertices, indicies, name):
+def create_mesh_from_arrays(name, co, loop_verts, poly_loop_total, edge_verts=None, loop_edges=None, edge_sharp=None, poly_smooth=None, poly_material=None, uvs=None, loop_normals=None):
     """
-    Create a Blender mesh and object from an X-Plane draw call.
+    Build a new Blender mesh directly from flat arrays using foreach_set. No bmesh, operators, or mode switches are involved.
     Args:
-        vertices (list of xp_vertex): List of xp_vertex objects representing the vertices.
-        indicies (list of int): List of indices to create faces with the vertices.
-        name (str): Name for the new object.
+        name (str): Name for the new mesh.
+        co (np.ndarray): Flat vertex coordinates (x, y, z per vertex).
+        loop_verts (np.ndarray): Vertex index of every face corner.
+        poly_loop_total (np.ndarray): Number of corners for each face.
+        edge_verts (np.ndarray): Optional flat edge vertex pairs. If not given, edges are calculated from the faces.
+        loop_edges (np.ndarray): Edge index of every face corner. Required if edge_verts is given.
+        edge_sharp (np.ndarray): Optional sharp flag for every edge.
+        poly_smooth (np.ndarray): Optional smooth flag for every face.
+        poly_material (np.ndarray): Optional material index for every face.
+        uvs (dict): Optional dictionary of UV layer name to flat per-corner UVs.
+        loop_normals (np.ndarray): Optional flat per-corner custom normals.
     Returns:
-        bpy.types.Object: The created Blender object.
+        bpy.types.Mesh: The new mesh.
     """
-    #Create a new bmesh
-    bm = bmesh.new()
+    mesh = bpy.data.meshes.new(name)
 
-    #Add all the vertices
-    for vertex in vertices:
-        v = bm.verts.new((vertex.loc_x, vertex.loc_y, vertex.loc_z))
-        v.normal = (vertex.normal_x, vertex.normal_y, vertex.normal_z)
+    num_loops = len(loop_verts)
+    num_polys = len(poly_loop_total)
 
+    mesh.vertices.add(len(co) // 3)
+    mesh.vertices.foreach_set("co", co)
 
-    # Update the bmesh to ensure the vertices are added
-    bm.verts.ensure_lookup_table()
+    if edge_verts is not None:
+        mesh.edges.add(len(edge_verts) // 2)
+        mesh.edges.foreach_set("vertices", edge_verts)
+        if edge_sharp is not None:
+            mesh.edges.foreach_set("use_edge_sharp", edge_sharp)
 
-    #Create a uv layer
-    uv_layer = bm.loops.layers.uv.new()
+    mesh.loops.add(num_loops)
+    mesh.loops.foreach_set("vertex_index", loop_verts)
+    if edge_verts is not None and loop_edges is not None:
+        mesh.loops.foreach_set("edge_index", loop_edges)
 
-    #Iterate through the indicies, 3 at a time, and create a face with the vertices at specified indicies
-    i = 0
+    loop_start = np.zeros(num_polys, dtype=np.int32)
+    if num_polys > 1:
+        np.cumsum(poly_loop_total[:-1], out=loop_start[1:])
 
-    while i < len(indicies) - 2:
-        #Get the vertices at the indicies
-        v1 = bm.verts[indicies[i]]
-        v2 = bm.verts[indicies[i + 1]]
-        v3 = bm.verts[indicies[i + 2]]
-        
-        # Create a new face with the vertices
-        face = bm.faces.new([v1, v2, v3])
+    mesh.polygons.add(num_polys)
+    mesh.polygons.foreach_set("loop_start", loop_start)
+    #loop_total is read-only (and derived from loop_start) in newer Blender versions
+    try:
+        mesh.polygons.foreach_set("loop_total", poly_loop_total)
+    except (AttributeError, TypeError, RuntimeError):
+        pass
+    if poly_smooth is not None:
+        mesh.polygons.foreach_set("use_smooth", poly_smooth)
+    if poly_material is not None:
+        mesh.polygons.foreach_set("material_index", poly_material)
 
-        #Assign the UV coordinates to the face
-        face.loops[0][uv_layer].uv = (vertices[indicies[i]].uv_x, vertices[indicies[i]].uv_y)
-        face.loops[1][uv_layer].uv = (vertices[indicies[i + 1]].uv_x, vertices[indicies[i + 1]].uv_y)
-        face.loops[2][uv_layer].uv = (vertices[indicies[i + 2]].uv_x, vertices[indicies[i + 2]].uv_y)
+    if uvs is not None:
+        for layer_name, layer_uvs in uvs.items():
+            layer = mesh.uv_layers.new(name=layer_name)
+            layer.data.foreach_set("uv", layer_uvs)
 
-        # Update the bmesh to ensure the face is added
-        bm.faces.ensure_lookup_table()
+    mesh.update(calc_edges=edge_verts is None)
 
-        i = i + 3
+    if loop_normals is not None:
+        mesh.normals_split_custom_set(np.asarray(loop_normals, dtype=np.float32).reshape(-1, 3))
+        if bpy.app.version < (4, 1, 0):
+            mesh.use_auto_smooth = True
 
-    # Finish up, write the bmesh back to the mesh
-    mesh = bpy.data.meshes.new(name)
-    bm.to_mesh(mesh)
-    bm.free()
-
-    # Set the custom normals
-    loop_normals = []
-    for i in range(0, len(indicies), 3):
-        nml1 = (vertices[indicies[i]].normal_x, vertices[indicies[i]].normal_y, vertices[indicies[i]].normal_z)
-        nml2 = (vertices[indicies[i + 1]].normal_x, vertices[indicies[i + 1]].normal_y, vertices[indicies[i + 1]].normal_z)
-        nml3 = (vertices[indicies[i + 2]].normal_x, vertices[indicies[i + 2]].normal_y, vertices[indicies[i + 2]].normal_z)
-        nml1 = mathutils.Vector(nml1).normalized()
-        nml2 = mathutils.Vector(nml2).normalized()
-        nml3 = mathutils.Vector(nml3).normalized()
-        loop_normals.append(nml1)
-        loop_normals.append(nml2)
-        loop_normals.append(nml3)
-
-    #Set the object to use smooth shading
-    for polygon in mesh.polygons:
-        polygon.use_smooth = True
-
-    mesh.normals_split_custom_set(loop_normals)
-    if bpy.app.version < (4, 1, 0):
-        mesh.use_auto_smooth = True  # Enable auto-smooth to use custom normals
+    return mesh
 
-    # Create an object with the mesh and link it to the scene
-    obj = bpy.data.objects.new(name, mesh)
+def create_mesh_from_triangles(name, co, normals, uvs, indicies):
+    """
+    Build a new smooth shaded Blender mesh from an indexed triangle list, like an X-Plane draw call.
+    Args:
+        name (str): Name for the new mesh.
+        co (np.ndarray): (V, 3) vertex positions.
+        normals (np.ndarray): (V, 3) vertex normals. These become custom normals on each face corner.
+        uvs (np.ndarray): (V, 2) vertex UVs.
+        indicies (list of int): Vertex indices, 3 per triangle.
+    Returns:
+        bpy.types.Mesh: The new mesh.
+    """
+    tris = np.asarray(indicies, dtype=np.int32)
+    tris = tris[:len(tris) // 3 * 3].reshape(-1, 3)
+
+    #Blender can't have a face use the same vertex twice, so degenerate triangles are dropped
+    tris = tris[(tris[:, 0] != tris[:, 1]) & (tris[:, 1] != tris[:, 2]) & (tris[:, 0] != tris[:, 2])]
+    loop_verts = tris.ravel()
+
+    loop_normals = np.asarray(normals, dtype=np.float32)[loop_verts]
+    lengths = np.linalg.norm(loop_normals, axis=1, keepdims=True)
+    loop_normals = np.divide(loop_normals, lengths, out=np.zeros_like(loop_normals), where=lengths > 0)
+
+    return create_mesh_from_arrays(
+        name,
+        np.asarray(co, dtype=np.float32).ravel(),
+        loop_verts,
+        np.full(len(tris), 3, dtype=np.int32),
+        poly_smooth=np.ones(len(tris), dtype=bool),
+        uvs={"UVMap": np.asarray(uvs, dtype=np.float32)[loop_verts].ravel()},
+        loop_normals=loop_normals
+    )
+
+def split_mesh_by_material(mesh, materials=None):
+    """
+    Partition the faces of a mesh by material index and build a separate mesh for each material in use.
+    Only the vertices and edges used by each partition are kept. UVs, smooth/sharp flags, and custom normals are preserved.
+    Args:
+        mesh (bpy.types.Mesh): The mesh to split.
+        materials (list of bpy.types.Material): The material shown for each material index, i.e. the materials of an object's slots, which differ from the mesh's for object linked slots. Defaults to the mesh's materials.
+    Returns:
+        list of Tuple[bpy.types.Material, bpy.types.Mesh]: The material and new single-material mesh for each material index in use.
+    """
+    if materials is None:
+        materials = list(mesh.materials)
+
+    arrays = get_mesh_arrays(mesh)
+
+    poly_material = arrays["poly_material"]
+    poly_loop_start = arrays["poly_loop_start"]
+    poly_loop_total = arrays["poly_loop_total"]
+    co = arrays["co"].reshape(-1, 3)
+    edge_verts = arrays["edge_verts"].reshape(-1, 2)
+
+    #Faces are not guaranteed to be stored in corner order, so we sort the faces by loop_start once and build the corner order (and the face of every corner) from that
+    poly_order = np.argsort(poly_loop_start, kind="stable").astype(np.int32)
+    sorted_totals = poly_loop_total[poly_order]
+    sorted_offsets = poly_loop_start[poly_order] - (np.cumsum(sorted_totals) - sorted_totals)
+    loop_order = np.arange(int(sorted_totals.sum()), dtype=np.int32) + np.repeat(sorted_offsets, sorted_totals)
+    loop_poly = np.repeat(poly_order, sorted_totals)
+
+    results = []
+
+    for mat_index in np.unique(poly_material):
+        part_polys = poly_order[poly_material[poly_order] == mat_index]
+        part_loops = loop_order[poly_material[loop_poly] == mat_index]
+
+        #Compact the used vertices and edges, and remap the corner indices to the new compacted ranges
+        used_verts, part_loop_verts = np.unique(arrays["loop_verts"][part_loops], return_inverse=True)
+        used_edges, part_loop_edges = np.unique(arrays["loop_edges"][part_loops], return_inverse=True)
+
+        vert_remap = np.full(len(co), -1, dtype=np.int32)
+        vert_remap[used_verts] = np.arange(len(used_verts), dtype=np.int32)
+        part_edge_verts = vert_remap[edge_verts[used_edges]]
+
+        part_uvs = {}
+        for layer_name, layer_uvs in arrays["uvs"].items():
+            part_uvs[layer_name] = layer_uvs.reshape(-1, 2)[part_loops].ravel()
+
+        part_normals = None
+        if arrays["loop_normals"] is not None:
+            part_normals = arrays["loop_normals"].reshape(-1, 3)[part_loops].ravel()
+
+        material = None
+        if 0 <= mat_index < len(materials):
+            material = materials[int(mat_index)]
+
+        part_name = mesh.name + "_" + (material.name if material is not None else str(mat_index))
+
+        part_mesh = create_mesh_from_arrays(
+            part_name,
+            co[used_verts].ravel(),
+            part_loop_verts.astype(np.int32),
+            poly_loop_total[part_polys],
+            edge_verts=part_edge_verts.ravel(),
+            loop_edges=part_loop_edges.astype(np.int32),
+            edge_sharp=arrays["edge_sharp"][used_edges],
+            poly_smooth=arrays["poly_smooth"][part_polys],
+            uvs=part_uvs,
+            loop_normals=part_normals
+        )
+        part_mesh.materials.append(material)
+
+        results.append((material, part_mesh))
+
+    return results
+
+def get_draw_call_arrays_from_obj(obj, matrix=None, depsgraph=None):
+    """
+    Get the triangulated geometry of a Blender object as NumPy arrays, without duplicating the object or calling any operators.
+    Modifiers are applied by reading the evaluated mesh from the depsgraph. Every triangle corner becomes it's own vertex.
+    Args:
+        obj (bpy.types.Object): Blender object to extract geometry from.
+        matrix (mathutils.Matrix): Transform to apply to the geometry. Defaults to the object's world matrix.
+        depsgraph (bpy.types.Depsgraph): Depsgraph to evaluate the object with. Defaults to the current evaluated depsgraph.
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: (vertices, indices, triangle material indices).
+            vertices is an (N, 8) array of loc x/y/z, normal x/y/z, uv x/y. indices is an (N,) array. triangle material indices is an (N / 3,) array.
+    """
+    positions, normals, uvs, tri_materials, weights = get_triangle_corner_arrays(obj, matrix, depsgraph)
 
-    return obj
+    vertices = np.hstack((positions, normals, uvs))
+    indices = np.arange(len(vertices), dtype=np.int64)
+
+    return vertices, indices, tri_materials
 
-def get_draw_call_from_obj(obj):
+def get_triangle_corner_arrays(obj, matrix=None, depsgraph=None, vertex_groups=()):
     """
-    Get the geometry from a Blender object and return it as a tuple of xp_vertexs and integer indices.
+    Read the position, normal, and UV of every triangle corner of a Blender object, from the evaluated mesh (so modifiers are applied).
     Args:
         obj (bpy.types.Object): Blender object to extract geometry from.
+        matrix (mathutils.Matrix): Transform to apply to the geometry. Defaults to the object's world matrix.
+        depsgraph (bpy.types.Depsgraph): Depsgraph to evaluate the object with. Defaults to the current evaluated depsgraph.
+        vertex_groups (list of bpy.types.VertexGroup): Vertex groups to read the weight of each corner from.
     Returns:
-        Tuple[List[xp_vertex], List[int]]:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]: (positions, normals, uvs, triangle material indices, weights).
+            positions and normals are (N, 3), uvs are (N, 2), triangle material indices are (N / 3,), weights are (N, len(vertex_groups)). Corners not in a group have a weight of 0.
     """
 
     # Ensure the object is a mesh
     if obj.type != 'MESH':
         raise TypeError("Object must be a mesh")
-    
-    #Define our output arrays
-    out_verts = []  #Array of xp_vertex
-    out_inds = []   #Ints
-
-    #Check if this object has modifiers. If it does, we'll duplicate it, and apply the modifiers to the duplicate.
-    did_duplicate = False
-    if len(obj.modifiers) > 0:
-        #Make sure we are in object mode before we duplicate and apply the modifiers
-        bpy.context.view_layer.objects.active = obj
-        if bpy.context.active_object.mode != "OBJECT":
-            bpy.ops.object.mode_set(mode="OBJECT")
 
-        obj = obj.copy()
-        obj.data = obj.data.copy()
-        bpy.context.collection.objects.link(obj)
-        bpy.context.view_layer.objects.active = obj
+    if depsgraph is None:
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+    if matrix is None:
+        matrix = obj.matrix_world
 
-        did_duplicate = True
-
-        for mod in obj.modifiers:
-            bpy.ops.object.modifier_apply(modifier=mod.name)
+    eval_obj = obj.evaluated_get(depsgraph)
+    mesh = eval_obj.to_mesh()
 
     try:
-        #Get our mesh data
-        mesh = obj.data
+        #Get the UV layer. Same rules as misc_utils.get_uv_layer, but on the evaluated mesh
+        uv_layer = mesh.uv_layers.active
+        if uv_layer is None and len(mesh.uv_layers) > 0:
+            uv_layer = mesh.uv_layers[0]
+        if uv_layer is None:
+            raise Exception(f"No UV layer could be found for object {obj.name}")
 
-        #Calculate split normals if this mesh has them. Not used in 4.1+ but this property wouldn't exist there soo it should be fine
+        #Calculate split normals if this mesh has them. Not used in 4.1+ (corner_normals is always available there)
         if hasattr(mesh, "calc_normals_split"):
             mesh.calc_normals_split()
-
-        #Triangulate the mesh and get the loop triangles
         mesh.calc_loop_triangles()
-        loop_triangles = mesh.loop_triangles
 
-        #Attempt to get the uv layer. We look for the first layer. 
-        uv_layer = misc_utils.get_uv_layer(obj)
+        num_tris = len(mesh.loop_triangles)
+        num_loops = len(mesh.loops)
 
-        if uv_layer is None:
-            raise Exception(f"No UV layer could be found for object {obj.name}")
+        tri_loops = np.empty(num_tris * 3, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("loops", tri_loops)
+        tri_materials = np.empty(num_tris, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("material_index", tri_materials)
 
-        #Define a temporary data structure to hold our triangle faces.
-        XPTriangle = collections.namedtuple(
-                        "XPTriangle",
-                        field_names=[
-                            "vertex_pos",  # Tuple[Tuple[float, float, float], Tuple[float, float, float], Tuple[float, float, float]] Tuple containing the positions for each vertex. Only used when smooth is true
-                            "vertex_nrm",  # Tuple[Tuple[float, float, float], Tuple[float, float, float], Tuple[float, float, float]] Tuple containing the normals for each vertex. Only used when smooth is true
-                            "uvs",  # type: Tuple[[float, float], [float, float], [float, float]]
-                        ],
-                    )
-        
-        #Define an array to hold our faces
-        xp_triangles = []
-
-        #TODO: We need to warn the user if this is Blender 4.1+ and they have an autosmooth modifier on the object, as this does not get applied to the normals
-
-        for tri in loop_triangles:
-
-            #Define our UV and normal data beforehand. The struct is immutable so we can't change it after the fact
-            xp_triangle_uvs = ((0, 0), (0, 0), (0, 0))
-            if uv_layer != None:
-                xp_triangle_uvs = (uv_layer.data[tri.loops[0]].uv, uv_layer.data[tri.loops[1]].uv, uv_layer.data[tri.loops[2]].uv)
-
-            xp_triangles_normals = (tri.split_normals[0], tri.split_normals[1], tri.split_normals[2])
-
-
-            #Define a temporary face with the data from the loop triangle. UVs default to none so we can add them IF we do have a uv layer
-            tmp_face = XPTriangle(
-                vertex_pos = (mesh.vertices[tri.vertices[0]].co, mesh.vertices[tri.vertices[1]].co, mesh.vertices[tri.vertices[2]].co),
-                vertex_nrm = xp_triangles_normals,
-                uvs = xp_triangle_uvs
-            )
-
-            #Append the face to the array
-            xp_triangles.append(tmp_face)
-
-        #Now that we have the faces stored, we need to actually turn them into vertices and indicies.
-        #This is a bit more complicated. We have to iterate through every face. Then we need to check if *any* of it's 3 vertices already exist - if they do, we will use the existing one instead
-        #Once we know the indicies of each vertex because it's either been added, or already exists, we can do the index output array, which would be in the order of last vertex, middle, first. 
-
-        for t in xp_triangles:
-            #Define vertices for each triangle. Then see if they exist, if they don't, add them.
-            v1 = xp_vertex(t.vertex_pos[0][0], t.vertex_pos[0][1], t.vertex_pos[0][2], t.vertex_nrm[0][0], t.vertex_nrm[0][1], t.vertex_nrm[0][2], t.uvs[0][0], t.uvs[0][1])
-            v2 = xp_vertex(t.vertex_pos[1][0], t.vertex_pos[1][1], t.vertex_pos[1][2], t.vertex_nrm[1][0], t.vertex_nrm[1][1], t.vertex_nrm[1][2], t.uvs[1][0], t.uvs[1][1])
-            v3 = xp_vertex(t.vertex_pos[2][0], t.vertex_pos[2][1], t.vertex_pos[2][2], t.vertex_nrm[2][0], t.vertex_nrm[2][1], t.vertex_nrm[2][2], t.uvs[2][0], t.uvs[2][1])
-
-            try_optomize = False
-
-            if try_optomize:
-                v1_index = misc_utils.linear_search_list(out_verts, v1)
-                v2_index = misc_utils.linear_search_list(out_verts, v2)
-                v3_index = misc_utils.linear_search_list(out_verts, v3)
-
-                if v1_index == -1:
-                    out_verts.append(v3)
-                    v1_index = len(out_verts) - 1
-                if v2_index == -1:
-                    out_verts.append(v2)
-                    v2_index = len(out_verts) - 1
-                if v3_index == -1:
-                    out_verts.append(v1)
-                    v3_index = len(out_verts) - 1
-            else:
-                out_verts.append(v3)
-                v1_index = len(out_verts) - 1
-                out_verts.append(v2)
-                v2_index = len(out_verts) - 1
-                out_verts.append(v1)
-                v3_index = len(out_verts) - 1
-
-            #Now finally we add the indicies! These are in the order v3, v2, v1
-            out_inds.append(v3_index)
-            out_inds.append(v2_index)
-            out_inds.append(v1_index)
-
-        #Now we need to get the transform matrix for the object
-        transform = obj.matrix_world
-
-        #Now we loop through the vertices and apply the transform to each one
-        for v in out_verts:
-            #Get the local position as a vector
-            local_position = mathutils.Vector((v.loc_x, v.loc_y, v.loc_z))
-            normal = mathutils.Vector((v.normal_x, v.normal_y, v.normal_z))
-
-            #Apply the full transformation
-            transformed_position = transform @ local_position
-
-            #Work to apply the transform to the normals
-            normal_matrix = obj.matrix_world.to_3x3().inverted().transposed()
-            transformed_normal = normal_matrix @ normal
-            transformed_normal.normalize()
-
-            #Set the new position and rotation
-            v.loc_x = transformed_position.x
-            v.loc_y = transformed_position.y
-            v.loc_z = transformed_position.z
-
-            #Set the new normal
-            v.normal_x = transformed_normal.x
-            v.normal_y = transformed_normal.y
-            v.normal_z = transformed_normal.z
-    except Exception as e:
-        raise e
+        co = np.empty(len(mesh.vertices) * 3, dtype=np.float64)
+        mesh.vertices.foreach_get("co", co)
+        loop_verts = np.empty(num_loops, dtype=np.int32)
+        mesh.loops.foreach_get("vertex_index", loop_verts)
 
+        loop_normals = np.empty(num_loops * 3, dtype=np.float64)
+        if hasattr(mesh, "calc_normals_split"):
+            mesh.loops.foreach_get("normal", loop_normals)
+        else:
+            mesh.corner_normals.foreach_get("vector", loop_normals)
+
+        loop_uvs = np.empty(num_loops * 2, dtype=np.float64)
+        uv_layer.data.foreach_get("uv", loop_uvs)
+
+        #Vertex group weights can't be read with foreach_get, so we walk each vertex's groups once
+        vertex_weights = np.zeros((len(mesh.vertices), len(vertex_groups)), dtype=np.float64)
+        if len(vertex_groups) > 0:
+            columns = {vg.index: i for i, vg in enumerate(vertex_groups)}
+            for vert in mesh.vertices:
+                for group in vert.groups:
+                    column = columns.get(group.group)
+                    if column is not None:
+                        vertex_weights[vert.index, column] = group.weight
     finally:
-        #If we made a duplicate object, delete it
-        if did_duplicate and obj != None:
-            bpy.data.objects.remove(obj, do_unlink=True)
-            obj = None
+        eval_obj.to_mesh_clear()
+
+    corner_verts = loop_verts[tri_loops]
+    positions = co.reshape(-1, 3)[corner_verts]
+    normals = loop_normals.reshape(-1, 3)[tri_loops]
+    uvs = loop_uvs.reshape(-1, 2)[tri_loops]
+    weights = vertex_weights[corner_verts]
+
+    #Apply the transform to the positions, and the inverse transpose to the normals
+    transform = np.array(matrix, dtype=np.float64)
+    normal_matrix = np.array(matrix.to_3x3().inverted_safe().transposed(), dtype=np.float64)
+
+    positions = positions @ transform[:3, :3].T + transform[:3, 3]
+    normals = normals @ normal_matrix.T
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    lengths[lengths == 0] = 1.0
+    normals = normals / lengths
 
-        return (out_verts, out_inds)
+    return positions, normals, uvs, tri_materials, weights
 
 def join_objects(objects, name):
     """
@@ -6,6 +6,7 @@
 
 import bpy # type: ignore
 import bmesh # type: ignore
+import numpy as np
 
 from ..Types import xp_lin # type: ignore
 from . import geometery_utils
@@ -14,7 +15,7 @@ from . import misc_utils
 
 class lin_vertex:
     """
-    Simple class to hold the vertex data for a line segment. TODO: Possibly refactor this to use xp_vertex
+    Simple class to hold the vertex data for a line segment. TODO: Possibly refactor this to use vertex_utils.vertex_buffer
     """
     def __init__(self):
         self.x = 0
@@ -24,24 +25,99 @@ class lin_vertex:
         self.v = 0
         self.uv_layer = 0
 
-def get_layer_z(in_object):
-     """
-     Gets the average Z of the object. This is used to determine the layer height.
+class layer_quad:
+    """
+    The world space positions and UVs of a line layer object, read in bulk. See get_layer_quad
+    """
+    def __init__(self):
+        self.corner_co = None   #(N, 3) world position of each face corner
+        self.corner_uvs = None  #(N, 2) UV of each face corner
+        self.z = 0.0    #Average world Z of the vertices
+
+def get_layer_quad(in_object, depsgraph=None):
+    """
+    Reads the vertices and UVs of a line layer object with foreach_get, without duplicating the object or triangulating it.
+
+    Args:
+        in_object (bpy.types.Object): The Blender object to read. Must have exactly 4 vertices and a UV layer.
+        depsgraph (bpy.types.Depsgraph): If given, and the object has modifiers, the evaluated mesh is read so modifiers are applied.
+
+    Returns:
+        layer_quad: The positions and UVs of the object.
+    """
+    #First, make sure this blender object has only 4 vertices
+    if len(in_object.data.vertices) != 4:
+        raise Exception(f"Error: Object {in_object.name} does not have 4 vertices!")
+
+    mesh_obj = in_object
+    if depsgraph is not None and len(in_object.modifiers) > 0:
+        mesh_obj = in_object.evaluated_get(depsgraph)
+    mesh = mesh_obj.data
+
+    #Attempt to get the uv layer. We look for the first layer. 
+    uv_layer = misc_utils.get_uv_layer(mesh_obj)
+
+    #If we have no uv layer, we can't get the layer
+    if uv_layer is None:
+        raise Exception(f"Error: No UV layer found on object {in_object.name}!")
+
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float64)
+    mesh.vertices.foreach_get("co", co)
+    co = co.reshape(-1, 3)
+
+    loop_verts = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_verts)
+
+    uvs = np.empty(len(mesh.loops) * 2, dtype=np.float64)
+    uv_layer.data.foreach_get("uv", uvs)
+
+    matrix = np.array(in_object.matrix_world, dtype=np.float64)
+    world_co = co @ matrix[:3, :3].T + matrix[:3, 3]
+
+    quad = layer_quad()
+    quad.corner_co = world_co[loop_verts]
+    quad.corner_uvs = uvs.reshape(-1, 2)
+    quad.z = float(world_co[:, 2].mean()) if len(world_co) > 0 else 0.0
+    return quad
+
+def get_layer_quads(in_objects):
+    """
+    Reads the vertices and UVs of all the layer objects of a line in one pass. See get_layer_quad
+
+    Args:
+        in_objects (list of bpy.types.Object): The layer objects.
+
+    Returns:
+        dict: Object name -> layer_quad
+    """
+    depsgraph = None
+    if any(len(obj.modifiers) > 0 for obj in in_objects):
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+
+    return {obj.name: get_layer_quad(obj, depsgraph) for obj in in_objects}
+
+def get_layer_z(in_object, quad=None):
+    """
+    Gets the average Z of the object. This is used to determine the layer height.
 
     Args:
         in_object (bpy.types.Object): The Blender object to calculate the average Z for.
+        quad (layer_quad): The already read quad of the object, if available.
 
     Returns:
         float: The average Z coordinate of the object's vertices in world space.
-     """
-     z_sum = 0
- 
-     for vert in in_object.data.vertices:
-         z_sum += (in_object.matrix_world @ vert.co).z
- 
-     return z_sum / len(in_object.data.vertices)
+    """
+    if quad is not None:
+        return quad.z
+
+    z_sum = 0
 
-def get_layer_from_segment_object(in_object, offset, type):
+    for vert in in_object.data.vertices:
+        z_sum += (in_object.matrix_world @ vert.co).z
+
+    return z_sum / len(in_object.data.vertices)
+
+def get_layer_from_segment_object(in_object, offset, type, quad=None):
     """
     Gets the layer from a segment object. This is used to determine the layer height.
 
@@ -49,69 +125,25 @@ def get_layer_from_segment_object(in_object, offset, type):
         in_object (bpy.types.Object): The Blender object to get the layer from.
         offset (float): The offset to apply to the layer. Use the index of this object in a list of objects, sorted off their Z position.
         type (str): The type of layer to get ("SEGMENT", "START", or "END"). Should come from PROP_lin_layer
+        quad (layer_quad): The already read quad of the object. If not given, it is read here.
 
     Returns:
         float: The layer height.
     """
+    if quad is None:
+        quad = get_layer_quad(in_object, bpy.context.evaluated_depsgraph_get() if len(in_object.modifiers) > 0 else None)
 
-    #First, make sure this blender object has only 4 vertices
-    if len(in_object.data.vertices) != 4:
-        raise Exception(f"Error: Object {in_object.name} does not have 4 vertices!")
-        return None
-
-    #Attempt to get the uv layer. We look for the first layer. 
-    uv_layer = misc_utils.get_uv_layer(in_object)
+    #Now, we need to find the edge vertices. These are the corners with the lowest/highest X and Y
+    def corner_to_vertex(corner_index):
+        vertex = lin_vertex()
+        vertex.x, vertex.y, vertex.z = quad.corner_co[corner_index].tolist()
+        vertex.u, vertex.v = quad.corner_uvs[corner_index].tolist()
+        return vertex
 
-    #If we have no uv layer, we will return None
-    if uv_layer is None:
-        raise Exception(f"Error: No UV layer found on object {in_object.name}!")
-        return None
-    
-    #Now, we need to find the edge vertices
-    verts, indicies = geometery_utils.get_draw_call_from_obj(in_object)
-
-    lowest_x = 1000
-    highest_x = -1000
-    lowest_y = 1000
-    highest_y = -1000
-
-    left_vertex = lin_vertex()
-    right_vertex = lin_vertex()
-    top_vertex = lin_vertex()
-    bottom_vertex = lin_vertex()
-
-    for i, vert in enumerate(verts):
-        if vert.loc_x < lowest_x * 1.01:
-            lowest_x = vert.loc_x
-            left_vertex.x = vert.loc_x
-            left_vertex.y = vert.loc_y
-            left_vertex.z = vert.loc_z
-            left_vertex.u = vert.uv_x
-            left_vertex.v = vert.uv_y
-
-        if vert.loc_x > highest_x * 1.01:
-            highest_x = vert.loc_x
-            right_vertex.x = vert.loc_x
-            right_vertex.y = vert.loc_y
-            right_vertex.z = vert.loc_z
-            right_vertex.u = vert.uv_x
-            right_vertex.v = vert.uv_y
-
-        if vert.loc_y < lowest_y * 1.01:
-            lowest_y = vert.loc_y
-            bottom_vertex.x = vert.loc_x
-            bottom_vertex.y = vert.loc_y
-            bottom_vertex.z = vert.loc_z
-            bottom_vertex.u = vert.uv_x
-            bottom_vertex.v = vert.uv_y
-
-        if vert.loc_y > highest_y * 1.01:
-            highest_y = vert.loc_y
-            top_vertex.x = vert.loc_x
-            top_vertex.y = vert.loc_y
-            top_vertex.z = vert.loc_z
-            top_vertex.u = vert.uv_x
-            top_vertex.v = vert.uv_y
+    left_vertex = corner_to_vertex(int(np.argmin(quad.corner_co[:, 0])))
+    right_vertex = corner_to_vertex(int(np.argmax(quad.corner_co[:, 0])))
+    bottom_vertex = corner_to_vertex(int(np.argmin(quad.corner_co[:, 1])))
+    top_vertex = corner_to_vertex(int(np.argmax(quad.corner_co[:, 1])))
 
     #Now, comes the hard part. We need to find the center coordinate.
     #S = X of UV. T = Y of UV. X = X of object. Y = Y of object.
@@ -161,38 +193,26 @@ def get_layer_from_segment_object(in_object, offset, type):
         cap.layer = offset
         return cap
 
-def get_scale_from_layer(in_object):
+def get_scale_from_layer(in_object, quad=None):
     """
     Gets the scale of the *texture* base on the scale of the object and it's UVs. I.e. if this object uses half the texture and is 1m wide, the scale will be 2m.
     Args:
         in_object (bpy.types.Object): The Blender object to get the scale from.
+        quad (layer_quad): The already read quad of the object. If not given, it is read here.
     Returns:
         tuple: (x_scale, y_scale) The scale of the layer in meters.
     """
+    if quad is None:
+        quad = get_layer_quad(in_object)
 
-    #First, make sure this blender object has only 4 vertices
-    if len(in_object.data.vertices) != 4:
-        raise Exception(f"Error: Object {in_object.name} does not have 4 vertices")
-    
     #Next, get the X size in meters of this object
     x_size = in_object.dimensions.x
     y_size = in_object.dimensions.y
 
-    #Now, get the UVs of this object. We will assume the UVs are square, so we will get the lowest X and highest X and store them
-    lowest_x = 1
-    highest_x = 0
-    lowest_y = 1
-    highest_y = 0
-
-    for uv in in_object.data.uv_layers.active.data:
-        if uv.uv.x < lowest_x:
-            lowest_x = uv.uv.x
-        if uv.uv.x > highest_x:
-            highest_x = uv.uv.x
-        if uv.uv.y < lowest_y:
-            lowest_y = uv.uv.y
-        if uv.uv.y > highest_y:
-            highest_y = uv.uv.y
+    #Now, get the UVs of this object. We will assume the UVs are square, so we will get the lowest X and highest X
+    lowest_x, lowest_y = quad.corner_uvs.min(axis=0).tolist()
+    highest_x, highest_y = quad.corner_uvs.max(axis=0).tolist()
+
     #Now that we have our edge UVs, and X, we can calculate the scale
     uv_width = abs(highest_x - lowest_x)
     actual_width = float(x_size) / uv_width
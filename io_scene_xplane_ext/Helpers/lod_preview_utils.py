@@ -0,0 +1,221 @@
+#Project:   Blender-X-Plane-Extensions
+#Author:    Connor Russell
+#Date:      10/18/2026
+#Module:    lod_preview_utils.py
+#Purpose:   Provide an index of the LOD ranges of every object so LOD distance previews can be updated live
+
+import bpy # type: ignore
+
+#Index of object name -> list of (near, far) ranges the object is visible in. Objects that have no LOD ranges are not in the index, and are never hidden or shown
+_lod_index = None
+
+#Object name -> whether the last preview made it visible. Used so we only touch objects whose visibility changes
+_last_visible = {}
+
+#What the index was built from, so depsgraph updates can be checked against it. Collection name -> (LOD ranges, names of it's objects) for every collection
+#a scene object is in, object name -> auto-split LOD ranges for every exportable auto-split object, and the number of objects in the scene
+_collection_state = {}
+_autosplit_state = {}
+_object_count = 0
+
+def mark_dirty():
+    """
+    Marks the LOD index as out of date. It will be rebuilt on the next preview
+    """
+    global _lod_index
+    _lod_index = None
+    _last_visible.clear()
+    _collection_state.clear()
+    _autosplit_state.clear()
+
+def get_collection_lod_ranges(col):
+    """
+    Gets the X-Plane2Blender LOD ranges of a collection
+    Args:
+        col (bpy.types.Collection): The collection.
+    Returns:
+        list of Tuple[float, float]: The (near, far) range of each LOD bucket.
+    """
+    return [(lod.near, lod.far) for lod in col.xplane.layer.lod]
+
+def get_autosplit_lod_ranges(obj):
+    """
+    Gets the LOD ranges of an auto-split AGP object
+    Args:
+        obj (bpy.types.Object): The auto-split object.
+    Returns:
+        list of Tuple[float, float]: The (near, far) range of each of the 4 LOD buckets.
+    """
+    return [
+        (obj.xp_agp.autosplit_lod_1_min, obj.xp_agp.autosplit_lod_1_max),
+        (obj.xp_agp.autosplit_lod_2_min, obj.xp_agp.autosplit_lod_2_max),
+        (obj.xp_agp.autosplit_lod_3_min, obj.xp_agp.autosplit_lod_3_max),
+        (obj.xp_agp.autosplit_lod_4_min, obj.xp_agp.autosplit_lod_4_max),
+    ]
+
+def is_autosplit_obj(obj):
+    return obj.xp_agp.type == 'AUTO_SPLIT_OBJ' and obj.xp_agp.exportable
+
+def get_autosplit_parent(obj, autosplit_parents=None):
+    """
+    Gets the outermost exportable auto-split AGP object an object is parented under
+    Args:
+        obj (bpy.types.Object): The object.
+        autosplit_parents (dict): Optional cache of object name -> result, shared between calls so each object is only resolved once.
+    Returns:
+        bpy.types.Object: The auto-split parent, or None if there isn't one.
+    """
+    if autosplit_parents is not None and obj.name in autosplit_parents:
+        return autosplit_parents[obj.name]
+
+    result = None
+    if obj.parent is not None:
+        result = get_autosplit_parent(obj.parent, autosplit_parents)
+        if result is None and is_autosplit_obj(obj.parent):
+            result = obj.parent
+
+    if autosplit_parents is not None:
+        autosplit_parents[obj.name] = result
+    return result
+
+def get_object_lod_ranges(obj, autosplit_parents=None, collection_ranges=None):
+    """
+    Gets the LOD ranges an object is visible in.
+    Objects in an auto-split AGP object use the ranges of their outermost auto-split parent, otherwise they use the ranges of their collection.
+    Args:
+        obj (bpy.types.Object): The object.
+        autosplit_parents (dict): Optional cache for get_autosplit_parent.
+        collection_ranges (dict): Optional cache of collection name -> LOD ranges.
+    Returns:
+        list of Tuple[float, float]: The (near, far) ranges. Empty if the object isn't in a LOD.
+    """
+    parent_col = obj.users_collection[0] if obj.users_collection else None
+    if parent_col is None:
+        return []
+
+    autosplit_parent = get_autosplit_parent(obj, autosplit_parents)
+    if autosplit_parent is not None:
+        bucket_ranges = get_autosplit_lod_ranges(autosplit_parent)
+    elif collection_ranges is not None:
+        if parent_col.name not in collection_ranges:
+            collection_ranges[parent_col.name] = get_collection_lod_ranges(parent_col)
+        bucket_ranges = collection_ranges[parent_col.name]
+    else:
+        bucket_ranges = get_collection_lod_ranges(parent_col)
+
+    lods = obj.xplane.lod
+    return [bucket_ranges[i] for i in range(min(len(bucket_ranges), 4)) if lods[i]]
+
+def get_collection_state(col):
+    return get_collection_lod_ranges(col), frozenset(obj.name for obj in col.objects)
+
+def build_lod_index(scene):
+    """
+    Builds the index of the LOD ranges every object in the scene is visible in, and records what it was built from for update_from_depsgraph.
+    Args:
+        scene (bpy.types.Scene): The scene to index.
+    Returns:
+        dict: Object name -> list of (near, far) ranges.
+    """
+    global _object_count
+
+    autosplit_parents = {}
+    collection_ranges = {}
+    index = {}
+
+    _collection_state.clear()
+    _autosplit_state.clear()
+    _object_count = len(scene.objects)
+
+    for obj in scene.objects:
+        for col in obj.users_collection:
+            if col.name not in _collection_state:
+                _collection_state[col.name] = get_collection_state(col)
+        if is_autosplit_obj(obj):
+            _autosplit_state[obj.name] = get_autosplit_lod_ranges(obj)
+
+        ranges = get_object_lod_ranges(obj, autosplit_parents, collection_ranges)
+        if len(ranges) > 0:
+            index[obj.name] = ranges
+
+    return index
+
+def update_from_depsgraph(scene, depsgraph):
+    """
+    Marks the LOD index as out of date if an update changed what it was built from: an object's LOD ranges, an auto-split object's ranges,
+    a collection's ranges or objects, or the number of objects in the scene. Selection, transform, and geometry updates leave it alone.
+    Args:
+        scene (bpy.types.Scene): The scene that was updated.
+        depsgraph (bpy.types.Depsgraph): The depsgraph of the update. None marks the index as out of date.
+    """
+    if _lod_index is None:
+        return
+
+    if depsgraph is None or len(scene.objects) != _object_count:
+        mark_dirty()
+        return
+
+    if not depsgraph.id_type_updated('OBJECT') and not depsgraph.id_type_updated('COLLECTION'):
+        return
+
+    for update in depsgraph.updates:
+        updated_id = update.id.original
+
+        if isinstance(updated_id, bpy.types.Object):
+            if get_object_lod_ranges(updated_id) != _lod_index.get(updated_id.name, []):
+                mark_dirty()
+                return
+            autosplit_ranges = get_autosplit_lod_ranges(updated_id) if is_autosplit_obj(updated_id) else None
+            if autosplit_ranges != _autosplit_state.get(updated_id.name):
+                mark_dirty()
+                return
+
+        elif isinstance(updated_id, bpy.types.Collection):
+            state = _collection_state.get(updated_id.name)
+            if state is None:
+                #Only matters if it now has objects, which weren't in it when the index was built
+                if len(updated_id.objects) > 0:
+                    mark_dirty()
+                    return
+            elif get_collection_state(updated_id) != state:
+                mark_dirty()
+                return
+
+def apply_lod_preview(scene, distance):
+    """
+    Shows objects that are visible at the given distance, and hides those that aren't. Only objects whose visibility changes are touched.
+    Args:
+        scene (bpy.types.Scene): The scene to preview.
+        distance (float): The distance to preview, in meters.
+    Returns:
+        int: The number of objects whose visibility was changed.
+    """
+    global _lod_index
+    if _lod_index is None:
+        _lod_index = build_lod_index(scene)
+
+    changed = 0
+    for name, ranges in _lod_index.items():
+        visible = False
+        for near, far in ranges:
+            if near <= distance <= far:
+                visible = True
+                break
+
+        if _last_visible.get(name) == visible:
+            continue
+
+        obj = scene.objects.get(name)
+        if obj is None:
+            continue
+
+        _last_visible[name] = visible
+        try:
+            if obj.hide_get() == visible:
+                obj.hide_set(not visible)
+                changed += 1
+        except RuntimeError:
+            #Object isn't in the view layer
+            pass
+
+    return changed
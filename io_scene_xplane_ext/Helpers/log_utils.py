@@ -6,6 +6,7 @@
 
 import bpy
 from datetime import datetime
+from . import perf_utils
 
 warning_count = 0
 error_count = 0
@@ -106,6 +107,58 @@ def new_section(name):
 
     log.write(msg)
 
+def get_messages_state():
+    """
+    Get everything logged to the log text block, and the pending warning/error counts and summaries. Used to send log messages from background export workers back to the main Blender instance.
+    Returns:
+        dict: The log text, warning count, error count, and summaries.
+    """
+    return {
+        "log": get_log_file().as_string(),
+        "warnings": warning_count,
+        "errors": error_count,
+        "summaries": list(summaries),
+    }
+
+def merge_messages_state(state):
+    """
+    Merge log messages from get_messages_state (i.e. from a background export worker) into this instance's log, so they are reported by display_messages.
+    Args:
+        state (dict): The state returned by get_messages_state.
+    """
+    global warning_count
+    global error_count
+    warning_count += state.get("warnings", 0)
+    error_count += state.get("errors", 0)
+    summaries.extend(state.get("summaries", []))
+
+    log_text = state.get("log", "")
+    if log_text != "":
+        get_log_file().write(log_text if log_text.endswith("\n") else log_text + "\n")
+
+def report_timings(save_trace=True):
+    """
+    Write the timing tree of the spans recorded by perf_utils to the log, and save them as a Chrome trace if a trace path is set. The spans are then cleared.
+    Args:
+        save_trace (bool): Whether to save the Chrome trace.
+    """
+    lines = perf_utils.get_timing_tree_lines()
+    if len(lines) == 0:
+        return
+
+    new_section("Timings")
+    for line in lines:
+        info(line)
+
+    if save_trace and perf_utils.trace_path != "":
+        try:
+            perf_utils.save_chrome_trace(perf_utils.trace_path)
+            info(f"Saved timing trace to {perf_utils.trace_path}")
+        except Exception as e:
+            warning(f"Could not save timing trace to {perf_utils.trace_path}: {e}")
+
+    perf_utils.clear()
+
 def display_messages():
     """
     Display a popup message in Blender if there are any warnings or errors logged.
@@ -114,6 +167,9 @@ def display_messages():
     global warning_count
     global error_count
     global summaries
+
+    report_timings()
+
     if warning_count > 0 or error_count > 0:
         message = f"{warning_count} warnings and {error_count} errors occured. Please check the \"X-Plane Extensions Log.txt\" in the text editor for details\n\n"
 
@@ -6,7 +6,10 @@
 
 import mathutils
 import math
+import sys
+import importlib.util
 import bpy
+from . import perf_utils
 
 def linear_search_list(in_list, search_value):
     """
@@ -186,4 +189,47 @@ def get_uv_layer(obj : bpy.types.Object):
             return layer
     except:
         pass
-    return None
\ No newline at end of file
+    return None
+
+class lazy_module:
+    """
+    Stands in for a module that is only imported the first time one of it's attributes is used, so heavy modules aren't loaded until they are needed.
+    """
+    def __init__(self, name, package=None):
+        """
+        Args:
+            name (str): The module name, may be relative (e.g. ".exporter").
+            package (str): The package relative names are resolved against, usually __package__ of the caller.
+        """
+        self._name = name
+        self._package = package
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            with perf_utils.span(f"Load module {self._name.lstrip('.')}"):
+                self._module = importlib.import_module(self._name, self._package)
+        return self._module
+
+    def __getattr__(self, attr):
+        #Only called for attributes not found on the stand in itself, so anything but the above goes to the real module
+        return getattr(self._load(), attr)
+
+    def is_loaded(self):
+        """
+        Gets whether the module has been imported, through this stand in or any other import of it.
+        Returns:
+            bool: True if the module is imported.
+        """
+        return importlib.util.resolve_name(self._name, self._package) in sys.modules
+
+def lazy_import(name, package=None):
+    """
+    Gets a stand in for a module that imports it the first time it is used. Use in place of an import for modules that are only needed when an operator runs.
+    Args:
+        name (str): The module name, may be relative (e.g. ".exporter").
+        package (str): The package relative names are resolved against, usually __package__ of the caller.
+    Returns:
+        lazy_module: The stand in.
+    """
+    return lazy_module(name, package)
@@ -0,0 +1,177 @@
+#Project:   Blender-X-Plane-Extensions
+#Author:    Connor Russell
+#Date:      10/18/2026
+#Module:    perf_utils.py
+#Purpose:   Provide nested timing spans for importers, exporters, and baking, reported as a timing tree in the log and optionally saved as a Chrome trace
+
+import os
+import json
+import time
+import threading
+import functools
+
+#Whether spans are recorded. When False, span() returns a shared no-op context, and timed() functions only pay for one global check
+enabled = False
+
+#Path to save a Chrome trace (chrome://tracing, Perfetto) to when the timing tree is reported. Empty to not save a trace
+trace_path = ""
+
+#Finished spans, as (name, start, end, depth, thread id). Start and end are perf_counter seconds
+_spans = []
+_spans_lock = threading.Lock()
+
+#Per thread depth of the currently open spans
+_local = threading.local()
+
+class _null_span:
+    """
+    Span used when timing is disabled. Does nothing.
+    """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+_NULL_SPAN = _null_span()
+
+class _span:
+    """
+    Records the time between entering and exiting it, and how deeply it is nested in other spans on the same thread.
+    """
+    __slots__ = ("name", "start", "depth")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.depth = getattr(_local, "depth", 0)
+        _local.depth = self.depth + 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end = time.perf_counter()
+        _local.depth = self.depth
+        with _spans_lock:
+            _spans.append((self.name, self.start, end, self.depth, threading.get_ident()))
+        return False
+
+def span(name):
+    """
+    Gets a context manager that times the code in it's with block, as a child of any span it is nested in.
+    Args:
+        name (str): Name shown in the timing tree and trace.
+    Returns:
+        A context manager.
+    """
+    if not enabled:
+        return _NULL_SPAN
+    return _span(name)
+
+def timed(name=None):
+    """
+    Decorator that times every call of a function as a span.
+    Args:
+        name (str): Name of the span. Defaults to the function's qualified name.
+    """
+    def decorator(func):
+        span_name = name if name is not None else func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            with _span(span_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+def set_enabled(do_enable, new_trace_path=""):
+    """
+    Turns span recording on or off. Recorded spans are discarded.
+    Args:
+        do_enable (bool): Whether to record spans.
+        new_trace_path (str): Path to save a Chrome trace to when reporting. Empty to not save one.
+    """
+    global enabled
+    global trace_path
+    enabled = do_enable
+    trace_path = new_trace_path
+    clear()
+
+def clear():
+    """
+    Discards all recorded spans.
+    """
+    with _spans_lock:
+        _spans.clear()
+
+def get_timing_tree_lines():
+    """
+    Builds the timing tree of the recorded spans. Spans with the same name and parent are merged, showing their call count and total time.
+    Returns:
+        list of str: One line per tree node, indented by depth.
+    """
+    with _spans_lock:
+        spans = list(_spans)
+
+    if len(spans) == 0:
+        return []
+
+    #Spans finish children first, so sort by start (and outermost first) to walk them parent first
+    spans.sort(key=lambda s: (s[4], s[1], s[3]))
+
+    #Each node is [total seconds, call count, children dict]. Keyed by name, so repeated calls merge
+    root = {}
+    stacks = {}     #Thread id -> list of (end time, children dict) of the open spans
+    for name, start, end, depth, thread_id in spans:
+        stack = stacks.setdefault(thread_id, [])
+        while len(stack) > 0 and (len(stack) > depth or stack[-1][0] < end):
+            stack.pop()
+
+        children = stack[-1][1] if len(stack) > 0 else root
+        node = children.setdefault(name, [0.0, 0, {}])
+        node[0] += end - start
+        node[1] += 1
+        stack.append((end, node[2]))
+
+    lines = []
+
+    def add_lines(children, indent):
+        for name, (seconds, count, grandchildren) in sorted(children.items(), key=lambda item: item[1][0], reverse=True):
+            count_text = f" x{count}" if count > 1 else ""
+            lines.append(f"{'    ' * indent}{name}{count_text}: {seconds * 1000:.1f}ms")
+            add_lines(grandchildren, indent + 1)
+
+    add_lines(root, 0)
+    return lines
+
+def save_chrome_trace(out_path):
+    """
+    Saves the recorded spans as a Chrome trace event JSON file.
+    Args:
+        out_path (str): The path to save the trace to.
+    """
+    with _spans_lock:
+        spans = list(_spans)
+
+    origin = min((s[1] for s in spans), default=0.0)
+    events = []
+    for name, start, end, depth, thread_id in spans:
+        events.append({
+            "name": name,
+            "ph": "X",
+            "ts": (start - origin) * 1000000,
+            "dur": (end - start) * 1000000,
+            "pid": os.getpid(),
+            "tid": thread_id,
+        })
+
+    folder = os.path.dirname(out_path)
+    if folder != "":
+        os.makedirs(folder, exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
@@ -0,0 +1,63 @@
+#Project:   Blender-X-Plane-Extensions
+#Author:    Connor Russell
+#Date:      10/19/2026
+#Module:    reader_utils.py
+#Purpose:   Stream the commands of X-Plane text formats with the Core tokenizer, reporting progress in Blender and logging skipped commands
+
+import bpy # type: ignore
+import os
+import threading
+from . import log_utils
+from ..Core import tokenizer
+
+#The tokenizer types, so readers only need this module
+command_table = tokenizer.command_table
+read_cancelled = tokenizer.read_cancelled
+
+#Files smaller than this don't show progress, they are read before the progress bar would even draw
+progress_min_bytes = 1024 * 1024
+
+#Set by request_cancel, cleared when a read starts so a request made while nothing was reading can't cancel a later import
+_cancel_event = threading.Event()
+
+def request_cancel():
+    """
+    Cancels the read in progress. The reader raises read_cancelled at it's next check. Does nothing if no read is in progress. Safe to call from any thread.
+    """
+    _cancel_event.set()
+
+def _get_window_manager():
+    try:
+        return bpy.context.window_manager
+    except AttributeError:
+        return None
+
+def read_commands(in_path, table, skip_comments=False):
+    """
+    Streams the commands of an X-Plane text file, one line at a time, so the whole file is never held in memory.
+    Empty lines are skipped, and commands without enough tokens (per table) are logged and skipped. Large files show progress in the window manager.
+    Args:
+        in_path (str): The path of the file to read.
+        table (command_table): The minimum token counts of the format.
+        skip_comments (bool): Whether to skip lines starting with #. Otherwise they are yielded like any other command.
+    Yields:
+        Tuple[str, list of str]: The stripped line, and it's tokens.
+    Raises:
+        read_cancelled: If request_cancel was called during the read.
+    """
+    _cancel_event.clear()
+
+    window_manager = None
+    if os.path.getsize(in_path) >= progress_min_bytes:
+        window_manager = _get_window_manager()
+
+    on_progress = None
+    if window_manager is not None:
+        window_manager.progress_begin(0, 100)
+        on_progress = lambda fraction: window_manager.progress_update(min(99, int(fraction * 100)))
+
+    try:
+        yield from tokenizer.read_commands(in_path, table, skip_comments, log_utils.warning, on_progress, _cancel_event.is_set)
+    finally:
+        if window_manager is not None:
+            window_manager.progress_end()
@@ -139,20 +139,21 @@ def TEST_get_roof_data():
 def TEST_draw_call_round_trip():
         """
         Test creating a mesh from a draw call, then getting the draw call from that mesh,
-        and comparing the outputted xp_vertex with the source ones.
+        and comparing the outputted vertex buffer with the source one.
         """
-        import mathutils
+        import numpy as np
         from ..Helpers import geometery_utils
+        from ..Helpers import vertex_utils
 
         result = "PASS"
 
         try:
             # Step 1: Define draw call data. We can only do a triangle because if when we get a draw call, we get triangles back, so the data would not match
-            vertices = [
-                geometery_utils.xp_vertex(-1.0, -1.0, -1.0, 0.1, 0.2, 0.3, 0.0, 0.0),
-                geometery_utils.xp_vertex(1.0, -1.0, -1.0, 0.4, 0.5, 0.6, 1.0, 0.0),
-                geometery_utils.xp_vertex(1.0, 1.0, -1.0, 0.7, 0.8, 0.9, 1.0, 1.0),
-            ]
+            vertices = vertex_utils.vertex_buffer.from_rows([
+                (-1.0, -1.0, -1.0, 0.1, 0.2, 0.3, 0.0, 0.0),
+                (1.0, -1.0, -1.0, 0.4, 0.5, 0.6, 1.0, 0.0),
+                (1.0, 1.0, -1.0, 0.7, 0.8, 0.9, 1.0, 1.0),
+            ])
             indices = [0, 1, 2]
 
             # Step 2: Create the mesh from the draw call
@@ -164,33 +165,35 @@ def TEST_draw_call_round_trip():
             # Step 3: Get the draw call from the created mesh
             round_tripped_vertices, round_tripped_indices = geometery_utils.get_draw_call_from_obj(obj)
 
-            # Step 4: Sort vertices for 1:1 comparison
-            original_sorted = sorted(vertices, key=lambda v: (v.loc_x, v.loc_y, v.loc_z, v.uv_x, v.uv_y))
-            round_tripped_sorted = sorted(round_tripped_vertices, key=lambda v: (v.loc_x, v.loc_y, v.loc_z, v.uv_x, v.uv_y))
+            # Step 4: Sort vertices for 1:1 comparison, by position then UV
+            def get_sorted_rows(buffer):
+                rows = buffer.get_rows()
+                return rows[np.lexsort((rows[:, 7], rows[:, 6], rows[:, 2], rows[:, 1], rows[:, 0]))]
 
-            # Ensure the number of vertices matches
-            if len(original_sorted) != len(round_tripped_sorted):
-                result = f"FAIL,Vertex count mismatch. Expected {len(original_sorted)}, got {len(round_tripped_sorted)}."
+            original_sorted = get_sorted_rows(vertices)
+            round_tripped_sorted = get_sorted_rows(round_tripped_vertices)
 
             # Compare each vertex within a tolerance
             tolerance = 0.000001
             normal_tolerance = 0.001
-            for orig_vert, rt_vert in zip(original_sorted, round_tripped_sorted):
-                if abs(orig_vert.loc_x - rt_vert.loc_x) > tolerance or \
-                   abs(orig_vert.loc_y - rt_vert.loc_y) > tolerance or \
-                   abs(orig_vert.loc_z - rt_vert.loc_z) > tolerance:
-                    result = f"FAIL,Vertex position mismatch. Expected {orig_vert.loc_x, orig_vert.loc_y, orig_vert.loc_z}, got {rt_vert.loc_x, rt_vert.loc_y, rt_vert.loc_z}."
-                    break
-                if abs(orig_vert.uv_x - rt_vert.uv_x) > tolerance or \
-                     abs(orig_vert.uv_y - rt_vert.uv_y) > tolerance:
-                      result = f"FAIL,Vertex UV mismatch. Expected {orig_vert.uv_x, orig_vert.uv_y}, got {rt_vert.uv_x, rt_vert.uv_y}."
-                      break
-                normalized_vert_normal = mathutils.Vector((orig_vert.normal_x, orig_vert.normal_y, orig_vert.normal_z)).normalized()
-                if abs(normalized_vert_normal[0] - rt_vert.normal_x) > normal_tolerance or \
-                     abs(normalized_vert_normal[1] - rt_vert.normal_y) > normal_tolerance or \
-                     abs(normalized_vert_normal[2] - rt_vert.normal_z) > normal_tolerance:
-                      result = f"FAIL,Vertex normal mismatch. Expected {normalized_vert_normal[0]} {normalized_vert_normal[1]} {normalized_vert_normal[2]} got {rt_vert.normal_x} {rt_vert.normal_y} {rt_vert.normal_z}."
-                      break
+            if len(original_sorted) != len(round_tripped_sorted):
+                result = f"FAIL,Vertex count mismatch. Expected {len(original_sorted)}, got {len(round_tripped_sorted)}."
+            else:
+                original_normals = original_sorted[:, 3:6] / np.linalg.norm(original_sorted[:, 3:6], axis=1, keepdims=True)
+                position_errors = np.abs(original_sorted[:, 0:3] - round_tripped_sorted[:, 0:3]).max(axis=1)
+                uv_errors = np.abs(original_sorted[:, 6:8] - round_tripped_sorted[:, 6:8]).max(axis=1)
+                normal_errors = np.abs(original_normals - round_tripped_sorted[:, 3:6]).max(axis=1)
+
+                for i in range(len(original_sorted)):
+                    if position_errors[i] > tolerance:
+                        result = f"FAIL,Vertex position mismatch. Expected {tuple(original_sorted[i, 0:3])}, got {tuple(round_tripped_sorted[i, 0:3])}."
+                        break
+                    if uv_errors[i] > tolerance:
+                        result = f"FAIL,Vertex UV mismatch. Expected {tuple(original_sorted[i, 6:8])}, got {tuple(round_tripped_sorted[i, 6:8])}."
+                        break
+                    if normal_errors[i] > normal_tolerance:
+                        result = f"FAIL,Vertex normal mismatch. Expected {original_normals[i]} got {round_tripped_sorted[i, 3:6]}."
+                        break
         except Exception as e:
             result = "FAIL,Exception: " + str(e)
         except:
@@ -345,6 +348,83 @@ def TEST_world_space_transform():
         result = "FAIL,Unknown error occurred."
     return result
 
+#----------------------------------------------------------------------------------
+# agp_utils.py tests
+#----------------------------------------------------------------------------------
+
+def TEST_perimeter_order():
+    """
+    Test that a closed perimeter starts at it's lowest Z then Y vertex, and goes along that vertex's first edge, on a quad whose vertex and edge
+    order don't follow the loop. The walk must be 2, 1, 0, 3, which make_winding_ccw then reverses.
+    """
+    from ..Helpers import agp_utils
+    result = "PASS"
+    obj = None
+    mesh = None
+    try:
+        mesh = bpy.data.meshes.new("TestPerimeterMesh")
+        mesh.from_pydata([(1, 1, 0), (0, 1, 0), (0, 0, 0), (1, 0, 0)], [(0, 1), (3, 0), (1, 2), (2, 3)], [])
+        mesh.update()
+        obj = bpy.data.objects.new("TestPerimeter", mesh)
+        bpy.context.scene.collection.objects.link(obj)
+
+        loops = agp_utils.get_perimeter_loops(obj)[0]
+        if len(loops) != 1 or loops[0] != ([2, 1, 0, 3], True):
+            result = f"FAIL,Expected one closed loop [2, 1, 0, 3], got {loops}"
+        else:
+            expected = [(1, 0), (1, 1), (0, 1), (0, 0)]
+            perimeter = [(round(co.x, 4), round(co.y, 4)) for co in agp_utils.get_perimeter_from_mesh(obj)]
+            if perimeter != expected:
+                result = f"FAIL,Expected perimeter {expected}, got {perimeter}"
+    except Exception as e:
+        result = "FAIL,Exception: " + str(e)
+    except:
+        result = "FAIL,Unknown error occurred."
+    finally:
+        if obj is not None:
+            bpy.data.objects.remove(obj, do_unlink=True)
+        if mesh is not None:
+            bpy.data.meshes.remove(mesh)
+    return result
+
+def TEST_dense_tile_grid():
+    """
+    Test that a densely subdivided BASE_TILE (positions 0.05 apart, UVs 0.01 apart, with float noise) is still recognized as a grid, with the same
+    tolerances the exporter uses, and that a grid with a missing or moved point is not.
+    """
+    import numpy as np
+    from ..Helpers import agp_utils
+    result = "PASS"
+    try:
+        rng = np.random.default_rng(0)
+
+        positions = np.linspace(0.0, 2.0, 41)
+        xs, ys = np.meshgrid(positions, positions)
+        xs = xs.ravel() + rng.uniform(-1e-5, 1e-5, xs.size)
+        ys = ys.ravel() + rng.uniform(-1e-5, 1e-5, ys.size)
+
+        uv_values = np.linspace(0.0, 1.0, 101)
+        us, vs = np.meshgrid(uv_values, uv_values)
+        us = us.ravel()
+        vs = vs.ravel()
+
+        moved_xs = xs.copy()
+        moved_xs[len(xs) // 2] += 0.025
+
+        if not agp_utils.is_grid(xs, ys, 0.1):
+            result = "FAIL,Densely subdivided positions were not recognized as a grid"
+        elif not agp_utils.is_grid(us, vs, 0.01):
+            result = "FAIL,Densely subdivided UVs were not recognized as a grid"
+        elif agp_utils.is_grid(xs[1:], ys[1:], 0.1):
+            result = "FAIL,A grid with a missing point was recognized as a grid"
+        elif agp_utils.is_grid(moved_xs, ys, 0.1):
+            result = "FAIL,A grid with a moved point was recognized as a grid"
+    except Exception as e:
+        result = "FAIL,Exception: " + str(e)
+    except:
+        result = "FAIL,Unknown error occurred."
+    return result
+
 #----------------------------------------------------------------------------------
 # Main function to run all tests
 #----------------------------------------------------------------------------------
@@ -369,12 +449,20 @@ def run_all_tests():
     result5 = TEST_world_space_transform()
     print(f"TEST_world_space_transform: {result5}")
 
+    result6 = TEST_perimeter_order()
+    print(f"TEST_perimeter_order: {result6}")
+
+    result7 = TEST_dense_tile_grid()
+    print(f"TEST_dense_tile_grid: {result7}")
+
     #Remove newlines
     result1 = result1.replace("\n", " | ")
     result2 = result2.replace("\n", " | ")
     result3 = result3.replace("\n", " | ")
     result4 = result4.replace("\n", " | ")
     result5 = result5.replace("\n", " | ")
+    result6 = result6.replace("\n", " | ")
+    result7 = result7.replace("\n", " | ")
 
     #Replace quotes with double quotes for CSV compatibility
     result1 = result1.replace("\"", "\"\"")
@@ -382,6 +470,8 @@ def run_all_tests():
     result3 = result3.replace("\"", "\"\"")
     result4 = result4.replace("\"", "\"\"")
     result5 = result5.replace("\"", "\"\"")
+    result6 = result6.replace("\"", "\"\"")
+    result7 = result7.replace("\"", "\"\"")
 
     test_results_file = file_utils.to_absolute("../Test Results.csv")
     with open(test_results_file, 'a') as output:
@@ -390,4 +480,6 @@ def run_all_tests():
         output.write(f"TEST_keyframing,\"{result3}\"\n")
         output.write(f"TEST_get_draw_call_from_obj,\"{result4}\"\n")
         output.write(f"TEST_world_space_transform,\"{result5}\"\n")
+        output.write(f"TEST_perimeter_order,\"{result6}\"\n")
+        output.write(f"TEST_dense_tile_grid,\"{result7}\"\n")
 
@@ -0,0 +1,257 @@
+#Project: Blender-X-Plane-Extensions
+#Author: Connor Russell
+#Date: 10/19/2026
+#Module: vertex_utils.py
+#Purpose: Provide vertex_buffer, a structure of arrays container for X-Plane vertices used in place of lists of per vertex objects. Does not depend on bpy
+
+import numpy as np
+
+#Axis remaps for vertex_buffer.remap_axes, as (order, signs). X-Plane is Y up, Blender is Z up.
+#OBJs and facades mirror an axis (Blender y = -X-Plane z), forests just swap Y and Z
+obj_xplane_to_blender = ((0, 2, 1), (1, -1, 1))
+obj_blender_to_xplane = ((0, 2, 1), (1, 1, -1))
+for_axes_swap = ((0, 2, 1), (1, 1, 1))
+
+#Number of floats in a vertex row without and with wind weights
+row_length = 8
+wind_row_length = 11
+
+class vertex_buffer:
+    """
+    A list of X-Plane vertices, stored as one NumPy column block per attribute: positions (N, 3), normals (N, 3), UVs (N, 2), and optionally
+    forest wind weights (N, 3) of stiffness, edge stiffness, and phase. Values are float64, so numbers read from a file are written back unchanged.
+    Rows are vertices in the same order as the file's VT/VERTEX commands: loc x/y/z, normal x/y/z, uv x/y, then the wind weights.
+    """
+    __slots__ = ("_positions", "_normals", "_uvs", "_wind", "_count")
+
+    def __init__(self, has_wind=False, capacity=0):
+        """
+        Args:
+            has_wind (bool): Whether the vertices have forest wind weights.
+            capacity (int): Number of vertices to allocate room for up front.
+        """
+        self._positions = np.zeros((capacity, 3))
+        self._normals = np.zeros((capacity, 3))
+        self._uvs = np.zeros((capacity, 2))
+        self._wind = np.zeros((capacity, 3)) if has_wind else None
+        self._count = 0
+
+    @classmethod
+    def from_arrays(cls, positions, normals, uvs, wind=None):
+        """
+        Creates a buffer from per attribute arrays. The arrays are copied.
+        Args:
+            positions (array-like): (N, 3) positions.
+            normals (array-like): (N, 3) normals.
+            uvs (array-like): (N, 2) UVs.
+            wind (array-like): Optional (N, 3) stiffness, edge stiffness, and phase.
+        Returns:
+            vertex_buffer: The new buffer.
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        buffer = cls(wind is not None, len(positions))
+        buffer._positions[:] = positions
+        buffer._normals[:] = np.asarray(normals, dtype=np.float64).reshape(-1, 3)
+        buffer._uvs[:] = np.asarray(uvs, dtype=np.float64).reshape(-1, 2)
+        if wind is not None:
+            buffer._wind[:] = np.asarray(wind, dtype=np.float64).reshape(-1, 3)
+        buffer._count = len(positions)
+        return buffer
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Creates a buffer from vertex rows.
+        Args:
+            rows (array-like): (N, 8) rows, or (N, 11) rows with wind weights.
+        Returns:
+            vertex_buffer: The new buffer.
+        """
+        rows = np.asarray(rows, dtype=np.float64)
+        if rows.size == 0:
+            return cls(rows.ndim == 2 and rows.shape[1] == wind_row_length)
+        if rows.ndim != 2 or rows.shape[1] not in (row_length, wind_row_length):
+            raise ValueError(f"Vertex rows must have {row_length} or {wind_row_length} columns, got shape {rows.shape}")
+        wind = rows[:, 8:11] if rows.shape[1] == wind_row_length else None
+        return cls.from_arrays(rows[:, 0:3], rows[:, 3:6], rows[:, 6:8], wind)
+
+    @property
+    def has_wind(self):
+        return self._wind is not None
+
+    @property
+    def positions(self):
+        """(N, 3) view of the positions. Writing to it changes the buffer."""
+        return self._positions[:self._count]
+
+    @property
+    def normals(self):
+        """(N, 3) view of the normals. Writing to it changes the buffer."""
+        return self._normals[:self._count]
+
+    @property
+    def uvs(self):
+        """(N, 2) view of the UVs. Writing to it changes the buffer."""
+        return self._uvs[:self._count]
+
+    @property
+    def wind(self):
+        """(N, 3) view of the stiffness, edge stiffness, and phase, or None if the buffer has no wind weights."""
+        return self._wind[:self._count] if self._wind is not None else None
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, key):
+        """
+        Args:
+            key (int, slice, or array-like): A vertex index, or the vertices to take.
+        Returns:
+            tuple of float for an int (the vertex's row), otherwise a new vertex_buffer of the selected vertices.
+        """
+        if isinstance(key, (int, np.integer)):
+            if key < 0:
+                key += self._count
+            if key < 0 or key >= self._count:
+                raise IndexError(f"Vertex index {key} out of range for {self._count} vertices")
+            return tuple(self.get_rows(key, key + 1)[0].tolist())
+        if isinstance(key, slice):
+            key = np.arange(self._count)[key]
+        return self.take(key)
+
+    def take(self, indices):
+        """
+        Gets the given vertices, in the given order, as a new buffer.
+        Args:
+            indices (array-like): Vertex indices. May repeat.
+        Returns:
+            vertex_buffer: The selected vertices.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        if len(indices) > 0 and (indices.min() < -self._count or indices.max() >= self._count):
+            raise IndexError(f"Vertex index out of range for {self._count} vertices")
+        return vertex_buffer.from_arrays(self.positions[indices], self.normals[indices], self.uvs[indices], self.wind[indices] if self.has_wind else None)
+
+    def copy(self):
+        return self.take(np.arange(self._count))
+
+    def _reserve(self, count):
+        """
+        Grows the arrays so they can hold count vertices. Capacity doubles, so appending one vertex at a time is amortized constant time.
+        """
+        capacity = len(self._positions)
+        if count <= capacity:
+            return
+        capacity = max(count, capacity * 2, 64)
+        for name in ("_positions", "_normals", "_uvs", "_wind"):
+            old = getattr(self, name)
+            if old is None:
+                continue
+            new = np.zeros((capacity, old.shape[1]))
+            new[:self._count] = old[:self._count]
+            setattr(self, name, new)
+
+    def append(self, row):
+        """
+        Adds a vertex.
+        Args:
+            row (sequence of float): loc x/y/z, normal x/y/z, uv x/y, and for buffers with wind weights, optionally stiffness, edge stiffness, and phase (0 if left out).
+        """
+        if len(row) < row_length:
+            raise ValueError(f"Vertex rows need at least {row_length} values, got {len(row)}")
+        i = self._count
+        self._reserve(i + 1)
+        self._positions[i] = row[0:3]
+        self._normals[i] = row[3:6]
+        self._uvs[i] = row[6:8]
+        if self._wind is not None:
+            self._wind[i] = row[8:11] if len(row) >= wind_row_length else 0
+        self._count = i + 1
+
+    def extend(self, other):
+        """
+        Adds every vertex of another buffer. Wind weights the other buffer doesn't have are 0.
+        Args:
+            other (vertex_buffer): The vertices to add.
+        """
+        start = self._count
+        end = start + len(other)
+        self._reserve(end)
+        self._positions[start:end] = other.positions
+        self._normals[start:end] = other.normals
+        self._uvs[start:end] = other.uvs
+        if self._wind is not None:
+            self._wind[start:end] = other.wind if other.has_wind else 0
+        self._count = end
+
+    def get_rows(self, start=0, end=None):
+        """
+        Gets the vertices as rows.
+        Args:
+            start (int): First vertex.
+            end (int): One past the last vertex. Defaults to the end of the buffer.
+        Returns:
+            np.ndarray: (N, 8) rows, or (N, 11) if the buffer has wind weights.
+        """
+        end = self._count if end is None else min(end, self._count)
+        columns = [self._positions[start:end], self._normals[start:end], self._uvs[start:end]]
+        if self._wind is not None:
+            columns.append(self._wind[start:end])
+        return np.hstack(columns)
+
+    def transform(self, matrix, normalize_normals=True):
+        """
+        Transforms the vertices in place. Positions get the full matrix, normals get the inverse transpose of it's 3x3 part.
+        Args:
+            matrix (array-like): 4x4 transform, i.e. a mathutils.Matrix.
+            normalize_normals (bool): Whether to normalize the normals afterwards. Zero length normals are left as is.
+        """
+        matrix = np.array(matrix, dtype=np.float64).reshape(4, 4)
+        rotation = matrix[:3, :3]
+        positions = self.positions
+        normals = self.normals
+        positions[:] = positions @ rotation.T + matrix[:3, 3]
+
+        try:
+            normal_matrix = np.linalg.inv(rotation).T
+        except np.linalg.LinAlgError:
+            normal_matrix = np.linalg.pinv(rotation).T
+        normals[:] = normals @ normal_matrix.T
+
+        if normalize_normals:
+            lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+            np.divide(normals, lengths, out=normals, where=lengths > 0)
+
+    def remap_axes(self, order, signs):
+        """
+        Reorders and flips the axes of the positions and normals in place, i.e. to go between X-Plane and Blender axes (see obj_xplane_to_blender).
+        Args:
+            order (sequence of int): For each output axis, the input axis it comes from.
+            signs (sequence of float): Multiplier of each output axis, applied after reordering.
+        """
+        order = list(order)
+        signs = np.asarray(signs, dtype=np.float64)
+        positions = self.positions
+        normals = self.normals
+        positions[:] = positions[:, order] * signs
+        normals[:] = normals[:, order] * signs
+
+    def get_lines(self, command, axes=None, precision=8):
+        """
+        Formats the vertices as X-Plane vertex commands. The buffer is not changed.
+        Args:
+            command (str): The command of each line, i.e. VT or VERTEX.
+            axes (Tuple): Optional (order, signs) to remap the positions and normals with first, i.e. obj_blender_to_xplane.
+            precision (int): Decimal places of each value.
+        Returns:
+            list of str: One line (without a newline) per vertex.
+        """
+        rows = self.get_rows()
+        if axes is not None:
+            order = list(axes[0])
+            signs = np.asarray(axes[1], dtype=np.float64)
+            rows[:, 0:3] = rows[:, order] * signs
+            rows[:, 3:6] = rows[:, [i + 3 for i in order]] * signs
+
+        line_format = command + (f" {{:.{precision}f}}" * rows.shape[1])
+        return [line_format.format(*row) for row in rows.tolist()]
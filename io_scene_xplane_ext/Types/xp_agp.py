@@ -5,11 +5,16 @@
 #Purpose:   Provide classes that abstracts the X-Plane AGP format
 
 from ..Helpers import agp_utils
+from ..Helpers import geometery_utils
 from ..Helpers import file_utils
 from ..Helpers import decal_utils
 from ..Helpers import misc_utils
 from ..Helpers import log_utils
+from ..Helpers import perf_utils
+from ..Helpers import reader_utils
+from ..Core import formats
 from .. import material_config
+from . import xp_obj
 
 from ..Helpers.misc_utils import ftos
 
@@ -19,6 +24,8 @@ import mathutils
 import bpy
 import bmesh
 import traceback
+import concurrent.futures
+import numpy as np
 
 class crop_polygon:
     """
@@ -508,6 +515,180 @@ class auto_split_obj:
         self.show_low = 0
         self.show_high = 0
 
+    def get_part_paths(self, obj, agp_name, mat):
+        """
+        Gets the output path of the part of the auto-split object for the given material
+        Returns a tuple of the absolute path of the part .obj, and the path of the part .obj relative to the .agp
+        """
+        #Get the name for the object. This is made by combining the agp name, the relative folder from the specified name (if included), _PT_, the specified name (without the folder), the material, and .obj
+        #Then we need to get that path *relative* to the .agp so that the .agp can reference it properly
+        obj_name = ""
+        insert_name = obj.xp_agp.autosplit_obj_name if obj.xp_agp.autosplit_obj_name != "" else obj.name
+        insert_name = insert_name.replace("\\", "/")  # Normalize slashes
+        adjusted_mat_name = insert_name.replace("/", "-")  # Remove slashes from material name
+        adjusted_mat_name = insert_name.replace("\\", "-")  # Remove slashes from material name
+        #Separate the part of the name that specifies a relative dir, and the part that specifies the name. We'll just split at the last /
+        insert_name_folder = insert_name.rsplit("/", 1)[0] if "/" in insert_name else ""
+        insert_name_filename = insert_name.rsplit("/", 1)[-1] if "/" in insert_name else insert_name
+        if len(insert_name_folder) > 0:
+            insert_name_folder += "/"
+
+        #First get the sanitized name, then make it relative to the .agp
+        obj_name = os.path.splitext(os.path.basename(agp_name))[0] + "_PT_" + file_utils.sanitize_path(insert_name + "_" + mat + ".obj")
+        obj_name = obj_name.replace(" ", "_")  # Replace spaces with underscores
+        obj_name = os.path.dirname(file_utils.to_absolute(agp_name)) + "/" + insert_name_folder + obj_name
+
+        agp_path = file_utils.to_absolute(agp_name)
+        obj_path = file_utils.to_absolute(obj_name)
+        obj_rel_to_agp_path = file_utils.to_relative(obj_path, False, os.path.dirname(agp_path))
+
+        return obj_name, obj_rel_to_agp_path
+
+    def get_lod_ranges(self, obj):
+        """
+        Returns the list of (near, far) LOD ranges for the auto-split object. A single (0, 0) range means no LODs
+        """
+        all_ranges = [
+            (obj.xp_agp.autosplit_lod_1_min, obj.xp_agp.autosplit_lod_1_max),
+            (obj.xp_agp.autosplit_lod_2_min, obj.xp_agp.autosplit_lod_2_max),
+            (obj.xp_agp.autosplit_lod_3_min, obj.xp_agp.autosplit_lod_3_max),
+            (obj.xp_agp.autosplit_lod_4_min, obj.xp_agp.autosplit_lod_4_max),
+        ]
+
+        if obj.xp_agp.autosplit_lod_count == 0:
+            return [(0, 0)]
+
+        return [(int(near), int(far)) for near, far in all_ranges[:obj.xp_agp.autosplit_lod_count]]
+
+    def export_native(self, obj, agp_name):
+        """
+        Exports the parts of the auto-split object with the built in OBJ8 writer instead of X-Plane2Blender.
+        Geometry is extracted from the evaluated meshes and bucketed by material and LOD directly, so no objects are duplicated and no collection export states are touched.
+        The part files are written in parallel.
+        Only static geometry and named lights are supported. If anything else is found, nothing is written and False is returned so the caller can fall back to X-Plane2Blender.
+        Returns:
+            bool: True if the parts were exported, False if the object needs to be exported with X-Plane2Blender
+        """
+        lod_ranges = self.get_lod_ranges(obj)
+
+        #X-Plane2Blender exported with the root at 0,0,0 with no rotation, but with it's scale, so we build the same transform here
+        root_basis = mathutils.Matrix.LocRotScale(None, None, obj.scale)
+        if obj.parent is not None:
+            root_zeroed = obj.parent.matrix_world @ obj.matrix_parent_inverse @ root_basis
+        else:
+            root_zeroed = root_basis
+        root_transform = root_zeroed @ obj.matrix_world.inverted_safe()
+
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+
+        #Material name -> (material, list of (vertices, lod ranges), list of (light name, location, lod ranges))
+        parts = {}
+
+        def get_part(mat_name, material):
+            if mat_name not in parts:
+                parts[mat_name] = (material, [], [])
+            return parts[mat_name]
+
+        def get_object_lod_ranges(cur_obj):
+            #Objects use the LODs of the first object up their parent chain that overrides LODs. If none do, they are in all LODs
+            while cur_obj is not None and cur_obj != obj:
+                if cur_obj.xplane.override_lods:
+                    return [lod_ranges[i] for i in range(len(lod_ranges)) if cur_obj.xplane.lod[i]]
+                cur_obj = cur_obj.parent
+            return lod_ranges
+
+        def collect(cur_obj):
+            is_visible = not cur_obj.hide_get() and not cur_obj.hide_select
+
+            if is_visible and cur_obj.type in ('MESH', 'LIGHT'):
+                if len(cur_obj.xplane.datarefs) > 0 or cur_obj.xplane.manip.enabled:
+                    log_utils.info(f"Object {cur_obj.name} in auto-split object {obj.name} is animated or has a manipulator. Exporting with X-Plane2Blender.")
+                    return False
+
+            if is_visible and cur_obj.type == 'MESH':
+                if len(cur_obj.data.materials) == 0:
+                    raise Exception(f"Object {cur_obj.name} has no materials assigned. X-Plane2Blender would throw an error on export! Skipping export of autosplit object {obj.name}")
+
+                vertices, indices, tri_materials = geometery_utils.get_draw_call_arrays_from_obj(cur_obj, root_transform @ cur_obj.matrix_world, depsgraph)
+                obj_lod_ranges = get_object_lod_ranges(cur_obj)
+
+                for mat_index in np.unique(tri_materials):
+                    material = cur_obj.material_slots[mat_index].material if mat_index < len(cur_obj.material_slots) else None
+                    if material is None:
+                        raise Exception(f"Object {cur_obj.name} has no active material assigned. X-Plane2Blender would throw an error on export!")
+
+                    reason = xp_obj.object.get_unsupported_material_reason(material)
+                    if reason != "":
+                        log_utils.info(f"Material {material.name} in auto-split object {obj.name} uses {reason}. Exporting with X-Plane2Blender.")
+                        return False
+
+                    corner_mask = np.repeat(tri_materials == mat_index, 3)
+                    get_part(material.name, material)[1].append((vertices[corner_mask], obj_lod_ranges))
+
+            elif is_visible and cur_obj.type == 'LIGHT':
+                light_props = cur_obj.data.xplane
+                if light_props.type not in ('automatic', 'named') or light_props.name == "" or light_props.params.strip() != "":
+                    log_utils.info(f"Light {cur_obj.name} in auto-split object {obj.name} is not a named light. Exporting with X-Plane2Blender.")
+                    return False
+
+                location = (root_transform @ cur_obj.matrix_world).translation
+                get_part("Lights", None)[2].append((light_props.name, (location.x, location.y, location.z), get_object_lod_ranges(cur_obj)))
+
+            for child in cur_obj.children:
+                if not collect(child):
+                    return False
+            return True
+
+        for child in obj.children:
+            if not collect(child):
+                return False
+
+        #Fake LODs are a fixed size quad below the object in every LOD, so X-Plane calculates the same LOD distances for every part
+        fake_lod_vertices = None
+        if obj.xp_agp.autosplit_do_fake_lods and lod_ranges != [(0, 0)]:
+            size = obj.xp_agp.autosplit_fake_lods_size / 2
+            corners = np.array([
+                (-size, -size, -size * 2, 0, 0, 1, 0, 0),
+                (-size, size, -size * 2, 0, 0, 1, 0, 0),
+                (size, -size, -size * 2, 0, 0, 1, 0, 0),
+                (size, size, -size * 2, 0, 0, 1, 0, 0),
+            ], dtype=np.float64)
+            fake_lod_vertices = corners[[1, 2, 0, 1, 3, 2]]
+
+        #Build all the parts on this thread, as it reads Blender data. Formatting and writing don't, so those happen in parallel
+        outputs = []
+        for mat_name, (material, geometry, lights) in parts.items():
+            obj_path, obj_rel_to_agp_path = self.get_part_paths(obj, agp_name, mat_name)
+
+            part = xp_obj.object()
+            part.name = os.path.basename(obj_path)
+            if material is not None:
+                part.from_material(material, os.path.dirname(obj_path))
+
+            for vertices, obj_lod_ranges in geometry:
+                part.add_static_geometry(vertices, obj_lod_ranges)
+            for light_name, location, obj_lod_ranges in lights:
+                part.add_named_light(light_name, location, obj_lod_ranges)
+            if fake_lod_vertices is not None:
+                part.add_static_geometry(fake_lod_vertices, lod_ranges)
+
+            self.resources.append(obj_rel_to_agp_path)
+            outputs.append((part, obj_path))
+
+        #Workers can't use bpy, so the backup preference is read here
+        do_backup = file_utils.get_do_backup_on_overwrite()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(len(outputs), os.cpu_count() or 1))) as pool:
+            futures = [(obj_path, pool.submit(part.write, obj_path, do_backup)) for part, obj_path in outputs]
+
+        file_utils.log_backups()
+
+        for obj_path, future in futures:
+            #Re-raises any error from the worker, on this thread, so it gets logged by the caller
+            future.result()
+            log_utils.info(f"Wrote auto-split part {obj_path}")
+
+        return True
+
     def export(self, obj, agp_name):
         """
         Automatically splits the object by material, exports all the parts, and configures the settings
@@ -524,6 +705,17 @@ class auto_split_obj:
         self.show_low = 0
         self.show_high = 0
 
+        #Use the built in writer when everything in the object is supported, it doesn't need to touch the scene or run a full X-Plane2Blender export
+        try:
+            if self.export_native(obj, agp_name):
+                return
+        except Exception as e:
+            log_utils.warning(f"Built in writer failed for auto-split object {obj.name}, exporting with X-Plane2Blender instead: {e}", f"Built in writer failed for auto-split object {obj.name}")
+            log_utils.info(traceback.format_exc())
+
+        #Anything written before the fallback is discarded, X-Plane2Blender will write all the parts
+        self.resources = []
+
         mat_name_to_collection = {}  # Maps material names to collections
         all_objs = []
         fake_lod_objects = []
@@ -583,27 +775,7 @@ class auto_split_obj:
             for mat in all_mats:
                 #Create a new collection for this material
 
-                #Get the name for the object. This is made by combining the agp name, the relative folder from the specified name (if included), _PT_, the specified name (without the folder), the material, and .obj
-                #Then we need to get that path *relative* to the .agp so that the .agp can reference it properly
-                obj_name = ""
-                insert_name = obj.xp_agp.autosplit_obj_name if obj.xp_agp.autosplit_obj_name != "" else obj.name
-                insert_name = insert_name.replace("\\", "/")  # Normalize slashes
-                adjusted_mat_name = insert_name.replace("/", "-")  # Remove slashes from material name
-                adjusted_mat_name = insert_name.replace("\\", "-")  # Remove slashes from material name
-                #Separate the part of the name that specifies a relative dir, and the part that specifies the name. We'll just split at the last /
-                insert_name_folder = insert_name.rsplit("/", 1)[0] if "/" in insert_name else ""
-                insert_name_filename = insert_name.rsplit("/", 1)[-1] if "/" in insert_name else insert_name
-                if len(insert_name_folder) > 0:
-                    insert_name_folder += "/"
-
-                #First get the sanitized name, then make it relative to the .agp
-                obj_name = os.path.splitext(os.path.basename(agp_name))[0] + "_PT_" + file_utils.sanitize_path(insert_name + "_" + mat + ".obj")
-                obj_name = obj_name.replace(" ", "_")  # Replace spaces with underscores
-                obj_name = os.path.dirname(file_utils.to_absolute(agp_name)) + "/" + insert_name_folder + obj_name
-
-                agp_path = file_utils.to_absolute(agp_name)
-                obj_path = file_utils.to_absolute(obj_name)
-                obj_rel_to_agp_path = file_utils.to_relative(obj_path, False, os.path.dirname(agp_path))
+                obj_name, obj_rel_to_agp_path = self.get_part_paths(obj, agp_name, mat)
 
                 mat_collection = bpy.data.collections.new(obj_name)
                 mat_collection.xplane.layer.name = file_utils.to_relative(obj_name)
@@ -706,7 +878,12 @@ class auto_split_obj:
             #Now we can remove the duplicate objects
             try:
                 for split_obj in all_objs:
+                    split_data = split_obj.data
                     bpy.data.objects.remove(split_obj, do_unlink=True)
+
+                    #The split meshes are unique to these objects, so remove them too rather than leaving orphans behind
+                    if isinstance(split_data, bpy.types.Mesh) and split_data.users == 0:
+                        bpy.data.meshes.remove(split_data)
             except Exception as e:
                 log_utils.error(f"Error removing duplicate objects: {e}", "Error on autosplit export cleanup")
                 log_utils.error(traceback.format_exc())
@@ -1013,6 +1190,7 @@ class agp:
 
         self.name = ""
 
+    @perf_utils.timed("AGP from collection")
     def from_collection(self, in_collection):
         log_utils.new_section(f"Loading .agp collection {in_collection.name}")
 
@@ -1133,6 +1311,7 @@ class agp:
             #Create the tile object and link it to the collection
             tile.to_obj(new_collection, mat)
 
+    @perf_utils.timed("AGP write")
     def write(self, output_path):
         output_path = file_utils.sanitize_path(output_path)
 
@@ -1234,19 +1413,16 @@ class agp:
 
             of += "\n"
 
-        #Write the output to the file
-        with open(output_path, 'w') as f:
-            f.write(of)
+        #Write the output to the file. It's left alone if nothing changed
+        file_utils.write_if_changed(output_path, of, backup=file_utils.get_do_backup_on_overwrite())
+        file_utils.log_backups()
 
+    @perf_utils.timed("AGP read")
     def read(self, in_file):
         log_utils.new_section(f"Reading .agp {in_file}")
 
         self.name = in_file.split(os.sep)[-1]
 
-        # Read the file
-        with open(in_file, 'r') as f:
-            lines = f.readlines()
-
         obj_resource_list = []
         fac_resource_list = []
 
@@ -1259,30 +1435,8 @@ class agp:
         imported_texture_height_px = -1
 
         # Now we need to parse the file
-        for line in lines:
-            # Get the line
-            line = line.strip()
-
-            tokens = line.split()
-            if not tokens:
-                continue
-
-            # Defensive: check token count for each command before using tokens
+        for line, tokens in reader_utils.read_commands(in_file, formats.agp_command_table):
             cmd = tokens[0]
-            min_tokens = {
-                'TEXTURE_NOWRAP': 2,
-                'TEXTURE': 2,
-                'TEXTURE_LIT': 2,
-                'WEATHER': 2,
-                'NO_BLEND': 2,
-                'LAYER_GROUP': 2, # can be 2 or 3, but 2 is safe
-                'SURFACE': 2,
-                'LOAD_CENTER': 5,
-                'TEXTURE_TILE': 6
-            }
-            if cmd in min_tokens and len(tokens) < min_tokens[cmd]:
-                log_utils.warning(f"Not enough tokens for command '{cmd}'! Expected at least {min_tokens[cmd]}, got {len(tokens)}. Line: '{line}'")
-                continue
 
             #If we are in a tile command we need to add it to the list of current tile commands'
             if len(cur_tile_commands) > 0 and cmd != "TILE":
@@ -13,18 +13,80 @@ from .. import material_config
 from ..Helpers import misc_utils
 from ..Helpers import anim_utils
 from ..Helpers import geometery_utils
+from ..Helpers import vertex_utils
 from ..Helpers import anim_utils
 from ..Helpers import light_data    #These are defines for the parameter layout of PARAM lights
 from ..Helpers import decal_utils
 from ..Helpers import log_utils
 from ..Helpers import file_utils
+from ..Helpers import reader_utils
 from typing import List
 from .xp_obj import draw_call
 from .xp_obj import draw_call_state
 
+#Minimum number of tokens of each command. Built once, and shared by every read
+preview_command_table = reader_utils.command_table({
+    'VT': 9,
+    'IDX10': 11,
+    'IDX': 2,
+    'TRIS': 3,
+    'PARTICLE_SYSTEM': 2,
+    'BLEND_GLASS': 1,
+    'GLOBAL_luminance': 2,
+    'TEXTURE': 2,
+    'TEXTURE_MAP': 3,
+    'TEXTURE_NORMAL': 2,
+    'TEXTURE_DRAPED': 2,
+    'TEXTURE_DRAPED_NORMAL': 3,
+    'TEXTURE_DRAPED_LIT': 2,
+    'TEXTURE_LIT': 2,
+    'GLOBAL_no_blend': 2,
+    'GLOBAL_shadow_blend': 2,
+    'ATTR_LOD': 3,
+})
+
 #Lights don't actually use LODs, but if there are LOD buckets, XP2B requires them to be in *one*. But if there's no LOD buckets they can't be in *any*. So we have a single global variable to set what bucket ot put them in
 obj_does_use_lods = False
 
+#Cache of parsed previews, so each resource is only read and built once no matter how many times it is attached. Maps normalized absolute path to (mtime, attached_object_preview)
+_preview_cache = {}
+
+#Name of the collection that holds the preview collections used by instanced previews. It is not linked to the scene, so it is never visible on it's own
+PREVIEW_LIBRARY_NAME = "XP Attached Object Preview Library"
+
+def is_preview_object(obj):
+    """
+    Checks if an object is a preview created by attached_object_preview.to_scene (not a real preview)
+    Args:
+        obj (bpy.types.Object): The object to check.
+    Returns:
+        bool: True if the object is a preview.
+    """
+    if not obj.hide_select:
+        return False
+    return obj.type == 'MESH' or (obj.type == 'EMPTY' and obj.instance_type == 'COLLECTION')
+
+def get_cached_preview(in_obj_path):
+    """
+    Gets the parsed preview for an .obj, reading it only if it hasn't been read yet or has changed on disk since.
+    Args:
+        in_obj_path (str): Absolute path to the .obj.
+    Returns:
+        attached_object_preview: The parsed preview. Shared by every caller with the same resource.
+    """
+    key = os.path.normcase(os.path.normpath(in_obj_path))
+    mtime = os.path.getmtime(in_obj_path)
+
+    cached = _preview_cache.get(key)
+    if cached is not None and cached[0] == mtime:
+        log_utils.info(f"Using cached attached .obj {in_obj_path}")
+        return cached[1]
+
+    preview = attached_object_preview()
+    preview.read(in_obj_path)
+    _preview_cache[key] = (mtime, preview)
+    return preview
+
 class attached_object_preview:
     """
     Class to represent a lightweight X-Plane object. This class provides functions to import the object into Blender.
@@ -32,7 +94,7 @@ class attached_object_preview:
 
     #Define instance variables
     def __init__(self):
-        self.verticies = []  #type: List[geometery_utils.xp_vertex]  #List of verticies in the object
+        self.verticies = vertex_utils.vertex_buffer()  #Verticies of the object
         self.indicies = []  #type: List[int]  #List of indices in the object
         self.draw_calls = [] #type: List[draw_call]
         self.name = ""
@@ -50,6 +112,26 @@ class attached_object_preview:
         self.draped_nml_texture = ""
         self.draped_lit_texture = ""
 
+        #Mesh built by the first to_scene call. Later previews link this same mesh instead of building their own
+        self.mesh = None
+
+        #Collection in the preview library that holds this object for instanced previews
+        self.library_collection = None
+
+    def get_shared_mesh(self):
+        """
+        Returns the mesh previously built for this object, or None if there isn't one or it has since been deleted (or invalidated by an undo)
+        """
+        if self.mesh is None:
+            return None
+        try:
+            if self.mesh.name in bpy.data.meshes and bpy.data.meshes[self.mesh.name] == self.mesh:
+                return self.mesh
+        except ReferenceError:
+            pass
+        self.mesh = None
+        return None
+
     def read(self, in_obj_path):
 
         log_utils.new_section(f"Read attached .obj {in_obj_path}")
@@ -61,53 +143,17 @@ class attached_object_preview:
         cur_start_lod = 0
         cur_is_draped_tris = False
 
-        with open(in_obj_path, "r") as f:
-            lines = f.readlines()
-        
-        for line in lines:
-
-            line = line.strip()
-            tokens = line.split()
-
-            if len(tokens) == 0:
-                continue
-
-            # Defensive: check token count for each command before using tokens
-            cmd = tokens[0]
-            # Map of command to minimum required tokens (based on usage below)
-            min_tokens = {
-                'VT': 9,
-                'IDX10': 11,
-                'IDX': 2,
-                'TRIS': 3,
-                'PARTICLE_SYSTEM': 2,
-                'BLEND_GLASS': 1,
-                'GLOBAL_luminance': 2,
-                'TEXTURE': 2,
-                'TEXTURE_MAP': 3,
-                'TEXTURE_NORMAL': 2,
-                'TEXTURE_DRAPED': 2,
-                'TEXTURE_DRAPED_NORMAL': 3,
-                'TEXTURE_DRAPED_LIT': 2,
-                'TEXTURE_LIT': 2,
-                'GLOBAL_no_blend': 2,
-                'GLOBAL_shadow_blend': 2,
-                'ATTR_LOD': 3,
-            }
-            
-            # Only check if command is in our map
-            if cmd in min_tokens and len(tokens) < min_tokens[cmd]:
-                log_utils.warning(f"Not enough tokens for command '{cmd}'! Expected at least {min_tokens[cmd]}, got {len(tokens)}. Line: '{line}'")
-                continue
+        #VT rows are collected as tuples and turned into the vertex buffer once at the end, which is much faster than appending them one at a time
+        vertex_rows = []
 
+        for line, tokens in reader_utils.read_commands(in_obj_path, preview_command_table):
             if tokens[0] == "VT":
                 #We flip Y and Z because of the way Blender and X-Plane handle coordinates
-                vert = geometery_utils.xp_vertex(
+                vertex_rows.append((
                     float(tokens[1]) * trans_matrix[0], float(tokens[3]) * trans_matrix[1], float(tokens[2]) * trans_matrix[2], 
                     float(tokens[4]) * trans_matrix[0], float(tokens[6]) * trans_matrix[1], float(tokens[5]) * trans_matrix[2], 
                     float(tokens[7]), float(tokens[8])
-                )
-                self.verticies.append(vert)
+                ))
 
             elif tokens[0] == "IDX10":
                 #List of 10 indices
@@ -180,6 +226,8 @@ class attached_object_preview:
                 cur_start_lod = float(tokens[1])
                 cur_end_lod = float(tokens[2])
 
+        self.verticies.extend(vertex_utils.vertex_buffer.from_rows(vertex_rows))
+
         def resolve_texture_path(texture_name):
             #Make the texture absolute (it's currently relative to the .obj path), then make it relative to the .blend file and return that value
             if texture_name == "":
@@ -201,6 +249,94 @@ class attached_object_preview:
     def to_scene(self, target_parent, target_collection, make_real=False):
         log_utils.new_section(f"Creating attached .obj object {self.name}")
 
+        #If we already built this object, link its mesh to a new object. Real objects get their own copy so they can be edited
+        shared_mesh = self.get_shared_mesh()
+        if shared_mesh is not None:
+            log_utils.info(f"Reusing mesh {shared_mesh.name} for attached .obj {self.name}")
+            joined_obj = bpy.data.objects.new(self.name, shared_mesh.copy() if make_real else shared_mesh)
+            target_collection.objects.link(joined_obj)
+        else:
+            joined_obj = self.build_object(target_collection)
+            self.mesh = joined_obj.data.copy() if make_real else joined_obj.data
+
+        joined_obj.xp_attached_obj.exportable = False
+        joined_obj.xp_agp.exportable = False
+        joined_obj.xp_fac_mesh.exportable = False
+
+        #Link to the collection and set parent
+        if not make_real:
+            joined_obj.parent = target_parent
+            joined_obj.hide_select = True
+        else:
+            joined_obj.matrix_world = target_parent.matrix_world.copy()  #Copy the location/rotation/scale of the parent, but don't parent it, so it can be edited independently
+            joined_obj.parent = None
+            joined_obj.hide_select = False
+
+    def get_library_collection(self, target_collection):
+        """
+        Gets the collection in the preview library that holds this object, creating it if needed.
+        Args:
+            target_collection (bpy.types.Collection): A collection on the scene, used while building the object.
+        Returns:
+            bpy.types.Collection: The collection to instance.
+        """
+        try:
+            if self.library_collection is not None and bpy.data.collections.get(self.library_collection.name) == self.library_collection:
+                return self.library_collection
+        except ReferenceError:
+            pass
+
+        library = bpy.data.collections.get(PREVIEW_LIBRARY_NAME)
+        if library is None:
+            library = bpy.data.collections.new(PREVIEW_LIBRARY_NAME)
+
+        self.library_collection = bpy.data.collections.new(self.name)
+        library.children.link(self.library_collection)
+
+        #Building needs the objects to be on the scene, so build there, then move it into the library
+        shared_mesh = self.get_shared_mesh()
+        if shared_mesh is not None:
+            library_obj = bpy.data.objects.new(self.name, shared_mesh)
+        else:
+            library_obj = self.build_object(target_collection)
+            target_collection.objects.unlink(library_obj)
+            self.mesh = library_obj.data
+
+        library_obj.xp_attached_obj.exportable = False
+        library_obj.xp_agp.exportable = False
+        library_obj.xp_fac_mesh.exportable = False
+        self.library_collection.objects.link(library_obj)
+
+        return self.library_collection
+
+    def to_scene_instance(self, target_parent, target_collection):
+        """
+        Previews this object as an empty that instances the object's collection in the preview library. Only the library has geometry, so previews stay cheap no matter how many there are.
+        Args:
+            target_parent (bpy.types.Object): The attached object empty to preview on.
+            target_collection (bpy.types.Collection): The collection to link the instance to.
+        """
+        library_collection = self.get_library_collection(target_collection)
+
+        instance_obj = bpy.data.objects.new(self.name, None)
+        instance_obj.instance_type = 'COLLECTION'
+        instance_obj.instance_collection = library_collection
+        instance_obj.empty_display_size = 0.01
+        instance_obj.xp_attached_obj.exportable = False
+        instance_obj.xp_agp.exportable = False
+        target_collection.objects.link(instance_obj)
+
+        instance_obj.parent = target_parent
+        instance_obj.hide_select = True
+
+    def build_object(self, target_collection):
+        """
+        Builds the materials and mesh for this object and links the resulting object to the target collection.
+        Args:
+            target_collection (bpy.types.Collection): The collection to link the object to.
+        Returns:
+            bpy.types.Object: The new object.
+        """
         #Create the base material
         all_mats = []
         mat = bpy.data.materials.new(name=self.name)
@@ -270,16 +406,4 @@ class attached_object_preview:
             target_collection.objects.link(obj)
         
         #Join all objects into one
-        joined_obj = geometery_utils.join_objects(all_objs, self.name)
-        joined_obj.xp_attached_obj.exportable = False
-        joined_obj.xp_agp.exportable = False
-        joined_obj.xp_fac_mesh.exportable = False
-            
-        #Link to the collection and set parent
-        if not make_real:
-            joined_obj.parent = target_parent
-            joined_obj.hide_select = True
-        else:
-            joined_obj.matrix_world = target_parent.matrix_world.copy()  #Copy the location/rotation/scale of the parent, but don't parent it, so it can be edited independently
-            joined_obj.parent = None
-            joined_obj.hide_select = False
\ No newline at end of file
+        return geometery_utils.join_objects(all_objs, self.name)
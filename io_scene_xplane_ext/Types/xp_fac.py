@@ -6,10 +6,14 @@
 
 from ..Helpers import facade_utils # type: ignore
 from ..Helpers import geometery_utils # type: ignore
+from ..Helpers import vertex_utils
 from ..Helpers import decal_utils # type: ignore
 from ..Helpers import file_utils # type: ignore
 from ..Helpers import misc_utils # type: ignore
 from ..Helpers import log_utils
+from ..Helpers import perf_utils
+from ..Helpers import reader_utils
+from ..Core import formats
 from .. import material_config
 from . import xp_attached_obj # type: ignore
 import os
@@ -19,7 +23,7 @@ import bpy
 class mesh:
     def __init__(self):
         self.name = ""
-        self.vertices = []
+        self.vertices = vertex_utils.vertex_buffer()
         self.indices = []
         self.far_lod = 0
         self.group = 0
@@ -58,6 +62,7 @@ class segment:
         self.name = ""
         self.is_curved = False
 
+    @perf_utils.timed("Facade segment from collection")
     def from_collection(self, collection):
         #Get the name of the collection
         self.name = collection.name
@@ -302,6 +307,7 @@ class facade:
         self.graded = False
         self.ring = False
 
+    @perf_utils.timed("Facade read")
     def read(self, in_path):
         """
         Reads a .fac file and populates the facade object and its members.
@@ -311,9 +317,6 @@ class facade:
 
         self.name = os.path.basename(in_path)  # Get the name of the facade file
 
-        with open(in_path, "r") as f:
-            lines = f.readlines()
-
         current_floor = None
         current_wall = None
         current_spelling = None
@@ -321,60 +324,13 @@ class facade:
         current_mesh = None
         current_material = None
 
-        last_comment_name = ""
-
-        for line in lines:
-            line = line.strip()
+        #VERTEX rows of each mesh, as (mesh, rows). They are turned into each mesh's vertex buffer once at the end, which is much faster than appending them one at a time
+        mesh_rows = []
 
-            if not line:
-                continue  # Ignore empty lines (comments are processed later, we use them to guess at segment names)
-
-            tokens = line.split()
-            if not tokens:
-                continue
+        last_comment_name = ""
 
-            # Defensive: check token count for each command before using tokens
+        for line, tokens in reader_utils.read_commands(in_path, formats.fac_command_table):
             command = tokens[0]
-            min_tokens = {
-                'I': 1,
-                'FACADE': 1,
-                'GRADED': 1,
-                'DRAPED': 1,
-                'RING': 2,
-                'SHADER_WALL': 1,
-                'SHADER_ROOF': 1,
-                'TEXTURE': 2,
-                'TEXTURE_LIT': 2,
-                'TEXTURE_NORMAL': 2,
-                'TEXTURE_MODULATOR': 2,
-                'NO_BLEND': 2,
-                'NO_SHADOW': 1,
-                'LAYER_GROUP': 3,
-                'DECAL': 1,
-                'NORMAL_DECAL': 1,
-                'ROOF_SCALE': 3,
-                'OBJ': 2,
-                'FLOOR': 2,
-                'ROOF_TWO_SIDED': 1,
-                'ROOF_HEIGHT': 2,
-                'ROOF_OBJ_HEADING': 7,
-                'SEGMENT': 2,
-                'SEGMENT_CURVED': 2,
-                'MESH': 6,
-                'VERTEX': 9,
-                'IDX': 2,
-                'WALL': 6,
-                'SPELLING': 2,
-                'ATTACH_DRAPED': 6,
-                'ATTACH_GRADED': 6,
-            }
-            if command in min_tokens and len(tokens) < min_tokens[command]:
-                #In the past we accidentally wrote MESH commands with too few parameters, so if the MESH command has only 4 commands we'll still accept that
-                if command == "MESH" and len(tokens) == 4:
-                    pass
-                else:
-                    log_utils.warning(f"Not enough tokens for command '{command}'! Expected at least {min_tokens[command]}, got {len(tokens)}. Line: '{line}'", f"Not enough arguments for command {command}")
-                    continue
 
             if command == "I":
                 # Header line, skip
@@ -501,22 +457,16 @@ class facade:
                     if len(tokens) > 5:
                         current_mesh.cuts = int(float(tokens[3]))
                     current_segment.meshes.append(current_mesh)
+                    mesh_rows.append((current_mesh, []))
 
             elif command == "VERTEX":
                 if current_mesh:
                     #X-Plane facades are *very* weird. They scale the wall mesh by -1 on their z axis (our y). So we need to do the same here so XP appears the same as blender - 0y being the start of the wall
-                    vertex = geometery_utils.xp_vertex(
-                        loc_x=float(tokens[1]),
-                        loc_y=-float(tokens[3]),
-                        loc_z=float(tokens[2]),
-                        normal_x=float(tokens[4]),
-                        normal_y=-float(tokens[6]),
-                        normal_z=float(tokens[5]),
-                        uv_x=float(tokens[7]),
-                        uv_y=float(tokens[8])
-                    )
-
-                    current_mesh.vertices.append(vertex)
+                    mesh_rows[-1][1].append((
+                        float(tokens[1]), -float(tokens[3]), float(tokens[2]),
+                        float(tokens[4]), -float(tokens[6]), float(tokens[5]),
+                        float(tokens[7]), float(tokens[8])
+                    ))
 
             elif command == "IDX":
                 if current_mesh:
@@ -584,6 +534,9 @@ class facade:
                     current_segment.attached_objects.append(attached_obj)
                     
 
+        for target_mesh, rows in mesh_rows:
+            target_mesh.vertices.extend(vertex_utils.vertex_buffer.from_rows(rows))
+
         # Sort objects and segments for consistency
         self.all_objects.sort()
         for cur_floor in self.floors:
@@ -591,6 +544,7 @@ class facade:
             cur_floor.all_curved_segments.sort(key=lambda seg: seg.name)
             cur_floor.roof_objs.sort(key=lambda obj: obj.resource)
 
+    @perf_utils.timed("Facade write")
     def write(self, out_path):
         log_utils.new_section(f"Writing .fac {out_path}")
 
@@ -766,8 +720,8 @@ class facade:
 
                 #X-Plane facades are *very* weird. They scale the wall mesh by -1 on their z axis (our y). So we need to do the same here so XP appears the same as blender - 0y being the start of the wall
 
-                for v in target_mesh.vertices:
-                    output += "VERTEX " + misc_utils.ftos(v.loc_x, 8) + " " + misc_utils.ftos(v.loc_z, 8) + " " + misc_utils.ftos(-v.loc_y, 8) + " " + misc_utils.ftos(v.normal_x, 8) + " " + misc_utils.ftos(v.normal_z, 8) + " " + misc_utils.ftos(-v.normal_y, 8) + " " + misc_utils.ftos(v.uv_x, 8) + " " + misc_utils.ftos(v.uv_y, 8) + "\n"
+                for line in target_mesh.vertices.get_lines("VERTEX", vertex_utils.obj_blender_to_xplane):
+                    output += line + "\n"
                 cur_idx = 0
 
                 #Since we had to scale by -1 for Y, we need to reverse the indicies to fix the face direction
@@ -844,10 +798,10 @@ class facade:
                 output += "\n"
 
         #Now output contains the contents of the full facade file, soo, now we just need to write it to the file
-        with open(out_path, "w") as f:
-            f.write(output)
-            f.close()
+        file_utils.write_if_changed(out_path, output, backup=file_utils.get_do_backup_on_overwrite())
+        file_utils.log_backups()
 
+    @perf_utils.timed("Facade from collection")
     def from_collection(self, in_collection):
 
         log_utils.new_section(f"Reading .fac collection {in_collection.name}")
@@ -887,6 +841,7 @@ class facade:
         self.roof_scale_x = self.floors[0].roof_scale_x
         self.roof_scale_y = self.floors[0].roof_scale_y
 
+    @perf_utils.timed("Facade to scene")
     def to_scene(self):
         """
         Converts the facade object into a Blender scene.
@@ -1014,10 +969,12 @@ class facade:
 
             #Create planes that are the size of the roof, one at each floor height, and link them to the roof collection. 
             for i, height in enumerate(floor_obj.roof_heights):
-                verts = [geometery_utils.xp_vertex(0, 0, 0, 0, 0, 1, 0, 0),
-                        geometery_utils.xp_vertex(0, self.roof_scale_y, 0, 0, 0, 1, 0, 1),
-                        geometery_utils.xp_vertex(self.roof_scale_x, 0, 0, 0, 0, 1, 1, 0),
-                        geometery_utils.xp_vertex(self.roof_scale_x, self.roof_scale_y, 0, 0, 0, 1, 1, 1),]
+                verts = vertex_utils.vertex_buffer.from_rows([
+                    (0, 0, 0, 0, 0, 1, 0, 0),
+                    (0, self.roof_scale_y, 0, 0, 0, 1, 0, 1),
+                    (self.roof_scale_x, 0, 0, 0, 0, 1, 1, 0),
+                    (self.roof_scale_x, self.roof_scale_y, 0, 0, 0, 1, 1, 1),
+                ])
                 indicies = [0, 2, 1, 2, 3, 1]
                 roof_obj = geometery_utils.create_obj_from_draw_call(verts, indicies, "Roof_" + str(i))
                 roof_obj.location.z = height
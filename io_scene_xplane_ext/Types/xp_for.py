@@ -6,15 +6,21 @@
 
 from ..Helpers import file_utils
 from ..Helpers import forest_geometry_utils
+from ..Helpers import vertex_utils
 from ..Helpers import decal_utils
 from ..Helpers import for_utils
 from ..Helpers.misc_utils import ftos
 from ..Helpers import decal_utils
 from ..Helpers import log_utils
+from ..Helpers import perf_utils
+from ..Helpers import reader_utils
+from ..Core import formats
 
 
 import bpy
 import os
+import time
+import concurrent.futures
 
 class TreeMesh():
     def __init__(self):
@@ -24,7 +30,7 @@ class TreeMesh():
         self.wind_bend_ratio = 0.0
         self.branch_bending = 1.0
         self.max_wind_speed = 1.0
-        self.verticies : list[forest_geometry_utils.for_xp_vertex] = []
+        self.verticies : vertex_utils.vertex_buffer = vertex_utils.vertex_buffer(has_wind=True)
         self.indicies : list[int] = []
         self.mesh_name : str = ""
     
@@ -36,7 +42,7 @@ class TreeMesh():
         self.wind_bend_ratio = xp_for.wind_bend_ratio
         self.branch_bending = xp_for.branch_bending
         self.max_wind_speed = xp_for.max_wind_speed
-        self.verticies, self.indicies = forest_geometry_utils.get_for_draw_call_from_obj(in_obj)
+        self.verticies, self.indicies = for_utils.get_cached_extraction("tree_mesh", in_obj, forest_geometry_utils.get_for_draw_call_from_obj)
         self.mesh_name = in_obj.name
         self.mesh_name = file_utils.sanitize_path(in_obj.name).replace(" ", "_")
 
@@ -53,20 +59,20 @@ class TreeMesh():
         return obj
 
     def to_string(self):
-        out = f"MESH {self.mesh_name} {self.near_lod} {self.far_lod} {len(self.verticies)} {len(self.indicies)} {self.wind_bend_ratio} {self.branch_bending} {self.max_wind_speed}\n"
+        out = [f"MESH {self.mesh_name} {self.near_lod} {self.far_lod} {len(self.verticies)} {len(self.indicies)} {self.wind_bend_ratio} {self.branch_bending} {self.max_wind_speed}\n"]
         if self.no_shadow:
-            out += "NO_SHADOW\n"
-        for vert in self.verticies:
-            out += f"VERTEX {ftos(vert.loc_x, 8)} {ftos(vert.loc_z, 8)} {ftos(vert.loc_y, 8)} {ftos(vert.normal_x, 8)} {ftos(vert.normal_z, 8)} {ftos(vert.normal_y, 8)} {ftos(vert.uv_x, 8)} {ftos(vert.uv_y, 8)} {ftos(vert.stiffness, 8)} {ftos(vert.edge_stiffness, 8)} {ftos(vert.phase, 8)}\n"
+            out.append("NO_SHADOW\n")
+        out.extend(line + "\n" for line in self.verticies.get_lines("VERTEX", vertex_utils.for_axes_swap))
+        full_rows = int(len(self.indicies) / 10) * 10
         i = 0
-        while i < len(self.indicies) - 9:
-            out += f"IDX {self.indicies[i]} {self.indicies[i+1]} {self.indicies[i+2]} {self.indicies[i+3]} {self.indicies[i+4]} {self.indicies[i+5]} {self.indicies[i+6]} {self.indicies[i+7]} {self.indicies[i+8]} {self.indicies[i+9]}\n"
+        while i < full_rows:
+            out.append(f"IDX {self.indicies[i]} {self.indicies[i+1]} {self.indicies[i+2]} {self.indicies[i+3]} {self.indicies[i+4]} {self.indicies[i+5]} {self.indicies[i+6]} {self.indicies[i+7]} {self.indicies[i+8]} {self.indicies[i+9]}\n")
             i += 10
-        i = 0
-        while i < len(self.indicies) % 10:
-            out += f"IDX {self.indicies[int(len(self.indicies) / 10) * 10 + i]}\n"
+        while i < len(self.indicies):
+            out.append(f"IDX {self.indicies[i]}\n")
             i += 1
-        return out + "\n"
+        out.append("\n")
+        return "".join(out)
 
 
 class Tree():
@@ -110,9 +116,9 @@ class Tree():
         for child in in_obj.children:
             log_utils.info("Checking child " + child.name + " of tree " + in_obj.name)
             if child.type == "MESH":
-                if for_utils.is_forest_quad_obj(child):
+                qd = for_utils.get_cached_forest_quad(child)
+                if qd is not None:
                     log_utils.info("Found forest quad " + child.name + " for tree " + in_obj.name)
-                    qd = for_utils.get_forest_quad_from_obj(child)
                     self.quad_x = qd.left_x
                     self.quad_y = qd.bottom_y
                     self.quad_width = qd.width
@@ -293,6 +299,7 @@ class Forest():
 
         self.layers : list[list[Tree]] = []
 
+    @perf_utils.timed("Forest from collection")
     def from_collection(self, in_collection : bpy.types.Collection):
         #Copy the properties from the collections .xp_for property group into our local copy
         # If a material is None in the PG, leave it as none here
@@ -358,7 +365,7 @@ class Forest():
             for obj in child.objects:
                 all_col_objects.append(obj)
         for obj in all_col_objects:
-            if for_utils.is_forest_quad_obj(obj):
+            if obj.type == "MESH" and for_utils.get_cached_forest_quad(obj) is not None:
                 self.mat_2d = ForestMaterial()
                 self.mat_2d.from_material(obj.active_material)
             elif obj.type == "MESH":
@@ -511,35 +518,10 @@ class Forest():
 
         return col
 
+    @perf_utils.timed("Forest read")
     def read(self, input_path: str):
-        #Min token dict
-        min_tokens = {
-            "TEXTURE": 2,
-            "TEXTURE_NORMAL": 3,
-            "TEXTURE_LIT": 2,
-            "TEXTURE_MODULATOR": 2,
-            "LAYER_GROUP": 3,
-            "NO_BLEND": 2,
-            "SCALE_X": 2,
-            "SCALE_Y": 2,
-            "SPACING": 3,
-            "RANDOM": 3,
-            "DENSITY_PARAMS": 9,
-            "HEIGHT_PARAMS": 9,
-            "CHOICE_PARAMS": 9,
-            "MESH": 9,
-            "VERTEX": 12,
-            "TREE2": 13,
-            "TREE": 11,
-            "IDX": 2,
-            "MESH_3D": 2
-        }
-
         self.name = os.path.splitext(os.path.basename(input_path))[0]
 
-        with open(input_path, 'r') as f:
-            lines = f.readlines()
-
         self.mat_2d = ForestMaterial()
         self.mat_3d = ForestMaterial()
 
@@ -548,19 +530,12 @@ class Forest():
         current_tree = None
         all_meshes = []
 
-        for raw_line in lines:
-            line = raw_line.strip()
-            if not line or line.startswith("#"):
-                continue
+        #VERTEX rows of each mesh, as (mesh, rows). They are turned into each mesh's vertex buffer once at the end, which is much faster than appending them one at a time
+        mesh_rows = []
 
-            tokens = line.split()
+        for line, tokens in reader_utils.read_commands(input_path, formats.for_command_table, skip_comments=True):
             cmd = tokens[0]
 
-            #Get the min tokens and make sure we meet the min token threshold for this command
-            if cmd in min_tokens and len(tokens) < min_tokens[cmd]:
-                log_utils.warning(f"Line '{line}' does not have enough tokens for command {cmd}, skipping", f"Command {cmd} doesn't have enough tokens")
-                continue
-
             # When in a mesh, if we get a command other than a vertex or idx, we need to end the mesh
             if current_mesh is not None and cmd not in ["VERTEX", "IDX"]:
                 all_meshes.append(current_mesh)
@@ -653,6 +628,7 @@ class Forest():
                 if current_mesh is not None:
                     all_meshes.append(current_mesh)
                 current_mesh = TreeMesh()
+                mesh_rows.append((current_mesh, []))
                 current_mesh.mesh_name = tokens[1]
                 current_mesh.near_lod = float(tokens[2])
                 current_mesh.far_lod = float(tokens[3])
@@ -667,15 +643,12 @@ class Forest():
                     log_utils.warning(f"VERTEX command found outside of a MESH block, skipping: '{line}'")
                     continue
                 # File format: VERTEX loc_x loc_z loc_y normal_x normal_z normal_y uv_x uv_y stiffness edge_stiffness phase
-                vert = forest_geometry_utils.for_xp_vertex(
+                mesh_rows[-1][1].append((
                     float(tokens[1]), float(tokens[3]), float(tokens[2]),
                     float(tokens[4]), float(tokens[6]), float(tokens[5]),
-                    float(tokens[7]), float(tokens[8])
-                )
-                vert.stiffness = float(tokens[9])
-                vert.edge_stiffness = float(tokens[10])
-                vert.phase = float(tokens[11])
-                current_mesh.verticies.append(vert)
+                    float(tokens[7]), float(tokens[8]),
+                    float(tokens[9]), float(tokens[10]), float(tokens[11])
+                ))
             elif cmd == "IDX":
                 if current_mesh is None:
                     log_utils.warning(f"IDX command found outside of a MESH block, skipping: '{line}'")
@@ -739,6 +712,10 @@ class Forest():
                 if not found_mesh:
                     log_utils.warning(f"MESH_3D command references mesh '{mesh_name}' which was not found in the file, skipping this mesh for tree '{current_tree.name}'", f"Mesh '{mesh_name}' not found for tree '{current_tree.name}'")
 
+        for mesh, rows in mesh_rows:
+            mesh.verticies.extend(vertex_utils.vertex_buffer.from_rows(rows))
+
+    @perf_utils.timed("Forest write")
     def write(self, output_path : str):
 
         output_folder = os.path.dirname(output_path)
@@ -761,29 +738,30 @@ class Forest():
         base_material += "\n"
 
         # Now we need to write the core of the file.
-        # The reason we're doing this in a separate string is so if we are exporting seasons, we can simply
-        # Append this string to their header
-        body = ""
+        # The reason we're doing this in a separate string is so if we are exporting seasons, every season
+        # writes the same body after it's own header. It is built once, and never copied
+        body = []
 
-        body += f"SCALE_X {self.tex_scale_x}\n"
-        body += f"SCALE_Y {self.tex_scale_y}\n"
-        body += f"SPACING {self.spacing_x} {self.spacing_y}\n"
-        body += f"RANDOM {self.random_x} {self.random_y}\n"
+        body.append(f"SCALE_X {self.tex_scale_x}\n")
+        body.append(f"SCALE_Y {self.tex_scale_y}\n")
+        body.append(f"SPACING {self.spacing_x} {self.spacing_y}\n")
+        body.append(f"RANDOM {self.random_x} {self.random_y}\n")
 
         if self.density_params:
-            body += f"DENSITY_PARAMS {self.density_wavelength_0} {self.density_wavestrength_0} {self.density_wavelength_1} {self.density_wavestrength_1} {self.density_wavelength_2} {self.density_wavestrength_2} {self.density_wavelength_3} {self.density_wavestrength_3}"
+            body.append(f"DENSITY_PARAMS {self.density_wavelength_0} {self.density_wavestrength_0} {self.density_wavelength_1} {self.density_wavestrength_1} {self.density_wavelength_2} {self.density_wavestrength_2} {self.density_wavelength_3} {self.density_wavestrength_3}")
         if self.height_params:
-            body += f"HEIGHT_PARAMS {self.height_wavelength_0} {self.height_wavestrength_0} {self.height_wavelength_1} {self.height_wavestrength_1} {self.height_wavelength_2} {self.height_wavestrength_2} {self.height_wavelength_3} {self.height_wavestrength_3}"
+            body.append(f"HEIGHT_PARAMS {self.height_wavelength_0} {self.height_wavestrength_0} {self.height_wavelength_1} {self.height_wavestrength_1} {self.height_wavelength_2} {self.height_wavestrength_2} {self.height_wavelength_3} {self.height_wavestrength_3}")
         if self.choice_params:
-            body += f"CHOICE_PARAMS {self.choice_wavelength_0} {self.choice_wavestrength_0} {self.choice_wavelength_1} {self.choice_wavestrength_1} {self.choice_wavelength_2} {self.choice_wavestrength_2} {self.choice_wavelength_3} {self.choice_wavestrength_3}"
+            body.append(f"CHOICE_PARAMS {self.choice_wavelength_0} {self.choice_wavestrength_0} {self.choice_wavelength_1} {self.choice_wavestrength_1} {self.choice_wavelength_2} {self.choice_wavestrength_2} {self.choice_wavelength_3} {self.choice_wavestrength_3}")
         
-        body += "\n"
+        body.append("\n")
 
         for layer in self.layers:
             for tree in layer:
                 log_utils.info("Tree mesh count " + str(len(tree.meshes)))
                 for mesh in tree.meshes:
-                    body += mesh.to_string() + "\n"
+                    body.append(mesh.to_string())
+                    body.append("\n")
 
         #Now, we sort the trees by their group variable, and write them!
         for layer in self.layers:
@@ -804,47 +782,52 @@ class Forest():
             for tree in layer:
                 if tree.group != last_group:
                     last_group = tree.group
-                    body += f"GROUP {last_group} {1.0 / different_group_count}"
-                body += tree.to_string(self.tex_scale_x, self.tex_scale_y)
+                    body.append(f"GROUP {last_group} {1.0 / different_group_count}")
+                body.append(tree.to_string(self.tex_scale_x, self.tex_scale_y))
+
+        body = "".join(body)
         
         # At this point, we have the header, the body, and the material section.
-        # If we are in season mode, we just need to get the different paths and the different headrees
+        # If we are in season mode, we just need to get the different paths and the different headers
         # Otherwise we just write it directly
+        variants = []   #List of (path, material section)
         if self.do_seasons:
-            sp_path = output_path.replace(".for", "_SP.for")
-            su_path = output_path.replace(".for", "_SU.for")
-            fl_path = output_path.replace(".for", "_FL.for")
-            wi_path = output_path.replace(".for", "_WI.for")
-
-            if self.mat_spring_2d is not None:
-                sp_material = "SHADER_2D\n"
-                sp_material += self.mat_spring_2d.to_string(output_folder)
-                sp_material += "SHADER_3D\n"
-                sp_material += self.mat_spring_3d.to_string(output_folder)
-                with open(sp_path, "w") as f:
-                    f.write(header + sp_material + body)
-            if self.mat_summer_2d is not None:
-                su_material = "SHADER_2D\n"
-                su_material += self.mat_summer_2d.to_string(output_folder)
-                su_material += "SHADER_3D\n"
-                su_material += self.mat_summer_3d.to_string(output_folder)
-                with open(su_path, "w") as f:
-                    f.write(header + su_material + body)
-            if self.mat_fall_2d is not None:
-                fl_material = "SHADER_2D\n"
-                fl_material += self.mat_fall_2d.to_string(output_folder)
-                fl_material += "SHADER_3D\n"
-                fl_material += self.mat_fall_3d.to_string(output_folder)
-                with open(fl_path, "w") as f:
-                    f.write(header + fl_material + body)
-            if self.mat_winter_2d is not None:
-                wi_material = "SHADER_2D\n"
-                wi_material += self.mat_winter_2d.to_string(output_folder)
-                wi_material += "SHADER_3D\n"
-                wi_material += self.mat_winter_3d.to_string(output_folder)
-                with open(wi_path, "w") as f:
-                    f.write(header + wi_material + body)
+            seasons = [
+                ("_SP.for", self.mat_spring_2d, self.mat_spring_3d),
+                ("_SU.for", self.mat_summer_2d, self.mat_summer_3d),
+                ("_FL.for", self.mat_fall_2d, self.mat_fall_3d),
+                ("_WI.for", self.mat_winter_2d, self.mat_winter_3d),
+            ]
+
+            for suffix, mat_2d, mat_3d in seasons:
+                if mat_2d is None:
+                    continue
+                season_material = "SHADER_2D\n"
+                season_material += mat_2d.to_string(output_folder)
+                season_material += "SHADER_3D\n"
+                season_material += mat_3d.to_string(output_folder)
+                variants.append((output_path.replace(".for", suffix), season_material))
         else:
-            with open(output_path, "w") as f:
-                f.write(header + base_material + body)
-            
\ No newline at end of file
+            variants.append((output_path, base_material))
+
+        #Workers can't use bpy, so the backup preference is read here
+        do_backup = file_utils.get_do_backup_on_overwrite()
+
+        def write_variant(path, material):
+            #The header and material are written before the shared body, rather than concatenated with it, so the body is never copied
+            start_time = time.perf_counter()
+            written = file_utils.write_if_changed(path, [header, material, body], backup=do_backup)
+            return time.perf_counter() - start_time, written
+
+        #Seasons only differ in their material, so they are written at the same time
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, len(variants))) as pool:
+            futures = [(path, material, pool.submit(write_variant, path, material)) for path, material in variants]
+
+        file_utils.log_backups()
+
+        for path, material, future in futures:
+            write_time, written = future.result()
+            if written:
+                log_utils.info(f"Wrote {os.path.basename(path)} in {write_time * 1000:.1f}ms. Header and material {len(header) + len(material)} characters, shared body {len(body)} characters")
+            else:
+                log_utils.info(f"{os.path.basename(path)} is unchanged, checked in {write_time * 1000:.1f}ms")
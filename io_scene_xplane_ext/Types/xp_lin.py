@@ -10,6 +10,9 @@ from ..Helpers import decal_utils #type: ignore
 from ..Helpers import file_utils #type: ignore
 from ..Helpers import misc_utils #type: ignore
 from ..Helpers import log_utils #type: ignore
+from ..Helpers import perf_utils
+from ..Helpers import reader_utils
+from ..Core import formats
 from .. import material_config #type: ignore
 import bpy #type: ignore
 import os
@@ -57,6 +60,7 @@ class line():
         self.imported_decal_commands = []
         self.surface = "NONE"
 
+    @perf_utils.timed("Line write")
     def write(self, output_path):
         log_utils.new_section(f"Writing .lin {output_path}")
 
@@ -146,60 +150,20 @@ class line():
 
             of += str(int(cap.layer)) + " " + str(int(cap.l)) + " " + str(int(cap.c)) + " " + str(int(cap.r)) + " " + str(int(cap.bottom)) + " " + str(int(cap.top)) + "\n"
 
-        #Open the output file and write the contents
-        with open(output_path, 'w') as f:
-            f.write(of)
+        #Write the contents. The file is left alone if nothing changed
+        file_utils.write_if_changed(output_path, of, backup=file_utils.get_do_backup_on_overwrite())
+        file_utils.log_backups()
     
+    @perf_utils.timed("Line read")
     def read(self, in_file):
         log_utils.new_section(f"Reading .lin {in_file}")
 
-        #Read the file
-        with open(in_file, 'r') as f:
-            lines = f.readlines()
-
         uv_scalar_x = 4096
         uv_scalar_y = 4096
 
         #Now we need to parse the file
-        for line in lines:
-            #Get the line
-            line = line.strip()
-
-            #Check for comments
-            if line.startswith("#"):
-                continue
-
-            tokens = line.split()
-            if not tokens:
-                continue
-
-            # Defensive: check token count for each command before using tokens
+        for line, tokens in reader_utils.read_commands(in_file, formats.lin_command_table, skip_comments=True):
             cmd = tokens[0]
-            min_tokens = {
-                'TEXTURE_NORMAL': 3,
-                'TEXTURE_LIT': 2,
-                'TEXTURE': 2,
-                'TEXTURE_MODULATOR': 2,
-                'WEATHER': 2,
-                'NO_BLEND': 2,
-                'DITHER_ALPHA': 2,
-                'TEX_WIDTH': 2,
-                'TEX_HEIGHT': 2,
-                'DECAL': 1,
-                'NORMAL_DECAL': 1,
-                'LAYER_GROUP': 2, # can be 2 or 3, but 2 is safe
-                'MIRROR': 1,
-                'ALIGN': 2,
-                'SCALE': 2, # can be 2 or 3
-                'SURFACE': 2,
-                'S_OFFSET': 5,
-                'START_CAP': 7,
-                'END_CAP': 7,
-            }
-            # Only check if command is in our map
-            if cmd in min_tokens and len(tokens) < min_tokens[cmd]:
-                log_utils.warning(f"Not enough tokens for command '{cmd}'! Expected at least {min_tokens[cmd]}, got {len(tokens)}. Line: '{line}'", f"Too few arguments for '{cmd}'")
-                continue
 
             #Check for material data
             if cmd == "TEXTURE_NORMAL":
@@ -279,6 +243,7 @@ class line():
                 cur_cap.top = float(tokens[6]) / uv_scalar_y
                 self.caps.append(cur_cap)
 
+    @perf_utils.timed("Line from collection")
     def from_collection(self, in_collection):
         log_utils.new_section(f"Reading .lin collection {in_collection.name}")
 
@@ -298,19 +263,22 @@ class line():
             log_utils.error("Error: No segment objects found in collection" + in_collection.name, "Line must have at least segment object")
             return
         
+        #Read all the layer quads up front. Everything below works off these instead of the objects' meshes
+        quads = line_utils.get_layer_quads(exportable_objects)
+
         #Now we want to sort them based on their Z position. While not *necessary*, it makes the output nicer
-        exportable_objects.sort(key=lambda x: line_utils.get_layer_z(x))
+        exportable_objects.sort(key=lambda x: quads[x.name].z)
 
         #Now we need to get the scale. We will get this from the bottom object. It is expected that all objects share the same scale
         scale_x, scale_y = 0, 0
         
-        scale_x, scale_y = line_utils.get_scale_from_layer(exportable_objects[0])
+        scale_x, scale_y = line_utils.get_scale_from_layer(exportable_objects[0], quads[exportable_objects[0].name])
 
         #Now that we do have a scale, we will iterate over every object again and check if it's scale is within a reasonable range. If not, we will throw an error.
         max_scale_diff_x = scale_x * 0.1
         max_scale_diff_y = scale_y * 0.1
         for obj in exportable_objects:
-            local_scale_x, local_scale_y = line_utils.get_scale_from_layer(obj)
+            local_scale_x, local_scale_y = line_utils.get_scale_from_layer(obj, quads[obj.name])
             if abs(local_scale_x - scale_x) > max_scale_diff_x or abs(local_scale_y - scale_y) > max_scale_diff_y:
                 log_utils.error("Error: Object " + obj.name + " has a different UV scale than the rest of the collection. Please make sure all objects share the same UV scale.", f"Object {obj.name} has a different UV scale from other objects")
                 return
@@ -370,16 +338,16 @@ class line():
         # Segments first
         for obj in exportable_objects:
             if obj.xp_lin.type == "SEGMENT":
-                seg = line_utils.get_layer_from_segment_object(obj, current_segment_layer, "SEGMENT")
+                seg = line_utils.get_layer_from_segment_object(obj, current_segment_layer, "SEGMENT", quads[obj.name])
                 self.segments.append(seg)
-                segment_layers.append( (line_utils.get_layer_z(obj), current_segment_layer, False, False) ) #False, False for start and end cap used flags
+                segment_layers.append( (quads[obj.name].z, current_segment_layer, False, False) ) #False, False for start and end cap used flags
                 current_segment_layer += 1
         
         # Now handle caps
         for obj in exportable_objects:
             if obj.xp_lin.type != "SEGMENT":
                 #Find the closest segment layer
-                obj_layer_z = line_utils.get_layer_z(obj)
+                obj_layer_z = quads[obj.name].z
                 closest_idx = -1
                 closest_dist = 9999
                 for i, (layer_z, layer_idx, start_used, end_used) in enumerate(segment_layers):
@@ -398,7 +366,7 @@ class line():
                     if start_used:
                         log_utils.warning(f"Warning: Multiple start caps found for segment layer at Z {seg_layer_z}. Skipping cap object {obj.name}!", f"Multiple start caps found for segment, skipping {obj.name}")
                         continue
-                    cap = line_utils.get_layer_from_segment_object(obj, seg_layer_idx, obj.xp_lin.type)
+                    cap = line_utils.get_layer_from_segment_object(obj, seg_layer_idx, obj.xp_lin.type, quads[obj.name])
                     self.caps.append(cap)
                     #Mark start cap as used
                     segment_layers[closest_idx] = (seg_layer_z, seg_layer_idx, True, end_used)
@@ -406,7 +374,7 @@ class line():
                     if end_used:
                         log_utils.warning(f"Warning: Multiple end caps found for segment layer at Z {seg_layer_z}. Skipping cap object {obj.name}!", f"Multiple end caps found for segment, skipping {obj.name}")
                         continue
-                    cap = line_utils.get_layer_from_segment_object(obj, seg_layer_idx, obj.xp_lin.type)
+                    cap = line_utils.get_layer_from_segment_object(obj, seg_layer_idx, obj.xp_lin.type, quads[obj.name])
                     self.caps.append(cap)
                     #Mark end cap as used
                     segment_layers[closest_idx] = (seg_layer_z, seg_layer_idx, start_used, True)
@@ -13,12 +13,17 @@ from .. import material_config
 from ..Helpers import misc_utils
 from ..Helpers import anim_utils
 from ..Helpers import geometery_utils
+from ..Helpers import vertex_utils
 from ..Helpers import anim_utils
 from ..Helpers import light_data    #These are defines for the parameter layout of PARAM lights
 from ..Helpers import decal_utils
 from ..Helpers import log_utils
+from ..Helpers import perf_utils
+from ..Helpers import reader_utils
+from ..Core import formats
 from ..Helpers import file_utils
 from typing import List
+from ..Helpers.misc_utils import ftos
 
 #Lights don't actually use LODs, but if there are LOD buckets, XP2B requires them to be in *one*. But if there's no LOD buckets they can't be in *any*. So we have a single global variable to set what bucket ot put them in
 obj_does_use_lods = False
@@ -811,7 +816,7 @@ class draw_call:
         Adds the geometry represented by this draw call to the Blender scene as a new mesh object.
 
         Args:
-            all_verts (list): List of all vertex objects (xp_vertex) for the parent X-Plane object.
+            all_verts (vertex_utils.vertex_buffer): All the vertices of the parent X-Plane object.
             all_indicies (list): List of all indices for the parent X-Plane object.
             in_mats (list): List of Blender material(s) to assign to the created mesh. The first material is used.
             in_collection (bpy.types.Collection): The Blender collection to which the new mesh object will be linked.
@@ -836,17 +841,11 @@ class draw_call:
 
         # When adding geometry, we need verts and indicies. We have our range of indicies, and *all* the indicies and *all* the verts
         # So to add them, we need *just* our indicies and verts. So what we do is we get all the indicies we need, in the correct order
-        # Then we iterate through them, getting the verticies they reference, and offsetting the indicies to start idx is at 0 here.
+        # Then we take the verticies they reference, in that order, so our indicies just count up from 0.
         # Then when we pass it to creat_obj_from_draw_call it's in the correct format.
         # Note, we do need to flip the indicies to fix reversed normals. I believe this an XP vs Blender winding thing, (TODO: Double check this) but it works for now
-        dc_indicies = all_indicies[self.start_index:self.start_index+self.length]
-
-        dc_verticies = []
-        for i in range(len(dc_indicies)):
-            dc_verticies.append(all_verts[dc_indicies[i]])
-            dc_indicies[i] = i
-
-        dc_indicies.reverse()
+        dc_verticies = all_verts.take(all_indicies[self.start_index:self.start_index+self.length])
+        dc_indicies = list(range(len(dc_verticies) - 1, -1, -1))
 
         dc_obj = geometery_utils.create_obj_from_draw_call(dc_verticies, dc_indicies, f"TRIS {self.start_index} {self.length}")
         if in_collection is not None:
@@ -1589,7 +1588,7 @@ class object:
 
     #Define instance variables
     def __init__(self):
-        self.verticies = []  #type: List[geometery_utils.xp_vertex]  #List of verticies in the object
+        self.verticies = vertex_utils.vertex_buffer()  #Verticies of the object
         self.indicies = []  #type: List[int]  #List of indices in the object
         self.draw_calls = [] #type: List[draw_call]
         self.lights = []  #type: List[light]
@@ -1639,6 +1638,19 @@ class object:
         self.rain_friction = 1.0
         self.cockpit_regions = []
 
+        #Settings only used by the native writer (write/from_material). Texture paths here are already relative to the output folder
+        self.material_mode = "NORMAL_METALNESS"
+        self.weather_mode = "DEFAULT"
+        self.weather_texture = ""
+        self.mod_texture = ""
+        self.dither_cutoff = 0.5
+        self.is_draped = False
+        self.surface_type = "none"
+        self.surface_is_deck = False
+        self.polygon_offset = 0
+        self.decal_commands = []
+
+    @perf_utils.timed("OBJ read")
     def read(self, in_obj_path):
 
         log_utils.new_section(f"Read .obj {in_obj_path}")
@@ -1658,81 +1670,17 @@ class object:
         cur_manipulator = manipulator()
         cur_in_draped_mat = False
 
-        with open(in_obj_path, "r") as f:
-            lines = f.readlines()
-        
-        for line in lines:
-
-            line = line.strip()
-            tokens = line.split()
-
-            if len(tokens) == 0:
-                continue
-
-            # Defensive: check token count for each command before using tokens
-            cmd = tokens[0]
-            # Map of command to minimum required tokens (based on usage below)
-            min_tokens = {
-                'VT': 9,
-                'IDX10': 11,
-                'IDX': 2,
-                'TRIS': 3,
-                'PARTICLE_SYSTEM': 2,
-                'BLEND_GLASS': 1,
-                'GLOBAL_luminance': 2,
-                'TEXTURE': 2,
-                'TEXTURE_MAP': 3,
-                'TEXTURE_NORMAL': 2,
-                'TEXTURE_DRAPED': 2,
-                'TEXTURE_DRAPED_NORMAL': 3,
-                'TEXTURE_DRAPED_LIT': 2,
-                'TEXTURE_LIT': 2,
-                'GLOBAL_no_blend': 2,
-                'GLOBAL_shadow_blend': 2,
-                'ANIM_trans': 4, # 4 *minimum* tokens, but can be more
-                'ANIM_rotate': 5, # 5 *minimum* tokens, but can be more
-                'ANIM_keyframe_loop': 2,
-                'ANIM_show': 4,
-                'ANIM_hide': 4,
-                'ANIM_rotate_begin': 5,
-                'ANIM_rotate_key': 3,
-                'ANIM_trans_begin': 2,
-                'ANIM_trans_key': 5,
-                'ATTR_LOD': 3,
-                'LIGHT_NAMED': 5,
-                'LIGHT_CUSTOM': 13, #13-14
-                'LIGHT_SPILL_CUSTOM': 13, #13-14
-                'LIGHT_PARAM': 6, # variable, but 6 is minimum
-                'ATTR_hard': 2,
-                'ATTR_hard_deck': 2,
-                'ATTR_layer_group': 3,
-                'ATTR_draped_layer_group': 3,
-                'ATTR_cockpit_device': 5,
-                'ATTR_cockpit_region': 2,
-                'THERMAL_source': 3,
-                'THERMAL_source2': 3,
-                'WIPER_param': 5,
-                'COCKPIT_REGION': 5,
-                'RAIN_SCALE': 2,
-                'RAIN_FRICTION': 2,
-                'THERMAL_texture': 2,
-                'WIPER_texture': 2,
-                'WIPER_blend': 2,
-            }
-            
-            # Only check if command is in our map
-            if cmd in min_tokens and len(tokens) < min_tokens[cmd]:
-                log_utils.warning(f"Not enough tokens for command '{cmd}'! Expected at least {min_tokens[cmd]}, got {len(tokens)}. Line: '{line}'", f"Not enough tokens for command '{cmd}'")
-                continue
+        #VT rows are collected as tuples and turned into the vertex buffer once at the end, which is much faster than appending them one at a time
+        vertex_rows = []
 
+        for line, tokens in reader_utils.read_commands(in_obj_path, formats.obj_command_table):
             if tokens[0] == "VT":
                 #We flip Y and Z because of the way Blender and X-Plane handle coordinates
-                vert = geometery_utils.xp_vertex(
+                vertex_rows.append((
                     float(tokens[1]) * trans_matrix[0], float(tokens[3]) * trans_matrix[1], float(tokens[2]) * trans_matrix[2], 
                     float(tokens[4]) * trans_matrix[0], float(tokens[6]) * trans_matrix[1], float(tokens[5]) * trans_matrix[2], 
                     float(tokens[7]), float(tokens[8])
-                )
-                self.verticies.append(vert)
+                ))
 
             elif tokens[0] == "IDX10":
                 #List of 10 indices
@@ -2387,7 +2335,10 @@ class object:
                 new_wiper.width = float(tokens[4])
 
                 self.wiper_params.append(new_wiper)
+
+        self.verticies.extend(vertex_utils.vertex_buffer.from_rows(vertex_rows))
             
+    @perf_utils.timed("OBJ to scene")
     def to_scene(self):
         log_utils.new_section(f"Creating .obj collection {self.name}")
 
@@ -2743,12 +2694,14 @@ class object:
                 lt.lod_buckets[3] = True
 
         #For the basic draw calls just add 'em to the scene
-        for dc in self.draw_calls:
-            dc.add_to_scene(self.verticies, self.indicies, all_mats, collection)
+        with perf_utils.span("Add draw calls"):
+            for dc in self.draw_calls:
+                dc.add_to_scene(self.verticies, self.indicies, all_mats, collection)
 
         #For basic lights just add them
-        for lt in self.lights:
-            lt.add_to_scene(collection)
+        with perf_utils.span("Add lights"):
+            for lt in self.lights:
+                lt.add_to_scene(collection)
 
         def check_for_something_to_add_in_anims(level):
             found_something = False
@@ -2769,13 +2722,278 @@ class object:
 
         #Now that we have the basic geometery, we need to add the animated stuff.
         #This is very simple. We iterate through all our root animation levels, and add them to the scene. Aka we call the function to do the hard (sort of) stuff
-        for anim in self.anims:
-            #BUT! It's possible that this is an animation whose objects are *all* lod duplicates, leading to no DCs! So we need to check all it's actions to make sure there is at least *one* dc/light that isn't a lod duplicate
-            if not obj_does_use_lods or check_for_something_to_add_in_anims(anim):
-                anim.add_to_scene(None, self.verticies, self.indicies, all_mats, collection)
-            else:
-                log_utils.info(f"Animation in object {self.name} has no draw calls or lights that are not LOD duplicates. Skipping animation.")
+        with perf_utils.span("Add animations"):
+            for anim in self.anims:
+                #BUT! It's possible that this is an animation whose objects are *all* lod duplicates, leading to no DCs! So we need to check all it's actions to make sure there is at least *one* dc/light that isn't a lod duplicate
+                if not obj_does_use_lods or check_for_something_to_add_in_anims(anim):
+                    anim.add_to_scene(None, self.verticies, self.indicies, all_mats, collection)
+                else:
+                    log_utils.info(f"Animation in object {self.name} has no draw calls or lights that are not LOD duplicates. Skipping animation.")
         
         #Lastly, we'll go through and update the materials
-        for mat in all_mats:
-            material_config.update_settings(mat)
\ No newline at end of file
+        with perf_utils.span("Update materials"):
+            for mat in all_mats:
+                material_config.update_settings(mat)
+
+    @staticmethod
+    def get_unsupported_material_reason(in_material):
+        """
+        Checks if a material only uses settings that the native writer supports.
+        Args:
+            in_material (bpy.types.Material): The material to check.
+        Returns:
+            str: Empty if the material is supported, otherwise the reason it is not.
+        """
+        if in_material is None:
+            return "no material assigned"
+
+        xp_mat = in_material.xp_materials
+
+        if xp_mat.material_mode not in ("NORMAL_METALNESS", "NORMAL_TRANSLUCENCY"):
+            return f"material mode {xp_mat.material_mode}"
+        if xp_mat.local_no_lit or xp_mat.light_level_override:
+            return "light level overrides"
+        if xp_mat.draped and not file_utils.is_empty(xp_mat.normal_texture):
+            return "draped normal maps"
+        if in_material.xplane.cockpit_feature != 'none':
+            return "cockpit features"
+
+        return ""
+
+    def from_material(self, in_material, output_folder):
+        """
+        Sets the header/material settings of this object from an X-Plane material. Paths are made relative to output_folder.
+        Args:
+            in_material (bpy.types.Material): The material to get the settings from.
+            output_folder (str): The folder the .obj will be written to.
+        """
+        xp_mat = in_material.xp_materials
+
+        def rel(in_path):
+            if file_utils.is_empty(in_path):
+                return ""
+            return file_utils.to_relative(file_utils.to_absolute(in_path), False, output_folder)
+
+        self.alb_texture = rel(xp_mat.alb_texture)
+        self.lit_texture = rel(xp_mat.lit_texture)
+        self.nml_texture = rel(xp_mat.normal_texture)
+        self.mat_texture = rel(xp_mat.material_texture) if xp_mat.do_separate_material_texture else ""
+        self.mod_texture = rel(xp_mat.decal_modulator)
+        self.weather_mode = xp_mat.weather_mode
+        self.weather_texture = rel(xp_mat.weather_texture)
+        self.material_mode = xp_mat.material_mode
+        self.brightness = int(xp_mat.brightness) if xp_mat.brightness > 0 else -1
+        self.blend_mode = xp_mat.blend_mode
+        self.blend_cutoff = xp_mat.blend_cutoff
+        self.dither_cutoff = xp_mat.dither_cutoff
+        self.cast_shadow = xp_mat.cast_shadow
+        self.is_draped = xp_mat.draped
+        self.surface_type = xp_mat.surface_type.lower()
+        self.surface_is_deck = xp_mat.surface_is_deck
+        self.polygon_offset = xp_mat.polygon_offset
+        self.obj_mode = "scenery"
+
+        if self.is_draped:
+            self.draped_alb_texture = self.alb_texture
+            self.draped_lit_texture = self.lit_texture
+            self.draped_layer_group = xp_mat.layer_group.lower()
+            self.draped_layer_group_offset = xp_mat.layer_group_offset
+        else:
+            self.layer_group = xp_mat.layer_group.lower()
+            self.layer_group_offset = xp_mat.layer_group_offset
+
+        self.decal_commands = []
+        for decal in xp_mat.decals:
+            decal_command = decal_utils.get_decal_command(decal, output_folder)
+            if decal_command:
+                self.decal_commands.append(decal_command.strip())
+
+    def add_static_geometry(self, in_vertices, lod_ranges):
+        """
+        Appends static geometry to this object, and adds a draw call for it in each of the given LOD ranges.
+        Args:
+            in_vertices (np.ndarray): (N, 8) array of loc x/y/z, normal x/y/z, uv x/y for each triangle corner, in Blender coordinates.
+            lod_ranges (list of Tuple[float, float]): LOD (near, far) ranges to draw the geometry in. (0, 0) means no LOD.
+        """
+        if len(in_vertices) == 0:
+            return
+
+        start_vertex = len(self.verticies)
+        start_index = len(self.indicies)
+
+        self.verticies.extend(vertex_utils.vertex_buffer.from_rows(in_vertices))
+        self.indicies.extend(range(start_vertex, start_vertex + len(in_vertices)))
+
+        for lod_start, lod_end in lod_ranges:
+            dc = draw_call()
+            dc.start_index = start_index
+            dc.length = len(in_vertices)
+            dc.lod_start = lod_start
+            dc.lod_end = lod_end
+            dc.state.draped = self.is_draped
+            dc.state.surface_type = self.surface_type
+            self.draw_calls.append(dc)
+
+    def add_named_light(self, name, location, lod_ranges):
+        """
+        Adds a static LIGHT_NAMED light in each of the given LOD ranges.
+        Args:
+            name (str): The X-Plane light name.
+            location (Tuple[float, float, float]): Location in Blender coordinates.
+            lod_ranges (list of Tuple[float, float]): LOD (near, far) ranges to draw the light in.
+        """
+        for lod_start, lod_end in lod_ranges:
+            new_light = light()
+            new_light.xp_type = "named"
+            new_light.name = name
+            new_light.loc_x, new_light.loc_y, new_light.loc_z = location
+            new_light.lod_start = lod_start
+            new_light.lod_end = lod_end
+            self.lights.append(new_light)
+
+    def to_string(self):
+        """
+        Formats this object as an OBJ8 file. Only static geometry and named lights are written.
+        This does not touch any Blender data, so it is safe to call from worker threads.
+        Returns:
+            str: The file contents.
+        """
+        out = ["I", "800", "OBJ", ""]
+
+        #Textures
+        if not file_utils.is_empty(self.alb_texture):
+            out.append("TEXTURE " + self.alb_texture)
+        if not file_utils.is_empty(self.lit_texture):
+            out.append("TEXTURE_LIT " + self.lit_texture)
+        if not file_utils.is_empty(self.mat_texture):
+            if not file_utils.is_empty(self.nml_texture):
+                out.append("TEXTURE_MAP normal " + self.nml_texture)
+            out.append("TEXTURE_MAP material_gloss " + self.mat_texture)
+        elif not file_utils.is_empty(self.nml_texture):
+            out.append("TEXTURE_NORMAL " + self.nml_texture)
+        if self.is_draped and not file_utils.is_empty(self.draped_alb_texture):
+            out.append("TEXTURE_DRAPED " + self.draped_alb_texture)
+            if not file_utils.is_empty(self.draped_lit_texture):
+                out.append("TEXTURE_DRAPED_LIT " + self.draped_lit_texture)
+        if not file_utils.is_empty(self.mod_texture):
+            out.append("TEXTURE_MODULATOR " + self.mod_texture)
+
+        if not file_utils.is_empty(self.nml_texture) and self.material_mode == "NORMAL_METALNESS":
+            out.append("NORMAL_METALNESS")
+        elif self.material_mode == "NORMAL_TRANSLUCENCY":
+            out.append("NORMAL_TRANSLUCENCY")
+
+        if self.weather_mode == "TRANSPARENT":
+            out.append("WEATHER_TRANSPARENT")
+        elif self.weather_mode == "NONE":
+            out.append("WEATHER_NONE")
+        elif self.weather_mode == "TEXTURE" and not file_utils.is_empty(self.weather_texture):
+            out.append("WEATHER " + self.weather_texture)
+
+        out.extend(self.decal_commands)
+
+        if not file_utils.is_empty(self.lit_texture) and self.brightness > 0:
+            out.append(f"GLOBAL_luminance {int(self.brightness)}")
+
+        if self.blend_mode == "CLIP":
+            out.append("GLOBAL_no_blend " + ftos(self.blend_cutoff, 2))
+        elif self.blend_mode == "SHADOW":
+            out.append("GLOBAL_shadow_blend " + ftos(self.blend_cutoff, 2))
+        elif self.blend_mode == "DITHER":
+            out.append("DITHER_ALPHA " + ftos(self.dither_cutoff, 2))
+
+        if not self.cast_shadow:
+            out.append("GLOBAL_no_shadow")
+
+        if self.is_draped:
+            out.append(f"ATTR_layer_group_draped {self.draped_layer_group} {self.draped_layer_group_offset}")
+        else:
+            out.append(f"ATTR_layer_group {self.layer_group} {self.layer_group_offset}")
+
+        out.append("")
+        out.append(f"POINT_COUNTS {len(self.verticies)} 0 0 {len(self.indicies)}")
+        out.append("")
+
+        #Positions and normals go from Blender (x, y, z) to X-Plane (x, z, -y). This is a rotation, so it doesn't change which way a triangle faces
+        #The winding is reversed because X-Plane treats clockwise triangles as front facing, where Blender's corners are counter-clockwise. The importer reverses them back the same way
+        out.extend(self.verticies.get_lines("VT", vertex_utils.obj_blender_to_xplane))
+        out.append("")
+
+        out_indicies = []
+        for i in range(0, len(self.indicies) - 2, 3):
+            out_indicies.append(self.indicies[i + 2])
+            out_indicies.append(self.indicies[i + 1])
+            out_indicies.append(self.indicies[i])
+
+        full_rows = len(out_indicies) // 10 * 10
+        for i in range(0, full_rows, 10):
+            out.append("IDX10 " + " ".join(str(idx) for idx in out_indicies[i:i + 10]))
+        for idx in out_indicies[full_rows:]:
+            out.append(f"IDX {idx}")
+        out.append("")
+
+        #Commands. These are grouped by LOD range. A range of (0, 0) means the object has no LODs
+        lod_ranges = []
+        for dc in self.draw_calls:
+            if (dc.lod_start, dc.lod_end) not in lod_ranges:
+                lod_ranges.append((dc.lod_start, dc.lod_end))
+        for lt in self.lights:
+            if (lt.lod_start, lt.lod_end) not in lod_ranges:
+                lod_ranges.append((lt.lod_start, lt.lod_end))
+
+        #Anything without a LOD range is written once, before the ranged LODs. Once an OBJ uses ATTR_LOD everything must be in one (and ATTR_LOD must be the first command),
+        #so when there are ranged LODs it goes in a single additive LOD that covers all of them, instead of being repeated in each
+        ranged_lods = sorted(r for r in lod_ranges if r != (0, 0))
+        lod_blocks = []
+        if (0, 0) in lod_ranges:
+            lod_blocks.append(((0, 0), (0, max((r[1] for r in ranged_lods), default=0))))
+        for lod_range in ranged_lods:
+            lod_blocks.append((lod_range, lod_range))
+
+        for lod_range, written_range in lod_blocks:
+            #The state resets at each LOD, so the attributes are written again for each one
+            if written_range != (0, 0):
+                out.append(f"ATTR_LOD {ftos(written_range[0], 2)} {ftos(written_range[1], 2)}")
+
+            if self.polygon_offset > 0:
+                out.append(f"ATTR_poly_os {self.polygon_offset}")
+            if self.surface_type != "none":
+                out.append(("ATTR_hard_deck " if self.surface_is_deck else "ATTR_hard ") + self.surface_type)
+            if self.is_draped:
+                out.append("ATTR_draped")
+
+            #Merge draw calls that are back to back in the index buffer so we emit as few TRIS as possible
+            cur_start = -1
+            cur_length = 0
+            for dc in self.draw_calls:
+                if (dc.lod_start, dc.lod_end) != lod_range:
+                    continue
+                if cur_start != -1 and cur_start + cur_length == dc.start_index:
+                    cur_length += dc.length
+                    continue
+                if cur_start != -1:
+                    out.append(f"TRIS {cur_start} {cur_length}")
+                cur_start = dc.start_index
+                cur_length = dc.length
+            if cur_start != -1:
+                out.append(f"TRIS {cur_start} {cur_length}")
+
+            for lt in self.lights:
+                if (lt.lod_start, lt.lod_end) == lod_range:
+                    out.append(f"LIGHT_NAMED {lt.name} {ftos(lt.loc_x, 8)} {ftos(lt.loc_z, 8)} {ftos(-lt.loc_y, 8)}")
+
+        out.append("")
+
+        return "\n".join(out)
+
+    @perf_utils.timed("OBJ write")
+    def write(self, output_path, backup=False):
+        """
+        Writes this object to an OBJ8 file. See to_string for what is supported. Doesn't use bpy, so it can run on a worker thread.
+        Args:
+            output_path (str): The path to write the .obj to.
+            backup (bool): Whether to back up the existing file before replacing it. See file_utils.write_if_changed.
+        """
+        contents = self.to_string()
+
+        file_utils.write_if_changed(output_path, contents, backup=backup)
@@ -10,7 +10,11 @@ from ..Helpers import decal_utils #type: ignore
 from ..Helpers import file_utils #type: ignore
 from ..Helpers import misc_utils #type: ignore
 from ..Helpers import geometery_utils
+from ..Helpers import vertex_utils
 from ..Helpers import log_utils #type: ignore
+from ..Helpers import perf_utils
+from ..Helpers import reader_utils
+from ..Core import formats
 from .. import material_config #type: ignore
 import bpy #type: ignore
 import os
@@ -63,6 +67,7 @@ class polygon():
 
         self.subtextures = [[]] #List of arrays of 4 values (translating to left, bottom, right, top, UVs)
 
+    @perf_utils.timed("Polygon write")
     def write(self, output_path):
         log_utils.new_section(f"Writing .pol {output_path}")
 
@@ -154,53 +159,19 @@ class polygon():
             #Write the subtexture
             of += "#subtex " + misc_utils.ftos(subtexture[0], 4) + " " + misc_utils.ftos(subtexture[1], 4) + " " + misc_utils.ftos(subtexture[2], 4) + " " + misc_utils.ftos(subtexture[3], 4) + "\n"
 
-        #Open the output file and write the contents
-        with open(output_path, 'w') as f:
-            f.write(of)
+        #Write the contents. The file is left alone if nothing changed
+        file_utils.write_if_changed(output_path, of, backup=file_utils.get_do_backup_on_overwrite())
+        file_utils.log_backups()
 
+    @perf_utils.timed("Polygon read")
     def read(self, in_file):
         log_utils.new_section(f"Reading .pol {in_file}")
 
         self.name = in_file.split(os.sep)[-1]
 
-        # Read the file
-        with open(in_file, 'r') as f:
-            lines = f.readlines()
-
         # Now we need to parse the file
-        for line in lines:
-            # Get the line
-            line = line.strip()
-
-            tokens = line.split()
-            if not tokens:
-                continue
-
-            # Defensive: check token count for each command before using tokens
+        for line, tokens in reader_utils.read_commands(in_file, formats.pol_command_table):
             cmd = tokens[0]
-            min_tokens = {
-                'TEXTURE_NOWRAP': 2,
-                'TEXTURE_LIT_NOWRAP': 2,
-                'TEXTURE_NORMAL': 3,
-                'TEXTURE_MODULATOR': 2,
-                'TEXTURE': 2,
-                'TEXTURE_LIT': 2,
-                'WEATHER': 2,
-                'SUPER_ROUGHNESS': 1,
-                'NO_BLEND': 2,
-                'DITHER_ALPHA': 2,
-                'LAYER_GROUP': 2, # can be 2 or 3, but 2 is safe
-                'SCALE': 3,
-                'SURFACE': 2,
-                'LOAD_CENTER': 5,
-                'TEXTURE_TILE': 6,
-                'RUNWAY_MARKINGS': 6,
-                'RUNWAY_NOISE': 1,
-                '#subtex': 5,
-            }
-            if cmd in min_tokens and len(tokens) < min_tokens[cmd]:
-                log_utils.warning(f"Not enough tokens for command '{cmd}'! Expected at least {min_tokens[cmd]}, got {len(tokens)}. Line: '{line}'", f"Command had too few tokens")
-                continue
 
             # Check for material data
             if cmd == "TEXTURE_NOWRAP":
@@ -284,6 +255,7 @@ class polygon():
                 subtexture = [float(i) for i in subtexture]
                 self.subtextures.append(subtexture)
 
+    @perf_utils.timed("Polygon from collection")
     def from_collection(self, in_collection):
         log_utils.new_section(f"Reading .pol collection {in_collection.name}")
 
@@ -398,6 +370,7 @@ class polygon():
                     subtexture = [uvs[0], uvs[2], uvs[1], uvs[3]]
                     self.subtextures.append(subtexture)
 
+    @perf_utils.timed("Polygon to scene")
     def to_scene(self):
         log_utils.new_section(f"Creating .pol collection {self.name}")
 
@@ -477,52 +450,16 @@ class polygon():
 
         #Generate the base object
         if True:    #So we can collapse this code
-            v1 = geometery_utils.xp_vertex(
-                loc_x=0,
-                loc_y=0,
-                loc_z=0,
-                normal_x=0,
-                normal_y=0,
-                normal_z=1,
-                uv_x=0,
-                uv_y=0
-            )
-
-            v2 = geometery_utils.xp_vertex(
-                loc_x=0,
-                loc_y=self.scale_y,
-                loc_z=0,
-                normal_x=0,
-                normal_y=0,
-                normal_z=1,
-                uv_x=0, 
-                uv_y=1
-            )
-
-            v3 = geometery_utils.xp_vertex(
-                loc_x=self.scale_x,
-                loc_y=self.scale_y,
-                loc_z=0,
-                normal_x=0,
-                normal_y=0,
-                normal_z=1,
-                uv_x=1,
-                uv_y=1
-            )
-
-            v4 = geometery_utils.xp_vertex(
-                loc_x=self.scale_x,
-                loc_y=0,
-                loc_z=0,
-                normal_x=0,
-                normal_y=0,
-                normal_z=1,
-                uv_x=1,
-                uv_y=0
-            )
+            #Bottom left, upper left, upper right, bottom right
+            verts = vertex_utils.vertex_buffer.from_rows([
+                (0, 0, 0, 0, 0, 1, 0, 0),
+                (0, self.scale_y, 0, 0, 0, 1, 0, 1),
+                (self.scale_x, self.scale_y, 0, 0, 0, 1, 1, 1),
+                (self.scale_x, 0, 0, 0, 0, 1, 1, 0),
+            ])
 
             indicies = [2, 1, 0, 3, 2, 0]
-            new_obj = geometery_utils.create_obj_from_draw_call([v1, v2, v3, v4], indicies, new_collection.name)
+            new_obj = geometery_utils.create_obj_from_draw_call(verts, indicies, new_collection.name)
             new_obj.data.materials.append(mat)
 
             #Link the new object to the collection
@@ -531,52 +468,18 @@ class polygon():
         # Generate objects for subtextures
         for i, subtexture in enumerate(self.subtextures):
 
-            v1 = geometery_utils.xp_vertex(
-                loc_x=subtexture[0] * self.scale_x,
-                loc_y=subtexture[1] * self.scale_y,
-                loc_z=1 + (float(i) * 0.01),
-                normal_x=0,
-                normal_y=0,
-                normal_z=1,
-                uv_x=subtexture[0],
-                uv_y=subtexture[1]
-            )
-
-            v2 = geometery_utils.xp_vertex(
-                loc_x=subtexture[0] * self.scale_x,
-                loc_y=subtexture[3] * self.scale_y,
-                loc_z=1 + (float(i) * 0.01),
-                normal_x=0,
-                normal_y=0,
-                normal_z=1,
-                uv_x=subtexture[0],
-                uv_y=subtexture[3]
-            )
-
-            v3 = geometery_utils.xp_vertex(
-                loc_x=subtexture[2] * self.scale_x,
-                loc_y=subtexture[3] * self.scale_y,
-                loc_z=1 + (float(i) * 0.01),
-                normal_x=0,
-                normal_y=0,
-                normal_z=1,
-                uv_x=subtexture[2],
-                uv_y=subtexture[3]
-            )
-
-            v4 = geometery_utils.xp_vertex(
-                loc_x=subtexture[2] * self.scale_x,
-                loc_y=subtexture[1] * self.scale_y,
-                loc_z=1 + (float(i) * 0.01),
-                normal_x=0,
-                normal_y=0,
-                normal_z=1,
-                uv_x=subtexture[2],
-                uv_y=subtexture[1]
-            )
+            height = 1 + (float(i) * 0.01)
+            left, bottom, right, top = subtexture[0], subtexture[1], subtexture[2], subtexture[3]
+
+            verts = vertex_utils.vertex_buffer.from_rows([
+                (left * self.scale_x, bottom * self.scale_y, height, 0, 0, 1, left, bottom),
+                (left * self.scale_x, top * self.scale_y, height, 0, 0, 1, left, top),
+                (right * self.scale_x, top * self.scale_y, height, 0, 0, 1, right, top),
+                (right * self.scale_x, bottom * self.scale_y, height, 0, 0, 1, right, bottom),
+            ])
 
             indicies = [2, 1, 0, 3, 2, 0]
 
-            new_obj = geometery_utils.create_obj_from_draw_call([v1, v2, v3, v4], indicies, new_collection.name + "_subtexture")
+            new_obj = geometery_utils.create_obj_from_draw_call(verts, indicies, new_collection.name + "_subtexture")
             new_obj.data.materials.append(mat)
             new_collection.objects.link(new_obj)
@@ -9,6 +9,7 @@ from . import props
 from . import ui
 from . import operators
 from . import material_config
+from .Helpers import perf_utils
 
 import bpy # type: ignore
 
@@ -24,6 +25,9 @@ bl_info = {
     "category": "Import-Export"
 }
 
+def update_timing_profile(self, context):
+    perf_utils.set_enabled(self.do_timing_profile, bpy.path.abspath(self.timing_trace_path) if self.timing_trace_path != "" else "")
+
 class XP_EXT_prefs(bpy.types.AddonPreferences):
     bl_idname = __name__
 
@@ -85,6 +89,21 @@ class XP_EXT_prefs(bpy.types.AddonPreferences):
         default=True,
     ) #type: ignore
 
+    do_timing_profile: bpy.props.BoolProperty(
+        name="Profile Import/Export Timings",
+        description="Time each phase of importing, exporting, and baking. A nested timing tree is written to the log when messages are displayed",
+        default=False,
+        update=update_timing_profile
+    ) #type: ignore
+
+    timing_trace_path: bpy.props.StringProperty(
+        name="Timing Trace Path",
+        description="If set, timings are also saved to this path as a Chrome trace .json (open with chrome://tracing or Perfetto)",
+        default="",
+        subtype='FILE_PATH',
+        update=update_timing_profile
+    ) #type: ignore
+
 
     def draw(self, context):
         layout = self.layout
@@ -94,6 +113,9 @@ class XP_EXT_prefs(bpy.types.AddonPreferences):
         layout.prop(self, "show_only_relevant_settings")
         layout.prop(self, "always_fully_reload_images")
         layout.prop(self, "do_backup_on_overwrite")
+        layout.prop(self, "do_timing_profile")
+        if self.do_timing_profile:
+            layout.prop(self, "timing_trace_path")
 
         layout.separator()
 
@@ -113,6 +135,10 @@ def pre_save(dummy):
 
 def register():
     bpy.utils.register_class(XP_EXT_prefs)
+    try:
+        update_timing_profile(bpy.context.preferences.addons[__name__].preferences, bpy.context)
+    except KeyError:
+        pass
     props.register()
     operators.register()
     ui.register()
@@ -5,12 +5,46 @@
 #Purpose:   Provides logic for creating animations for X-Plane from Blender unique sources (i.e. mesh deformations)
 
 import bpy
+import numpy as np
 
 from .Helpers import anim_utils
+from .Helpers import log_utils
+
+def get_mesh_geometry_arrays(mesh):
+    """
+    Read the geometry of a mesh into flat NumPy arrays so frames can be compared cheaply.
+
+    :param mesh: The mesh to read.
+    :return: A tuple of (vertex coordinates, polygon loop totals, loop vertex indices) as flat arrays.
+    """
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", coords)
+
+    loop_totals = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+
+    loop_verts = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_verts)
+
+    return coords, loop_totals, loop_verts
+
+def geometry_arrays_equal(a, b):
+    """
+    Check if two sets of arrays from get_mesh_geometry_arrays describe identical geometry.
+
+    :param a: The first tuple of geometry arrays.
+    :param b: The second tuple of geometry arrays.
+    :return: True if the topology and vertex positions are identical, False otherwise.
+    """
+    if a is None or b is None:
+        return False
+    return all(np.array_equal(x, y) for x, y in zip(a, b))
 
 def create_flipbook_animation(in_obj, dataref, start_value, end_value, loop_value, start_frame, end_frame, keyframe_interval, apply_parent_transform=False):
     """
     Create a flipbook animation for the given object.
+    Each frame is evaluated through the depsgraph and becomes a new object built directly with the data API (no operators, so no undo steps or selection changes).
+    Consecutive frames with identical geometry (i.e. held poses) share the same mesh datablock.
 
     :param in_obj: The object to animate.
     :param dataref: The dataref to use for the animation.
@@ -20,6 +54,8 @@ def create_flipbook_animation(in_obj, dataref, start_value, end_value, loop_valu
     :param start_frame: The frame to start the animation on.
     :param end_frame: The frame to end the animation on.
     :param keyframe_interval: The interval between keyframes.
+    :param apply_parent_transform: Bake the parent transform into each frame object instead of parenting it.
+    :return: A tuple of (number of frames generated, number of unique meshes created)
     """
     #Get the number of frames that we'll freeze at
     num_frames = (end_frame - start_frame) // keyframe_interval + 1
@@ -27,45 +63,53 @@ def create_flipbook_animation(in_obj, dataref, start_value, end_value, loop_valu
     #Get the value interval
     value_interval = (end_value - start_value) / num_frames
 
-    depsgraph = bpy.context.evaluated_depsgraph_get()
+    scene = bpy.context.scene
+    target_collections = list(in_obj.users_collection)
+    if len(target_collections) == 0:
+        target_collections = [scene.collection]
+
+    prior_mesh = None
+    prior_geometry = None
+    unique_meshes = 0
 
     for frame in range(0, num_frames):
-        #Get the frame
+        #Get the frame. frame_set re-evaluates the depsgraph (including simulations) so we don't need a separate view layer update
         frame_num = start_frame + (frame * keyframe_interval)
-
-        bpy.context.scene.frame_set(frame_num)
-        bpy.context.view_layer.update()
+        scene.frame_set(frame_num)
 
         # Get the evaluated object with cloth deformation
+        depsgraph = bpy.context.evaluated_depsgraph_get()
         eval_obj = in_obj.evaluated_get(depsgraph)
+        eval_mesh = eval_obj.to_mesh()
+
+        #Reuse the last mesh if this frame is identical to it, otherwise make a real datablock copy
+        geometry = get_mesh_geometry_arrays(eval_mesh)
+        if prior_mesh is not None and geometry_arrays_equal(geometry, prior_geometry):
+            mesh_copy = prior_mesh
+        else:
+            mesh_copy = eval_mesh.copy()
+            mesh_copy.name = f"{in_obj.name}_anim_{frame_num}"
+            prior_mesh = mesh_copy
+            prior_geometry = geometry
+            unique_meshes += 1
 
-        # Copy the mesh data from the evaluated object
-        mesh_copy = eval_obj.to_mesh().copy()  # Make a real datablock copy
+        # Free the mesh when done (to avoid memory leaks)
+        eval_obj.to_mesh_clear()
 
-        #Duplicat the object via operators, then we will clear modifiers, and replace it's mesh data with mesh_copy
-        bpy.ops.object.select_all(action='DESELECT')
-        in_obj.select_set(True)
-        bpy.context.view_layer.objects.active = in_obj
-        bpy.ops.object.duplicate()
-        anim_obj = bpy.context.active_object
+        #Copy the source object so it keeps it's X-Plane properties, custom properties, visibility, display settings, and object linked materials.
+        #The modifiers and animation are already baked into the mesh, so they are removed from the copy
+        anim_obj = in_obj.copy()
         anim_obj.name = f"{in_obj.name}_anim_{frame_num}"
-
-        # Clear all modifiers
         anim_obj.modifiers.clear()
-
+        anim_obj.animation_data_clear()
         anim_obj.data = mesh_copy
+        for col in target_collections:
+            col.objects.link(anim_obj)
 
-        if apply_parent_transform:
-            if anim_obj.parent:
-                # Store the world matrix
-                world_matrix = anim_obj.matrix_world.copy()
-                # Clear parent
-                anim_obj.parent = None
-                # Restore world matrix
-                anim_obj.matrix_world = world_matrix
-
-        # Free the mesh when done (to avoid memory leaks)
-        eval_obj.to_mesh_clear()
+        #The copy has the source's transform at this frame. If requested, unparent it and bake the parent's transform in
+        if apply_parent_transform and in_obj.parent is not None:
+            anim_obj.parent = None
+            anim_obj.matrix_world = in_obj.matrix_world.copy()
 
         #Now we need to setup the animation. So we need to get the start value, and the end value, then add the animations
         start_dref_value = start_value + value_interval * frame
@@ -93,6 +137,10 @@ def create_flipbook_animation(in_obj, dataref, start_value, end_value, loop_valu
             anim_obj.xplane.datarefs[-1].show_hide_v2 = end_value + (value_interval * 0.01)
             anim_obj.xplane.datarefs[-1].loop = loop_value
 
+    log_utils.info(f"Flipbook for {in_obj.name} generated {num_frames} frames using {unique_meshes} unique meshes")
+
+    return num_frames, unique_meshes
+
 def auto_keyframe(in_obj: bpy.types.Object, dataref, start_value, end_value, loop_value, start_frame, end_frame, keyframe_interval, add_intermediate_keyframes):
     """
     Automatically keyframe the given object for the specified dataref.
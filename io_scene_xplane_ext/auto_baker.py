@@ -6,9 +6,11 @@
 
 from .Helpers import bake_utils
 from .Helpers import log_utils
+from .Helpers import perf_utils
 import bpy
 
 # Iterates through all the channels to bake, configuring all source materials, calling blender bake, then saving the textures. Once all channels have been baked, normals are merged, then the target textures are saved the source materials reverted
+@perf_utils.timed("Auto bake")
 def auto_bake_current_to_active():
     #Make the active object no longer be selected (so changes don't affect it)
     bpy.context.view_layer.objects.active.select_set(False)
@@ -72,10 +74,11 @@ def auto_bake_current_to_active():
     if do_bake_alb:
         log_utils.new_section("Baking low poly model to high poly model")
         log_utils.info("Baking base")
-        bake_utils.config_source_materials(bake_utils.BakeType.BASE, mats)
-        bake_utils.config_target_bake_texture(bpy.context.view_layer.objects.active, bake_utils.BakeType.BASE, bpy.context.scene.xp_ext.low_poly_bake_resolution * bpy.context.scene.xp_ext.low_poly_bake_ss_factor)
-        bake_utils.config_bake_settings(bake_utils.BakeType.BASE)
-        bpy.ops.object.bake(type=bpy.context.scene.cycles.bake_type)
+        with perf_utils.span("Bake base"):
+            bake_utils.config_source_materials(bake_utils.BakeType.BASE, mats)
+            bake_utils.config_target_bake_texture(bpy.context.view_layer.objects.active, bake_utils.BakeType.BASE, bpy.context.scene.xp_ext.low_poly_bake_resolution * bpy.context.scene.xp_ext.low_poly_bake_ss_factor)
+            bake_utils.config_bake_settings(bake_utils.BakeType.BASE)
+            bpy.ops.object.bake(type=bpy.context.scene.cycles.bake_type)
         log_utils.info("Base baked")
     else:
         log_utils.info("Skipping base bake as no albedo textures were found")
@@ -84,10 +87,11 @@ def auto_bake_current_to_active():
 
     if do_bake_opacity:
         log_utils.info("Baking opacity")
-        bake_utils.config_source_materials(bake_utils.BakeType.OPACITY, mats)
-        bake_utils.config_target_bake_texture(bpy.context.view_layer.objects.active, bake_utils.BakeType.OPACITY, bpy.context.scene.xp_ext.low_poly_bake_resolution * bpy.context.scene.xp_ext.low_poly_bake_ss_factor)
-        bake_utils.config_bake_settings(bake_utils.BakeType.OPACITY)
-        bpy.ops.object.bake(type=bpy.context.scene.cycles.bake_type)
+        with perf_utils.span("Bake opacity"):
+            bake_utils.config_source_materials(bake_utils.BakeType.OPACITY, mats)
+            bake_utils.config_target_bake_texture(bpy.context.view_layer.objects.active, bake_utils.BakeType.OPACITY, bpy.context.scene.xp_ext.low_poly_bake_resolution * bpy.context.scene.xp_ext.low_poly_bake_ss_factor)
+            bake_utils.config_bake_settings(bake_utils.BakeType.OPACITY)
+            bpy.ops.object.bake(type=bpy.context.scene.cycles.bake_type)
         log_utils.info("Opacity baked")
 
     bpy.context.window_manager.progress_update(30)
@@ -95,10 +99,11 @@ def auto_bake_current_to_active():
     #Normal. We need to config source materials, config target material, config bake settings, bake
     if do_bake_nrm:
         log_utils.info("Baking normal")
-        bake_utils.config_source_materials(bake_utils.BakeType.NORMAL, mats)
-        bake_utils.config_target_bake_texture(bpy.context.view_layer.objects.active, bake_utils.BakeType.NORMAL, bpy.context.scene.xp_ext.low_poly_bake_resolution * bpy.context.scene.xp_ext.low_poly_bake_ss_factor)
-        bake_utils.config_bake_settings(bake_utils.BakeType.NORMAL)
-        bpy.ops.object.bake(type='NORMAL')
+        with perf_utils.span("Bake normal"):
+            bake_utils.config_source_materials(bake_utils.BakeType.NORMAL, mats)
+            bake_utils.config_target_bake_texture(bpy.context.view_layer.objects.active, bake_utils.BakeType.NORMAL, bpy.context.scene.xp_ext.low_poly_bake_resolution * bpy.context.scene.xp_ext.low_poly_bake_ss_factor)
+            bake_utils.config_bake_settings(bake_utils.BakeType.NORMAL)
+            bpy.ops.object.bake(type='NORMAL')
         log_utils.info("Normal baked")
 
     if do_bake_mat:
@@ -106,20 +111,22 @@ def auto_bake_current_to_active():
 
         #Roughness. We need to config source materials, config target material, config bake settings, bake
         log_utils.info("Baking roughness")
-        bake_utils.config_source_materials(bake_utils.BakeType.ROUGHNESS, mats)
-        bake_utils.config_target_bake_texture(bpy.context.view_layer.objects.active, bake_utils.BakeType.ROUGHNESS, bpy.context.scene.xp_ext.low_poly_bake_resolution * bpy.context.scene.xp_ext.low_poly_bake_ss_factor)
-        bake_utils.config_bake_settings(bake_utils.BakeType.ROUGHNESS)
-        bpy.ops.object.bake(type=bpy.context.scene.cycles.bake_type)
+        with perf_utils.span("Bake roughness"):
+            bake_utils.config_source_materials(bake_utils.BakeType.ROUGHNESS, mats)
+            bake_utils.config_target_bake_texture(bpy.context.view_layer.objects.active, bake_utils.BakeType.ROUGHNESS, bpy.context.scene.xp_ext.low_poly_bake_resolution * bpy.context.scene.xp_ext.low_poly_bake_ss_factor)
+            bake_utils.config_bake_settings(bake_utils.BakeType.ROUGHNESS)
+            bpy.ops.object.bake(type=bpy.context.scene.cycles.bake_type)
         log_utils.info("Roughness baked")
 
         bpy.context.window_manager.progress_update(60)
 
         #Metalness. We need to config source materials, config target material, config bake settings, bake
         log_utils.info("Baking metalness")
-        bake_utils.config_source_materials(bake_utils.BakeType.METALNESS, mats)
-        bake_utils.config_target_bake_texture(bpy.context.view_layer.objects.active, bake_utils.BakeType.METALNESS, bpy.context.scene.xp_ext.low_poly_bake_resolution * bpy.context.scene.xp_ext.low_poly_bake_ss_factor)
-        bake_utils.config_bake_settings(bake_utils.BakeType.METALNESS)
-        bpy.ops.object.bake(type=bpy.context.scene.cycles.bake_type)
+        with perf_utils.span("Bake metalness"):
+            bake_utils.config_source_materials(bake_utils.BakeType.METALNESS, mats)
+            bake_utils.config_target_bake_texture(bpy.context.view_layer.objects.active, bake_utils.BakeType.METALNESS, bpy.context.scene.xp_ext.low_poly_bake_resolution * bpy.context.scene.xp_ext.low_poly_bake_ss_factor)
+            bake_utils.config_bake_settings(bake_utils.BakeType.METALNESS)
+            bpy.ops.object.bake(type=bpy.context.scene.cycles.bake_type)
         log_utils.info("Metalness baked")
 
     bpy.context.window_manager.progress_update(75)
@@ -127,10 +134,11 @@ def auto_bake_current_to_active():
     #Lit. We need to config source materials, config target material, config bake settings, bake
     if do_bake_lit:
         log_utils.info("Baking lit")
-        bake_utils.config_source_materials(bake_utils.BakeType.LIT, mats)
-        bake_utils.config_target_bake_texture(bpy.context.view_layer.objects.active, bake_utils.BakeType.LIT, bpy.context.scene.xp_ext.low_poly_bake_resolution * bpy.context.scene.xp_ext.low_poly_bake_ss_factor)
-        bake_utils.config_bake_settings(bake_utils.BakeType.LIT)
-        bpy.ops.object.bake(type=bpy.context.scene.cycles.bake_type)
+        with perf_utils.span("Bake lit"):
+            bake_utils.config_source_materials(bake_utils.BakeType.LIT, mats)
+            bake_utils.config_target_bake_texture(bpy.context.view_layer.objects.active, bake_utils.BakeType.LIT, bpy.context.scene.xp_ext.low_poly_bake_resolution * bpy.context.scene.xp_ext.low_poly_bake_ss_factor)
+            bake_utils.config_bake_settings(bake_utils.BakeType.LIT)
+            bpy.ops.object.bake(type=bpy.context.scene.cycles.bake_type)
         log_utils.info("Lit baked")
 
     bpy.context.window_manager.progress_update(90)
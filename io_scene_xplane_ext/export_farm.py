@@ -0,0 +1,183 @@
+#Project:   Blender-X-Plane-Extensions
+#Author:    Connor Russell
+#Date:      10/18/2026
+#Module:    export_farm.py
+#Purpose:   Export collections in parallel using background Blender processes
+
+import bpy #type: ignore
+import os
+import sys
+import json
+import time
+import tempfile
+import subprocess
+import traceback
+
+from . import exporter
+from .Helpers import log_utils
+from .Helpers import file_utils
+
+class export_farm:
+    """
+    Exports a list of collections by saving a snapshot of the .blend, and running background Blender workers that each export a disjoint subset of the collections.
+    Call start, then poll until it returns True, then call finish to merge the results and logs.
+    """
+
+    def __init__(self, assets, worker_count):
+        """
+        Args:
+            assets (list of Tuple[str, bpy.types.Collection]): Type name (a key of exporter.export_functions) and collection of each asset. See exporter.get_exportable_collections
+            worker_count (int): The number of background Blender processes to run.
+        """
+        self.worker_count = max(1, min(worker_count, len(assets)))
+        self.work_dir = ""
+        self.snapshot_path = ""
+        self.workers = []   #List of (subprocess.Popen, result path, log path, asset count)
+        self.terminated = set()   #Indices (into workers) of the workers stopped by cancel
+
+        #Split the assets so each worker has about the same number of objects to export. Biggest assets go first, each to the least loaded worker
+        self.partitions = [[] for _ in range(self.worker_count)]
+        loads = [0] * self.worker_count
+        for type_name, col in sorted(assets, key=lambda asset: len(asset[1].all_objects), reverse=True):
+            worker = loads.index(min(loads))
+            self.partitions[worker].append((type_name, col.name))
+            loads[worker] += max(1, len(col.all_objects))
+
+    def start(self):
+        """
+        Saves the snapshot and starts the workers.
+        """
+        if bpy.data.filepath == "":
+            raise Exception("The .blend file must be saved before exporting with multiple processes")
+
+        #The snapshot is saved next to the .blend, as export paths are relative to the .blend file
+        blend_dir = os.path.dirname(bpy.data.filepath)
+        blend_name = os.path.splitext(os.path.basename(bpy.data.filepath))[0]
+        self.snapshot_path = os.path.join(blend_dir, f".{blend_name}_export_snapshot_{os.getpid()}.blend")
+        self.work_dir = tempfile.mkdtemp(prefix="xp_ext_export_")
+
+        bpy.ops.wm.save_as_mainfile(filepath=self.snapshot_path, copy=True, check_existing=False)
+
+        for i, partition in enumerate(self.partitions):
+            if len(partition) == 0:
+                continue
+
+            job_path = os.path.join(self.work_dir, f"job_{i}.json")
+            result_path = os.path.join(self.work_dir, f"result_{i}.json")
+            log_path = os.path.join(self.work_dir, f"worker_{i}.log")
+            with open(job_path, "w", encoding="utf-8") as f:
+                json.dump({"assets": partition, "result_path": result_path}, f)
+
+            #The worker's console output goes to a log next to it's results, so a worker that dies before writing results can still be diagnosed
+            expr = f"import importlib; importlib.import_module({__package__!r} + '.export_farm').run_worker({job_path!r})"
+            with open(log_path, "w", encoding="utf-8") as log_file:
+                process = subprocess.Popen(
+                    [bpy.app.binary_path, "--background", self.snapshot_path, "--python-expr", expr],
+                    stdout=log_file,
+                    stderr=subprocess.STDOUT
+                )
+            self.workers.append((process, result_path, log_path, len(partition)))
+
+            log_utils.info(f"Started export worker {i} with {len(partition)} assets")
+
+    def get_finished_asset_count(self):
+        """
+        Returns the number of assets exported by workers that have finished
+        """
+        return sum(asset_count for process, result_path, log_path, asset_count in self.workers if process.poll() is not None)
+
+    def poll(self):
+        """
+        Returns True when all workers have finished
+        """
+        return all(process.poll() is not None for process, result_path, log_path, asset_count in self.workers)
+
+    def cancel(self):
+        """
+        Stops all workers. Assets they already exported stay written.
+        """
+        for i, (process, result_path, log_path, asset_count) in enumerate(self.workers):
+            if process.poll() is None:
+                process.terminate()
+                self.terminated.add(i)
+        for process, result_path, log_path, asset_count in self.workers:
+            process.wait()
+
+    def finish(self):
+        """
+        Merges the results and log messages of the workers into this instance, and removes the snapshot. The console logs of workers that failed are kept.
+        Returns:
+            list of Tuple[str, str, float, bool]: The type name, collection name, seconds, and whether it succeeded, for each exported asset
+        """
+        timings = []
+        kept_logs = set()
+
+        for i, (process, result_path, log_path, asset_count) in enumerate(self.workers):
+            if not os.path.isfile(result_path):
+                #Workers stopped by cancel are expected to not have results
+                if i in self.terminated:
+                    log_utils.info(f"Export worker {i} was cancelled before it finished")
+                    continue
+                kept_logs.add(log_path)
+                log_utils.error(f"Export worker {i} exited with code {process.returncode} without writing results. See it's log at {log_path}", "An export worker failed")
+                continue
+
+            with open(result_path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+
+            log_utils.new_section(f"Export worker {i}")
+            log_utils.merge_messages_state(result["messages"])
+            timings.extend(tuple(timing) for timing in result["timings"])
+            file_utils.add_write_stats(*result.get("write_stats", (0, 0)))
+
+        for path in (self.snapshot_path, self.snapshot_path + "1"):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        for name in os.listdir(self.work_dir):
+            path = os.path.join(self.work_dir, name)
+            if path not in kept_logs:
+                os.remove(path)
+        if len(kept_logs) == 0:
+            os.rmdir(self.work_dir)
+
+        return timings
+
+def run_worker(job_path):
+    """
+    Entry point of a background worker. Exports the assets in the job, then writes the timings and log messages to the job's result path.
+    Args:
+        job_path (str): Path to the job .json written by export_farm.start
+    """
+    with open(job_path, "r", encoding="utf-8") as f:
+        job = json.load(f)
+
+    #The snapshot has the parent's log in it, we only want to send back what we log
+    log_utils.get_log_file().clear()
+
+    timings = []
+    for type_name, col_name in job["assets"]:
+        col = bpy.data.collections.get(col_name)
+        if col is None:
+            log_utils.error(f"Collection {col_name} not found in export snapshot", f"Collection {col_name} not found")
+            timings.append((type_name, col_name, 0.0, False))
+            continue
+
+        asset_start = time.perf_counter()
+        succeeded = True
+        try:
+            exporter.export_functions[type_name](col, display_messages=False)
+        except Exception as e:
+            succeeded = False
+            log_utils.error(f"Error exporting {type_name} {col_name}: {e}", f"Error exporting {type_name} {col_name}")
+            log_utils.error(traceback.format_exc())
+        timings.append((type_name, col_name, time.perf_counter() - asset_start, succeeded))
+
+    #Timings go back in the log. Each worker would overwrite the same trace, so only the main instance saves one
+    log_utils.report_timings(save_trace=False)
+
+    with open(job["result_path"], "w", encoding="utf-8") as f:
+        json.dump({"timings": timings, "messages": log_utils.get_messages_state(), "write_stats": file_utils.get_write_stats()}, f)
+
+    sys.stdout.flush()
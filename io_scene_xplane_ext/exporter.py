@@ -9,13 +9,14 @@ import os
 
 from .Helpers import file_utils
 from .Helpers import log_utils
+from .Helpers import collection_utils
 from .Types import xp_lin
 from .Types import xp_fac
 from .Types import xp_pol
 from .Types import xp_agp
 from .Types import xp_for
 
-def export_fac(in_col):
+def export_fac(in_col, display_messages=True):
     #Create an xp_fac, load it from the collection, and write it to a file
     output = xp_fac.facade()
     output.from_collection(in_col)
@@ -25,9 +26,10 @@ def export_fac(in_col):
     #Write the file
     output.write(export_path)
 
-    log_utils.display_messages()
+    if display_messages:
+        log_utils.display_messages()
     
-def export_lin(in_col):
+def export_lin(in_col, display_messages=True):
     #Create an xp_lin, load it from the collection, and write it to a file
     output = xp_lin.line()
     output.from_collection(in_col)
@@ -37,9 +39,10 @@ def export_lin(in_col):
     #Write the file
     output.write(export_path)
 
-    log_utils.display_messages()
+    if display_messages:
+        log_utils.display_messages()
 
-def export_pol(in_col):
+def export_pol(in_col, display_messages=True):
     # Create an xp_pol, load it from the collection, and write it to a file
     output = xp_pol.polygon()
     output.from_collection(in_col)
@@ -49,9 +52,10 @@ def export_pol(in_col):
     # Write the file
     output.write(export_path)
 
-    log_utils.display_messages()
+    if display_messages:
+        log_utils.display_messages()
 
-def export_agp(in_col):
+def export_agp(in_col, display_messages=True):
     # Create an xp_agp, load it from the collection, and write it to a file
     output = xp_agp.agp()
     output.from_collection(in_col)
@@ -61,9 +65,10 @@ def export_agp(in_col):
     # Write the file
     output.write(export_path)
 
-    log_utils.display_messages()
+    if display_messages:
+        log_utils.display_messages()
 
-def export_for(in_col):
+def export_for(in_col, display_messages=True):
     # Create an xp_agp, load it from the collection, and write it to a file
     output = xp_for.Forest()
     output.from_collection(in_col)
@@ -73,4 +78,27 @@ def export_for(in_col):
     # Write the file
     output.write(export_path)
 
-    log_utils.display_messages()
\ No newline at end of file
+    if display_messages:
+        log_utils.display_messages()
+
+#Export function for each exportable collection type, in the order they are exported by export all
+export_functions = {
+    "Facade": export_fac,
+    "Line": export_lin,
+    "Polygon": export_pol,
+    "AGP": export_agp,
+    "Forest": export_for,
+}
+
+def get_exportable_collections():
+    """
+    Gets every visible, exportable collection of every type
+    Returns:
+        list of Tuple[str, bpy.types.Collection]: The type name (a key of export_functions) and collection of each asset to export
+    """
+    exportable = []
+    for type_name, prop_name in (("Facade", "xp_fac"), ("Line", "xp_lin"), ("Polygon", "xp_pol"), ("AGP", "xp_agp"), ("Forest", "xp_for")):
+        for col in bpy.data.collections:
+            if getattr(col, prop_name).exportable and collection_utils.get_collection_is_visible(col):
+                exportable.append((type_name, col))
+    return exportable
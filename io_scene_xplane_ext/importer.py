@@ -7,6 +7,7 @@
 import bpy #type: ignore
 
 from .Helpers import log_utils
+from .Helpers import reader_utils
 from .Types import xp_lin
 from .Types import xp_fac
 from .Types import xp_obj
@@ -15,6 +16,23 @@ from .Types import xp_agp
 from .Types import xp_for
 import os
 
+def read_asset(asset, in_path):
+    """
+    Reads an asset from a file, stopping if the read is cancelled with reader_utils.request_cancel.
+    Args:
+        asset: The asset to read into (i.e. xp_lin.line).
+        in_path (str): The path of the file to read.
+    Returns:
+        bool: True if the asset was read, False if the read was cancelled.
+    """
+    try:
+        asset.read(in_path)
+        return True
+    except reader_utils.read_cancelled:
+        log_utils.warning(f"Import of {in_path} was cancelled", "Import cancelled")
+        log_utils.display_messages()
+        return False
+
 def import_lin(in_path):
     #Define just the file name from the path
     in_name = in_path
@@ -22,10 +40,12 @@ def import_lin(in_path):
 
     #Read it
     lin = xp_lin.line()
-    lin.read(in_path)
+    if not read_asset(lin, in_path):
+        return False
     lin.to_collection(in_name)
     
     log_utils.display_messages()
+    return True
 
 def import_pol(in_path):
     #Define just the file name from the path
@@ -35,10 +55,12 @@ def import_pol(in_path):
     #Read it
     pol = xp_pol.polygon()
     print(f"Importing {in_name}...")
-    pol.read(in_path)
+    if not read_asset(pol, in_path):
+        return False
     pol.to_scene()
 
     log_utils.display_messages()
+    return True
 
 def import_fac(in_path):
     #Define just the file name from the path
@@ -48,10 +70,12 @@ def import_fac(in_path):
     #Read it
     fac = xp_fac.facade()
     print(f"Importing {in_name}...")
-    fac.read(in_path)
+    if not read_asset(fac, in_path):
+        return False
     fac.to_scene()
 
     log_utils.display_messages()
+    return True
 
 def import_obj(in_path):
     #Define just the file name from the path
@@ -61,11 +85,13 @@ def import_obj(in_path):
     #Read it
     obj = xp_obj.object()
     print(f"Importing {in_name}...")
-    obj.read(in_path)
+    if not read_asset(obj, in_path):
+        return False
     obj.to_scene()
 
     log_utils.display_messages()
-    
+    return True
+
 def import_agp(in_path):
     #Define just the file name from the path
     in_name = in_path
@@ -74,10 +100,12 @@ def import_agp(in_path):
     #Read it
     agp = xp_agp.agp()
     print(f"Importing {in_name}...")
-    agp.read(in_path)
+    if not read_asset(agp, in_path):
+        return False
     agp.to_collection()
 
     log_utils.display_messages()
+    return True
 
 def import_for(in_path):
     #Define just the file name from the path
@@ -87,7 +115,9 @@ def import_for(in_path):
     #Read it
     agp = xp_for.Forest()
     print(f"Importing {in_name}...")
-    agp.read(in_path)
+    if not read_asset(agp, in_path):
+        return False
     agp.to_collection()
 
     log_utils.display_messages()
+    return True
@@ -9,6 +9,7 @@ from .Helpers import file_utils
 from .Helpers import decal_utils
 from .Helpers import log_utils
 from .Helpers import misc_utils
+from .Helpers import perf_utils
 
 import struct
 
@@ -535,6 +536,7 @@ def create_decal_key_nodes(material, x, y, mod_connection, alb_node, key_r, key_
     return node_clamp_final.outputs[0]
 
 #Function to update the nodes of a material
+@perf_utils.timed("Update material nodes")
 def update_nodes(material: bpy.types.Material):
     #Check to make sure teh file is saved, otherwise exit and warn the user in the status bar
         if bpy.data.filepath == "":
@@ -7,20 +7,26 @@
 import bpy  # type: ignore
 from bpy_extras.io_utils import ImportHelper # type: ignore
 
-from . import exporter
-from . import importer
 from . import material_config
 from .Helpers import file_utils
 from .Helpers import collection_utils
 from .Helpers import decal_utils
 from .Helpers import misc_utils
 from .Helpers import log_utils
-from .Helpers import facade_utils
-from .Helpers import normal_conversion_utils
-from .Types import xp_attached_obj_preview
-from . import anim_actions
-from . import auto_baker
+from .Helpers import lod_preview_utils
+
+#The format, bake, and conversion modules (and NumPy through them) are only imported when an operator first uses them, so registering the addon stays fast
+exporter = misc_utils.lazy_import(".exporter", __package__)
+export_farm = misc_utils.lazy_import(".export_farm", __package__)
+importer = misc_utils.lazy_import(".importer", __package__)
+facade_utils = misc_utils.lazy_import(".Helpers.facade_utils", __package__)
+normal_conversion_utils = misc_utils.lazy_import(".Helpers.normal_conversion_utils", __package__)
+xp_attached_obj_preview = misc_utils.lazy_import(".Types.xp_attached_obj_preview", __package__)
+anim_actions = misc_utils.lazy_import(".anim_actions", __package__)
+auto_baker = misc_utils.lazy_import(".auto_baker", __package__)
 import os
+import time
+import traceback
 from .Helpers import collection_utils
 
 class BTN_lin_exporter(bpy.types.Operator):
@@ -79,113 +85,261 @@ class BTN_for_exporter(bpy.types.Operator):
 
         return {'FINISHED'}  
 
-class IMPORT_lin(bpy.types.Operator, ImportHelper):
-    bl_idname = "import_scene.xp_lin"
-    bl_label = "Import X-Plane Lines"
-    filename_ext = ".lin"
-    filter_glob: bpy.props.StringProperty(default="*.lin", options={'HIDDEN'}) # type: ignore
-    files: bpy.props.CollectionProperty(type=bpy.types.PropertyGroup)  # type: ignore To support multiple files
+class BTN_export_all(bpy.types.Operator):
+    """Export every visible facade, line, polygon, AGP and forest"""
+    bl_idname = "xp_ext.export_all"
+    bl_label = "Export All X-Plane Assets"
+    bl_description = "Export every visible facade, line, polygon, AGP, and forest. Shows progress, and can be cancelled with ESC between assets."
+
+    #How long each step of the export may run before giving control back to Blender, in seconds. An asset is never split, so long assets may exceed this
+    time_slice = 0.1
+
+    worker_count: bpy.props.IntProperty( # type: ignore
+        name="Worker Processes",
+        description="Number of background Blender processes to export with. Each exports a different set of collections from a saved snapshot of this file. 0 or 1 exports in this Blender. The .blend must be saved to use workers.",
+        default=0,
+        min=0,
+        max=64
+    )
+
+    def start(self, context):
+        log_utils.new_section("Export all")
+        self.assets = exporter.get_exportable_collections()
+        self.next_asset = 0
+        self.timings = []   #List of (type name, collection name, seconds, succeeded)
+        self.start_time = time.perf_counter()
+        file_utils.reset_write_stats()
+        self.farm = None
+
+        if self.worker_count > 1 and len(self.assets) > 1:
+            self.farm = export_farm.export_farm(self.assets, self.worker_count)
+            try:
+                self.farm.start()
+            except Exception as e:
+                log_utils.error(f"Could not start export workers: {e}. Exporting in this Blender instead.", "Could not start export workers")
+                self.farm = None
+
+    def finish_farm(self, cancelled):
+        if cancelled:
+            self.farm.cancel()
+        self.timings = self.farm.finish()
+        self.next_asset = len(self.assets)
+
+    def export_next(self):
+        type_name, col = self.assets[self.next_asset]
+        self.next_asset += 1
+
+        asset_start = time.perf_counter()
+        succeeded = True
+        try:
+            exporter.export_functions[type_name](col, display_messages=False)
+        except Exception as e:
+            succeeded = False
+            log_utils.error(f"Error exporting {type_name} {col.name}: {e}", f"Error exporting {type_name} {col.name}")
+            log_utils.error(traceback.format_exc())
+        self.timings.append((type_name, col.name, time.perf_counter() - asset_start, succeeded))
+
+    def finish(self, context, cancelled):
+        total_time = time.perf_counter() - self.start_time
+
+        log_utils.new_section("Export all timings")
+        log_utils.info(f"{'Type':<10} {'Collection':<40} {'Time (ms)':>10}  Result")
+        for type_name, col_name, seconds, succeeded in sorted(self.timings, key=lambda t: t[2], reverse=True):
+            log_utils.info(f"{type_name:<10} {col_name:<40} {seconds * 1000:>10.1f}  {'OK' if succeeded else 'FAILED'}")
+
+        written, unchanged = file_utils.get_write_stats()
+        summary = f"Exported {len(self.timings)} of {len(self.assets)} assets in {total_time:.2f}s. {written} files written, {unchanged} unchanged"
+        if cancelled:
+            summary += " (cancelled)"
+        log_utils.info(summary)
+        log_utils.display_messages()
+
+        self.report({'WARNING'} if cancelled else {'INFO'}, summary)
 
     def execute(self, context):
-        # Implement your import logic here
+        #Used when there's no window to run modally in (i.e. from scripts). Exports everything in one go
+        self.start(context)
+        if self.farm is not None:
+            while not self.farm.poll():
+                time.sleep(0.1)
+            self.finish_farm(False)
+        while self.next_asset < len(self.assets):
+            self.export_next()
+        self.finish(context, False)
+
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        self.start(context)
+
+        if len(self.assets) == 0:
+            self.finish(context, False)
+            return {'FINISHED'}
+
+        wm = context.window_manager
+        wm.progress_begin(0, len(self.assets))
+        self._timer = wm.event_timer_add(0.01, window=context.window)
+        wm.modal_handler_add(self)
+
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        wm = context.window_manager
+
+        cancelled = event.type == 'ESC'
+
+        #When exporting with workers, we just wait for them to finish
+        if self.farm is not None:
+            if event.type == 'TIMER' and not cancelled:
+                wm.progress_update(self.farm.get_finished_asset_count())
+            if cancelled or self.farm.poll():
+                self.finish_farm(cancelled)
+                wm.event_timer_remove(self._timer)
+                wm.progress_end()
+                self.finish(context, cancelled)
+                return {'CANCELLED'} if cancelled else {'FINISHED'}
+            return {'RUNNING_MODAL'} if event.type == 'TIMER' else {'PASS_THROUGH'}
+
+        if event.type == 'TIMER' and not cancelled:
+            #Export assets until we've used our time slice, then let Blender redraw and handle input
+            slice_start = time.perf_counter()
+            while self.next_asset < len(self.assets) and time.perf_counter() - slice_start < self.time_slice:
+                self.export_next()
+            wm.progress_update(self.next_asset)
+
+        if cancelled or self.next_asset >= len(self.assets):
+            wm.event_timer_remove(self._timer)
+            wm.progress_end()
+            self.finish(context, cancelled)
+            return {'CANCELLED'} if cancelled else {'FINISHED'}
+
+        return {'RUNNING_MODAL'} if event.type == 'TIMER' else {'PASS_THROUGH'}
+
+class import_files_modal:
+    """
+    Shared by the import operators. Imports started from the file browser run modally, one file per timer event, so Blender redraws between files and ESC
+    cancels the files not yet imported. Each file is read on Blender's main thread, so ESC takes effect once the current file is done.
+    Scripts that call the operator directly import every file before it returns.
+    """
+    import_function_name = ""   #Name of the importer function that imports one file, i.e. import_lin
+
+    run_modal: bpy.props.BoolProperty(default=False, options={'HIDDEN', 'SKIP_SAVE'}) # type: ignore
+
+    def get_paths(self):
         directory = self.filepath
         directory = directory[:directory.rfind(os.sep)]
+        return [f"{directory}{os.sep}{cf.name}" for cf in self.files]
 
-        for cf in self.files:
-            filepath = f"{directory}{os.sep}{cf.name}"
-            importer.import_lin(filepath)
+    def invoke(self, context, event):
+        self.run_modal = True
+        return ImportHelper.invoke(self, context, event)
 
+    def execute(self, context):
+        self.paths = self.get_paths()
+        self.next_path = 0
+        self.import_function = getattr(importer, self.import_function_name)
+
+        if not self.run_modal or context.window is None or len(self.paths) == 0:
+            for path in self.paths:
+                if not self.import_function(path):
+                    return {'CANCELLED'}
+            return {'FINISHED'}
+
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(0.01, window=context.window)
+        wm.modal_handler_add(self)
+        self.set_status(context)
+        return {'RUNNING_MODAL'}
+
+    def set_status(self, context):
+        if context.workspace is not None:
+            context.workspace.status_text_set(f"Importing {self.next_path + 1} of {len(self.paths)}: {os.path.basename(self.paths[self.next_path])}. Press ESC to cancel the remaining files")
+
+    def finish(self, context, cancelled):
+        context.window_manager.event_timer_remove(self._timer)
+        if context.workspace is not None:
+            context.workspace.status_text_set(None)
+        if cancelled:
+            self.report({'WARNING'}, f"Import cancelled. Imported {self.next_path} of {len(self.paths)} files")
+            return {'CANCELLED'}
         return {'FINISHED'}
 
-class IMPORT_pol(bpy.types.Operator, ImportHelper):
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            return self.finish(context, True)
+
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        path = self.paths[self.next_path]
+        self.next_path += 1
+        try:
+            imported = self.import_function(path)
+        except Exception:
+            self.finish(context, True)
+            raise
+        if not imported:
+            return self.finish(context, True)
+
+        if self.next_path >= len(self.paths):
+            return self.finish(context, False)
+
+        self.set_status(context)
+        return {'RUNNING_MODAL'}
+
+class IMPORT_lin(import_files_modal, bpy.types.Operator, ImportHelper):
+    bl_idname = "import_scene.xp_lin"
+    bl_label = "Import X-Plane Lines"
+    filename_ext = ".lin"
+    filter_glob: bpy.props.StringProperty(default="*.lin", options={'HIDDEN'}) # type: ignore
+    files: bpy.props.CollectionProperty(type=bpy.types.PropertyGroup)  # type: ignore To support multiple files
+
+    import_function_name = "import_lin"
+
+class IMPORT_pol(import_files_modal, bpy.types.Operator, ImportHelper):
     bl_idname = "import_scene.xp_pol"
     bl_label = "Import X-Plane Polygons"
     filename_ext = ".pol"
     filter_glob: bpy.props.StringProperty(default="*.pol", options={'HIDDEN'}) # type: ignore
     files: bpy.props.CollectionProperty(type=bpy.types.PropertyGroup)  # type: ignore To support multiple files
 
-    def execute(self, context):
-        # Implement your import logic here
-        directory = self.filepath
-        directory = directory[:directory.rfind(os.sep)]
-
-        for cf in self.files:
-            filepath = f"{directory}{os.sep}{cf.name}"
-            importer.import_pol(filepath)
-
-        return {'FINISHED'}
+    import_function_name = "import_pol"
 
-class IMPORT_fac(bpy.types.Operator, ImportHelper):
+class IMPORT_fac(import_files_modal, bpy.types.Operator, ImportHelper):
     bl_idname = "import_scene.xp_fac"
     bl_label = "Import X-Plane Facade"
     filename_ext = ".fac"
     filter_glob: bpy.props.StringProperty(default="*.fac", options={'HIDDEN'}) # type: ignore
     files: bpy.props.CollectionProperty(type=bpy.types.PropertyGroup)  # type: ignore To support multiple files
 
-    def execute(self, context):
-        # Implement your import logic here
-        directory = self.filepath
-        directory = directory[:directory.rfind(os.sep)]
-
-        for cf in self.files:
-            filepath = f"{directory}{os.sep}{cf.name}"
-            importer.import_fac(filepath)
-
-        return {'FINISHED'}
+    import_function_name = "import_fac"
     
-class IMPORT_obj(bpy.types.Operator, ImportHelper):
+class IMPORT_obj(import_files_modal, bpy.types.Operator, ImportHelper):
     bl_idname = "import_scene.xp_obj"
     bl_label = "Import X-Plane Object"
     filename_ext = ".obj"
     filter_glob: bpy.props.StringProperty(default="*.obj", options={'HIDDEN'}) # type: ignore
     files: bpy.props.CollectionProperty(type=bpy.types.PropertyGroup)  # type: ignore To support multiple files
 
-    def execute(self, context):
-        # Implement your import logic here
-        directory = self.filepath
-        directory = directory[:directory.rfind(os.sep)]
-
-        for cf in self.files:
-            filepath = f"{directory}{os.sep}{cf.name}"
-            importer.import_obj(filepath)
+    import_function_name = "import_obj"
 
-        return {'FINISHED'}
-
-class IMPORT_agp(bpy.types.Operator, ImportHelper):
+class IMPORT_agp(import_files_modal, bpy.types.Operator, ImportHelper):
     bl_idname = "import_scene.xp_agp"
     bl_label = "Import X-Plane Autogen Points"
     filename_ext = ".agp"
     filter_glob: bpy.props.StringProperty(default="*.agp", options={'HIDDEN'}) # type: ignore
     files: bpy.props.CollectionProperty(type=bpy.types.PropertyGroup)  # type: ignore To support multiple files
 
-    def execute(self, context):
-        # Implement your import logic here
-        directory = self.filepath
-        directory = directory[:directory.rfind(os.sep)]
-
-        for cf in self.files:
-            filepath = f"{directory}{os.sep}{cf.name}"
-            importer.import_agp(filepath)
+    import_function_name = "import_agp"
 
-        return {'FINISHED'}
-
-class IMPORT_for(bpy.types.Operator, ImportHelper):
+class IMPORT_for(import_files_modal, bpy.types.Operator, ImportHelper):
     bl_idname = "import_scene.xp_for"
     bl_label = "Import X-Plane Forest"
     filename_ext = ".for"
     filter_glob: bpy.props.StringProperty(default="*.for", options={'HIDDEN'}) # type: ignore
     files: bpy.props.CollectionProperty(type=bpy.types.PropertyGroup)  # type: ignore To support multiple files
 
-    def execute(self, context):
-        # Implement your import logic here
-        directory = self.filepath
-        directory = directory[:directory.rfind(os.sep)]
-
-        for cf in self.files:
-            filepath = f"{directory}{os.sep}{cf.name}"
-            importer.import_for(filepath)
-
-        return {'FINISHED'}
+    import_function_name = "import_for"
 
 class BTN_mats_autoodetect_textures(bpy.types.Operator):
     """Autodetects the texture"""
@@ -317,14 +471,17 @@ class BTN_generate_flipbook_animation(bpy.types.Operator):
             self.autoanim_apply_parent_transform = bpy.context.scene.xp_ext.autoanim_apply_parent_transform
 
 
-        for obj in context.selected_objects:
+        total_frames = 0
+        total_meshes = 0
+
+        for obj in list(context.selected_objects):
             #Check that the object has a deform modifier
             physics_types = {'ARMATURE', 'CLOTH', 'SOFT_BODY', 'FLUID', 'DYNAMIC_PAINT', 'COLLISION', 'SMOKE'}
             if not any(mod.type in physics_types for mod in obj.modifiers):
                 continue
             if self.autoanim_autodetect:
                 start_frame, end_frame, start_value, end_value = anim_actions.autodetect_frame_range(obj, self.autoanim_autodetect_fps)
-                anim_actions.create_flipbook_animation(
+                frames, meshes = anim_actions.create_flipbook_animation(
                     obj,
                     self.autoanim_dataref,
                     start_value,
@@ -336,7 +493,7 @@ class BTN_generate_flipbook_animation(bpy.types.Operator):
                     self.autoanim_apply_parent_transform
                 )
             else:
-                anim_actions.create_flipbook_animation(
+                frames, meshes = anim_actions.create_flipbook_animation(
                     obj,
                     self.autoanim_dataref,
                     self.autoanim_start_value,
@@ -347,6 +504,10 @@ class BTN_generate_flipbook_animation(bpy.types.Operator):
                     self.autoanim_keyframe_interval,
                     self.autoanim_apply_parent_transform
                 )
+            total_frames += frames
+            total_meshes += meshes
+
+        self.report({'INFO'}, f"Generated {total_frames} flipbook frames using {total_meshes} unique meshes")
         return {'FINISHED'}
     
 class BTN_auto_keyframe_animation(bpy.types.Operator):
@@ -1086,70 +1247,11 @@ class BTN_preview_lods_for_distance(bpy.types.Operator):
     bl_options = {'REGISTER', 'UNDO'}  # Add 'REGISTER' here
 
     def execute(self, context):
-        #Iterate over all objects.
-        # Get their parent collection to learn the LOD settings
-        # Get the object's LOD bucket, and thereby whether it's visible or not
-        # Then show or hide the object
-        for obj in bpy.data.objects:
-            #First we need to check if we're in an autosplit obj, and need to use those ranges. Otherwise we use the parent collection
-            all_parents = []
-            cur_parent = obj.parent
-            while cur_parent is not None:
-                all_parents.append(cur_parent)
-                cur_parent = cur_parent.parent
-            
-            is_autosplit_child = False
-            autosplit_parent = None
-            for parent in all_parents:
-                if parent.xp_agp.type == 'AUTO_SPLIT_OBJ' and parent.xp_agp.exportable:
-                    is_autosplit_child = True
-                    autosplit_parent = parent
+        #Rebuild the LOD index, as this is an explicit request, then show/hide every object whose visibility changes
+        lod_preview_utils.mark_dirty()
+        changed = lod_preview_utils.apply_lod_preview(context.scene, context.scene.xp_ext.lod_distance_preview)
 
-            #Get the parent collection
-            parent_col = obj.users_collection[0] if obj.users_collection else None
-
-            if parent_col is None:
-                continue
-            
-            lod_ranges = []
-
-            #If autosplit child, use those ranges
-            if is_autosplit_child and autosplit_parent is not None:
-                if obj.xplane.lod[0]:
-                    lod_ranges.append([autosplit_parent.xp_agp.autosplit_lod_1_min, autosplit_parent.xp_agp.autosplit_lod_1_max])
-                if obj.xplane.lod[1]:
-                    lod_ranges.append([autosplit_parent.xp_agp.autosplit_lod_2_min, autosplit_parent.xp_agp.autosplit_lod_2_max])
-                if obj.xplane.lod[2]:
-                    lod_ranges.append([autosplit_parent.xp_agp.autosplit_lod_3_min, autosplit_parent.xp_agp.autosplit_lod_3_max])
-                if obj.xplane.lod[3]:
-                    lod_ranges.append([autosplit_parent.xp_agp.autosplit_lod_4_min, autosplit_parent.xp_agp.autosplit_lod_4_max])
-
-            #Use the collection LOD if not autosplit child
-            else:
-                if obj.xplane.lod[0]:
-                    if len(parent_col.xplane.layer.lod) > 0:
-                        lod_ranges.append([parent_col.xplane.layer.lod[0].near, parent_col.xplane.layer.lod[0].far])
-            
-                if obj.xplane.lod[1]:
-                    if len(parent_col.xplane.layer.lod) > 1:
-                        lod_ranges.append([parent_col.xplane.layer.lod[1].near, parent_col.xplane.layer.lod[1].far])
-
-                if obj.xplane.lod[2]:
-                    if len(parent_col.xplane.layer.lod) > 2:
-                        lod_ranges.append([parent_col.xplane.layer.lod[2].near, parent_col.xplane.layer.lod[2].far])
-
-                if obj.xplane.lod[3]:
-                    if len(parent_col.xplane.layer.lod) > 3:
-                        lod_ranges.append([parent_col.xplane.layer.lod[3].near, parent_col.xplane.layer.lod[3].far])
-
-            for range in lod_ranges:
-                if range[0] <= bpy.context.scene.xp_ext.lod_distance_preview <= range[1]:
-                    #If the distance is within the range, show the object
-                    obj.hide_set(False)
-                    break
-                else:
-                    #If the distance is not within the range, hide the object
-                    obj.hide_set(True)
+        self.report({'INFO'}, f"Updated visibility of {changed} objects")
 
         return {'FINISHED'}
 
@@ -1427,6 +1529,12 @@ class BTN_preview_attached_object(bpy.types.Operator):
         default=False
     )
 
+    use_instances: bpy.props.BoolProperty( # type: ignore
+        name="Use Instances",
+        description="Whether to preview using collection instances. Each resource is imported once into a hidden library collection, and every attached object just instances it. This keeps the scene fast with many attached objects. Ignored when making real objects.",
+        default=False
+    )
+
     def execute(self, context):
         log_utils.new_section("Preview attached object")
 
@@ -1435,6 +1543,8 @@ class BTN_preview_attached_object(bpy.types.Operator):
         # If there is no object to add, check for children, if there is a mesh with selection (.hide_select) disabled, delete it
         selected_objects = context.selected_objects
         original_active_object = context.active_object
+        previewed_resources = set()
+        preview_count = 0
 
         for obj in selected_objects:
             if obj.type != 'EMPTY':
@@ -1452,10 +1562,10 @@ class BTN_preview_attached_object(bpy.types.Operator):
             else:
                 continue
 
-            #Iterate through obj's children. If mesh, and hide_select, delete it
+            #Iterate through obj's children. If it is a preview (a mesh or collection instance with hide_select), delete it
             for child in obj.children:
-                if child.type == 'MESH' and child.hide_select:
-                    log_utils.info(f"Deleting child object '{child.name}' of '{obj.name}' because it is a mesh with hide_select enabled, which indicates it's an old preview object.")
+                if xp_attached_obj_preview.is_preview_object(child):
+                    log_utils.info(f"Deleting child object '{child.name}' of '{obj.name}' because it is a preview object with hide_select enabled, which indicates it's an old preview object.")
                     bpy.data.objects.remove(child, do_unlink=True)
 
             #Skip empty. Warn on missing
@@ -1475,10 +1585,15 @@ class BTN_preview_attached_object(bpy.types.Operator):
 
             #Read and add
             log_utils.info(f"Importing attached object preview from resource '{resource}' for object '{obj.name}'")
-            new_obj = xp_attached_obj_preview.attached_object_preview()
-            new_obj.read(resource)
-            new_obj.to_scene(obj, parent_collection, self.make_real)
+            new_obj = xp_attached_obj_preview.get_cached_preview(resource)
+            if self.use_instances and not self.make_real:
+                new_obj.to_scene_instance(obj, parent_collection)
+            else:
+                new_obj.to_scene(obj, parent_collection, self.make_real)
+            previewed_resources.add(resource)
+            preview_count += 1
 
+        log_utils.info(f"Previewed {preview_count} attached objects from {len(previewed_resources)} unique resources")
         log_utils.display_messages()
 
         #Deselect all objects
@@ -1522,9 +1637,9 @@ class BTN_clear_attached_object_preview(bpy.types.Operator):
             else:
                 continue
 
-            #Iterate through obj's children. If mesh, and hide_select, delete it
+            #Iterate through obj's children. If it is a preview, delete it. Instanced previews only remove the instance, the library stays for the next preview
             for child in obj.children:
-                if child.type == 'MESH' and child.hide_select:
+                if xp_attached_obj_preview.is_preview_object(child):
                     bpy.data.objects.remove(child, do_unlink=True)
 
         log_utils.display_messages()
@@ -1571,6 +1686,7 @@ def menu_func_import_options(self, context):
     
 def register():
     bpy.utils.register_class(BTN_lin_exporter)
+    bpy.utils.register_class(BTN_export_all)
     bpy.utils.register_class(BTN_pol_exporter)
     bpy.utils.register_class(IMPORT_lin)
     bpy.utils.register_class(IMPORT_pol)
@@ -1613,6 +1729,7 @@ def register():
 def unregister():
     bpy.utils.unregister_class(BTN_agp_exporter)
     bpy.utils.unregister_class(BTN_lin_exporter)
+    bpy.utils.unregister_class(BTN_export_all)
     bpy.utils.unregister_class(BTN_pol_exporter)
     bpy.utils.unregister_class(IMPORT_lin)
     bpy.utils.unregister_class(IMPORT_pol)
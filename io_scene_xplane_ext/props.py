@@ -7,8 +7,14 @@
 import bpy # type: ignore
 from . import material_config
 from .Helpers import file_utils
+from .Helpers import lod_preview_utils
+from .Helpers import collection_index_utils
+from .Helpers import misc_utils
 from bpy.app.handlers import persistent # type: ignore
 
+#Only used by the forest extraction cache handlers, which have nothing to evict until an exporter has loaded it
+for_utils = misc_utils.lazy_import(".Helpers.for_utils", __package__)
+
 #Enum for types. Can be START END or SEGMENT
 line_type = [
     ("START", "Start", "Start"),
@@ -53,14 +59,7 @@ collision_type_enum = [
 
 #TODO: Kill this code and all it's references. ENUMs cause problems
 def get_all_collection_names(self, context):
-    enum_results = []
-    for col in bpy.data.collections:
-        enum_results.append((col.name, col.name, col.name))
-        
-    if len(enum_results) == 0:
-        enum_results.append(("NO_COLLECTIONS", "No Collections", "No Collections"))
-
-    return enum_results
+    return collection_index_utils.get_collection_enum_items()
 
 #Triggers UI redraw
 def update_ui(self, context):
@@ -68,6 +67,16 @@ def update_ui(self, context):
         if context.area != None:
             context.area.tag_redraw()
 
+def update_lod_distance_preview(self, context):
+    if self.lod_preview_live and context != None and context.scene != None:
+        lod_preview_utils.apply_lod_preview(context.scene, self.lod_distance_preview)
+    update_ui(self, context)
+
+#Keeps the exportable collection index up to date, then redraws
+def update_collection_exportable(self, context):
+    collection_index_utils.update_collection(self.id_data)
+    update_ui(self, context)
+
 #Sanitizes and includes the // in all material texture paths. Why? Because when Blender goes to file browse again, it will actually go to the right spot thanks to the //
 def sanitize_prop_path(in_path):
         if in_path == "":
@@ -287,7 +296,23 @@ class PROP_xp_ext_scene(bpy.types.PropertyGroup):
         name="LOD Distance Preview",
         description="Show objects whose LODs would make them visible at this range",
         default=0.0,
-        min=0.0
+        min=0.0,
+        update=update_lod_distance_preview
+    ) # type: ignore
+
+    export_worker_count: bpy.props.IntProperty(
+        name="Export Worker Processes",
+        description="Number of background Blender processes Export All uses. Each exports a different set of collections from a saved snapshot of this file. 0 or 1 exports in this Blender",
+        default=0,
+        min=0,
+        max=64
+    ) # type: ignore
+
+    lod_preview_live: bpy.props.BoolProperty(
+        name="Live LOD Preview",
+        description="Update object visibility as the LOD distance preview changes",
+        default=False,
+        update=update_lod_distance_preview
     ) # type: ignore
 
     autoanim_frame_start: bpy.props.IntProperty(
@@ -846,7 +871,7 @@ class PROP_for_collection(bpy.types.PropertyGroup):
         name="Exportable",
         default=False,
         description="Whether or not this layer should be exported",
-        update=update_ui
+        update=update_collection_exportable
     ) # type: ignore
     
     name: bpy.props.StringProperty(
@@ -1217,7 +1242,7 @@ class PROP_lin_collection(bpy.types.PropertyGroup):
         name="Exportable",
         default=False,
         description="Whether or not this layer should be exported",
-        update=update_ui
+        update=update_collection_exportable
     ) # type: ignore
     
     name: bpy.props.StringProperty(
@@ -1248,7 +1273,7 @@ class PROP_lin_collection(bpy.types.PropertyGroup):
 
 class PROP_pol_collection(bpy.types.PropertyGroup):
     name: bpy.props.StringProperty(name="Name", description="The name of the polygon layer", subtype='FILE_PATH', **path_options) # type: ignore
-    exportable: bpy.props.BoolProperty(name="Exportable", description="Whether the polygon is exportable", default=False) # type: ignore
+    exportable: bpy.props.BoolProperty(name="Exportable", description="Whether the polygon is exportable", default=False, update=update_collection_exportable) # type: ignore
     is_ui_expanded: bpy.props.BoolProperty(name="UI Expanded", description="Whether the polygon is expanded in the UI", default=False, update=update_ui) # type: ignore
     
     texture_is_nowrap: bpy.props.BoolProperty(name="Non-tiling textures", description="Whether the texture can tile or not", default=False) # type: ignore
@@ -1372,7 +1397,7 @@ class PROP_agp_obj(bpy.types.PropertyGroup):
 
 class PROP_agp_collection(bpy.types.PropertyGroup):
     name: bpy.props.StringProperty(name="Name", description="The name of the autogen point collection", subtype="FILE_PATH", **path_options) # type: ignore
-    exportable: bpy.props.BoolProperty(name="Exportable", description="Whether the autogen point collection is exportable", default=False) # type: ignore
+    exportable: bpy.props.BoolProperty(name="Exportable", description="Whether the autogen point collection is exportable", default=False, update=update_collection_exportable) # type: ignore
     is_ui_expanded: bpy.props.BoolProperty(name="UI Expanded", description="Whether the autogen point collection is expanded in the UI", default=False, update=update_ui) # type: ignore
 
     is_texture_tiling: bpy.props.BoolProperty(name="Enable Texture Tiling", description="Whether the polygon uses texture tiling", default=False) # type: ignore
@@ -1421,7 +1446,7 @@ class PROP_fac_floor(bpy.types.PropertyGroup):
 
 class PROP_facade(bpy.types.PropertyGroup):
     #Facade name
-    exportable: bpy.props.BoolProperty(name="Exportable", description="Whether the facade is exportable", default=False, update=update_ui)# type: ignore
+    exportable: bpy.props.BoolProperty(name="Exportable", description="Whether the facade is exportable", default=False, update=update_collection_exportable)# type: ignore
     name: bpy.props.StringProperty( name="Facade Name", description="The name of the facade", subtype="FILE_PATH", **path_options)# type: ignore
     is_ui_expanded: bpy.props.BoolProperty(name="UI Expanded", description="Whether the facade is expanded in the UI", default=False, update=update_ui)# type: ignore
 
@@ -1469,6 +1494,38 @@ def update_fac_spelling_choices_depgraph_handler(scene):
 def update_fac_spelling_choices_load_handler(in_file_path, in_startup_file_path):
     update_fac_spelling_choices()
 
+@persistent
+def lod_preview_depsgraph_handler(scene, depsgraph=None):
+    #Selecting, moving, and editing objects also update them, so this only rebuilds the LOD index when their LOD ranges or collections change
+    lod_preview_utils.update_from_depsgraph(scene, depsgraph)
+
+@persistent
+def lod_preview_load_handler(in_file_path, in_startup_file_path=None):
+    lod_preview_utils.mark_dirty()
+
+@persistent
+def collection_index_depsgraph_handler(scene, depsgraph=None):
+    collection_index_utils.update_from_depsgraph(depsgraph)
+
+@persistent
+def collection_index_reset_handler(*args):
+    #Loading and undo restore exportable flags without calling their update functions
+    collection_index_utils.mark_dirty()
+
+@persistent
+def forest_cache_depsgraph_handler(scene, depsgraph=None):
+    #Geometry edits include vertex weight and custom normal changes, which aren't part of the forest extraction fingerprint
+    if depsgraph is None or not for_utils.is_loaded():
+        return
+    for update in depsgraph.updates:
+        if update.is_updated_geometry:
+            for_utils.evict_extraction_cache(update.id.name)
+
+@persistent
+def forest_cache_load_handler(in_file_path, in_startup_file_path=None):
+    if for_utils.is_loaded():
+        for_utils.clear_extraction_cache()
+
 def register():
     
     bpy.utils.register_class(PROP_fac_filtered_spelling_choices)
@@ -1505,8 +1562,25 @@ def register():
 
     bpy.app.handlers.depsgraph_update_pre.append(update_fac_spelling_choices_depgraph_handler)
     bpy.app.handlers.load_post.append(update_fac_spelling_choices_load_handler)
+    bpy.app.handlers.depsgraph_update_post.append(lod_preview_depsgraph_handler)
+    bpy.app.handlers.load_post.append(lod_preview_load_handler)
+    bpy.app.handlers.depsgraph_update_post.append(forest_cache_depsgraph_handler)
+    bpy.app.handlers.load_post.append(forest_cache_load_handler)
+    bpy.app.handlers.depsgraph_update_post.append(collection_index_depsgraph_handler)
+    bpy.app.handlers.load_post.append(collection_index_reset_handler)
+    bpy.app.handlers.undo_post.append(collection_index_reset_handler)
+    bpy.app.handlers.redo_post.append(collection_index_reset_handler)
+    collection_index_utils.mark_dirty()
 
 def unregister():
+    bpy.app.handlers.redo_post.remove(collection_index_reset_handler)
+    bpy.app.handlers.undo_post.remove(collection_index_reset_handler)
+    bpy.app.handlers.load_post.remove(collection_index_reset_handler)
+    bpy.app.handlers.depsgraph_update_post.remove(collection_index_depsgraph_handler)
+    bpy.app.handlers.load_post.remove(forest_cache_load_handler)
+    bpy.app.handlers.depsgraph_update_post.remove(forest_cache_depsgraph_handler)
+    bpy.app.handlers.load_post.remove(lod_preview_load_handler)
+    bpy.app.handlers.depsgraph_update_post.remove(lod_preview_depsgraph_handler)
     bpy.app.handlers.load_post.remove(update_fac_spelling_choices_load_handler)
     bpy.app.handlers.depsgraph_update_pre.remove(update_fac_spelling_choices_depgraph_handler)
 
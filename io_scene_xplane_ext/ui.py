@@ -7,7 +7,8 @@
 import os
 import bpy # type: ignore
 from . import props
-from .Helpers import file_utils    
+from .Helpers import file_utils
+from .Helpers import collection_index_utils
 
 def draw_decal_prop(layout, property_item, index, material_name=""):
     box = layout.box()
@@ -91,11 +92,7 @@ def draw_fac_spelling_entry(layout, entry, collection_name, floor_index, wall_in
     #row.prop(entry, "collection", text="Segment")
 
     #Find this collection in the collection list
-    col = None
-    for collection in bpy.data.collections:
-        if collection.name == collection_name:
-            col = collection
-            break
+    col = bpy.data.collections.get(collection_name)
     if col is None:
         raise ValueError(f"Collection '{collection_name}' not found in bpy.data.collections.")
         return
@@ -221,11 +218,7 @@ def draw_fac_wall(layout, wall, collection_name, floor_index, wall_index, wall_l
 
 def draw_fac_floor(layout, floor, collection_name, floor_index, floor_len=0):
     #Get the collection from the collection name
-    col = None
-    for collection in bpy.data.collections:
-        if collection.name == collection_name:
-            col = collection
-            break
+    col = bpy.data.collections.get(collection_name)
 
     box = layout.box()
     row = box.row()
@@ -388,21 +381,15 @@ class MENU_for_exporter(bpy.types.Panel):
                 col_2.prop(fr, "skip_water")
 
         # Draw enabled collections
-        for col in bpy.data.collections:
-            if col.xp_for.exportable:
-                if scene.xp_ext.for_collection_search != "" and not (col.name.startswith(scene.xp_ext.for_collection_search) or col.name.endswith(scene.xp_ext.for_collection_search)):
-                    continue
-                draw_collection(col, layout)
+        for col in collection_index_utils.get_collections("xp_for", True, scene.xp_ext.for_collection_search):
+            draw_collection(col, layout)
 
         # Draw disabled collections
         disabled_collections = layout.box()
         disabled_collections.prop(scene.xp_ext, "for_disabled_collections_expanded", text="Disabled Collections", icon='TRIA_DOWN' if scene.xp_ext.for_disabled_collections_expanded else 'TRIA_RIGHT', emboss=False)
         if scene.xp_ext.for_disabled_collections_expanded:
-            for col in bpy.data.collections:
-                if not col.xp_for.exportable:
-                    if scene.xp_ext.for_collection_search != "" and not (col.name.startswith(scene.xp_ext.for_collection_search) or col.name.endswith(scene.xp_ext.for_collection_search)):
-                        continue
-                    draw_collection(col, disabled_collections)
+            for col in collection_index_utils.get_collections("xp_for", False, scene.xp_ext.for_collection_search):
+                draw_collection(col, disabled_collections)
 
 class MENU_for_object(bpy.types.Panel):
     bl_label = "X-Plane Forest Exporter"
@@ -472,40 +459,34 @@ class MENU_lin_exporter(bpy.types.Panel):
         if scene.xp_ext.lin_collection_search != "":
             layout.label(text="Filtered Collections")
 
-        #For every collection, if it exportable, draw it's params
-        for col in bpy.data.collections:
-            if col.xp_lin.exportable:
-                #Check if the collection starts with the search name, or, the search is empty
-                if scene.xp_ext.lin_collection_search == "" or (col.name.startswith(scene.xp_ext.lin_collection_search) or col.name.endswith(scene.xp_ext.lin_collection_search)):
-                    box = layout.box()
-                    top_row = box.row()
-                    top_row.prop(col.xp_lin, "is_ui_expanded", text=col.name, icon='TRIA_DOWN' if col.xp_lin.is_ui_expanded else 'TRIA_RIGHT', emboss=False)
-                    top_row.prop(col.xp_lin, "exportable", text="Export Enabled")
-                    if col.xp_lin.is_ui_expanded:
-                        box.prop(col.xp_lin, "name")
-                        box.prop(col.xp_lin, "mirror")
-                        box.prop(col.xp_lin, "segment_count")
+        #Draw the params of every exportable collection that matches the search
+        for col in collection_index_utils.get_collections("xp_lin", True, scene.xp_ext.lin_collection_search):
+            box = layout.box()
+            top_row = box.row()
+            top_row.prop(col.xp_lin, "is_ui_expanded", text=col.name, icon='TRIA_DOWN' if col.xp_lin.is_ui_expanded else 'TRIA_RIGHT', emboss=False)
+            top_row.prop(col.xp_lin, "exportable", text="Export Enabled")
+            if col.xp_lin.is_ui_expanded:
+                box.prop(col.xp_lin, "name")
+                box.prop(col.xp_lin, "mirror")
+                box.prop(col.xp_lin, "segment_count")
 
 
         #Draw a collapsable box where we can list all the collections, and whether they are exportable
         disabled_box = layout.box()
         disabled_box.prop(scene.xp_ext, "lin_disabled_collections_expanded", text="Disabled Collections", icon='TRIA_DOWN' if scene.xp_ext.lin_disabled_collections_expanded else 'TRIA_RIGHT', emboss=False)
         if scene.xp_ext.lin_disabled_collections_expanded:
-            for col in bpy.data.collections:
-                if not col.xp_lin.exportable:
-                    #Check if the collection starts with the search name, or, the search is empty
-                    if scene.xp_ext.lin_collection_search == "" or (col.name.startswith(scene.xp_ext.lin_collection_search) or col.name.endswith(scene.xp_ext.lin_collection_search)):
-                        box = layout.box()
-                        top_row = box.row()
-                        top_row.prop(col.xp_lin, "is_ui_expanded", text=col.name, icon='TRIA_DOWN' if col.xp_lin.is_ui_expanded else 'TRIA_RIGHT', emboss=False)
-                        top_row.prop(col.xp_lin, "exportable", text="Export Disabled")
-                        if col.xp_lin.is_ui_expanded:
-                            box.prop(col.xp_lin, "name")
-                            box.prop(col.xp_lin, "mirror")
-                            box.prop(col.xp_lin, "segment_count")
-                            row = box.row()
-                            row.prop(col.xp_lin, "layer_group")
-                            row.prop(col.xp_lin, "layer_group_offset")
+            for col in collection_index_utils.get_collections("xp_lin", False, scene.xp_ext.lin_collection_search):
+                box = layout.box()
+                top_row = box.row()
+                top_row.prop(col.xp_lin, "is_ui_expanded", text=col.name, icon='TRIA_DOWN' if col.xp_lin.is_ui_expanded else 'TRIA_RIGHT', emboss=False)
+                top_row.prop(col.xp_lin, "exportable", text="Export Disabled")
+                if col.xp_lin.is_ui_expanded:
+                    box.prop(col.xp_lin, "name")
+                    box.prop(col.xp_lin, "mirror")
+                    box.prop(col.xp_lin, "segment_count")
+                    row = box.row()
+                    row.prop(col.xp_lin, "layer_group")
+                    row.prop(col.xp_lin, "layer_group_offset")
 
 class MENU_lin_layer(bpy.types.Panel):
     bl_label = "X-Plane Line Layer"
@@ -594,6 +575,8 @@ class MENU_agp_obj(bpy.types.Panel):
                 row.operator("xp_ext.clear_attached_object_preview", text="Clear Preview")
                 btn_real_preview = row.operator("xp_ext.preview_attached_object", text="Preview as Real Objects")
                 btn_real_preview.make_real = True
+                btn_instance_preview = box.operator("xp_ext.preview_attached_object", text="Preview as Instances")
+                btn_instance_preview.use_instances = True
             elif agp_obj.type == "AUTO_SPLIT_OBJ":
                 layout.separator()
                 layout.label(text="DISCLAIMER:")
@@ -687,21 +670,15 @@ class MENU_agp_exporter(bpy.types.Panel):
                     box.prop(agp, "texture_tiling_map_texture")
 
         # Draw enabled collections
-        for col in bpy.data.collections:
-            if col.xp_agp.exportable:
-                if scene.xp_ext.agp_collection_search != "" and not (col.name.startswith(scene.xp_ext.agp_collection_search) or col.name.endswith(scene.xp_ext.agp_collection_search)):
-                    continue
-                draw_collection(col, layout)
+        for col in collection_index_utils.get_collections("xp_agp", True, scene.xp_ext.agp_collection_search):
+            draw_collection(col, layout)
 
         # Draw disabled collections
         disabled_collections = layout.box()
         disabled_collections.prop(scene.xp_ext, "agp_disabled_collections_expanded", text="Disabled Collections", icon='TRIA_DOWN' if scene.xp_ext.agp_disabled_collections_expanded else 'TRIA_RIGHT', emboss=False)
         if scene.xp_ext.agp_disabled_collections_expanded:
-            for col in bpy.data.collections:
-                if not col.xp_agp.exportable:
-                    if scene.xp_ext.agp_collection_search != "" and not (col.name.startswith(scene.xp_ext.agp_collection_search) or col.name.endswith(scene.xp_ext.agp_collection_search)):
-                        continue
-                    draw_collection(col, disabled_collections)
+            for col in collection_index_utils.get_collections("xp_agp", False, scene.xp_ext.agp_collection_search):
+                draw_collection(col, disabled_collections)
 
 class MENU_mats(bpy.types.Panel):
     bl_label = "X-Plane Material Properties"
@@ -848,6 +825,10 @@ class MENU_operations(bpy.types.Panel):
 
         xp_ext = bpy.context.scene.xp_ext
 
+        layout.separator()
+        layout.prop(xp_ext, "export_worker_count")
+        layout.operator("xp_ext.export_all", text="Export All X-Plane Assets").worker_count = xp_ext.export_worker_count
+
         layout.separator()
         layout.label(text="X-Plane Exporter Sync")
         layout.operator("xp_ext.update_collection_textures", text="Update X-Plane Export Texture Settings")
@@ -924,6 +905,7 @@ class MENU_operations(bpy.types.Panel):
         box.prop(xp_ext, "menu_lod_preview_expanded", text="Level of Detail (LOD) Preview", icon='TRIA_DOWN' if xp_ext.menu_lod_preview_expanded else 'TRIA_RIGHT', emboss=False)
         if xp_ext.menu_lod_preview_expanded:
             box.prop(xp_ext, "lod_distance_preview")
+            box.prop(xp_ext, "lod_preview_live")
             box.operator("xp_ext.preview_lods_for_distance", text="Preview LODs for Distance")
 
         layout.separator()
@@ -1048,20 +1030,14 @@ class MENU_facade(bpy.types.Panel):
                 btn_add.level = "floor"
                 btn_add.add = True
 
-        for col in bpy.data.collections:
-            if col.xp_fac.exportable:
-                if context.scene.xp_ext.fac_collection_search != "" and not (col.name.startswith(context.scene.xp_ext.fac_collection_search) or col.name.endswith(context.scene.xp_ext.fac_collection_search)):
-                    continue
-                draw_collection(col, layout)
+        for col in collection_index_utils.get_collections("xp_fac", True, context.scene.xp_ext.fac_collection_search):
+            draw_collection(col, layout)
                 
         disabled_collections = layout.box()
         disabled_collections.prop(context.scene.xp_ext, "fac_disabled_collections_expanded", text="Disabled Collections", icon='TRIA_DOWN' if context.scene.xp_ext.fac_disabled_collections_expanded else 'TRIA_RIGHT', emboss=False)
         if context.scene.xp_ext.fac_disabled_collections_expanded:
-            for col in bpy.data.collections:
-                if not col.xp_fac.exportable:
-                    if context.scene.xp_ext.fac_collection_search != "" and not (col.name.startswith(context.scene.xp_ext.fac_collection_search) or col.name.endswith(context.scene.xp_ext.fac_collection_search)):
-                        continue
-                    draw_collection(col, disabled_collections)
+            for col in collection_index_utils.get_collections("xp_fac", False, context.scene.xp_ext.fac_collection_search):
+                draw_collection(col, disabled_collections)
 
 class MENU_attached_object(bpy.types.Panel):
     """Creates a Panel in the object properties window"""
@@ -1083,11 +1059,7 @@ class MENU_attached_object(bpy.types.Panel):
             
             #Check if there are any facades enabled in the scene
             if addon_prefs.show_only_relevant_settings:
-                result = False
-
-                for col in bpy.data.collections:
-                    if col.xp_fac.exportable:
-                        result = True
+                result = collection_index_utils.has_exportable("xp_fac")
                         
         return result
 
@@ -1112,6 +1084,8 @@ class MENU_attached_object(bpy.types.Panel):
             row.operator("xp_ext.clear_attached_object_preview", text="Clear Preview")
             btn_real_preview = row.operator("xp_ext.preview_attached_object", text="Preview as Real Objects")
             btn_real_preview.make_real = True
+            btn_instance_preview = box.operator("xp_ext.preview_attached_object", text="Preview as Instances")
+            btn_instance_preview.use_instances = True
 
 class MENU_fac_mesh(bpy.types.Panel):
     """Creates a Panel in the object properties window"""
@@ -1132,10 +1106,7 @@ class MENU_fac_mesh(bpy.types.Panel):
         if result:
             #Check if there are any facades enabled in the scene
             if addon_prefs.show_only_relevant_settings:
-                result = False
-                for col in bpy.data.collections:
-                    if col.xp_fac.exportable:
-                        result = True
+                result = collection_index_utils.has_exportable("xp_fac")
 
         return result
 
@@ -1217,21 +1188,15 @@ class MENU_pol_exporter(bpy.types.Panel):
                     box.prop(pol, "runway_markings_texture")
 
         # Draw enabled collections
-        for col in bpy.data.collections:
-            if col.xp_pol.exportable:
-                if scene.xp_ext.pol_collection_search != "" and not (col.name.startswith(scene.xp_ext.pol_collection_search) or col.name.endswith(scene.xp_ext.pol_collection_search)):
-                    continue
-                draw_collection(col, layout)
+        for col in collection_index_utils.get_collections("xp_pol", True, scene.xp_ext.pol_collection_search):
+            draw_collection(col, layout)
 
         # Draw disabled collections
         disabled_collections = layout.box()
         disabled_collections.prop(scene.xp_ext, "pol_disabled_collections_expanded", text="Disabled Collections", icon='TRIA_DOWN' if scene.xp_ext.pol_disabled_collections_expanded else 'TRIA_RIGHT', emboss=False)
         if scene.xp_ext.pol_disabled_collections_expanded:
-            for col in bpy.data.collections:
-                if not col.xp_pol.exportable:
-                    if scene.xp_ext.pol_collection_search != "" and not (col.name.startswith(scene.xp_ext.pol_collection_search) or col.name.endswith(scene.xp_ext.pol_collection_search)):
-                        continue
-                    draw_collection(col, disabled_collections)
+            for col in collection_index_utils.get_collections("xp_pol", False, scene.xp_ext.pol_collection_search):
+                draw_collection(col, disabled_collections)
 
 def register():
     bpy.utils.register_class(MENU_lin_exporter)